@@ -0,0 +1,57 @@
+"""Add vocabulary_versions change marker for vocabulary-derived caches.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+from uuid import uuid4
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "015"
+down_revision: str | None = "014"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Tables whose changes invalidate vocabulary-derived caches
+VOCABULARY_TABLES = ("concepts", "concept_synonyms")
+
+
+def upgrade() -> None:
+    versions = op.create_table(
+        "vocabulary_versions",
+        sa.Column("id", sa.dialects.postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.bulk_insert(versions, [{"id": uuid4(), "version": 1}])
+
+    # Bump the version once per statement (not per row) so bulk loads stay cheap
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_vocabulary_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE vocabulary_versions SET version = version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in VOCABULARY_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_vocabulary_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_vocabulary_version()
+        """)
+
+
+def downgrade() -> None:
+    for table in VOCABULARY_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_vocabulary_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_vocabulary_version()")
+    op.drop_table("vocabulary_versions")
@@ -0,0 +1,60 @@
+"""Add lower() and trigram indexes on concept and synonym names.
+
+SQLMappingService matches on lower(name) (equality, prefix ranges and
+the pg_trgm % operator). Without expression indexes each lookup is a
+sequential scan over the concept tables.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "016"
+down_revision: str | None = "015"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# (index name, table, column, access method and operator class)
+NAME_INDEXES = (
+    # text_pattern_ops serves byte-wise prefix ranges (~>=~, ~<~) under non-C collations
+    ("ix_concepts_concept_name_lower", "concepts", "concept_name", "btree", "text_pattern_ops"),
+    ("ix_concepts_concept_name_trgm", "concepts", "concept_name", "gin", "gin_trgm_ops"),
+    (
+        "ix_concept_synonyms_name_lower",
+        "concept_synonyms",
+        "concept_synonym_name",
+        "btree",
+        "text_pattern_ops",
+    ),
+    (
+        "ix_concept_synonyms_name_trgm",
+        "concept_synonyms",
+        "concept_synonym_name",
+        "gin",
+        "gin_trgm_ops",
+    ),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Build concurrently so loaded vocabularies stay writable meanwhile
+    with op.get_context().autocommit_block():
+        for name, table, column, method, opclass in NAME_INDEXES:
+            op.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+                ON {table} USING {method} (lower({column}) {opclass})
+            """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, *_ in NAME_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,113 @@
+"""Add a unique fact dedup key and a unique index on evidence links.
+
+DatabaseFactBuilderService writes facts with INSERT ... ON CONFLICT on
+their dedup key and evidence with ON CONFLICT DO NOTHING on (fact,
+source), which needs unique indexes on both.
+
+The dedup key is stored in its own column, set only by the fact builder:
+FHIR import writes one fact per resource (repeated readings, several
+facts with omop_concept_id 0) and must not be merged. Existing facts
+with evidence, which the fact builder wrote, are backfilled. Duplicates
+written before the index existed are merged into the oldest fact of each
+key, which takes their evidence, graph edges and merged confidence.
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "017"
+down_revision: str | None = "016"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+FACT_DEDUP_INDEX = "uq_clinical_facts_dedup_key"
+EVIDENCE_SOURCE_INDEX = "uq_fact_evidence_source"
+EVIDENCE_SOURCE_COLUMNS = "fact_id, source_id, source_table"
+
+
+def upgrade() -> None:
+    op.add_column("clinical_facts", sa.Column("dedup_key", sa.String(600), nullable=True))
+
+    # Same format as BaseFactBuilderService.calculate_dedup_key
+    op.execute("""
+        UPDATE clinical_facts f
+        SET dedup_key = concat_ws(':', f.patient_id, f.omop_concept_id,
+                                  f.assertion, f.temporality, f.experiencer)
+        WHERE EXISTS (SELECT 1 FROM fact_evidence e WHERE e.fact_id = f.id)
+    """)
+
+    # Map each duplicate fact to the oldest fact with the same dedup key
+    op.execute("""
+        CREATE TEMPORARY TABLE fact_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY dedup_key ORDER BY created_at, id
+            ) AS keep_id
+            FROM clinical_facts
+            WHERE dedup_key IS NOT NULL
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    # Same formula as BaseFactBuilderService.merge_confidence: 1 - prod(1 - c)
+    op.execute("""
+        UPDATE clinical_facts f
+        SET confidence = merged.confidence
+        FROM (
+            SELECT groups.keep_id,
+                   1 - exp(sum(ln(greatest(1 - c.confidence, 1e-12)))) AS confidence
+            FROM (
+                SELECT id, keep_id FROM fact_duplicates
+                UNION
+                SELECT keep_id, keep_id FROM fact_duplicates
+            ) groups
+            JOIN clinical_facts c ON c.id = groups.id
+            GROUP BY groups.keep_id
+        ) merged
+        WHERE f.id = merged.keep_id
+    """)
+    op.execute("""
+        UPDATE fact_evidence e SET fact_id = d.keep_id
+        FROM fact_duplicates d WHERE e.fact_id = d.id
+    """)
+    op.execute("""
+        UPDATE kg_edges e SET fact_id = d.keep_id
+        FROM fact_duplicates d WHERE e.fact_id = d.id
+    """)
+    op.execute("DELETE FROM clinical_facts f USING fact_duplicates d WHERE f.id = d.id")
+    op.execute(f"""
+        DELETE FROM fact_evidence e
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY {EVIDENCE_SOURCE_COLUMNS} ORDER BY created_at, id
+            ) AS position
+            FROM fact_evidence
+        ) ranked
+        WHERE e.id = ranked.id AND ranked.position > 1
+    """)
+
+    # Build concurrently so fact writers are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {FACT_DEDUP_INDEX}
+            ON clinical_facts (dedup_key)
+        """)
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {EVIDENCE_SOURCE_INDEX}
+            ON fact_evidence ({EVIDENCE_SOURCE_COLUMNS})
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {EVIDENCE_SOURCE_INDEX}")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {FACT_DEDUP_INDEX}")
+    op.drop_column("clinical_facts", "dedup_key")
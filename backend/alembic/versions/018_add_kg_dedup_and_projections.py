@@ -0,0 +1,112 @@
+"""Add unique knowledge-graph dedup indexes and projection watermarks.
+
+DatabaseGraphBuilderService projects facts into the graph incrementally:
+nodes are written with INSERT ... ON CONFLICT on their dedup key, edges
+with ON CONFLICT DO NOTHING on (source, target, type), and each patient's
+projection watermark and graph counts are kept in kg_projections.
+
+As for facts, the node dedup key is stored in its own column, set only by
+the graph builder: FHIR import writes one node per resource and must not
+be merged. Existing builder nodes (the patient node and nodes carrying a
+fact_id) are backfilled. Duplicates written before the index existed are
+merged into the oldest node of each key, which takes their edges.
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-16
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "018"
+down_revision: str | None = "017"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+NODE_DEDUP_INDEX = "uq_kg_nodes_dedup_key"
+EDGE_INDEX = "uq_kg_edges_source_target_type"
+EDGE_COLUMNS = "source_node_id, target_node_id, edge_type"
+
+
+def upgrade() -> None:
+    op.add_column("kg_nodes", sa.Column("dedup_key", sa.String(600), nullable=True))
+
+    # Same format as BaseGraphBuilderService.calculate_node_dedup_key
+    op.execute("""
+        UPDATE kg_nodes
+        SET dedup_key = concat_ws(':', patient_id, node_type,
+                                  coalesce(nullif(omop_concept_id, 0)::text, 'patient'))
+        WHERE properties ? 'fact_id' OR properties->>'type' = 'patient'
+    """)
+
+    # Map each duplicate node to the oldest node with the same dedup key
+    op.execute("""
+        CREATE TEMPORARY TABLE node_duplicates ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY dedup_key ORDER BY created_at, id
+            ) AS keep_id
+            FROM kg_nodes
+            WHERE dedup_key IS NOT NULL
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        UPDATE kg_edges e SET source_node_id = d.keep_id
+        FROM node_duplicates d WHERE e.source_node_id = d.id
+    """)
+    op.execute("""
+        UPDATE kg_edges e SET target_node_id = d.keep_id
+        FROM node_duplicates d WHERE e.target_node_id = d.id
+    """)
+    op.execute("DELETE FROM kg_nodes n USING node_duplicates d WHERE n.id = d.id")
+    op.execute(f"""
+        DELETE FROM kg_edges e
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY {EDGE_COLUMNS} ORDER BY created_at, id
+            ) AS position
+            FROM kg_edges
+        ) ranked
+        WHERE e.id = ranked.id AND ranked.position > 1
+    """)
+
+    op.create_table(
+        "kg_projections",
+        sa.Column("id", postgresql.UUID(as_uuid=False), primary_key=True),
+        sa.Column("patient_id", sa.String(255), nullable=False),
+        sa.Column("projected_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("node_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("edge_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index("ix_kg_projections_patient_id", "kg_projections", ["patient_id"], unique=True)
+
+    # Build concurrently so graph writers are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {NODE_DEDUP_INDEX}
+            ON kg_nodes (dedup_key)
+        """)
+        op.execute(f"""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {EDGE_INDEX}
+            ON kg_edges ({EDGE_COLUMNS})
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {EDGE_INDEX}")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {NODE_DEDUP_INDEX}")
+    op.drop_index("ix_kg_projections_patient_id", table_name="kg_projections")
+    op.drop_table("kg_projections")
+    op.drop_column("kg_nodes", "dedup_key")
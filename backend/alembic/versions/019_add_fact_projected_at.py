@@ -0,0 +1,69 @@
+"""Track graph projection per fact instead of a created_at watermark.
+
+DatabaseGraphBuilderService used to project only facts created after a
+per-patient watermark (kg_projections.projected_until). created_at is
+the inserting transaction's start time, so a fact committed by a
+transaction that started before a build but finished after it was never
+projected. Facts now carry projected_at, set by the graph builder in the
+transaction that projects them; incremental builds read the facts where
+it is NULL, through a partial index.
+
+Facts created before their patient's old watermark are backfilled as
+projected. Facts at or after it are left NULL and reprojected by the next
+build, which is a no-op for those already in the graph.
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-17
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "019"
+down_revision: str | None = "018"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+UNPROJECTED_INDEX = "ix_clinical_facts_unprojected"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "clinical_facts", sa.Column("projected_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.execute("""
+        UPDATE clinical_facts f
+        SET projected_at = p.projected_until
+        FROM kg_projections p
+        WHERE p.patient_id = f.patient_id AND f.created_at < p.projected_until
+    """)
+    op.drop_column("kg_projections", "projected_until")
+
+    # Build concurrently so fact writers are not blocked meanwhile
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {UNPROJECTED_INDEX}
+            ON clinical_facts (patient_id) WHERE projected_at IS NULL
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {UNPROJECTED_INDEX}")
+    op.add_column(
+        "kg_projections",
+        sa.Column("projected_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute("""
+        UPDATE kg_projections p
+        SET projected_until = (
+            SELECT max(f.projected_at) FROM clinical_facts f WHERE f.patient_id = p.patient_id
+        )
+    """)
+    op.drop_column("clinical_facts", "projected_at")
@@ -18,6 +18,8 @@ from uuid import uuid4
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from app.services.nlp import ExtractedMention
+
 router = APIRouter(prefix="/coding", tags=["Auto-Coding"])
 
 
@@ -253,187 +255,15 @@ async def auto_code(request: AutoCodeRequest) -> AutoCodeResponse:
         AutoCodeResponse with concepts, codes, and summary.
     """
     start_time = time.perf_counter()
-    request_id = str(uuid4())
 
     try:
-        # Import services
-        from app.services import (
-            get_advanced_nlp_service,
-            get_ensemble_nlp_service,
-            get_icd10_suggester_service,
-            get_cpt_suggester_service,
-        )
+        from app.services import get_nlp_engine_registry
 
-        # Step 1: NLP Extraction
-        ensemble = get_ensemble_nlp_service()
+        # Step 1: NLP Extraction (shared ensemble picks up hot-swapped engines)
+        ensemble = get_nlp_engine_registry().get("ensemble")
         mentions = ensemble.extract_mentions(request.text, str(uuid4()))
 
-        # Step 2: Advanced NLP Enhancements
-        advanced = get_advanced_nlp_service()
-        enhanced_mentions = advanced.enhance_mentions(request.text, mentions)
-
-        # Step 3: Build concepts with codes
-        concepts_with_codes: list[ConceptWithCodes] = []
-        codes_by_system: dict[str, int] = {}
-        high_confidence_count = 0
-        negated_count = 0
-
-        icd10_service = None
-        cpt_service = None
-
-        if CodeSystem.ICD10CM in request.code_systems:
-            icd10_service = get_icd10_suggester_service()
-        if CodeSystem.CPT in request.code_systems:
-            cpt_service = get_cpt_suggester_service()
-
-        for em in enhanced_mentions:
-            mention = em.mention
-            enhancement = em.enhancement
-
-            # Determine assertion status
-            assertion = AssertionStatus.PRESENT
-            if mention.assertion.value == "absent":
-                assertion = AssertionStatus.ABSENT
-                negated_count += 1
-                if not request.include_negated:
-                    continue
-            elif mention.assertion.value == "possible":
-                assertion = AssertionStatus.POSSIBLE
-            elif mention.assertion.value == "conditional":
-                assertion = AssertionStatus.CONDITIONAL
-            elif mention.temporality == "historical":
-                if not request.include_historical:
-                    continue
-
-            # Build normalized text
-            normalized = mention.text
-            if enhancement.disambiguated_term:
-                normalized = enhancement.disambiguated_term
-            if enhancement.compound_condition_text:
-                normalized = enhancement.compound_condition_text
-
-            # Create extracted concept
-            concept = ExtractedConcept(
-                id=str(uuid4()),
-                text=mention.text,
-                normalized_text=normalized,
-                start_offset=mention.start_offset,
-                end_offset=mention.end_offset,
-                domain=mention.domain or "Unknown",
-                assertion=assertion,
-                laterality=enhancement.laterality.value if enhancement.laterality else None,
-                temporality=mention.temporality,
-                confidence=mention.confidence,
-                abbreviation_expansion=enhancement.disambiguated_term,
-                compound_modifier=enhancement.linked_modifier,
-                negation_trigger=enhancement.negation_trigger,
-            )
-
-            # Suggest codes
-            suggested_codes: list[CodeSuggestion] = []
-
-            # ICD-10 codes for conditions
-            if (
-                icd10_service
-                and mention.domain in ("Condition", "Observation", None)
-                and assertion != AssertionStatus.ABSENT
-            ):
-                try:
-                    icd_result = icd10_service.suggest_codes(
-                        query=normalized,
-                        max_suggestions=request.max_codes_per_concept,
-                    )
-                    for s in icd_result.suggestions:
-                        conf_level = ConfidenceLevel(s.confidence.value)
-                        if _passes_confidence_threshold(conf_level, request.min_confidence):
-                            suggested_codes.append(
-                                CodeSuggestion(
-                                    code=s.code,
-                                    code_system=CodeSystem.ICD10CM,
-                                    description=s.description,
-                                    confidence=conf_level,
-                                    confidence_score=_confidence_to_score(conf_level),
-                                    match_type=_infer_match_type(s.match_reason),
-                                    match_explanation=s.match_reason,
-                                    is_billable=s.is_billable,
-                                    more_specific_available=len(s.more_specific_codes) > 0,
-                                )
-                            )
-                            codes_by_system["ICD10CM"] = codes_by_system.get("ICD10CM", 0) + 1
-                            if conf_level == ConfidenceLevel.HIGH:
-                                high_confidence_count += 1
-                except Exception:
-                    pass  # Continue if ICD-10 suggestion fails
-
-            # CPT codes for procedures
-            if cpt_service and mention.domain == "Procedure":
-                try:
-                    cpt_result = cpt_service.suggest_codes(
-                        query=normalized,
-                        clinical_context={},
-                        max_suggestions=request.max_codes_per_concept,
-                    )
-                    for s in cpt_result.suggestions:
-                        conf_level = ConfidenceLevel(s.confidence.value)
-                        if _passes_confidence_threshold(conf_level, request.min_confidence):
-                            suggested_codes.append(
-                                CodeSuggestion(
-                                    code=s.code,
-                                    code_system=CodeSystem.CPT,
-                                    description=s.description,
-                                    confidence=conf_level,
-                                    confidence_score=_confidence_to_score(conf_level),
-                                    match_type="semantic",
-                                    match_explanation=s.cer_citation.claim if s.cer_citation else "Procedure match",
-                                    is_billable=True,
-                                    more_specific_available=len(s.alternative_codes) > 0,
-                                )
-                            )
-                            codes_by_system["CPT"] = codes_by_system.get("CPT", 0) + 1
-                            if conf_level == ConfidenceLevel.HIGH:
-                                high_confidence_count += 1
-                except Exception:
-                    pass  # Continue if CPT suggestion fails
-
-            # Add OMOP concept if available
-            omop_id = mention.omop_concept_id
-
-            concepts_with_codes.append(
-                ConceptWithCodes(
-                    concept=concept,
-                    suggested_codes=suggested_codes,
-                    omop_concept_id=omop_id,
-                    omop_concept_name=normalized if omop_id else None,
-                )
-            )
-
-        # Build summary
-        processing_time = (time.perf_counter() - start_time) * 1000
-        concepts_with_codes_count = sum(1 for c in concepts_with_codes if c.suggested_codes)
-
-        summary = CodingSummary(
-            total_concepts_extracted=len(concepts_with_codes),
-            concepts_with_codes=concepts_with_codes_count,
-            concepts_negated=negated_count,
-            codes_by_system=codes_by_system,
-            high_confidence_codes=high_confidence_count,
-            processing_time_ms=round(processing_time, 2),
-        )
-
-        # Warnings
-        warnings = []
-        if len(concepts_with_codes) == 0:
-            warnings.append("No clinical concepts were extracted from the text.")
-        if concepts_with_codes_count == 0 and len(concepts_with_codes) > 0:
-            warnings.append("Concepts were extracted but no codes could be suggested.")
-
-        return AutoCodeResponse(
-            request_id=request_id,
-            text_length=len(request.text),
-            concepts=concepts_with_codes,
-            summary=summary,
-            warnings=warnings,
-        )
+        return _code_mentions(request, mentions, start_time)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Auto-coding failed: {str(e)}")
@@ -469,15 +299,45 @@ async def batch_code(request: BatchCodeRequest) -> BatchCodeResponse:
     successful = 0
     failed = 0
 
+    # Validate each text as its own auto-code request
+    auto_requests: dict[int, AutoCodeRequest] = {}
+    errors: dict[int, Exception] = {}
     for i, text in enumerate(request.texts):
         try:
-            # Use auto_code for each text
-            auto_request = AutoCodeRequest(
+            auto_requests[i] = AutoCodeRequest(
                 text=text,
                 code_systems=request.code_systems,
                 max_codes_per_concept=request.max_codes_per_concept,
             )
-            response = await auto_code(auto_request)
+        except Exception as e:
+            errors[i] = e
+
+    # Extract all texts in one batch so the engines share work across texts
+    from app.services import get_nlp_engine_registry
+
+    ensemble = get_nlp_engine_registry().get("ensemble")
+    mentions_by_index: dict[int, list] = {}
+    try:
+        extracted = ensemble.extract_mentions_batch(
+            (auto_request.text, str(uuid4()), None) for auto_request in auto_requests.values()
+        )
+        mentions_by_index = dict(zip(auto_requests, extracted, strict=True))
+    except Exception:
+        # Retry text by text so one bad text only fails its own item
+        for i, auto_request in auto_requests.items():
+            try:
+                mentions_by_index[i] = ensemble.extract_mentions(auto_request.text, str(uuid4()))
+            except Exception as e:
+                errors[i] = e
+
+    for i, text in enumerate(request.texts):
+        if i in errors:
+            results.append(_failed_batch_item(i, text, errors[i]))
+            failed += 1
+            continue
+
+        try:
+            response = _code_mentions(auto_requests[i], mentions_by_index[i], time.perf_counter())
 
             # Collect top codes across all concepts
             all_codes = []
@@ -501,16 +361,7 @@ async def batch_code(request: BatchCodeRequest) -> BatchCodeResponse:
             successful += 1
 
         except Exception as e:
-            results.append(
-                BatchCodeItem(
-                    index=i,
-                    text_preview=text[:100] + "..." if len(text) > 100 else text,
-                    concepts_extracted=0,
-                    codes_suggested=0,
-                    top_codes=[],
-                    error=str(e),
-                )
-            )
+            results.append(_failed_batch_item(i, text, e))
             failed += 1
 
     total_time = (time.perf_counter() - start_time) * 1000
@@ -686,3 +537,209 @@ def _infer_match_type(match_reason: str) -> str:
     if "partial" in reason_lower or "fuzzy" in reason_lower:
         return "fuzzy"
     return "semantic"
+
+
+def _failed_batch_item(index: int, text: str, error: Exception) -> BatchCodeItem:
+    """Build the batch result for a text that could not be coded."""
+    return BatchCodeItem(
+        index=index,
+        text_preview=text[:100] + "..." if len(text) > 100 else text,
+        concepts_extracted=0,
+        codes_suggested=0,
+        top_codes=[],
+        error=str(error),
+    )
+
+
+def _code_mentions(
+    request: AutoCodeRequest,
+    mentions: list[ExtractedMention],
+    start_time: float,
+) -> AutoCodeResponse:
+    """Enhance extracted mentions and suggest codes for them.
+
+    Shared by the auto-code and batch endpoints, which differ only in how
+    mentions are extracted.
+
+    Args:
+        request: Clinical text and coding configuration.
+        mentions: Mentions extracted from request.text.
+        start_time: perf_counter value when processing of the text started.
+
+    Returns:
+        AutoCodeResponse with concepts, codes, and summary.
+    """
+    from app.services import (
+        get_advanced_nlp_service,
+        get_cpt_suggester_service,
+        get_icd10_suggester_service,
+    )
+
+    request_id = str(uuid4())
+
+    # Step 2: Advanced NLP Enhancements
+    advanced = get_advanced_nlp_service()
+    enhanced_mentions = advanced.enhance_mentions(request.text, mentions)
+
+    # Step 3: Build concepts with codes
+    concepts_with_codes: list[ConceptWithCodes] = []
+    codes_by_system: dict[str, int] = {}
+    high_confidence_count = 0
+    negated_count = 0
+
+    icd10_service = None
+    cpt_service = None
+
+    if CodeSystem.ICD10CM in request.code_systems:
+        icd10_service = get_icd10_suggester_service()
+    if CodeSystem.CPT in request.code_systems:
+        cpt_service = get_cpt_suggester_service()
+
+    for em in enhanced_mentions:
+        mention = em.mention
+        enhancement = em.enhancement
+
+        # Determine assertion status
+        assertion = AssertionStatus.PRESENT
+        if mention.assertion.value == "absent":
+            assertion = AssertionStatus.ABSENT
+            negated_count += 1
+            if not request.include_negated:
+                continue
+        elif mention.assertion.value == "possible":
+            assertion = AssertionStatus.POSSIBLE
+        elif mention.assertion.value == "conditional":
+            assertion = AssertionStatus.CONDITIONAL
+        elif mention.temporality == "historical":
+            if not request.include_historical:
+                continue
+
+        # Build normalized text
+        normalized = mention.text
+        if enhancement.disambiguated_term:
+            normalized = enhancement.disambiguated_term
+        if enhancement.compound_condition_text:
+            normalized = enhancement.compound_condition_text
+
+        # Create extracted concept
+        concept = ExtractedConcept(
+            id=str(uuid4()),
+            text=mention.text,
+            normalized_text=normalized,
+            start_offset=mention.start_offset,
+            end_offset=mention.end_offset,
+            domain=mention.domain or "Unknown",
+            assertion=assertion,
+            laterality=enhancement.laterality.value if enhancement.laterality else None,
+            temporality=mention.temporality,
+            confidence=mention.confidence,
+            abbreviation_expansion=enhancement.disambiguated_term,
+            compound_modifier=enhancement.linked_modifier,
+            negation_trigger=enhancement.negation_trigger,
+        )
+
+        # Suggest codes
+        suggested_codes: list[CodeSuggestion] = []
+
+        # ICD-10 codes for conditions
+        if (
+            icd10_service
+            and mention.domain in ("Condition", "Observation", None)
+            and assertion != AssertionStatus.ABSENT
+        ):
+            try:
+                icd_result = icd10_service.suggest_codes(
+                    query=normalized,
+                    max_suggestions=request.max_codes_per_concept,
+                )
+                for s in icd_result.suggestions:
+                    conf_level = ConfidenceLevel(s.confidence.value)
+                    if _passes_confidence_threshold(conf_level, request.min_confidence):
+                        suggested_codes.append(
+                            CodeSuggestion(
+                                code=s.code,
+                                code_system=CodeSystem.ICD10CM,
+                                description=s.description,
+                                confidence=conf_level,
+                                confidence_score=_confidence_to_score(conf_level),
+                                match_type=_infer_match_type(s.match_reason),
+                                match_explanation=s.match_reason,
+                                is_billable=s.is_billable,
+                                more_specific_available=len(s.more_specific_codes) > 0,
+                            )
+                        )
+                        codes_by_system["ICD10CM"] = codes_by_system.get("ICD10CM", 0) + 1
+                        if conf_level == ConfidenceLevel.HIGH:
+                            high_confidence_count += 1
+            except Exception:
+                pass  # Continue if ICD-10 suggestion fails
+
+        # CPT codes for procedures
+        if cpt_service and mention.domain == "Procedure":
+            try:
+                cpt_result = cpt_service.suggest_codes(
+                    query=normalized,
+                    clinical_context={},
+                    max_suggestions=request.max_codes_per_concept,
+                )
+                for s in cpt_result.suggestions:
+                    conf_level = ConfidenceLevel(s.confidence.value)
+                    if _passes_confidence_threshold(conf_level, request.min_confidence):
+                        suggested_codes.append(
+                            CodeSuggestion(
+                                code=s.code,
+                                code_system=CodeSystem.CPT,
+                                description=s.description,
+                                confidence=conf_level,
+                                confidence_score=_confidence_to_score(conf_level),
+                                match_type="semantic",
+                                match_explanation=s.cer_citation.claim if s.cer_citation else "Procedure match",
+                                is_billable=True,
+                                more_specific_available=len(s.alternative_codes) > 0,
+                            )
+                        )
+                        codes_by_system["CPT"] = codes_by_system.get("CPT", 0) + 1
+                        if conf_level == ConfidenceLevel.HIGH:
+                            high_confidence_count += 1
+            except Exception:
+                pass  # Continue if CPT suggestion fails
+
+        # Add OMOP concept if available
+        omop_id = mention.omop_concept_id
+
+        concepts_with_codes.append(
+            ConceptWithCodes(
+                concept=concept,
+                suggested_codes=suggested_codes,
+                omop_concept_id=omop_id,
+                omop_concept_name=normalized if omop_id else None,
+            )
+        )
+
+    # Build summary
+    processing_time = (time.perf_counter() - start_time) * 1000
+    concepts_with_codes_count = sum(1 for c in concepts_with_codes if c.suggested_codes)
+
+    summary = CodingSummary(
+        total_concepts_extracted=len(concepts_with_codes),
+        concepts_with_codes=concepts_with_codes_count,
+        concepts_negated=negated_count,
+        codes_by_system=codes_by_system,
+        high_confidence_codes=high_confidence_count,
+        processing_time_ms=round(processing_time, 2),
+    )
+
+    # Warnings
+    warnings = []
+    if len(concepts_with_codes) == 0:
+        warnings.append("No clinical concepts were extracted from the text.")
+    if concepts_with_codes_count == 0 and len(concepts_with_codes) > 0:
+        warnings.append("Concepts were extracted but no codes could be suggested.")
+
+    return AutoCodeResponse(
+        request_id=request_id,
+        text_length=len(request.text),
+        concepts=concepts_with_codes,
+        summary=summary,
+        warnings=warnings,
+    )
@@ -17,7 +17,7 @@ from app.models.mention import Mention as MentionModel
 from app.schemas import DocumentCreate, JobStatus
 from app.schemas.document import Document, DocumentUploadResponse
 from app.schemas.mention import Mention
-from app.services.nlp_rule_based import RuleBasedNLPService
+from app.services.nlp_engines import get_nlp_engine_registry
 
 logger = logging.getLogger(__name__)
 
@@ -244,8 +244,8 @@ async def preview_extraction(
     """
     import time
 
-    # Initialize NLP service
-    nlp_service = RuleBasedNLPService()
+    # Shared, pre-warmed rule-based engine (no per-request automaton build)
+    nlp_service = get_nlp_engine_registry().get("rule_based")
 
     # Run extraction with timing
     start_time = time.perf_counter()
@@ -281,14 +281,86 @@ async def preview_extraction(
     )
 
 
+class EngineReloadRequest(BaseModel):
+    """Request body for hot-swapping shared NLP engines."""
+
+    engines: list[str] | None = Field(
+        None, description="Engines to rebuild (default: all, or vocabulary engines if reloading vocabulary)"
+    )
+    reload_vocabulary: bool = Field(False, description="Reload the shared vocabulary before rebuilding")
+
+
+class EngineStatsResponse(BaseModel):
+    """Build and reuse statistics for the shared NLP engines."""
+
+    engine_count: int = Field(..., description="Number of registered engines")
+    built_count: int = Field(..., description="Number of engines currently built")
+    engines: dict[str, dict] = Field(..., description="Per-engine build time, generation and reuse count")
+    reloaded: dict[str, float | dict] | None = Field(None, description="Build times of engines reloaded by this request")
+
+
+@router.get(
+    "/preview/engines",
+    response_model=EngineStatsResponse,
+    summary="Shared NLP engine statistics",
+    description="Report build time and reuse counts of the shared extraction engines used by /preview/* endpoints.",
+)
+async def get_preview_engine_stats() -> EngineStatsResponse:
+    """Get statistics for the shared preview extraction engines.
+
+    Returns:
+        EngineStatsResponse with per-engine build and reuse statistics.
+    """
+    return EngineStatsResponse(**get_nlp_engine_registry().get_stats())
+
+
+@router.post(
+    "/preview/engines/reload",
+    response_model=EngineStatsResponse,
+    summary="Hot-swap shared NLP engines",
+    description="Rebuild shared extraction engines (e.g. after a vocabulary reload) without restarting.",
+)
+def reload_preview_engines(
+    request: EngineReloadRequest,
+) -> EngineStatsResponse:
+    """Rebuild and hot-swap the shared preview extraction engines.
+
+    In-flight requests finish on the engine they already hold; subsequent
+    requests use the rebuilt engine. Declared sync so FastAPI runs the
+    (potentially multi-second) rebuild in its threadpool instead of
+    blocking the event loop.
+
+    Args:
+        request: Engines to rebuild and whether to reload vocabulary first.
+
+    Returns:
+        EngineStatsResponse with updated statistics.
+
+    Raises:
+        HTTPException: 400 if an unknown engine name is given.
+    """
+    registry = get_nlp_engine_registry()
+
+    unknown = set(request.engines or []) - set(registry.engine_names)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown engines: {', '.join(sorted(unknown))}",
+        )
+
+    reloaded = registry.reload(
+        names=request.engines,
+        reload_vocabulary=request.reload_vocabulary,
+    )
+    return EngineStatsResponse(**registry.get_stats(), reloaded=reloaded)
+
+
 # ============================================================================
 # Value Extraction Endpoints
 # ============================================================================
 
 from app.models.clinical_value import ValueType
-from app.services.value_extraction import get_value_extraction_service
-from app.services.nlp_clinical_ner import get_clinical_ner_service
-from app.services.relation_extraction import get_relation_extraction_service, RelationType
+from app.services.relation_extraction import RelationType
 from app.services.nlp_ensemble import get_ensemble_nlp_service
 
 
@@ -357,7 +429,7 @@ async def preview_value_extraction(
     import time
 
     # Get extraction service
-    service = get_value_extraction_service()
+    service = get_nlp_engine_registry().get("value")
 
     # Run extraction with timing
     start_time = time.perf_counter()
@@ -473,7 +545,7 @@ async def preview_ner_extraction(
     import time
 
     # Get NER service
-    service = get_clinical_ner_service()
+    service = get_nlp_engine_registry().get("ner")
 
     # Run extraction with timing
     start_time = time.perf_counter()
@@ -597,8 +669,9 @@ async def preview_relation_extraction(
     import time
 
     # Get services
-    relation_service = get_relation_extraction_service()
-    ner_service = get_clinical_ner_service()
+    registry = get_nlp_engine_registry()
+    relation_service = registry.get("relation")
+    ner_service = registry.get("ner")
 
     # Run extraction with timing
     start_time = time.perf_counter()
@@ -744,9 +817,16 @@ async def preview_ensemble_extraction(
         min_confidence=request.min_confidence,
     )
 
-    # Create a new service instance with this config (don't pollute singleton)
-    from app.services.nlp_ensemble import EnsembleNLPService
-    service = EnsembleNLPService(config=config)
+    # Default config uses the shared engine; custom configs get a lightweight
+    # ensemble whose component engines are still shared (don't pollute singleton)
+    if config == EnsembleConfig():
+        service = get_nlp_engine_registry().get("ensemble")
+    else:
+        from app.services.nlp_ensemble import EnsembleNLPService
+        service = EnsembleNLPService(
+            config=config,
+            engine_registry=get_nlp_engine_registry(),
+        )
 
     # Run extraction
     start_time = time.perf_counter()
@@ -95,14 +95,22 @@ def get_patient_graph(patient_id: str) -> PatientGraph:
     summary="Build patient knowledge graph",
     description="Build or rebuild the knowledge graph for a patient from their clinical facts.",
 )
-def build_patient_graph(patient_id: str) -> PatientGraph:
+def build_patient_graph(
+    patient_id: str,
+    full: Annotated[
+        bool,
+        Query(description="Reproject all facts instead of only those added since the last build"),
+    ] = False,
+) -> PatientGraph:
     """Build the knowledge graph for a patient from clinical facts.
 
-    This endpoint forces a rebuild of the patient's knowledge graph,
-    projecting all clinical facts into nodes and edges.
+    This endpoint projects the patient's clinical facts into nodes and
+    edges. Only facts added since the last build are projected unless
+    full is set.
 
     Args:
         patient_id: The patient identifier.
+        full: Reproject all clinical facts.
 
     Returns:
         PatientGraph with all nodes and edges.
@@ -131,7 +139,7 @@ def build_patient_graph(patient_id: str) -> PatientGraph:
         graph_service = DatabaseGraphBuilderService(session)
 
         # Build the graph
-        result = graph_service.build_graph_for_patient(patient_id)
+        result = graph_service.build_graph_for_patient(patient_id, full=full)
         session.commit()
 
         logger.info(
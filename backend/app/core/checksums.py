@@ -0,0 +1,32 @@
+"""Content checksums for source files.
+
+Used to key derived artifacts (cached automatons, vocabulary snapshots)
+to the exact contents of the files they were built from.
+"""
+
+import hashlib
+from pathlib import Path
+
+
+def hash_files(*paths: Path) -> str:
+    """Compute a content hash over a set of source files.
+
+    Missing files contribute a fixed marker so that creating or deleting
+    a fixture also changes the hash.
+
+    Args:
+        paths: Files to include in the hash.
+
+    Returns:
+        Hex-encoded SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(path.name).encode())
+        if path.exists():
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        else:
+            digest.update(b"<missing>")
+    return digest.hexdigest()
@@ -28,6 +28,34 @@ class Settings(BaseSettings):
     # Redis
     redis_url: str = "redis://localhost:6379/0"
 
+    # NLP automaton cache (shared across worker processes)
+    nlp_automaton_cache_enabled: bool = True
+    nlp_cache_dir: str | None = None
+
+    # Compiled vocabulary snapshots (python -m app.scripts.build_snapshots)
+    vocabulary_snapshot_enabled: bool = True
+    vocabulary_snapshot_dir: str | None = None
+
+    # SQL concept mapping: minimum pg_trgm similarity for fuzzy candidates
+    mapping_similarity_threshold: float = 0.3
+
+    # Concept mapping cache: in-process LRU in front of Redis
+    mapping_cache_enabled: bool = True
+    mapping_cache_redis_enabled: bool = True
+    mapping_cache_size: int = 50_000
+    mapping_cache_ttl_seconds: int = 7 * 24 * 3600
+
+    # Startup warm-up of singleton services (concurrent; lazy ones load on first use)
+    warmup_max_workers: int = 4
+    warmup_lazy_services: list[str] = []
+
+    # Write buffer for bulk inserts (flushes at this many rows or this age)
+    write_buffer_max_rows: int = 1000
+    write_buffer_max_age_seconds: float = 5.0
+
+    # Backfills: IDs per batch job (app.core.queue.enqueue_batches)
+    queue_batch_size: int = 100
+
     # API
     api_v1_prefix: str = "/api/v1"
 
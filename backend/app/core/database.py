@@ -4,10 +4,11 @@ from collections.abc import AsyncGenerator
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Engine, create_engine, func
+from sqlalchemy import DateTime, Engine, Insert, create_engine, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from app.core.config import settings
 
@@ -69,6 +70,17 @@ class Base(DeclarativeBase):
     )
 
 
+def upsert_insert(session: Session, model: type[Base]) -> Insert:
+    """Create an INSERT with ON CONFLICT support for the session's dialect.
+
+    PostgreSQL in production, SQLite in tests; both dialects provide
+    on_conflict_do_nothing/on_conflict_do_update with the same arguments.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session.
 
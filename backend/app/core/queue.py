@@ -1,8 +1,11 @@
 """Redis queue configuration and job management."""
 
+from collections.abc import Iterable
+from itertools import islice
 from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
+from app.core.config import settings
 from app.core.redis import get_redis
 
 # RQ is optional - allows app to run without queue support
@@ -76,6 +79,48 @@ def enqueue_job(
     return queue.enqueue(func, *args, job_timeout=job_timeout, job_id=job_id_str, **kwargs)
 
 
+def enqueue_batches(
+    func: Any,
+    ids: Iterable[str | UUID],
+    batch_size: int | None = None,
+    queue_name: str = "default",
+    job_timeout: int = 600,
+) -> list["Job"]:
+    """Enqueue one job per chunk of IDs.
+
+    For backfills: each job receives a list of up to batch_size IDs (as
+    strings), e.g. process_documents_batch, so Redis, pickling and worker
+    set-up are paid per chunk rather than per record. All jobs are
+    enqueued in one Redis pipeline.
+
+    Args:
+        func: The function to execute; called with one list of IDs.
+        ids: IDs to process.
+        batch_size: IDs per job (default: settings.queue_batch_size).
+        queue_name: Name of the queue. Defaults to "default".
+        job_timeout: Timeout of each job in seconds. Defaults to 600 (10 minutes).
+
+    Returns:
+        The enqueued RQ Jobs, in ID order.
+
+    Raises:
+        ImportError: If RQ package is not installed.
+        ValueError: If batch_size is less than 1.
+    """
+    batch_size = batch_size if batch_size is not None else settings.queue_batch_size
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    queue = get_queue(queue_name)
+    remaining = (str(item_id) for item_id in ids)
+    jobs = []
+    while chunk := list(islice(remaining, batch_size)):
+        jobs.append(queue.prepare_data(func, args=(chunk,), timeout=job_timeout))
+    if not jobs:
+        return []
+    return queue.enqueue_many(jobs)
+
+
 def get_job(job_id: str | UUID) -> "Job | None":
     """Get job by ID.
 
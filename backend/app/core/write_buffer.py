@@ -0,0 +1,268 @@
+"""Unit-of-work write buffer for bulk inserts.
+
+Pipeline code used to add ORM objects one at a time and flush the session
+to learn their generated IDs, which cost one round trip per row. A
+WriteBuffer instead takes plain row dictionaries, assigns their UUID
+primary keys client-side (so IDs are known immediately and can be used
+in dependent rows), and keeps them per model until it flushes. A flush
+writes each model's rows with one executemany INSERT, which SQLAlchemy
+sends as batched multi-row statements (insertmanyvalues), parents before
+children so foreign keys hold.
+
+The buffer flushes when it holds max_rows rows, when its oldest row is
+older than max_age_seconds (checked as rows are added; there is no
+background timer, sessions are not thread-safe), on an explicit flush()
+and when its `with` block exits without an error. Rows still pending are
+not visible to queries on the session: code that reads or upserts tables
+other buffered rows depend on should flush first.
+
+WriteBuffer works with a sync Session (get_sync_engine()), AsyncWriteBuffer
+with an AsyncSession (async_session_maker). Both report rows per flush
+through get_stats() and a debug log line per flush.
+
+Usage:
+    with WriteBuffer(session) as buffer:
+        mention_id = buffer.add(Mention, {"document_id": doc_id, ...})
+        buffer.add(MentionConceptCandidate, {"mention_id": mention_id, ...})
+    session.commit()
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _table_order() -> dict[str, int]:
+    """Position of each mapped table in foreign key dependency order."""
+    return {table.name: position for position, table in enumerate(Base.metadata.sorted_tables)}
+
+
+@dataclass
+class WriteBufferStats:
+    """Flush counters of one write buffer."""
+
+    flush_count: int = 0
+    row_count: int = 0
+    max_rows_per_flush: int = 0
+    flush_time_ms: float = 0.0
+    rows_by_table: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the stats to a JSON-serializable dictionary."""
+        return {
+            "flush_count": self.flush_count,
+            "row_count": self.row_count,
+            "rows_per_flush": round(self.row_count / self.flush_count, 2)
+            if self.flush_count
+            else 0.0,
+            "max_rows_per_flush": self.max_rows_per_flush,
+            "flush_time_ms": round(self.flush_time_ms, 2),
+            "rows_by_table": dict(self.rows_by_table),
+        }
+
+
+class _BaseWriteBuffer:
+    """Row bookkeeping shared by the sync and async buffers."""
+
+    def __init__(self, max_rows: int | None = None, max_age_seconds: float | None = None) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_rows: Pending rows that trigger a flush
+                (default: settings.write_buffer_max_rows).
+            max_age_seconds: Age of the oldest pending row that triggers a
+                flush (default: settings.write_buffer_max_age_seconds).
+        """
+        self.max_rows = max_rows if max_rows is not None else settings.write_buffer_max_rows
+        self.max_age_seconds = (
+            max_age_seconds
+            if max_age_seconds is not None
+            else settings.write_buffer_max_age_seconds
+        )
+        self._pending: dict[type[Base], list[dict[str, Any]]] = {}
+        self._pending_count = 0
+        self._oldest: float | None = None
+        self._stats = WriteBufferStats()
+
+    def _queue(self, model: type[Base], rows: Iterable[dict[str, Any]]) -> list[str]:
+        """Assign missing IDs and queue rows, returning their IDs."""
+        pending = self._pending.setdefault(model, [])
+        ids = []
+        for row in rows:
+            row.setdefault("id", str(uuid4()))
+            pending.append(row)
+            ids.append(row["id"])
+        if ids and self._oldest is None:
+            self._oldest = time.monotonic()
+        self._pending_count += len(ids)
+        return ids
+
+    def _should_flush(self) -> bool:
+        """Whether the size or age limit has been reached."""
+        if self._pending_count >= self.max_rows:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_age_seconds
+
+    def _take_pending(self) -> list[tuple[type[Base], list[dict[str, Any]]]]:
+        """Remove the pending rows, per model in foreign key order."""
+        batches = [(model, rows) for model, rows in self._pending.items() if rows]
+        if len(batches) > 1:
+            order = _table_order()
+            batches.sort(key=lambda batch: order.get(batch[0].__tablename__, len(order)))
+        self._pending = {}
+        self._pending_count = 0
+        self._oldest = None
+        return batches
+
+    def _record_flush(
+        self, batches: list[tuple[type[Base], list[dict[str, Any]]]], start_time: float
+    ) -> None:
+        """Update the stats after writing a flush's batches."""
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        rows = sum(len(batch_rows) for _, batch_rows in batches)
+        stats = self._stats
+        stats.flush_count += 1
+        stats.row_count += rows
+        stats.max_rows_per_flush = max(stats.max_rows_per_flush, rows)
+        stats.flush_time_ms += duration_ms
+        for model, batch_rows in batches:
+            table = model.__tablename__
+            stats.rows_by_table[table] = stats.rows_by_table.get(table, 0) + len(batch_rows)
+        logger.debug(
+            f"Write buffer flushed {rows} rows to "
+            f"{', '.join(model.__tablename__ for model, _ in batches)} in {duration_ms:.2f}ms"
+        )
+
+    @property
+    def pending_count(self) -> int:
+        """Number of rows waiting to be flushed."""
+        return self._pending_count
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get flush statistics.
+
+        Returns:
+            Dictionary with flush and row counts, mean and max rows per
+            flush, total flush time, rows per table and pending rows.
+        """
+        return {**self._stats.to_dict(), "pending_count": self._pending_count}
+
+
+class WriteBuffer(_BaseWriteBuffer):
+    """Buffers inserts for a sync Session."""
+
+    def __init__(
+        self,
+        session: Session,
+        max_rows: int | None = None,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            session: Session the rows are written with.
+            max_rows: Pending rows that trigger a flush.
+            max_age_seconds: Age of the oldest pending row that triggers a flush.
+        """
+        super().__init__(max_rows, max_age_seconds)
+        self._session = session
+
+    def add(self, model: type[Base], row: dict[str, Any]) -> str:
+        """Queue one row for insertion.
+
+        Args:
+            model: Mapped class of the row.
+            row: Column values; an "id" is generated if missing.
+
+        Returns:
+            The row's ID.
+        """
+        return self.add_all(model, [row])[0]
+
+    def add_all(self, model: type[Base], rows: Iterable[dict[str, Any]]) -> list[str]:
+        """Queue rows for insertion.
+
+        Returns:
+            The rows' IDs, in order.
+        """
+        ids = self._queue(model, rows)
+        if self._should_flush():
+            self.flush()
+        return ids
+
+    def flush(self) -> None:
+        """Write all pending rows, one executemany INSERT per model."""
+        batches = self._take_pending()
+        if not batches:
+            return
+        start_time = time.perf_counter()
+        for model, rows in batches:
+            self._session.execute(insert(model), rows)
+        self._record_flush(batches, start_time)
+
+    def __enter__(self) -> "WriteBuffer":
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        if exc_type is None:
+            self.flush()
+
+
+class AsyncWriteBuffer(_BaseWriteBuffer):
+    """Buffers inserts for an AsyncSession."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        max_rows: int | None = None,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            session: Session the rows are written with.
+            max_rows: Pending rows that trigger a flush.
+            max_age_seconds: Age of the oldest pending row that triggers a flush.
+        """
+        super().__init__(max_rows, max_age_seconds)
+        self._session = session
+
+    async def add(self, model: type[Base], row: dict[str, Any]) -> str:
+        """Queue one row for insertion (see WriteBuffer.add)."""
+        return (await self.add_all(model, [row]))[0]
+
+    async def add_all(self, model: type[Base], rows: Iterable[dict[str, Any]]) -> list[str]:
+        """Queue rows for insertion (see WriteBuffer.add_all)."""
+        ids = self._queue(model, rows)
+        if self._should_flush():
+            await self.flush()
+        return ids
+
+    async def flush(self) -> None:
+        """Write all pending rows, one executemany INSERT per model."""
+        batches = self._take_pending()
+        if not batches:
+            return
+        start_time = time.perf_counter()
+        for model, rows in batches:
+            await self._session.execute(insert(model), rows)
+        self._record_flush(batches, start_time)
+
+    async def __aenter__(self) -> "AsyncWriteBuffer":
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        if exc_type is None:
+            await self.flush()
@@ -1,5 +1,5 @@
 """Job functions for background processing with RQ."""
 
-from app.jobs.document_processing import process_document
+from app.jobs.document_processing import process_document, process_documents_batch
 
-__all__ = ["process_document"]
+__all__ = ["process_document", "process_documents_batch"]
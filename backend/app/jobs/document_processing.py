@@ -1,41 +1,71 @@
 """Document processing job functions."""
 
 import logging
+from collections import deque
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.core.database import get_sync_engine
+from app.core.write_buffer import WriteBuffer
 from app.models import Document
 from app.models.mention import Mention, MentionConceptCandidate
 from app.schemas.base import Assertion, Domain, Experiencer, JobStatus, Temporality
+from app.schemas.clinical_fact import EvidenceType
+from app.services.fact_builder import EvidenceInput, FactInput
 from app.services.fact_builder_db import DatabaseFactBuilderService
+from app.services.mapping_cache import get_mapping_cache
 from app.services.mapping_sql import SQLMappingService
+from app.services.nlp import ExtractedMention, NLPDocument
+from app.services.nlp_engines import get_nlp_engine_registry
 from app.services.nlp_rule_based import RuleBasedNLPService
 
 logger = logging.getLogger(__name__)
 
-# Singleton NLP service for reuse across job calls
-_nlp_service: RuleBasedNLPService | None = None
-
 
 def get_nlp_service() -> RuleBasedNLPService:
-    """Get or create the NLP service singleton."""
-    global _nlp_service
-    if _nlp_service is None:
-        _nlp_service = RuleBasedNLPService()
-    return _nlp_service
+    """Get the shared rule-based NLP engine for reuse across job calls.
+
+    Served from the engine registry so a reload swaps it in for jobs too.
+    """
+    return get_nlp_engine_registry().get("rule_based")
+
+
+def extract_document_mentions(
+    documents: Iterable[Document],
+) -> Iterator[tuple[Document, list[ExtractedMention]]]:
+    """Extract mentions from documents through the NLP batch API.
+
+    Args:
+        documents: Documents to extract from.
+
+    Yields:
+        Each document with its extracted mentions, in input order.
+    """
+    # Documents handed to the NLP service whose results are not yet back
+    pending: deque[Document] = deque()
+
+    def nlp_inputs() -> Iterator[NLPDocument]:
+        for document in documents:
+            pending.append(document)
+            yield document.text, document.id, document.note_type
+
+    for mentions in get_nlp_service().extract_mentions_batch(nlp_inputs()):
+        yield pending.popleft(), mentions
 
 
 def get_mapping_service(session: Session) -> SQLMappingService:
     """Create a SQL-based mapping service for concept lookups.
 
     Uses SQL queries instead of loading all concepts into memory,
-    enabling full 5.36M vocabulary support without OOM issues.
+    enabling full 5.36M vocabulary support without OOM issues. Results
+    go through the shared mapping cache, so repeated surface forms across
+    documents skip the database.
     """
-    return SQLMappingService(session)
+    return SQLMappingService(session, cache=get_mapping_cache())
 
 
 # Domain ID mapping from OMOP vocabulary to our Domain enum
@@ -89,6 +119,195 @@ def map_experiencer(experiencer_str: str) -> Experiencer:
         return Experiencer.PATIENT
 
 
+def process_loaded_document(
+    session: Session,
+    document: Document,
+    mapping_service: SQLMappingService,
+) -> dict:
+    """Run the NLP pipeline on a fetched document, without committing.
+
+    Extracts mentions (Phase 4), then stores them, maps them to OMOP
+    concepts and creates ClinicalFacts (see store_document_mentions).
+    Document status is left to the caller.
+
+    Args:
+        session: Session to write with.
+        document: The document to process.
+        mapping_service: Concept mapping service.
+
+    Returns:
+        Dictionary with mention, candidate and fact counts.
+    """
+    # Phase 4: Extract mentions using NLP service
+    _, extracted_mentions = next(extract_document_mentions([document]))
+    return store_document_mentions(session, document, extracted_mentions, mapping_service)
+
+
+def store_document_mentions(
+    session: Session,
+    document: Document,
+    extracted_mentions: list[ExtractedMention],
+    mapping_service: SQLMappingService,
+) -> dict:
+    """Store a document's extracted mentions and build facts, without committing.
+
+    Writes the mentions (Phase 4), maps them to OMOP concepts (Phase 5)
+    and creates ClinicalFacts (Phase 6).
+
+    Mentions and candidates are queued in a WriteBuffer with client-side
+    IDs and each table is written with one bulk INSERT; the top candidate
+    per mention is picked in Python and facts are created with one bulk
+    call (which flushes the buffer first), so the number of round trips
+    does not grow with the mention count.
+
+    Args:
+        session: Session to write with.
+        document: The document the mentions were extracted from.
+        extracted_mentions: The document's NLP mentions.
+        mapping_service: Concept mapping service.
+
+    Returns:
+        Dictionary with mention, candidate and fact counts.
+    """
+    logger.info(f"Extracted {len(extracted_mentions)} mentions from document")
+
+    # Queue Mention rows with client-side IDs; the write buffer inserts
+    # them in bulk. Also track direct concept_ids from the vocabulary for
+    # use in fact building.
+    write_buffer = WriteBuffer(session)
+    mention_rows: list[dict] = []
+    # mention_id -> (concept_id, domain)
+    mention_direct_concepts: dict[str, tuple[int, str]] = {}
+
+    for extracted in extracted_mentions:
+        mention = {
+            "document_id": document.id,
+            "text": extracted.text,
+            "start_offset": extracted.start_offset,
+            "end_offset": extracted.end_offset,
+            "lexical_variant": extracted.lexical_variant,
+            "section": extracted.section,
+            "assertion": extracted.assertion,
+            "temporality": extracted.temporality,
+            "experiencer": extracted.experiencer,
+            "confidence": extracted.confidence,
+        }
+        mention_id = write_buffer.add(Mention, mention)
+        mention_rows.append(mention)
+
+        # Store direct concept_id if available from vocabulary
+        if extracted.omop_concept_id and extracted.omop_concept_id > 0:
+            mention_direct_concepts[mention_id] = (
+                extracted.omop_concept_id,
+                extracted.domain_hint or "Observation",
+            )
+
+    # Phase 5: Map mentions to OMOP concepts, every mention without a
+    # direct concept in one batch
+    unmapped = [m for m in mention_rows if m["id"] not in mention_direct_concepts]
+    mapped_candidates = dict(
+        zip(
+            (m["id"] for m in unmapped),
+            mapping_service.map_mentions_batch(
+                [m["text"] for m in unmapped],
+                domain=None,  # Allow any domain
+                limit=5,  # Top 5 candidates per mention
+            ),
+            strict=True,
+        )
+    )
+
+    candidate_rows: list[dict] = []
+    # mention_id -> its top-ranked candidate row, used for fact building
+    top_candidates: dict[str, dict] = {}
+
+    for mention in mention_rows:
+        mention_id = mention["id"]
+        # Check if we have a direct concept_id from vocabulary
+        if mention_id in mention_direct_concepts:
+            concept_id, domain = mention_direct_concepts[mention_id]
+            # Create a high-priority candidate with the direct concept
+            # Convert domain to lowercase to match database enum
+            rows = [{
+                "mention_id": mention_id,
+                "omop_concept_id": concept_id,
+                "concept_name": mention["text"],  # Use original text
+                "concept_code": str(concept_id),
+                "vocabulary_id": "Direct",
+                "domain_id": domain.lower() if domain else "observation",
+                "score": 1.0,  # Perfect score for direct match
+                "method": "direct",
+                "rank": 1,
+            }]
+        else:
+            # Fall back to mapping service candidates
+            rows = [
+                {
+                    "mention_id": mention_id,
+                    "omop_concept_id": candidate.omop_concept_id,
+                    "concept_name": candidate.concept_name,
+                    "concept_code": candidate.concept_code,
+                    "vocabulary_id": candidate.vocabulary_id,
+                    "domain_id": candidate.domain_id,
+                    "score": candidate.score,
+                    "method": candidate.method.value,
+                    "rank": candidate.rank,
+                }
+                for candidate in mapped_candidates[mention_id]
+            ]
+
+        write_buffer.add_all(MentionConceptCandidate, rows)
+        candidate_rows.extend(rows)
+        if rows:
+            top_candidates[mention_id] = min(rows, key=lambda row: row["rank"])
+
+    candidate_count = len(candidate_rows)
+
+    logger.info(f"Created {candidate_count} concept candidates for {len(mention_rows)} mentions")
+
+    # Phase 6: Create ClinicalFacts from mentions with mapped concepts,
+    # skipping mentions without a concept mapping
+    fact_builder = DatabaseFactBuilderService(session, write_buffer=write_buffer)
+    facts = [
+        (
+            FactInput(
+                patient_id=document.patient_id,
+                domain=map_domain_id(top_candidate["domain_id"]),
+                omop_concept_id=top_candidate["omop_concept_id"],
+                concept_name=top_candidate["concept_name"],
+                assertion=map_assertion(mention["assertion"]),
+                temporality=map_temporality(mention["temporality"]),
+                experiencer=map_experiencer(mention["experiencer"]),
+                confidence=mention["confidence"],
+            ),
+            [
+                EvidenceInput(
+                    evidence_type=EvidenceType.MENTION,
+                    source_id=UUID(mention["id"]),
+                    source_table="mentions",
+                )
+            ],
+        )
+        for mention in mention_rows
+        if (top_candidate := top_candidates.get(mention["id"])) is not None
+    ]
+    fact_count = len(fact_builder.create_facts_bulk(facts))
+
+    logger.info(f"Created {fact_count} clinical facts from mentions")
+
+    write_buffer.flush()
+    write_stats = write_buffer.get_stats()
+    logger.info(
+        f"Write buffer: {write_stats['row_count']} rows in {write_stats['flush_count']} flushes"
+    )
+
+    return {
+        "mention_count": len(mention_rows),
+        "candidate_count": candidate_count,
+        "fact_count": fact_count,
+    }
+
+
 def process_document(document_id: str) -> dict:
     """Process a clinical document through the NLP pipeline.
 
@@ -99,6 +318,9 @@ def process_document(document_id: str) -> dict:
     4. Creates ClinicalFacts (Phase 6)
     5. Updates document status to COMPLETED or FAILED
 
+    See process_loaded_document for the pipeline itself, and
+    process_documents_batch for processing many documents in one job.
+
     Args:
         document_id: The UUID of the document to process.
 
@@ -131,140 +353,7 @@ def process_document(document_id: str) -> dict:
                 f"note_type={document.note_type}"
             )
 
-            # Phase 4: Extract mentions using NLP service
-            nlp_service = get_nlp_service()
-            extracted_mentions = nlp_service.extract_mentions(
-                text=document.text,
-                document_id=UUID(document_id),
-                note_type=document.note_type,
-            )
-
-            logger.info(f"Extracted {len(extracted_mentions)} mentions from document")
-
-            # Create Mention records in database
-            # Also track direct concept_ids from vocabulary for use in fact building
-            mention_records: list[Mention] = []
-            direct_concept_map: dict[str, tuple[int, str]] = {}  # mention_id -> (concept_id, domain)
-
-            for extracted in extracted_mentions:
-                # Explicitly generate ID to ensure it's available before flush
-                mention_id = str(uuid4())
-                mention = Mention(
-                    id=mention_id,
-                    document_id=document_id,
-                    text=extracted.text,
-                    start_offset=extracted.start_offset,
-                    end_offset=extracted.end_offset,
-                    lexical_variant=extracted.lexical_variant,
-                    section=extracted.section,
-                    assertion=extracted.assertion,
-                    temporality=extracted.temporality,
-                    experiencer=extracted.experiencer,
-                    confidence=extracted.confidence,
-                )
-                mention_records.append(mention)
-                session.add(mention)
-
-                # Store direct concept_id if available from vocabulary
-                if extracted.omop_concept_id and extracted.omop_concept_id > 0:
-                    # We'll map by index since mention.id isn't assigned yet
-                    direct_concept_map[len(mention_records) - 1] = (
-                        extracted.omop_concept_id,
-                        extracted.domain_hint or "Observation"
-                    )
-
-            session.flush()  # Assign IDs to mentions
-
-            # Update direct_concept_map with actual mention IDs
-            mention_direct_concepts: dict[str, tuple[int, str]] = {}
-            for idx, (concept_id, domain) in direct_concept_map.items():
-                mention_id = mention_records[idx].id
-                mention_direct_concepts[mention_id] = (concept_id, domain)
-
-            # Phase 5: Map mentions to OMOP concepts
-            mapping_service = get_mapping_service(session)
-            candidate_count = 0
-
-            for mention in mention_records:
-                # Check if we have a direct concept_id from vocabulary
-                if mention.id in mention_direct_concepts:
-                    concept_id, domain = mention_direct_concepts[mention.id]
-                    # Create a high-priority candidate with the direct concept
-                    # Convert domain to lowercase to match database enum
-                    concept_candidate = MentionConceptCandidate(
-                        mention_id=mention.id,
-                        omop_concept_id=concept_id,
-                        concept_name=mention.text,  # Use original text
-                        concept_code=str(concept_id),
-                        vocabulary_id="Direct",
-                        domain_id=domain.lower() if domain else "observation",
-                        score=1.0,  # Perfect score for direct match
-                        method="direct",
-                        rank=1,
-                    )
-                    session.add(concept_candidate)
-                    candidate_count += 1
-                else:
-                    # Fall back to mapping service
-                    candidates = mapping_service.map_mention(
-                        text=mention.text,
-                        domain=None,  # Allow any domain
-                        limit=5,  # Top 5 candidates per mention
-                    )
-
-                    for candidate in candidates:
-                        concept_candidate = MentionConceptCandidate(
-                            mention_id=mention.id,
-                            omop_concept_id=candidate.omop_concept_id,
-                            concept_name=candidate.concept_name,
-                            concept_code=candidate.concept_code,
-                            vocabulary_id=candidate.vocabulary_id,
-                            domain_id=candidate.domain_id,
-                            score=candidate.score,
-                            method=candidate.method.value,
-                            rank=candidate.rank,
-                        )
-                        session.add(concept_candidate)
-                        candidate_count += 1
-
-            logger.info(
-                f"Created {candidate_count} concept candidates for {len(mention_records)} mentions"
-            )
-
-            # Phase 6: Create ClinicalFacts from mentions with mapped concepts
-            fact_builder = DatabaseFactBuilderService(session)
-            fact_count = 0
-
-            for mention in mention_records:
-                # Get the top-ranked concept candidate for this mention
-                stmt = (
-                    select(MentionConceptCandidate)
-                    .where(MentionConceptCandidate.mention_id == mention.id)
-                    .order_by(MentionConceptCandidate.rank.asc())
-                    .limit(1)
-                )
-                result = session.execute(stmt)
-                top_candidate = result.scalar_one_or_none()
-
-                if top_candidate is None:
-                    # No concept mapping found, skip this mention
-                    continue
-
-                # Create ClinicalFact from the mention
-                fact_builder.create_fact_from_mention(
-                    mention_id=UUID(mention.id),
-                    patient_id=document.patient_id,
-                    omop_concept_id=top_candidate.omop_concept_id,
-                    concept_name=top_candidate.concept_name,
-                    domain=map_domain_id(top_candidate.domain_id),
-                    assertion=map_assertion(mention.assertion),
-                    temporality=map_temporality(mention.temporality),
-                    experiencer=map_experiencer(mention.experiencer),
-                    confidence=mention.confidence,
-                )
-                fact_count += 1
-
-            logger.info(f"Created {fact_count} clinical facts from mentions")
+            counts = process_loaded_document(session, document, get_mapping_service(session))
 
             # Update status to COMPLETED
             session.execute(
@@ -279,17 +368,15 @@ def process_document(document_id: str) -> dict:
 
             logger.info(
                 f"Document processing completed for document_id={document_id}, "
-                f"mention_count={len(mention_records)}, "
-                f"candidate_count={candidate_count}"
+                f"mention_count={counts['mention_count']}, "
+                f"candidate_count={counts['candidate_count']}"
             )
 
             return {
                 "success": True,
                 "document_id": document_id,
                 "patient_id": document.patient_id,
-                "mention_count": len(mention_records),
-                "candidate_count": candidate_count,
-                "fact_count": fact_count,
+                **counts,
             }
 
     except Exception as e:
@@ -308,3 +395,166 @@ def process_document(document_id: str) -> dict:
             logger.exception("Failed to update document status to FAILED")
 
         return {"success": False, "error": str(e)}
+
+
+def process_documents_batch(document_ids: list[str]) -> dict:
+    """Process many clinical documents in one RQ job.
+
+    Meant for backfills (see app.core.queue.enqueue_batches): one job per
+    chunk of documents instead of one per document, so the Redis round
+    trip, job pickling and session setup are paid once per chunk. The
+    documents are marked PROCESSING with one UPDATE, fetched with one IN
+    query and run through the NLP batch API as one stream, then each
+    document's mentions are stored in a shared session with a shared
+    mapping service. Each document is written in its own savepoint, so a
+    failing document is rolled back and marked FAILED without affecting
+    the others; if the NLP stream fails, the documents it had not
+    returned yet are extracted one by one and only those that fail again
+    are marked FAILED. Final statuses are written with one UPDATE per
+    status and the batch is committed once.
+
+    IDs are matched in canonical UUID form, so IDs given in another case
+    or without hyphens are found; IDs that are not UUIDs fail on their own.
+
+    Args:
+        document_ids: UUIDs of the documents to process.
+
+    Returns:
+        Dictionary with completed and failed counts and the per-document
+        results (as returned by process_document), in input order.
+    """
+    logger.info(f"Starting batch processing of {len(document_ids)} documents")
+    results: dict[str, dict] = {}
+
+    # Canonical form of each input ID (the form the database returns)
+    keys: dict[str, str] = {}
+    for document_id in document_ids:
+        try:
+            keys[document_id] = str(UUID(document_id))
+        except (TypeError, ValueError, AttributeError):
+            logger.error(f"Invalid document ID: {document_id}")
+            keys[document_id] = document_id
+            results[document_id] = {"success": False, "error": "Invalid document ID"}
+    valid_ids = list(dict.fromkeys(key for key in keys.values() if key not in results))
+
+    try:
+        with Session(get_sync_engine()) as session:
+            if valid_ids:
+                session.execute(
+                    update(Document)
+                    .where(Document.id.in_(valid_ids))
+                    .values(status=JobStatus.PROCESSING)
+                )
+                session.commit()
+
+            documents = {
+                document.id: document
+                for document in session.execute(
+                    select(Document).where(Document.id.in_(valid_ids))
+                ).scalars()
+            }
+            for document_id in valid_ids:
+                if document_id not in documents:
+                    logger.error(f"Document not found: {document_id}")
+                    results[document_id] = {"success": False, "error": "Document not found"}
+
+            mentions, nlp_errors = _extract_batch_mentions(list(documents.values()))
+            mapping_service = get_mapping_service(session)
+
+            for document_id, document in documents.items():
+                try:
+                    if document_id in nlp_errors:
+                        raise nlp_errors[document_id]
+                    with session.begin_nested():
+                        counts = store_document_mentions(
+                            session, document, mentions[document_id], mapping_service
+                        )
+                except Exception as e:
+                    logger.exception(f"Error processing document {document_id}: {e}")
+                    results[document_id] = {"success": False, "error": str(e)}
+                    continue
+
+                results[document_id] = {
+                    "success": True,
+                    "document_id": document_id,
+                    "patient_id": document.patient_id,
+                    **counts,
+                }
+
+            completed = [doc_id for doc_id, result in results.items() if result["success"]]
+            failed = [
+                doc_id
+                for doc_id, result in results.items()
+                if not result["success"] and doc_id in documents
+            ]
+            if completed:
+                session.execute(
+                    update(Document)
+                    .where(Document.id.in_(completed))
+                    .values(status=JobStatus.COMPLETED, processed_at=datetime.now(UTC))
+                )
+            if failed:
+                session.execute(
+                    update(Document).where(Document.id.in_(failed)).values(status=JobStatus.FAILED)
+                )
+            session.commit()
+
+    except Exception as e:
+        logger.exception(f"Error processing document batch: {e}")
+
+        # Nothing was committed: mark the whole batch FAILED
+        try:
+            with Session(get_sync_engine()) as session:
+                session.execute(
+                    update(Document)
+                    .where(Document.id.in_(valid_ids))
+                    .values(status=JobStatus.FAILED)
+                )
+                session.commit()
+        except Exception:
+            logger.exception("Failed to update document batch status to FAILED")
+
+        return {"success": False, "error": str(e)}
+
+    ordered = [results[keys[document_id]] for document_id in document_ids]
+    completed_count = sum(result["success"] for result in ordered)
+    logger.info(
+        f"Batch processing completed: {completed_count} completed, "
+        f"{len(ordered) - completed_count} failed"
+    )
+    return {
+        "success": True,
+        "document_count": len(ordered),
+        "completed_count": completed_count,
+        "failed_count": len(ordered) - completed_count,
+        "results": ordered,
+    }
+
+
+def _extract_batch_mentions(
+    documents: list[Document],
+) -> tuple[dict[str, list[ExtractedMention]], dict[str, Exception]]:
+    """Extract mentions from documents in one NLP stream.
+
+    If the stream fails, the documents it had not returned yet are
+    extracted one by one, so an error is only attributed to the document
+    that causes it.
+
+    Returns:
+        (mentions by document ID, NLP error by document ID)
+    """
+    mentions: dict[str, list[ExtractedMention]] = {}
+    errors: dict[str, Exception] = {}
+    try:
+        for document, document_mentions in extract_document_mentions(documents):
+            mentions[document.id] = document_mentions
+    except Exception as e:
+        logger.warning(f"Batch mention extraction failed, retrying per document: {e}")
+        for document in documents:
+            if document.id in mentions:
+                continue
+            try:
+                _, mentions[document.id] = next(extract_document_mentions([document]))
+            except Exception as document_error:
+                errors[document.id] = document_error
+    return mentions, errors
@@ -1,139 +1,129 @@
 """FastAPI application for Clinical Ontology Normalizer."""
 
+import importlib
 import logging
 import time
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime
 from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.orm import Session
 
 from app.api import coding_router, dashboard_router, documents_router, export_router, fhir_router, jobs_router, patients_router, search_router, vocabulary_mapping_router
 from app.core.config import settings
-from app.core.database import close_db, init_db
+from app.core.database import close_db, get_sync_engine, init_db
 from app.core.queue import clear_queues
 from app.core.redis import close_redis
+from app.services.mapping_cache import get_mapping_cache
+from app.services.mapping_sql import check_mapping_indexes
+from app.services.nlp_engines import get_nlp_engine_registry
 from app.services.vocabulary import get_vocabulary_service, preload_vocabulary
+from app.services.warmup import WarmupScheduler, WarmupTask
 
 logger = logging.getLogger(__name__)
 
 
-def prewarm_all_services() -> dict[str, Any]:
-    """Pre-warm all singleton services at startup.
+def _singleton(module: str, getter: str, report_stats: bool = True) -> Callable[[], Any]:
+    """Create a warm-up initializer that builds a service singleton.
 
-    This ensures no customer ever hits a cold service.
-    All data is loaded into memory before accepting requests.
-
-    Returns:
-        Dictionary with service names and their stats.
+    Args:
+        module: Module defining the singleton getter (imported on warm-up).
+        getter: Name of the getter function.
+        report_stats: Report the service's get_stats() as warm-up details.
     """
-    start_time = time.perf_counter()
-    services_loaded = {}
-
+    def initialize() -> Any:
+        svc = getattr(importlib.import_module(module), getter)()
+        return svc.get_stats() if report_stats and hasattr(svc, "get_stats") else "loaded"
+    return initialize
+
+
+def _check_mapping_indexes() -> list[str]:
+    """Warn when SQL concept mapping would scan the concept tables."""
+    with Session(get_sync_engine()) as session:
+        return check_mapping_indexes(session)
+
+
+# Everything warmed at startup; tasks run concurrently unless they depend on each other
+WARMUP_TASKS: tuple[WarmupTask, ...] = (
+    # Vocabulary singleton for fast NLP extraction
+    WarmupTask("vocabulary", preload_vocabulary),
+    WarmupTask("mapping_indexes", _check_mapping_indexes),
+    # Shared NLP extraction engines used by the /preview/* endpoints
+    WarmupTask(
+        "nlp_engines", lambda: get_nlp_engine_registry().prewarm(), depends_on=("vocabulary",)
+    ),
     # Clinical Decision Support Services
-    try:
-        from app.services.differential_diagnosis import get_differential_diagnosis_service
-        svc = get_differential_diagnosis_service()
-        services_loaded["differential_diagnosis"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm differential_diagnosis: {e}")
-
-    try:
-        from app.services.clinical_calculators import get_clinical_calculator_service
-        svc = get_clinical_calculator_service()
-        services_loaded["clinical_calculators"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm clinical_calculators: {e}")
-
-    try:
-        from app.services.lab_reference import get_lab_reference_service
-        svc = get_lab_reference_service()
-        services_loaded["lab_reference"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm lab_reference: {e}")
-
+    WarmupTask(
+        "differential_diagnosis",
+        _singleton("app.services.differential_diagnosis", "get_differential_diagnosis_service"),
+    ),
+    WarmupTask(
+        "clinical_calculators",
+        _singleton("app.services.clinical_calculators", "get_clinical_calculator_service"),
+    ),
+    WarmupTask(
+        "lab_reference", _singleton("app.services.lab_reference", "get_lab_reference_service")
+    ),
     # Drug Safety Services
-    try:
-        from app.services.drug_interactions import get_drug_interaction_service
-        svc = get_drug_interaction_service()
-        services_loaded["drug_interactions"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm drug_interactions: {e}")
-
-    try:
-        from app.services.drug_safety import get_drug_safety_service
-        svc = get_drug_safety_service()
-        services_loaded["drug_safety"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm drug_safety: {e}")
-
+    WarmupTask(
+        "drug_interactions",
+        _singleton("app.services.drug_interactions", "get_drug_interaction_service"),
+    ),
+    WarmupTask("drug_safety", _singleton("app.services.drug_safety", "get_drug_safety_service")),
     # Billing & Coding Services
-    try:
-        from app.services.icd10_suggester import get_icd10_suggester_service
-        svc = get_icd10_suggester_service()
-        services_loaded["icd10_suggester"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm icd10_suggester: {e}")
-
-    try:
-        from app.services.cpt_suggester import get_cpt_suggester_service
-        svc = get_cpt_suggester_service()
-        services_loaded["cpt_suggester"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm cpt_suggester: {e}")
-
-    try:
-        from app.services.hcc_analyzer import get_hcc_analyzer_service
-        svc = get_hcc_analyzer_service()
-        services_loaded["hcc_analyzer"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm hcc_analyzer: {e}")
-
-    try:
-        from app.services.billing_optimizer import get_billing_optimization_service
-        svc = get_billing_optimization_service()
-        services_loaded["billing_optimizer"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm billing_optimizer: {e}")
-
-    try:
-        from app.services.coding_query_generator import get_coding_query_generator_service
-        svc = get_coding_query_generator_service()
-        services_loaded["coding_query_generator"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm coding_query_generator: {e}")
-
+    WarmupTask(
+        "icd10_suggester",
+        _singleton("app.services.icd10_suggester", "get_icd10_suggester_service"),
+    ),
+    WarmupTask(
+        "cpt_suggester", _singleton("app.services.cpt_suggester", "get_cpt_suggester_service")
+    ),
+    WarmupTask(
+        "hcc_analyzer", _singleton("app.services.hcc_analyzer", "get_hcc_analyzer_service")
+    ),
+    WarmupTask(
+        "billing_optimizer",
+        _singleton("app.services.billing_optimizer", "get_billing_optimization_service"),
+    ),
+    WarmupTask(
+        "coding_query_generator",
+        _singleton("app.services.coding_query_generator", "get_coding_query_generator_service"),
+    ),
     # NLP Services
-    try:
-        from app.services.nlp_advanced import get_advanced_nlp_service
-        svc = get_advanced_nlp_service()
-        services_loaded["nlp_advanced"] = "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm nlp_advanced: {e}")
-
-    try:
-        from app.services.vocabulary_enhanced import get_enhanced_vocabulary_service
-        svc = get_enhanced_vocabulary_service()
-        services_loaded["vocabulary_enhanced"] = svc.get_stats() if hasattr(svc, 'get_stats') else "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm vocabulary_enhanced: {e}")
-
-    try:
-        from app.services.value_extraction import get_value_extraction_service
-        svc = get_value_extraction_service()
-        services_loaded["value_extraction"] = "loaded"
-    except Exception as e:
-        logger.warning(f"Failed to prewarm value_extraction: {e}")
-
-    total_time_ms = (time.perf_counter() - start_time) * 1000
+    WarmupTask(
+        "nlp_advanced",
+        _singleton("app.services.nlp_advanced", "get_advanced_nlp_service", report_stats=False),
+    ),
+    WarmupTask(
+        "vocabulary_enhanced",
+        _singleton("app.services.vocabulary_enhanced", "get_enhanced_vocabulary_service"),
+    ),
+    WarmupTask(
+        "value_extraction",
+        _singleton(
+            "app.services.value_extraction", "get_value_extraction_service", report_stats=False
+        ),
+    ),
+)
 
-    return {
-        "services_loaded": len(services_loaded),
-        "total_prewarm_time_ms": round(total_time_ms, 2),
-        "services": services_loaded,
-    }
+
+def build_warmup_scheduler() -> WarmupScheduler:
+    """Create the startup warm-up scheduler from settings.
+
+    Returns:
+        Scheduler over WARMUP_TASKS, with settings.warmup_lazy_services skipped.
+    """
+    unknown = set(settings.warmup_lazy_services) - {task.name for task in WARMUP_TASKS}
+    if unknown:
+        logger.warning(f"Unknown services in warmup_lazy_services: {sorted(unknown)}")
+    return WarmupScheduler(
+        WARMUP_TASKS,
+        max_workers=settings.warmup_max_workers,
+        lazy=settings.warmup_lazy_services,
+    )
 
 
 @asynccontextmanager
@@ -141,10 +131,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager.
 
     Handles startup and shutdown events:
-    - Startup: Initialize database, preload vocabulary, prewarm ALL services
+    - Startup: Initialize database, then warm the vocabulary, NLP engines and
+      singleton services concurrently in the background
     - Shutdown: Close database and Redis connections, clear queues
 
-    Pre-warming ensures no customer ever hits a cold service.
+    Requests are accepted while services warm up; /ready reports 503 until
+    the warm-up has finished, so no customer is routed to a cold pod.
     """
     startup_start = time.perf_counter()
 
@@ -152,26 +144,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     if settings.debug:
         await init_db()
 
-    # Preload vocabulary service (singleton) for fast NLP extraction
-    vocab_stats = preload_vocabulary()
-    logger.info(
-        f"Vocabulary preloaded: {vocab_stats['concept_count']} concepts, "
-        f"{vocab_stats['term_count']} terms in {vocab_stats['load_time_ms']}ms"
-    )
-
-    # Pre-warm ALL singleton services so no customer hits cold services
-    prewarm_stats = prewarm_all_services()
-    logger.info(
-        f"Services pre-warmed: {prewarm_stats['services_loaded']} services "
-        f"in {prewarm_stats['total_prewarm_time_ms']}ms"
-    )
-
-    total_startup_ms = (time.perf_counter() - startup_start) * 1000
-    logger.info(f"Server ready - total startup time: {total_startup_ms:.0f}ms")
+    warmup = build_warmup_scheduler()
+    warmup.start()
+    app.state.warmup = warmup
 
-    # Store prewarm stats for health endpoint
-    app.state.prewarm_stats = prewarm_stats
-    app.state.startup_time_ms = total_startup_ms
+    app.state.startup_time_ms = (time.perf_counter() - startup_start) * 1000
+    logger.info(f"Server accepting requests after {app.state.startup_time_ms:.0f}ms")
 
     yield
 
@@ -225,17 +203,31 @@ async def health_check() -> dict[str, Any]:
 
 
 @app.get("/ready", tags=["Health"])
-async def readiness_check() -> dict[str, Any]:
+async def readiness_check(response: Response) -> dict[str, Any]:
     """Readiness check endpoint.
 
-    Confirms all services are pre-warmed and ready to handle requests.
-    Use this for Kubernetes readiness probes.
+    Reports 503 with per-service warm-up progress until all eagerly loaded
+    services are warm, then 200. Use this for Kubernetes readiness probes.
     """
+    warmup: WarmupScheduler | None = getattr(app.state, "warmup", None)
+    warmup_stats = warmup.get_stats() if warmup is not None else None
+    startup_time = getattr(app.state, "startup_time_ms", 0)
+
+    if warmup is not None and not warmup.is_ready:
+        # Stats below would load cold services on the event loop
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {
+            "status": "warming",
+            "service": "clinical-ontology-normalizer",
+            "version": "0.1.0",
+            "timestamp": datetime.now(UTC).isoformat(),
+            "startup_time_ms": startup_time,
+            "warmup": warmup_stats,
+        }
+
     vocab = get_vocabulary_service()
     vocab_stats = vocab.get_stats()
-
-    prewarm_stats = getattr(app.state, 'prewarm_stats', {})
-    startup_time = getattr(app.state, 'startup_time_ms', 0)
+    mapping_cache = get_mapping_cache()
 
     return {
         "status": "ready",
@@ -244,8 +236,10 @@ async def readiness_check() -> dict[str, Any]:
         "timestamp": datetime.now(UTC).isoformat(),
         "startup_time_ms": startup_time,
         "vocabulary": vocab_stats,
-        "prewarmed_services": prewarm_stats.get("services_loaded", 0),
-        "prewarm_time_ms": prewarm_stats.get("total_prewarm_time_ms", 0),
+        "mapping_cache": mapping_cache.get_stats() if mapping_cache else None,
+        "prewarmed_services": warmup_stats["ready_count"] if warmup_stats else 0,
+        "prewarm_time_ms": warmup_stats["total_time_ms"] if warmup_stats else 0,
+        "warmup": warmup_stats,
     }
 
 
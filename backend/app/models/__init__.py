@@ -8,7 +8,7 @@ Models:
 - Document, StructuredResource (task 2.3)
 - Mention, MentionConceptCandidate (task 2.4)
 - ClinicalFact, FactEvidence (task 2.5)
-- KGNode, KGEdge (task 2.6)
+- KGNode, KGEdge (task 2.6), KGProjection
 - Concept, ConceptSynonym (task 2.7)
 - ClinicalValue (P3-1 value extraction)
 """
@@ -17,9 +17,9 @@ from app.core.database import Base
 from app.models.clinical_fact import ClinicalFact, FactEvidence
 from app.models.clinical_value import ClinicalValue, ValueType
 from app.models.document import Document, StructuredResource
-from app.models.knowledge_graph import KGEdge, KGNode
+from app.models.knowledge_graph import KGEdge, KGNode, KGProjection
 from app.models.mention import Mention, MentionConceptCandidate
-from app.models.vocabulary import Concept, ConceptSynonym
+from app.models.vocabulary import Concept, ConceptSynonym, VocabularyVersion
 
 __all__ = [
     "Base",
@@ -31,8 +31,10 @@ __all__ = [
     "FactEvidence",
     "KGNode",
     "KGEdge",
+    "KGProjection",
     "Concept",
     "ConceptSynonym",
+    "VocabularyVersion",
     "ClinicalValue",
     "ValueType",
 ]
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -88,6 +88,19 @@ class ClinicalFact(Base):
         ARRAY(Float),
         nullable=True,
     )
+    # Set by the fact builder (BaseFactBuilderService.calculate_dedup_key),
+    # which upserts on it. Facts written elsewhere (e.g. FHIR import, one
+    # fact per resource) leave it NULL and are never merged.
+    dedup_key: Mapped[str | None] = mapped_column(
+        String(600),
+        nullable=True,
+    )
+    # Set by the graph builder when it projects the fact into the knowledge
+    # graph, in the same transaction; NULL facts are still to be projected
+    projected_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
 
     # Relationships
     evidence = relationship(
@@ -96,6 +109,15 @@ class ClinicalFact(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        Index("uq_clinical_facts_dedup_key", "dedup_key", unique=True),
+        Index(
+            "ix_clinical_facts_unprojected",
+            "patient_id",
+            postgresql_where=text("projected_at IS NULL"),
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<ClinicalFact(id={self.id}, patient={self.patient_id}, concept={self.concept_name}, assertion={self.assertion})>"
 
@@ -156,5 +178,10 @@ class FactEvidence(Base):
     # Relationships
     fact = relationship("ClinicalFact", back_populates="evidence")
 
+    # Each source is linked to a fact at most once
+    __table_args__ = (
+        Index("uq_fact_evidence_source", "fact_id", "source_id", "source_table", unique=True),
+    )
+
     def __repr__(self) -> str:
         return f"<FactEvidence(fact_id={self.fact_id}, type={self.evidence_type}, source={self.source_table})>"
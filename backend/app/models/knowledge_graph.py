@@ -1,6 +1,6 @@
 """SQLAlchemy models for KGNode and KGEdge."""
 
-from sqlalchemy import JSON, Enum, Float, ForeignKey, Integer, String
+from sqlalchemy import JSON, Enum, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -52,6 +52,13 @@ class KGNode(Base):
         ARRAY(Float),
         nullable=True,
     )
+    # (patient_id, node_type, omop_concept_id) key set by the graph builder
+    # (BaseGraphBuilderService.calculate_node_dedup_key), which upserts on
+    # it. Nodes written elsewhere (e.g. FHIR import) leave it NULL.
+    dedup_key: Mapped[str | None] = mapped_column(
+        String(600),
+        nullable=True,
+    )
 
     # Relationships for edges
     outgoing_edges = relationship(
@@ -67,6 +74,10 @@ class KGNode(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        Index("uq_kg_nodes_dedup_key", "dedup_key", unique=True),
+    )
+
     def __repr__(self) -> str:
         return f"<KGNode(id={self.id}, type={self.node_type}, label='{self.label}')>"
 
@@ -136,5 +147,47 @@ class KGEdge(Base):
     )
     fact = relationship("ClinicalFact")
 
+    # One edge of each type between two nodes
+    __table_args__ = (
+        Index(
+            "uq_kg_edges_source_target_type",
+            "source_node_id",
+            "target_node_id",
+            "edge_type",
+            unique=True,
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<KGEdge(id={self.id}, type={self.edge_type}, {self.source_node_id} → {self.target_node_id})>"
+
+
+class KGProjection(Base):
+    """Projection state of a patient's knowledge graph.
+
+    Records the graph's node and edge counts, kept up to date from the
+    builder's writes. While they match the graph, incremental builds only
+    project facts not yet marked projected (ClinicalFact.projected_at).
+    """
+
+    __tablename__ = "kg_projections"
+
+    patient_id: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        unique=True,
+        index=True,
+    )
+    node_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    edge_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    def __repr__(self) -> str:
+        return f"<KGProjection(patient={self.patient_id}, nodes={self.node_count}, edges={self.edge_count})>"
@@ -1,6 +1,8 @@
 """SQLAlchemy models for OMOP vocabulary concepts."""
 
-from sqlalchemy import ForeignKey, Integer, String
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, String, func
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import Float
@@ -156,3 +158,30 @@ class ConceptRelationship(Base):
     def is_valid(self) -> bool:
         """Check if this relationship is currently valid."""
         return self.invalid_reason is None
+
+
+class VocabularyVersion(Base):
+    """Single-row change marker for the concept tables.
+
+    The version is bumped by statement-level database triggers on every
+    INSERT, UPDATE, DELETE or TRUNCATE of concepts and concept_synonyms
+    (see migration 015), so loaders and ETL jobs never have to remember to
+    bump it. Caches derived from the vocabulary (e.g. the NLP automaton)
+    key on this row instead of scanning the concept tables.
+    """
+
+    __tablename__ = "vocabulary_versions"
+
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=1,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<VocabularyVersion(version={self.version}, updated_at={self.updated_at})>"
@@ -0,0 +1,76 @@
+"""Build compiled vocabulary snapshots.
+
+Usage:
+    python -m app.scripts.build_snapshots                  # Build all snapshots
+    python -m app.scripts.build_snapshots --only cpt       # Build one kind
+    python -m app.scripts.build_snapshots --output-dir /tmp/snapshots
+
+Snapshots hold the prebuilt indexes of the fixture-backed vocabulary
+services in a memory-mapped binary layout (see app.services.snapshot), so
+API and worker processes start without parsing the JSON fixtures. Each
+snapshot records a checksum of its sources and is ignored once they change;
+rerun this script after updating a fixture. Snapshots are written to
+settings.vocabulary_snapshot_dir (default: backend/snapshots).
+"""
+
+import argparse
+import logging
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.services.cpt_suggester import write_cpt_snapshot
+from app.services.icd10_suggester import write_icd10_snapshot
+from app.services.snapshot import snapshot_dir
+from app.services.vocabulary import VocabularyService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Snapshot kind -> writer taking the destination path
+SNAPSHOT_BUILDERS: dict[str, Callable[[Path], Path]] = {
+    VocabularyService.SNAPSHOT_KIND: lambda path: VocabularyService().write_snapshot(path),
+    "icd10": write_icd10_snapshot,
+    "cpt": write_cpt_snapshot,
+}
+
+
+def build_snapshots(output_dir: Path, kinds: list[str] | None = None) -> dict[str, Path]:
+    """Build snapshots.
+
+    Args:
+        output_dir: Directory to write the snapshots to.
+        kinds: Snapshot kinds to build (default: all).
+
+    Returns:
+        Written path per kind.
+    """
+    written = {}
+    for kind in kinds or list(SNAPSHOT_BUILDERS):
+        start = time.perf_counter()
+        written[kind] = SNAPSHOT_BUILDERS[kind](output_dir / f"{kind}.snap")
+        logger.info(f"Built {kind} snapshot in {time.perf_counter() - start:.2f}s")
+    return written
+
+
+def main() -> None:
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Build compiled vocabulary snapshots")
+    parser.add_argument(
+        "--only",
+        choices=list(SNAPSHOT_BUILDERS),
+        action="append",
+        help="Snapshot kind to build (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Output directory (default: settings.vocabulary_snapshot_dir or backend/snapshots)",
+    )
+    args = parser.parse_args()
+    build_snapshots(args.output_dir or snapshot_dir(), args.only)
+
+
+if __name__ == "__main__":
+    main()
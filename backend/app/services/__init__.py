@@ -41,12 +41,13 @@ from app.services.mapping import (
 from app.services.mapping_db import DatabaseMappingService
 from app.services.mapping_sql import SQLMappingService
 from app.services.nlp_vocabulary import FilteredNLPVocabularyService
-from app.services.nlp import BaseNLPService, ExtractedMention, NLPServiceInterface
+from app.services.nlp import BaseNLPService, ExtractedMention, NLPDocument, NLPServiceInterface
 from app.services.nlp_rule_based import RuleBasedNLPService
 from app.services.value_extraction import (
     ExtractedValue,
     ValueExtractionService,
     get_value_extraction_service,
+    reset_value_extraction_service,
 )
 from app.services.vocabulary import (
     VocabularyService,
@@ -75,6 +76,12 @@ from app.services.nlp_ensemble import (
     get_ensemble_nlp_service,
     reset_ensemble_nlp_service,
 )
+from app.services.nlp_engines import (
+    EngineStats,
+    NLPEngineRegistry,
+    get_nlp_engine_registry,
+    reset_nlp_engine_registry,
+)
 from app.services.vocabulary_enhanced import (
     EnhancedVocabularyService,
     get_enhanced_vocabulary_service,
@@ -246,6 +253,7 @@ __all__ = [
     "MappingMethod",
     "MappingServiceInterface",
     "NodeInput",
+    "NLPDocument",
     "NLPServiceInterface",
     "RuleBasedNLPService",
     "SQLMappingService",
@@ -261,6 +269,7 @@ __all__ = [
     "ExtractedValue",
     "ValueExtractionService",
     "get_value_extraction_service",
+    "reset_value_extraction_service",
     "ClinicalNERService",
     "TransformerNERConfig",
     "get_clinical_ner_service",
@@ -276,6 +285,10 @@ __all__ = [
     "EnsembleResult",
     "get_ensemble_nlp_service",
     "reset_ensemble_nlp_service",
+    "EngineStats",
+    "NLPEngineRegistry",
+    "get_nlp_engine_registry",
+    "reset_nlp_engine_registry",
     "EnhancedVocabularyService",
     "get_enhanced_vocabulary_service",
     "reset_enhanced_vocabulary_service",
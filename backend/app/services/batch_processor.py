@@ -1,7 +1,7 @@
 """Batch Processing Service.
 
 Handles batch document uploads and processing with:
-- Parallel processing
+- Parallel processing (thread pool, or forked process pool for CPU-bound work)
 - Progress tracking
 - Error handling and retry
 - Status reporting
@@ -11,12 +11,19 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable
+import gc
+import multiprocessing
 import threading
 import uuid
 import time
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed
 from collections import defaultdict
 
+from app.services.nlp_engines import get_nlp_engine_registry
+
+# Documents sent to a worker process per task in process mode
+DEFAULT_CHUNK_SIZE = 16
+
 
 # ============================================================================
 # Enums and Data Classes
@@ -34,6 +41,13 @@ class BatchStatus(Enum):
     PARTIAL = "partial"  # Some succeeded, some failed
 
 
+class ExecutionMode(Enum):
+    """How documents in a batch are executed."""
+
+    THREAD = "thread"  # Thread pool; fine for I/O-bound processors
+    PROCESS = "process"  # Forked process pool; for CPU-bound extraction
+
+
 class DocumentStatus(Enum):
     """Status of a document in a batch."""
 
@@ -118,6 +132,8 @@ class BatchProcessorService:
         self,
         max_workers: int = 4,
         max_concurrent_batches: int = 10,
+        execution_mode: ExecutionMode = ExecutionMode.THREAD,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
     ):
         """
         Initialize the batch processor.
@@ -125,12 +141,18 @@ class BatchProcessorService:
         Args:
             max_workers: Maximum parallel workers per batch
             max_concurrent_batches: Maximum concurrent batch jobs
+            execution_mode: Default execution mode for start_batch
+            chunk_size: Documents per worker task in process mode
         """
         self._max_workers = max_workers
         self._max_concurrent_batches = max_concurrent_batches
+        self._execution_mode = execution_mode
+        self._chunk_size = max(1, chunk_size)
         self._jobs: dict[str, BatchJob] = {}
-        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._executors: dict[str, Executor] = {}
         self._futures: dict[str, list[Future]] = defaultdict(list)
+        # Process mode: documents carried by each chunk future
+        self._chunk_documents: dict[Future, list[BatchDocument]] = {}
         self._lock = threading.Lock()
         self._progress_callbacks: dict[str, list[Callable]] = defaultdict(list)
 
@@ -182,13 +204,21 @@ class BatchProcessorService:
         self,
         job_id: str,
         processor: Callable[[BatchDocument], dict[str, Any]],
+        execution_mode: ExecutionMode | None = None,
     ) -> BatchJob:
         """
         Start processing a batch job.
 
+        In process mode the processor must be picklable (a module-level
+        function or an instance of a module-level class). If it has a
+        ``warm_up()`` method it is called before the workers are forked, so
+        expensive state (e.g. the NLP automaton and vocabulary) is built once
+        and shared copy-on-write by every worker.
+
         Args:
             job_id: ID of the batch job
             processor: Function to process each document
+            execution_mode: Thread or process pool; defaults to the service's mode
 
         Returns:
             Updated batch job
@@ -203,17 +233,19 @@ class BatchProcessorService:
             job.status = BatchStatus.PROCESSING
             job.started_at = datetime.now().isoformat()
 
-        # Create executor for this job
-        executor = ThreadPoolExecutor(max_workers=self._max_workers)
-        self._executors[job_id] = executor
+        pending = [doc for doc in job.documents if doc.status != DocumentStatus.COMPLETED]
 
-        # Submit all documents for processing
-        for doc in job.documents:
-            if doc.status == DocumentStatus.COMPLETED:
-                continue  # Skip already completed (for retry)
+        if (execution_mode or self._execution_mode) == ExecutionMode.PROCESS:
+            self._submit_to_processes(job_id, pending, processor)
+        else:
+            # Create executor for this job
+            executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            self._executors[job_id] = executor
 
-            future = executor.submit(self._process_document, job_id, doc, processor)
-            self._futures[job_id].append(future)
+            # Submit all documents for processing
+            for doc in pending:
+                future = executor.submit(self._process_document, job_id, doc, processor)
+                self._futures[job_id].append(future)
 
         # Start monitoring thread
         threading.Thread(
@@ -224,6 +256,66 @@ class BatchProcessorService:
 
         return job
 
+    def _submit_to_processes(
+        self,
+        job_id: str,
+        documents: list[BatchDocument],
+        processor: Callable[[BatchDocument], dict[str, Any]],
+    ) -> None:
+        """Submit documents in chunks to a forked process pool."""
+        warm_up = getattr(processor, "warm_up", None)
+        if callable(warm_up):
+            warm_up()
+
+        # Keep shared objects out of the cyclic GC so workers don't touch
+        # (and copy) their pages; workers fork on the first submit.
+        gc.freeze()
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+            self._executors[job_id] = executor
+
+            for i in range(0, len(documents), self._chunk_size):
+                chunk = documents[i:i + self._chunk_size]
+                future = executor.submit(
+                    _process_chunk,
+                    processor,
+                    [(d.document_id, d.filename, d.content, d.content_type) for d in chunk],
+                )
+                self._chunk_documents[future] = chunk
+                self._futures[job_id].append(future)
+        finally:
+            gc.unfreeze()
+
+    def _record_result(
+        self,
+        job_id: str,
+        doc: BatchDocument,
+        result: dict[str, Any] | None,
+        error: str | None,
+    ) -> None:
+        """Record a document outcome and update job counters and progress."""
+        if error is None:
+            doc.status = DocumentStatus.COMPLETED
+            doc.result = result
+            doc.progress = 1.0
+        else:
+            doc.status = DocumentStatus.FAILED
+            doc.error = error
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job.processed_documents += 1
+            if error is None:
+                job.successful_documents += 1
+            else:
+                job.failed_documents += 1
+                job.errors.append(f"{doc.filename}: {error}")
+            job.progress_percent = (job.processed_documents / job.total_documents) * 100
+            job.current_document = None
+
     def _process_document(
         self,
         job_id: str,
@@ -237,45 +329,56 @@ class BatchProcessorService:
 
         try:
             result = processor(doc)
-            doc.status = DocumentStatus.COMPLETED
-            doc.result = result
-            doc.progress = 1.0
-
-            with self._lock:
-                job = self._jobs[job_id]
-                job.processed_documents += 1
-                job.successful_documents += 1
-
+            error = None
         except Exception as e:
-            doc.status = DocumentStatus.FAILED
-            doc.error = str(e)
-
-            with self._lock:
-                job = self._jobs[job_id]
-                job.processed_documents += 1
-                job.failed_documents += 1
-                job.errors.append(f"{doc.filename}: {str(e)}")
-
             result = {"error": str(e)}
-
+            error = str(e)
         finally:
             doc.completed_at = datetime.now().isoformat()
             doc.processing_time_ms = (time.time() - start_time) * 1000
 
-        # Update progress
-        with self._lock:
-            job = self._jobs[job_id]
-            job.progress_percent = (job.processed_documents / job.total_documents) * 100
-            job.current_document = None
-
+        self._record_result(job_id, doc, result if error is None else None, error)
         return result
 
+    def _apply_chunk(self, job_id: str, future: Future) -> None:
+        """Apply the results of a finished process-mode chunk.
+
+        Documents stay queued until their chunk's results come back, then
+        take the start and end times the worker recorded. A chunk cancelled
+        before it started leaves its documents queued, as in thread mode.
+        """
+        documents = self._chunk_documents.pop(future, [])
+        if future.cancelled():
+            return
+        try:
+            outcomes = future.result()
+        except Exception as e:
+            # Worker died or the chunk could not be pickled
+            completed_at = datetime.now().isoformat()
+            for doc in documents:
+                doc.completed_at = completed_at
+                self._record_result(job_id, doc, None, str(e))
+            return
+
+        for doc, (_, result, error, started_at, completed_at, processing_time_ms) in zip(
+            documents, outcomes, strict=True
+        ):
+            doc.started_at = started_at
+            doc.completed_at = completed_at
+            doc.processing_time_ms = processing_time_ms
+            self._record_result(job_id, doc, result, error)
+
     def _monitor_batch(self, job_id: str) -> None:
         """Monitor batch job completion."""
         futures = self._futures.get(job_id, [])
 
         # Wait for all futures
-        for future in futures:
+        for future in as_completed(futures):
+            if future in self._chunk_documents:
+                self._apply_chunk(job_id, future)
+                continue
+            if future.cancelled():
+                continue  # Cancelled before it started; the document stays queued
             try:
                 future.result()
             except Exception:
@@ -285,16 +388,17 @@ class BatchProcessorService:
         with self._lock:
             job = self._jobs.get(job_id)
             if job:
-                job.completed_at = datetime.now().isoformat()
+                if job.status != BatchStatus.CANCELLED:
+                    job.completed_at = datetime.now().isoformat()
 
-                if job.failed_documents == 0:
-                    job.status = BatchStatus.COMPLETED
-                elif job.successful_documents == 0:
-                    job.status = BatchStatus.FAILED
-                else:
-                    job.status = BatchStatus.PARTIAL
+                    if job.failed_documents == 0:
+                        job.status = BatchStatus.COMPLETED
+                    elif job.successful_documents == 0:
+                        job.status = BatchStatus.FAILED
+                    else:
+                        job.status = BatchStatus.PARTIAL
 
-                job.progress_percent = 100.0
+                    job.progress_percent = 100.0
 
                 # Build summary
                 job.summary = {
@@ -389,10 +493,16 @@ class BatchProcessorService:
             job.status = BatchStatus.CANCELLED
             job.completed_at = datetime.now().isoformat()
 
-        # Shutdown executor
+        # Shutdown executor, dropping work that has not started
         if job_id in self._executors:
-            self._executors[job_id].shutdown(wait=False)
-            del self._executors[job_id]
+            executor = self._executors.pop(job_id)
+            executor.shutdown(wait=False, cancel_futures=True)
+            if isinstance(executor, ThreadPoolExecutor):
+                # The thread pool cancels queued futures without waking
+                # as_completed(), which would leave _monitor_batch waiting
+                for future in self._futures.get(job_id, []):
+                    if future.cancelled():
+                        future.set_running_or_notify_cancel()
 
         return True
 
@@ -511,11 +621,92 @@ class BatchProcessorService:
                 "total_jobs": len(self._jobs),
                 "by_status": dict(by_status),
                 "max_workers": self._max_workers,
+                "execution_mode": self._execution_mode.value,
                 "max_concurrent_batches": self._max_concurrent_batches,
                 "active_executors": len(self._executors),
             }
 
 
+# ============================================================================
+# Process-Mode Workers
+# ============================================================================
+
+
+def _process_chunk(
+    processor: Callable[[BatchDocument], dict[str, Any]],
+    items: list[tuple[str, str, str | bytes | None, str]],
+) -> list[tuple[str, dict[str, Any] | None, str | None, str, str, float]]:
+    """Run a processor over a chunk of documents inside a worker process.
+
+    Returns:
+        Per document: (document_id, result, error, started_at, completed_at,
+        processing_time_ms)
+    """
+    outcomes = []
+    for document_id, filename, content, content_type in items:
+        doc = BatchDocument(
+            document_id=document_id,
+            filename=filename,
+            content=content,
+            content_type=content_type,
+        )
+        started_at = datetime.now().isoformat()
+        start_time = time.time()
+        try:
+            result, error = processor(doc), None
+        except Exception as e:
+            result, error = None, str(e)
+        outcomes.append((
+            document_id,
+            result,
+            error,
+            started_at,
+            datetime.now().isoformat(),
+            (time.time() - start_time) * 1000,
+        ))
+    return outcomes
+
+
+class MentionExtractionProcessor:
+    """Batch processor extracting mentions with a shared NLP engine.
+
+    Picklable, so it can run in process mode: ``warm_up()`` builds the engine
+    in the parent before workers fork, and each worker then uses the
+    inherited, already-built engine. Mentions are returned in the compact
+    ExtractedMention.to_tuple() form; rebuild them with
+    ExtractedMention.from_tuple().
+
+    Usage:
+        service = BatchProcessorService(execution_mode=ExecutionMode.PROCESS)
+        job = service.create_batch(documents)
+        service.start_batch(job.job_id, MentionExtractionProcessor())
+    """
+
+    def __init__(self, engine: str = "rule_based") -> None:
+        """
+        Initialize the processor.
+
+        Args:
+            engine: Name of the engine in the NLP engine registry
+        """
+        self.engine = engine
+
+    def warm_up(self) -> None:
+        """Build the engine (automaton, vocabulary) ahead of forking."""
+        get_nlp_engine_registry().get(self.engine)
+
+    def __call__(self, doc: BatchDocument) -> dict[str, Any]:
+        """Extract mentions from one document."""
+        content = doc.content or ""
+        text = content.decode("utf-8", errors="replace") if isinstance(content, bytes) else content
+        nlp = get_nlp_engine_registry().get(self.engine)
+        mentions = nlp.extract_mentions(text, uuid.uuid5(uuid.NAMESPACE_URL, doc.document_id))
+        return {
+            "mention_count": len(mentions),
+            "mentions": [m.to_tuple() for m in mentions],
+        }
+
+
 # ============================================================================
 # Singleton Pattern
 # ============================================================================
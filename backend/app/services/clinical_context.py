@@ -15,6 +15,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from app.services.section_parser import SectionIndex
+
 
 # ============================================================================
 # Enums
@@ -515,14 +517,19 @@ class SectionDetector:
     }
 
     def __init__(self):
-        self._patterns = {}
+        # One alternation over every section, one named group per section
+        self._group_sections: dict[str, ClinicalSection] = {}
+        alternatives = []
         for section, patterns in self.SECTION_PATTERNS.items():
-            combined = '|'.join(f'({p})' for p in patterns)
-            self._patterns[section] = re.compile(combined, re.IGNORECASE)
+            group = section.name.lower()
+            self._group_sections[group] = section
+            combined = '|'.join(f'(?:{p})' for p in patterns)
+            alternatives.append(f'(?P<{group}>{combined})')
+        self._pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
 
     def detect_sections(self, text: str) -> list[SectionSpan]:
         """
-        Detect all sections in clinical text.
+        Detect all sections in clinical text in a single pass.
 
         Args:
             text: Clinical note text
@@ -532,19 +539,15 @@ class SectionDetector:
         """
         sections = []
 
-        for section, pattern in self._patterns.items():
-            for match in pattern.finditer(text):
-                # Find section end (next section or end of text)
-                sections.append(SectionSpan(
-                    section=section,
-                    header=match.group(),
-                    start=match.start(),
-                    end=-1,  # Will be set later
-                    content="",
-                ))
-
-        # Sort by start position
-        sections.sort(key=lambda s: s.start)
+        for match in self._pattern.finditer(text):
+            # Find section end (next section or end of text)
+            sections.append(SectionSpan(
+                section=self._group_sections[match.lastgroup],
+                header=match.group(),
+                start=match.start(),
+                end=-1,  # Will be set later
+                content="",
+            ))
 
         # Set end positions and content
         for i, section in enumerate(sections):
@@ -556,12 +559,27 @@ class SectionDetector:
 
         return sections
 
-    def get_section_at_position(self, sections: list[SectionSpan], position: int) -> ClinicalSection:
+    def index(self, text: str) -> SectionIndex[SectionSpan]:
+        """
+        Detect sections and index them for position lookups.
+
+        Args:
+            text: Clinical note text
+
+        Returns:
+            SectionIndex answering position -> section in O(log n)
+        """
+        return SectionIndex(self.detect_sections(text), unknown=ClinicalSection.UNKNOWN)
+
+    def get_section_at_position(
+        self,
+        sections: list[SectionSpan] | SectionIndex[SectionSpan],
+        position: int,
+    ) -> ClinicalSection:
         """Get the section containing a given position."""
-        for section in sections:
-            if section.start <= position < section.end:
-                return section.section
-        return ClinicalSection.UNKNOWN
+        if not isinstance(sections, SectionIndex):
+            sections = SectionIndex(sections, unknown=ClinicalSection.UNKNOWN)
+        return sections.section_at(position)
 
 
 # ============================================================================
@@ -686,7 +704,7 @@ class FamilyHistoryDetector:
         text: str,
         mention_start: int,
         mention_end: int,
-        sections: list[SectionSpan] | None = None,
+        sections: list[SectionSpan] | SectionIndex[SectionSpan] | None = None,
     ) -> tuple[bool, str | None]:
         """
         Check if a mention refers to family history.
@@ -702,10 +720,10 @@ class FamilyHistoryDetector:
         """
         # Check if in Family History section
         if sections:
-            for section in sections:
-                if section.section == ClinicalSection.FAMILY_HISTORY:
-                    if section.start <= mention_start < section.end:
-                        return True, "family history section"
+            if not isinstance(sections, SectionIndex):
+                sections = SectionIndex(sections, unknown=ClinicalSection.UNKNOWN)
+            if sections.section_at(mention_start) == ClinicalSection.FAMILY_HISTORY:
+                return True, "family history section"
 
         # Look in surrounding context
         context_start = max(0, mention_start - 50)
@@ -746,7 +764,7 @@ class ClinicalContextAnalyzer:
         mention_text: str,
         mention_start: int,
         mention_end: int,
-        sections: list[SectionSpan] | None = None,
+        sections: list[SectionSpan] | SectionIndex[SectionSpan] | None = None,
     ) -> ContextualMention:
         """
         Analyze the clinical context of a mention.
@@ -762,7 +780,9 @@ class ClinicalContextAnalyzer:
             ContextualMention with full context analysis
         """
         if sections is None:
-            sections = self.section_detector.detect_sections(text)
+            sections = self.section_detector.index(text)
+        elif not isinstance(sections, SectionIndex):
+            sections = SectionIndex(sections, unknown=ClinicalSection.UNKNOWN)
 
         # Get section
         section = self.section_detector.get_section_at_position(sections, mention_start)
@@ -0,0 +1,151 @@
+"""Columnar confidence scoring for extracted mentions.
+
+Scores all of a document's mentions at once: the per-mention signals are
+packed into NumPy columns (term length, section-domain affinity code,
+specificity flag, case-match quality, assertion penalty) and combined in a
+single array expression. Section-domain fit comes from a section x domain
+matrix precomputed from SectionParser, so no per-mention affinity lookups
+are needed.
+
+The scorer works on ExtractedMention fields, so any extractor (rule-based,
+clinical NER, ensemble) can reuse it.
+"""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from app.schemas.base import Assertion
+from app.services.nlp import ExtractedMention
+from app.services.section_parser import ClinicalSection, SectionParser, get_section_parser
+
+# Domain assumed for mentions without a domain hint
+DEFAULT_DOMAIN = "Observation"
+
+# Case-match quality for exact, case-insensitive, and other matches
+_CASE_SCORES = np.array([1.0, 0.8, 0.5])
+
+
+class ConfidenceScorer:
+    """Weighted confidence scoring over columns of mentions.
+
+    Usage:
+        scorer = ConfidenceScorer(RuleBasedNLPService.CONFIDENCE_WEIGHTS)
+        scores = scorer.score_mentions(mentions)
+    """
+
+    def __init__(
+        self,
+        weights: Mapping[str, float],
+        section_parser: SectionParser | None = None,
+    ) -> None:
+        """Precompute the section x domain fit matrix.
+
+        Args:
+            weights: Weights for "base", "term_length", "section_fit",
+                "specificity" and "case_match". Read on every call, so
+                changes to the mapping take effect immediately.
+            section_parser: Parser providing section-domain affinities.
+        """
+        self.weights = weights
+        parser = section_parser or get_section_parser()
+
+        self._sections = {section: i for i, section in enumerate(ClinicalSection)}
+        self._section_values = {section.value: i for section, i in self._sections.items()}
+
+        # Domains with an explicit affinity somewhere; the last column stands
+        # for every other domain (which falls back to the default affinity)
+        domains = sorted({d for a in parser.SECTION_DOMAIN_AFFINITY.values() for d in a})
+        domains.append("")
+        self._domains = {domain: i for i, domain in enumerate(domains)}
+        self._other_domain = len(domains) - 1
+
+        modifiers = np.array(
+            [
+                [parser.calculate_confidence_modifier(section, domain) for domain in domains]
+                for section in ClinicalSection
+            ]
+        )
+        # Normalize modifier from 0.8-1.1 range to 0.0-1.0
+        self.section_fit = np.clip((modifiers - 0.8) / 0.3, 0.0, 1.0)
+
+    def section_code(self, section: ClinicalSection | str | None) -> int:
+        """Get the matrix row of a section (an enum, its value, or None)."""
+        if isinstance(section, ClinicalSection):
+            return self._sections[section]
+        return self._section_values.get(section or "", self._sections[ClinicalSection.UNKNOWN])
+
+    def domain_code(self, domain: str | None) -> int:
+        """Get the matrix column of a domain."""
+        return self._domains.get(domain or DEFAULT_DOMAIN, self._other_domain)
+
+    def score(
+        self,
+        matched_texts: Sequence[str],
+        lexical_variants: Sequence[str],
+        concept_ids: Sequence[int | None],
+        domain_ids: Sequence[str | None],
+        sections: Sequence[ClinicalSection | str | None],
+        assertions: Sequence[Assertion],
+    ) -> np.ndarray:
+        """Score mentions given as parallel columns.
+
+        Args:
+            matched_texts: Text matched in the document.
+            lexical_variants: Vocabulary terms that matched.
+            concept_ids: OMOP concept IDs (None if unknown).
+            domain_ids: OMOP domains (None treated as Observation).
+            sections: Clinical sections (enum, section name or None).
+            assertions: Assertion statuses.
+
+        Returns:
+            Array of confidence scores between 0.0 and 1.0.
+        """
+        weights = self.weights
+        term_length = np.fromiter((len(t) for t in matched_texts), dtype=float, count=len(matched_texts))
+        section_codes = np.fromiter((self.section_code(s) for s in sections), dtype=np.intp)
+        domain_codes = np.fromiter((self.domain_code(d) for d in domain_ids), dtype=np.intp)
+        has_concept = np.fromiter((c is not None for c in concept_ids), dtype=bool)
+        case_codes = np.fromiter(
+            (
+                0 if text == variant else 1 if text.lower() == variant.lower() else 2
+                for text, variant in zip(matched_texts, lexical_variants, strict=True)
+            ),
+            dtype=np.intp,
+        )
+        possible = np.fromiter((a == Assertion.POSSIBLE for a in assertions), dtype=bool)
+
+        # Longer terms are more specific: 2 chars = 0.3, 5 chars = 0.6, 10+ chars = 1.0
+        length_score = np.where(
+            term_length >= 10,
+            1.0,
+            np.where(term_length >= 5, 0.6 + (term_length - 5) * 0.08, 0.3 + (term_length - 2) * 0.1),
+        )
+
+        score = (
+            weights["base"] * 1.0
+            + weights["term_length"] * length_score
+            + weights["section_fit"] * self.section_fit[section_codes, domain_codes]
+            + weights["specificity"] * np.where(has_concept, 1.0, 0.5)
+            + weights["case_match"] * _CASE_SCORES[case_codes]
+        ) * np.where(possible, 0.9, 1.0)
+
+        return np.clip(score, 0.0, 1.0)
+
+    def score_mentions(self, mentions: Sequence[ExtractedMention]) -> np.ndarray:
+        """Score extracted mentions from their own fields.
+
+        Args:
+            mentions: Mentions whose section is a section name (or None).
+
+        Returns:
+            Array of confidence scores, one per mention.
+        """
+        return self.score(
+            [m.text for m in mentions],
+            [m.lexical_variant for m in mentions],
+            [m.omop_concept_id for m in mentions],
+            [m.domain_hint for m in mentions],
+            [m.section for m in mentions],
+            [m.assertion for m in mentions],
+        )
@@ -20,6 +20,12 @@ import logging
 from pathlib import Path
 import threading
 
+import numpy as np
+
+from app.core.checksums import hash_files
+from app.services.snapshot import SnapshotWriter, open_snapshot, snapshot_path
+from app.services.trigram_index import TrigramIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -946,6 +952,92 @@ def load_extended_cpt_codes() -> tuple[list[CPTCode], dict[str, list[str]]]:
     return codes, synonym_index
 
 
+# ============================================================================
+# Compiled Snapshot
+# ============================================================================
+
+SNAPSHOT_KIND = "cpt"
+
+# Index of a loaded CPT code set: codes, synonym-to-code index, the index's
+# synonyms in order, and the trigram index over those synonyms
+CPTCodeIndex = tuple[list[CPTCode], dict[str, list[str]], list[str], TrigramIndex]
+
+
+def cpt_snapshot_source_hash() -> str:
+    """Get a checksum of the fixture and this module (core codes, loading rules)."""
+    return hash_files(FIXTURE_FILE, Path(__file__))
+
+
+def write_cpt_snapshot(path: Path | None = None) -> Path:
+    """Build the CPT code index from the fixture and write it as a snapshot.
+
+    Only fixture codes are stored; the core codes are defined in this module.
+
+    Args:
+        path: Destination file. Defaults to the snapshot directory.
+
+    Returns:
+        The written path.
+    """
+    codes, synonym_index = load_extended_cpt_codes()
+    extended = codes[len(CPT_CODES):]
+    categories = {category: i for i, category in enumerate(CPTCategory)}
+    positions: dict[str, int] = {}
+    for position, code in enumerate(codes):
+        positions.setdefault(code.code, position)
+    synonyms = list(synonym_index)
+
+    writer = SnapshotWriter(SNAPSHOT_KIND, cpt_snapshot_source_hash())
+    writer.add_strings("codes", [c.code for c in extended])
+    writer.add_strings("descriptions", [c.description for c in extended])
+    writer.add_array(
+        "categories", np.array([categories[c.category] for c in extended], dtype=np.int16)
+    )
+    writer.add_string_lists("synonyms", [c.synonyms for c in extended])
+    writer.add_strings("index_terms", synonyms)
+    writer.add_lists("index_codes", [[positions[c] for c in synonym_index[s]] for s in synonyms])
+    writer.add_trigram_index("index_trigrams", TrigramIndex(synonyms))
+    return writer.write(path or snapshot_path(SNAPSHOT_KIND))
+
+
+def load_cpt_code_index() -> CPTCodeIndex:
+    """Load the CPT code index, from the compiled snapshot when it is current.
+
+    Returns:
+        Tuple of (codes, synonym-to-code index, synonyms, synonym trigram index)
+    """
+    snapshot = open_snapshot(SNAPSHOT_KIND, cpt_snapshot_source_hash())
+    if snapshot is None:
+        codes, synonym_index = load_extended_cpt_codes()
+        synonyms = list(synonym_index)
+        return codes, synonym_index, synonyms, TrigramIndex(synonyms)
+
+    categories = list(CPTCategory)
+    codes = list(CPT_CODES)
+    for code_str, description, category, synonyms in zip(
+        snapshot.strings("codes"),
+        snapshot.strings("descriptions"),
+        snapshot.array("categories").tolist(),
+        snapshot.string_lists("synonyms"),
+        strict=True,
+    ):
+        codes.append(CPTCode(
+            code=code_str,
+            description=description,
+            category=categories[category],
+            synonyms=synonyms,
+        ))
+
+    code_strs = [c.code for c in codes]
+    synonyms = snapshot.strings("index_terms")
+    synonym_index = {
+        synonym: [code_strs[i] for i in positions]
+        for synonym, positions in zip(synonyms, snapshot.lists("index_codes"), strict=True)
+    }
+    logger.info(f"Loaded {len(codes)} CPT/HCPCS codes from snapshot {snapshot.path}")
+    return codes, synonym_index, synonyms, snapshot.trigram_index("index_trigrams", synonyms)
+
+
 # ============================================================================
 # CPT Suggester Service
 # ============================================================================
@@ -980,8 +1072,11 @@ class CPTSuggesterService:
         self._codes: dict[str, CPTCode] = {}
         self._synonym_index: dict[str, list[str]] = {}
 
-        # Load extended codes from fixture
-        codes, self._synonym_index = load_extended_cpt_codes()
+        # Load extended codes (compiled snapshot or fixture), with a
+        # substring index over synonyms for partial matching
+        codes, self._synonym_index, self._synonyms, self._synonym_trigrams = (
+            load_cpt_code_index()
+        )
 
         for code in codes:
             self._codes[code.code] = code
@@ -1025,18 +1120,18 @@ class CPTSuggesterService:
                     seen_codes.add(code_str)
 
         # 2. Partial synonym match
-        for synonym, code_list in self._synonym_index.items():
-            if query_lower in synonym or synonym in query_lower:
-                for code_str in code_list:
-                    if code_str in self._codes and code_str not in seen_codes:
-                        code = self._codes[code_str]
-                        suggestion = self._create_suggestion_with_cer(
-                            code, clinical_context,
-                            match_type="partial_synonym",
-                            matched_term=synonym
-                        )
-                        suggestions.append(suggestion)
-                        seen_codes.add(code_str)
+        for synonym_id in self._synonym_trigrams.overlapping(query_lower):
+            synonym = self._synonyms[synonym_id]
+            for code_str in self._synonym_index[synonym]:
+                if code_str in self._codes and code_str not in seen_codes:
+                    code = self._codes[code_str]
+                    suggestion = self._create_suggestion_with_cer(
+                        code, clinical_context,
+                        match_type="partial_synonym",
+                        matched_term=synonym
+                    )
+                    suggestions.append(suggestion)
+                    seen_codes.add(code_str)
 
         # 3. Description search
         query_words = set(query_lower.split())
@@ -19,6 +19,8 @@ import logging
 from pathlib import Path
 import threading
 
+from app.services.trigram_index import TrigramIndex
+
 logger = logging.getLogger(__name__)
 
 FIXTURE_FILE = Path(__file__).parent.parent.parent / "fixtures" / "drug_safety_profiles_expanded.json"
@@ -741,6 +743,16 @@ class DrugSafetyService:
         for profile in profiles:
             self._profiles[profile.generic_name.lower()] = profile
 
+        # Substring index over each profile's name, generic name and class
+        self._profile_list = list(self._profiles.values())
+        search_fields: list[str] = []
+        self._field_profiles: list[int] = []
+        for i, profile in enumerate(self._profile_list):
+            for value in (profile.drug_name, profile.generic_name, profile.drug_class):
+                search_fields.append(value.lower())
+                self._field_profiles.append(i)
+        self._search_trigrams = TrigramIndex(search_fields)
+
         logger.info(f"Drug safety service initialized with {len(self._profiles)} drug profiles")
 
     def normalize_drug_name(self, drug: str) -> str:
@@ -886,17 +898,10 @@ class DrugSafetyService:
     def search_profiles(self, query: str, limit: int = 10) -> list[DrugSafetyProfile]:
         """Search for drug profiles by name or class."""
         query_lower = query.lower()
-        matches = []
-
-        for profile in self._profiles.values():
-            if (
-                query_lower in profile.drug_name.lower()
-                or query_lower in profile.generic_name.lower()
-                or query_lower in profile.drug_class.lower()
-            ):
-                matches.append(profile)
+        field_ids = self._search_trigrams.containing(query_lower)
+        profile_ids = sorted({self._field_profiles[i] for i in field_ids})
 
-        return matches[:limit]
+        return [self._profile_list[i] for i in profile_ids[:limit]]
 
     def get_stats(self) -> dict:
         """Get statistics about the drug safety database."""
@@ -135,8 +135,8 @@ class PreProcessor:
         Returns:
             Dict with sections, negation_scopes, sentences
         """
-        # Detect sections
-        sections = self.section_detector.detect_sections(text)
+        # Detect sections, indexed for per-entity lookups
+        sections = self.section_detector.index(text)
 
         # Find negation scopes
         negation_scopes = self.negation_detector.find_negation_scopes(text)
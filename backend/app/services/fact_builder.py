@@ -272,6 +272,24 @@ class BaseFactBuilderService(FactBuilderServiceInterface):
         """Default implementation - override in subclass."""
         raise NotImplementedError("Subclass must implement create_fact")
 
+    def create_facts_bulk(
+        self,
+        facts: list[tuple[FactInput, list[EvidenceInput]]],
+    ) -> list[FactResult]:
+        """Create many facts, each with its evidence.
+
+        Same semantics as calling create_fact for each item in order.
+        Database-backed subclasses override this to write the batch in a
+        few statements instead of several per fact.
+
+        Args:
+            facts: (fact input, evidence) pairs.
+
+        Returns:
+            One FactResult per input, in input order.
+        """
+        return [self.create_fact(fact_input, evidence) for fact_input, evidence in facts]
+
     def create_fact_from_mention(
         self,
         mention_id: UUID,
@@ -7,11 +7,13 @@ IMPORTANT: Negated findings (assertion=ABSENT) MUST be preserved
 and correctly represented in the knowledge graph.
 """
 
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.database import upsert_insert
+from app.core.write_buffer import WriteBuffer
 from app.models.clinical_fact import ClinicalFact, FactEvidence
 from app.schemas.base import Assertion, Domain
 from app.services.fact_builder import (
@@ -43,14 +45,17 @@ class DatabaseFactBuilderService(BaseFactBuilderService):
         )
     """
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, write_buffer: WriteBuffer | None = None) -> None:
         """Initialize the database fact builder.
 
         Args:
             session: SQLAlchemy database session.
+            write_buffer: Buffer of the caller's pending inserts (e.g. the
+                mentions evidence points to), flushed before facts are written.
         """
         super().__init__()
         self._session = session
+        self._write_buffer = write_buffer
         self._dedup_cache: dict[str, UUID] = {}
 
     def create_fact(
@@ -65,143 +70,152 @@ class DatabaseFactBuilderService(BaseFactBuilderService):
 
         IMPORTANT: Negated findings are correctly preserved.
         """
-        # Calculate dedup key
-        dedup_key = self.calculate_dedup_key(
-            patient_id=fact_input.patient_id,
-            omop_concept_id=fact_input.omop_concept_id,
-            assertion=fact_input.assertion,
-            temporality=fact_input.temporality,
-            experiencer=fact_input.experiencer,
-        )
-
-        # Check for existing fact
-        existing_fact_id = self._find_existing_fact(dedup_key, fact_input)
+        return self.create_facts_bulk([(fact_input, evidence or [])])[0]
 
-        if existing_fact_id:
-            # Add evidence to existing fact
-            return self._add_evidence_to_existing(
-                fact_id=existing_fact_id,
-                evidence=evidence or [],
-                new_confidence=fact_input.confidence,
+    def create_facts_bulk(
+        self,
+        facts: list[tuple[FactInput, list[EvidenceInput]]],
+    ) -> list[FactResult]:
+        """Create many facts with evidence in a handful of statements.
+
+        Existing facts for the batch's dedup keys are fetched in one query
+        and the confidences of repeated keys are merged in memory. Facts
+        are then written with one INSERT ... ON CONFLICT on the dedup key
+        (merging confidence into a fact that already exists, even one a
+        concurrent writer just inserted), and evidence with one
+        INSERT ... ON CONFLICT DO NOTHING on (fact, source). Fact and
+        evidence IDs are generated client-side.
+
+        Results match calling create_fact for each item in order: a
+        repeated dedup key merges into the first fact, and evidence
+        already linked to it is not added again. Negated findings have
+        their own dedup keys and are kept as separate facts.
+        """
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+        if not facts:
+            return []
+
+        inputs = [fact_input for fact_input, _ in facts]
+        keys = [self._dedup_key(fact_input) for fact_input in inputs]
+        # dedup key -> ID of the fact already stored for it
+        existing = {key: str(self._dedup_cache[key]) for key in keys if key in self._dedup_cache}
+        existing.update(self._prefetch_facts({key for key in keys if key not in existing}))
+
+        # One row per dedup key, carrying the batch's merged confidence
+        fact_rows: dict[str, dict] = {}
+        for fact_input, key in zip(inputs, keys, strict=True):
+            row = fact_rows.get(key)
+            if row is not None:
+                row["confidence"] = self.merge_confidence(row["confidence"], fact_input.confidence)
+                continue
+            fact_rows[key] = {
+                "id": existing.get(key) or str(uuid4()),
+                "dedup_key": key,
+                "patient_id": fact_input.patient_id,
+                "domain": fact_input.domain,
+                "omop_concept_id": fact_input.omop_concept_id,
+                "concept_name": fact_input.concept_name,
+                "assertion": fact_input.assertion,
+                "temporality": fact_input.temporality,
+                "experiencer": fact_input.experiencer,
+                "confidence": fact_input.confidence,
+                "value": fact_input.value,
+                "unit": fact_input.unit,
+            }
+
+        fact_ids = {key: row["id"] for key, row in fact_rows.items()}
+        # The database's IDs win: a concurrent writer may have inserted a key since the prefetch
+        fact_ids.update(self._upsert_facts(list(fact_rows.values())))
+
+        evidence_rows: list[dict] = []
+        item_evidence_ids: list[list[str]] = []
+        for (_, evidence), key in zip(facts, keys, strict=True):
+            ids = []
+            for ev in evidence:
+                evidence_id = str(uuid4())
+                evidence_rows.append({
+                    "id": evidence_id,
+                    "fact_id": fact_ids[key],
+                    "evidence_type": ev.evidence_type,
+                    "source_id": str(ev.source_id),
+                    "source_table": ev.source_table,
+                    "weight": ev.weight,
+                    "notes": ev.notes,
+                })
+                ids.append(evidence_id)
+            item_evidence_ids.append(ids)
+        inserted_evidence = self._insert_evidence(evidence_rows)
+
+        results = []
+        seen: set[str] = set()
+        for key, evidence_ids in zip(keys, item_evidence_ids, strict=True):
+            fact_id = fact_ids[key]
+            is_new = key not in existing and key not in seen and fact_id == fact_rows[key]["id"]
+            seen.add(key)
+            self._dedup_cache[key] = UUID(fact_id)
+            results.append(
+                FactResult(
+                    fact_id=UUID(fact_id),
+                    evidence_ids=[UUID(e) for e in evidence_ids if e in inserted_evidence],
+                    is_new=is_new,
+                )
             )
+        return results
 
-        # Create new fact
-        fact = ClinicalFact(
+    def _dedup_key(self, fact_input: FactInput) -> str:
+        """Calculate the dedup key of a fact input."""
+        return self.calculate_dedup_key(
             patient_id=fact_input.patient_id,
-            domain=fact_input.domain,
             omop_concept_id=fact_input.omop_concept_id,
-            concept_name=fact_input.concept_name,
             assertion=fact_input.assertion,
             temporality=fact_input.temporality,
             experiencer=fact_input.experiencer,
-            confidence=fact_input.confidence,
-            value=fact_input.value,
-            unit=fact_input.unit,
         )
-        self._session.add(fact)
-        self._session.flush()  # Get the fact ID
-
-        # Create evidence links
-        evidence_ids = []
-        for ev in evidence or []:
-            fact_evidence = FactEvidence(
-                fact_id=fact.id,
-                evidence_type=ev.evidence_type,
-                source_id=str(ev.source_id),
-                source_table=ev.source_table,
-                weight=ev.weight,
-                notes=ev.notes,
-            )
-            self._session.add(fact_evidence)
-            self._session.flush()
-            evidence_ids.append(UUID(fact_evidence.id))
 
-        # Cache for future dedup lookups
-        self._dedup_cache[dedup_key] = UUID(fact.id)
+    def _prefetch_facts(self, keys: set[str]) -> dict[str, str]:
+        """Fetch the existing facts for a set of dedup keys in one query.
 
-        return FactResult(
-            fact_id=UUID(fact.id),
-            evidence_ids=evidence_ids,
-            is_new=True,
+        Returns:
+            Mapping of dedup key to fact ID.
+        """
+        if not keys:
+            return {}
+        stmt = select(ClinicalFact.dedup_key, ClinicalFact.id).where(
+            ClinicalFact.dedup_key.in_(keys)
         )
+        return {key: str(fact_id) for key, fact_id in self._session.execute(stmt)}
 
-    def _find_existing_fact(
-        self,
-        dedup_key: str,
-        fact_input: FactInput,
-    ) -> UUID | None:
-        """Find an existing fact matching the dedup key.
+    def _upsert_facts(self, rows: list[dict]) -> dict[str, str]:
+        """Insert facts, merging confidence into facts that already exist.
 
-        Checks both the local cache and database.
+        Returns:
+            Mapping of dedup key to the stored fact's ID.
         """
-        # Check cache first
-        if dedup_key in self._dedup_cache:
-            return self._dedup_cache[dedup_key]
-
-        # Query database
+        stmt = upsert_insert(self._session, ClinicalFact)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["dedup_key"],
+            set_={
+                # merge_confidence, applied in SQL against the stored value
+                "confidence": 1.0 - (1.0 - ClinicalFact.confidence) * (1.0 - stmt.excluded.confidence),
+            },
+        ).returning(ClinicalFact.dedup_key, ClinicalFact.id)
+        return {key: str(fact_id) for key, fact_id in self._session.execute(stmt, rows)}
+
+    def _insert_evidence(self, rows: list[dict]) -> set[str]:
+        """Insert evidence links, skipping sources already linked to the fact.
+
+        Returns:
+            IDs of the inserted rows.
+        """
+        if not rows:
+            return set()
         stmt = (
-            select(ClinicalFact)
-            .where(ClinicalFact.patient_id == fact_input.patient_id)
-            .where(ClinicalFact.omop_concept_id == fact_input.omop_concept_id)
-            .where(ClinicalFact.assertion == fact_input.assertion)
-            .where(ClinicalFact.temporality == fact_input.temporality)
-            .where(ClinicalFact.experiencer == fact_input.experiencer)
-        )
-        result = self._session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            fact_id = UUID(existing.id)
-            self._dedup_cache[dedup_key] = fact_id
-            return fact_id
-
-        return None
-
-    def _add_evidence_to_existing(
-        self,
-        fact_id: UUID,
-        evidence: list[EvidenceInput],
-        new_confidence: float,
-    ) -> FactResult:
-        """Add evidence to an existing fact and update confidence."""
-        # Get existing fact
-        stmt = select(ClinicalFact).where(ClinicalFact.id == str(fact_id))
-        result = self._session.execute(stmt)
-        fact = result.scalar_one()
-
-        # Update confidence using merge formula
-        fact.confidence = self.merge_confidence(fact.confidence, new_confidence)
-
-        # Add new evidence links
-        evidence_ids = []
-        for ev in evidence:
-            # Check if this evidence already exists
-            existing_ev_stmt = (
-                select(FactEvidence)
-                .where(FactEvidence.fact_id == str(fact_id))
-                .where(FactEvidence.source_id == str(ev.source_id))
-                .where(FactEvidence.source_table == ev.source_table)
-            )
-            existing_ev = self._session.execute(existing_ev_stmt).scalar_one_or_none()
-
-            if not existing_ev:
-                fact_evidence = FactEvidence(
-                    fact_id=str(fact_id),
-                    evidence_type=ev.evidence_type,
-                    source_id=str(ev.source_id),
-                    source_table=ev.source_table,
-                    weight=ev.weight,
-                    notes=ev.notes,
-                )
-                self._session.add(fact_evidence)
-                self._session.flush()
-                evidence_ids.append(UUID(fact_evidence.id))
-
-        return FactResult(
-            fact_id=fact_id,
-            evidence_ids=evidence_ids,
-            is_new=False,
+            upsert_insert(self._session, FactEvidence)
+            .on_conflict_do_nothing(index_elements=["fact_id", "source_id", "source_table"])
+            .returning(FactEvidence.id)
         )
+        return {str(evidence_id) for evidence_id in self._session.scalars(stmt, rows)}
 
     def get_fact_by_id(self, fact_id: UUID) -> FactInput | None:
         """Retrieve a fact by its ID."""
@@ -9,7 +9,7 @@ import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.clinical_fact import ClinicalFact, FactEvidence
-from app.models.knowledge_graph import KGEdge, KGNode
+from app.models.knowledge_graph import KGEdge, KGNode, KGProjection
 from app.schemas.base import Assertion, Domain, Experiencer, Temporality
 from app.schemas.clinical_fact import EvidenceType
 from app.schemas.knowledge_graph import EdgeType, NodeType
@@ -185,6 +185,7 @@ class FHIRImportService:
 
         await session.execute(delete(KGEdge).where(KGEdge.patient_id == patient_id))
         await session.execute(delete(KGNode).where(KGNode.patient_id == patient_id))
+        await session.execute(delete(KGProjection).where(KGProjection.patient_id == patient_id))
         await session.execute(
             delete(ClinicalFact).where(ClinicalFact.patient_id == patient_id)
         )
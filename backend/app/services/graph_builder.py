@@ -186,7 +186,7 @@ class GraphBuilderServiceInterface(ABC):
         pass  # pragma: no cover
 
     @abstractmethod
-    def build_graph_for_patient(self, patient_id: str) -> GraphResult:
+    def build_graph_for_patient(self, patient_id: str, full: bool = False) -> GraphResult:
         """Build complete graph for a patient from their facts.
 
         This method orchestrates:
@@ -196,6 +196,8 @@ class GraphBuilderServiceInterface(ABC):
 
         Args:
             patient_id: Patient identifier.
+            full: Reproject every fact even if the implementation keeps
+                track of facts already projected.
 
         Returns:
             GraphResult with statistics.
@@ -305,5 +307,5 @@ class BaseGraphBuilderService(GraphBuilderServiceInterface):
     ) -> list[EdgeInput]:
         return []
 
-    def build_graph_for_patient(self, patient_id: str) -> GraphResult:
+    def build_graph_for_patient(self, patient_id: str, full: bool = False) -> GraphResult:
         raise NotImplementedError("Subclass must implement")
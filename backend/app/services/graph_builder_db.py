@@ -3,13 +3,15 @@
 Implements graph construction with database persistence.
 """
 
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, select, update
 from sqlalchemy.orm import Session
 
+from app.core.database import upsert_insert
+from app.core.write_buffer import WriteBuffer
 from app.models.clinical_fact import ClinicalFact
-from app.models.knowledge_graph import KGEdge, KGNode
+from app.models.knowledge_graph import KGEdge, KGNode, KGProjection
 from app.schemas.base import Domain
 from app.schemas.knowledge_graph import EdgeType, NodeType, PatientGraph
 from app.services.graph_builder import (
@@ -30,14 +32,17 @@ class DatabaseGraphBuilderService(BaseGraphBuilderService):
         result = service.build_graph_for_patient("P001")
     """
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, write_buffer: WriteBuffer | None = None) -> None:
         """Initialize the database graph builder.
 
         Args:
             session: SQLAlchemy database session.
+            write_buffer: Buffer of the caller's pending inserts (e.g. facts
+                to project), flushed before the graph is read or written.
         """
         super().__init__()
         self._session = session
+        self._write_buffer = write_buffer
         self._patient_node_cache: dict[str, UUID] = {}
         self._node_dedup_cache: dict[str, UUID] = {}
 
@@ -62,17 +67,22 @@ class DatabaseGraphBuilderService(BaseGraphBuilderService):
             return node_id
 
         # Create new patient node
-        node = KGNode(
-            patient_id=patient_id,
-            node_type=NodeType.PATIENT,
-            omop_concept_id=None,
-            label=f"Patient {patient_id}",
-            properties={"type": "patient"},
+        dedup_key = self.calculate_node_dedup_key(patient_id, NodeType.PATIENT, None)
+        node_ids, _ = self._upsert_nodes(
+            {
+                dedup_key: {
+                    "id": str(uuid4()),
+                    "dedup_key": dedup_key,
+                    "patient_id": patient_id,
+                    "node_type": NodeType.PATIENT,
+                    "omop_concept_id": None,
+                    "label": f"Patient {patient_id}",
+                    "properties": {"type": "patient"},
+                }
+            }
         )
-        self._session.add(node)
-        self._session.flush()
 
-        node_id = UUID(node.id)
+        node_id = UUID(node_ids[dedup_key])
         self._patient_node_cache[patient_id] = node_id
         return node_id
 
@@ -98,74 +108,53 @@ class DatabaseGraphBuilderService(BaseGraphBuilderService):
 
     def create_node(self, node_input: NodeInput) -> UUID:
         """Create a node in the knowledge graph."""
-        # Calculate dedup key
         dedup_key = self.calculate_node_dedup_key(
             node_input.patient_id,
             node_input.node_type,
             node_input.omop_concept_id,
         )
-
-        # Check cache
-        if dedup_key in self._node_dedup_cache:
-            return self._node_dedup_cache[dedup_key]
-
-        # Check database
-        stmt = select(KGNode).where(KGNode.patient_id == node_input.patient_id)
-        if node_input.omop_concept_id:
-            stmt = stmt.where(KGNode.omop_concept_id == node_input.omop_concept_id)
-        stmt = stmt.where(KGNode.node_type == node_input.node_type)
-
-        result = self._session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            node_id = UUID(existing.id)
-            self._node_dedup_cache[dedup_key] = node_id
-            return node_id
-
-        # Create new node
-        node = KGNode(
-            patient_id=node_input.patient_id,
-            node_type=node_input.node_type,
-            omop_concept_id=node_input.omop_concept_id,
-            label=node_input.label,
-            properties=node_input.properties,
+        node_ids, _ = self._upsert_nodes(
+            {
+                dedup_key: {
+                    "id": str(uuid4()),
+                    "dedup_key": dedup_key,
+                    "patient_id": node_input.patient_id,
+                    "node_type": node_input.node_type,
+                    "omop_concept_id": node_input.omop_concept_id,
+                    "label": node_input.label,
+                    "properties": node_input.properties,
+                }
+            }
         )
-        self._session.add(node)
-        self._session.flush()
-
-        node_id = UUID(node.id)
-        self._node_dedup_cache[dedup_key] = node_id
-        return node_id
+        return UUID(node_ids[dedup_key])
 
     def create_edge(self, edge_input: EdgeInput) -> UUID:
         """Create an edge in the knowledge graph."""
-        # Check for existing edge
+        edge_id = str(uuid4())
+        inserted = self._insert_edges(
+            [
+                {
+                    "id": edge_id,
+                    "patient_id": edge_input.patient_id,
+                    "source_node_id": str(edge_input.source_node_id),
+                    "target_node_id": str(edge_input.target_node_id),
+                    "edge_type": edge_input.edge_type,
+                    "fact_id": str(edge_input.fact_id) if edge_input.fact_id else None,
+                    "properties": edge_input.properties,
+                }
+            ]
+        )
+        if inserted:
+            return UUID(edge_id)
+
+        # Already linked: return the existing edge
         stmt = (
-            select(KGEdge)
+            select(KGEdge.id)
             .where(KGEdge.source_node_id == str(edge_input.source_node_id))
             .where(KGEdge.target_node_id == str(edge_input.target_node_id))
             .where(KGEdge.edge_type == edge_input.edge_type)
         )
-        result = self._session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            return UUID(existing.id)
-
-        # Create new edge
-        edge = KGEdge(
-            patient_id=edge_input.patient_id,
-            source_node_id=str(edge_input.source_node_id),
-            target_node_id=str(edge_input.target_node_id),
-            edge_type=edge_input.edge_type,
-            fact_id=str(edge_input.fact_id) if edge_input.fact_id else None,
-            properties=edge_input.properties,
-        )
-        self._session.add(edge)
-        self._session.flush()
-
-        return UUID(edge.id)
+        return UUID(self._session.execute(stmt).scalar_one())
 
     def project_fact_to_graph(
         self,
@@ -186,14 +175,7 @@ class DatabaseGraphBuilderService(BaseGraphBuilderService):
             node_type=node_type,
             label=concept_name,
             omop_concept_id=omop_concept_id,
-            properties={
-                "assertion": assertion,
-                "temporality": temporality,
-                "experiencer": experiencer,
-                "fact_id": str(fact_id),
-                "is_negated": assertion == "absent",
-                "is_uncertain": assertion == "possible",
-            },
+            properties=self._fact_node_properties(fact_id, assertion, temporality, experiencer),
         )
         node_id = self.create_node(node_input)
 
@@ -281,54 +263,240 @@ class DatabaseGraphBuilderService(BaseGraphBuilderService):
             for e in edges
         ]
 
-    def build_graph_for_patient(self, patient_id: str) -> GraphResult:
-        """Build the complete knowledge graph for a patient."""
-        nodes_created = 0
-        edges_created = 0
+    def build_graph_for_patient(self, patient_id: str, full: bool = False) -> GraphResult:
+        """Project a patient's facts into the knowledge graph.
+
+        Incremental: only facts not projected yet (ClinicalFact.projected_at
+        is NULL) are read. Their nodes are deduplicated against the graph
+        with one prefetch, then nodes and edges are each written with one
+        INSERT ... ON CONFLICT DO NOTHING (nodes keyed on patient, node type
+        and concept), and the facts are marked projected with one UPDATE in
+        the same transaction. A fact only becomes visible once its
+        transaction commits, so however long that transaction ran, the
+        next build picks it up. Creation counts come from the rows the
+        inserts return and are added to the graph's counts, read up front
+        with one query.
+
+        Incremental builds rely on the graph still holding the counts
+        recorded on the patient's KGProjection: if nodes or edges were
+        written or deleted behind the builder's back (e.g. a FHIR
+        reimport), every fact is reprojected.
+
+        Args:
+            patient_id: Patient identifier.
+            full: Reproject every fact, including those already projected.
+        """
+        self._flush_write_buffer()
+        projection = self._session.execute(
+            select(KGProjection).where(KGProjection.patient_id == patient_id)
+        ).scalar_one_or_none()
+        node_count, edge_count = self._count_graph(patient_id)
+        incremental = (
+            not full
+            and projection is not None
+            and (projection.node_count, projection.edge_count) == (node_count, edge_count)
+        )
 
-        # Create patient node
-        existing_patient = self.get_patient_node(patient_id)
-        if existing_patient is None:
+        nodes_created = 0
+        if self.get_patient_node(patient_id) is None:
             self.create_patient_node(patient_id)
             nodes_created += 1
 
-        # Get all facts for patient
-        stmt = select(ClinicalFact).where(ClinicalFact.patient_id == patient_id)
-        result = self._session.execute(stmt)
-        facts = result.scalars().all()
+        stmt = select(
+            ClinicalFact.id,
+            ClinicalFact.domain,
+            ClinicalFact.omop_concept_id,
+            ClinicalFact.concept_name,
+            ClinicalFact.assertion,
+            ClinicalFact.temporality,
+            ClinicalFact.experiencer,
+        ).where(ClinicalFact.patient_id == patient_id)
+        if incremental:
+            stmt = stmt.where(ClinicalFact.projected_at.is_(None))
+        # Creation order, so the first fact of a node still sets its properties
+        facts = self._session.execute(stmt.order_by(ClinicalFact.created_at)).all()
+
+        fact_nodes_created, edges_created = self._project_facts(patient_id, facts)
+        nodes_created += fact_nodes_created
+        self._mark_projected([fact.id for fact in facts])
+
+        node_count += nodes_created
+        edge_count += edges_created
+        self._save_projection(patient_id, node_count, edge_count)
 
-        # Project each fact to graph
+        return GraphResult(
+            patient_id=patient_id,
+            node_count=node_count,
+            edge_count=edge_count,
+            nodes_created=nodes_created,
+            edges_created=edges_created,
+        )
+
+    def _fact_node_properties(
+        self,
+        fact_id: UUID | str,
+        assertion: str,
+        temporality: str,
+        experiencer: str,
+    ) -> dict:
+        """Build the properties of a fact's node."""
+        return {
+            "assertion": assertion,
+            "temporality": temporality,
+            "experiencer": experiencer,
+            "fact_id": str(fact_id),
+            "is_negated": assertion == "absent",
+            "is_uncertain": assertion == "possible",
+        }
+
+    def _project_facts(self, patient_id: str, facts: list[Row]) -> tuple[int, int]:
+        """Project fact rows to nodes and patient edges in bulk.
+
+        As with project_fact_to_graph for each fact in order, the first
+        fact of a node key sets the node's label and properties and the
+        first fact per node sets its edge.
+
+        Returns:
+            (nodes created, edges created)
+        """
+        if not facts:
+            return 0, 0
+        patient_node_id = str(
+            self.get_patient_node(patient_id) or self.create_patient_node(patient_id)
+        )
+
+        node_rows: dict[str, dict] = {}
+        # (node key, edge type) -> first fact projected to it
+        edge_facts: dict[tuple[str, EdgeType], Row] = {}
         for fact in facts:
-            # Check if node already exists
             node_type = self.domain_to_node_type(fact.domain)
             dedup_key = self.calculate_node_dedup_key(patient_id, node_type, fact.omop_concept_id)
-            node_exists = dedup_key in self._node_dedup_cache
-
-            self.project_fact_to_graph(
-                fact_id=UUID(fact.id),
-                patient_id=patient_id,
-                domain=fact.domain,
-                omop_concept_id=fact.omop_concept_id,
-                concept_name=fact.concept_name,
-                assertion=fact.assertion.value,
-                temporality=fact.temporality.value,
-                experiencer=fact.experiencer.value,
-            )
+            if dedup_key not in node_rows:
+                node_rows[dedup_key] = {
+                    "id": str(uuid4()),
+                    "dedup_key": dedup_key,
+                    "patient_id": patient_id,
+                    "node_type": node_type,
+                    "omop_concept_id": fact.omop_concept_id,
+                    "label": fact.concept_name,
+                    "properties": self._fact_node_properties(
+                        fact.id,
+                        fact.assertion.value,
+                        fact.temporality.value,
+                        fact.experiencer.value,
+                    ),
+                }
+            edge_facts.setdefault((dedup_key, self.domain_to_edge_type(fact.domain)), fact)
+
+        node_ids, nodes_created = self._upsert_nodes(node_rows)
+        edges_created = self._insert_edges(
+            [
+                {
+                    "id": str(uuid4()),
+                    "patient_id": patient_id,
+                    "source_node_id": patient_node_id,
+                    "target_node_id": node_ids[dedup_key],
+                    "edge_type": edge_type,
+                    "fact_id": str(fact.id),
+                    "properties": {"assertion": fact.assertion.value},
+                }
+                for (dedup_key, edge_type), fact in edge_facts.items()
+            ]
+        )
+        return nodes_created, edges_created
 
-            if not node_exists:
-                nodes_created += 1
-                edges_created += 1
+    def _upsert_nodes(self, rows: dict[str, dict]) -> tuple[dict[str, str], int]:
+        """Insert nodes whose dedup keys are not in the graph yet.
 
-        # Get final counts
-        all_nodes = self.get_nodes_for_patient(patient_id)
-        all_edges = self.get_edges_for_patient(patient_id)
+        Existing nodes are found through the dedup cache and one prefetch
+        query; the rest are inserted with ON CONFLICT DO NOTHING.
 
-        return GraphResult(
-            patient_id=patient_id,
-            node_count=len(all_nodes),
-            edge_count=len(all_edges),
-            nodes_created=nodes_created,
-            edges_created=edges_created,
+        Args:
+            rows: Node rows by dedup key.
+
+        Returns:
+            (node ID by dedup key, number of nodes inserted)
+        """
+        self._flush_write_buffer()
+        node_ids = {
+            key: str(self._node_dedup_cache[key]) for key in rows if key in self._node_dedup_cache
+        }
+        node_ids.update(self._fetch_node_ids([key for key in rows if key not in node_ids]))
+
+        new_rows = [row for key, row in rows.items() if key not in node_ids]
+        inserted: dict[str, str] = {}
+        if new_rows:
+            stmt = (
+                upsert_insert(self._session, KGNode)
+                .on_conflict_do_nothing(index_elements=["dedup_key"])
+                .returning(KGNode.dedup_key, KGNode.id)
+            )
+            inserted = {key: str(node_id) for key, node_id in self._session.execute(stmt, new_rows)}
+            node_ids.update(inserted)
+            # Inserted by a concurrent writer since the prefetch
+            node_ids.update(self._fetch_node_ids([key for key in rows if key not in node_ids]))
+
+        self._node_dedup_cache.update({key: UUID(node_id) for key, node_id in node_ids.items()})
+        return node_ids, len(inserted)
+
+    def _fetch_node_ids(self, dedup_keys: list[str]) -> dict[str, str]:
+        """Look up node IDs by dedup key in one query."""
+        if not dedup_keys:
+            return {}
+        stmt = select(KGNode.dedup_key, KGNode.id).where(KGNode.dedup_key.in_(dedup_keys))
+        return {key: str(node_id) for key, node_id in self._session.execute(stmt)}
+
+    def _insert_edges(self, rows: list[dict]) -> int:
+        """Insert edges, skipping ones already in the graph.
+
+        Returns:
+            Number of edges inserted.
+        """
+        if not rows:
+            return 0
+        self._flush_write_buffer()
+        stmt = (
+            upsert_insert(self._session, KGEdge)
+            .on_conflict_do_nothing(
+                index_elements=["source_node_id", "target_node_id", "edge_type"]
+            )
+            .returning(KGEdge.id)
+        )
+        return len(self._session.scalars(stmt, rows).all())
+
+    def _flush_write_buffer(self) -> None:
+        """Write the caller's pending inserts before touching the graph."""
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+
+    def _count_graph(self, patient_id: str) -> tuple[int, int]:
+        """Count a patient's nodes and edges in one query."""
+        stmt = select(
+            select(func.count()).where(KGNode.patient_id == patient_id).scalar_subquery(),
+            select(func.count()).where(KGEdge.patient_id == patient_id).scalar_subquery(),
+        )
+        node_count, edge_count = self._session.execute(stmt).one()
+        return node_count, edge_count
+
+    def _mark_projected(self, fact_ids: list[str]) -> None:
+        """Mark facts as projected into the graph, in one UPDATE."""
+        if not fact_ids:
+            return
+        self._session.execute(
+            update(ClinicalFact)
+            .where(ClinicalFact.id.in_(fact_ids))
+            .values(projected_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    def _save_projection(self, patient_id: str, node_count: int, edge_count: int) -> None:
+        """Record the patient's graph counts."""
+        values = {"node_count": node_count, "edge_count": edge_count}
+        stmt = upsert_insert(self._session, KGProjection).values(
+            id=str(uuid4()), patient_id=patient_id, **values
+        )
+        self._session.execute(
+            stmt.on_conflict_do_update(index_elements=["patient_id"], set_=values)
         )
 
     def get_patient_graph(self, patient_id: str) -> PatientGraph:
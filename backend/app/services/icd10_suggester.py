@@ -20,6 +20,12 @@ from pathlib import Path
 import re
 import threading
 
+import numpy as np
+
+from app.core.checksums import hash_files
+from app.services.snapshot import SnapshotWriter, open_snapshot, snapshot_path
+from app.services.trigram_index import TrigramIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -784,6 +790,107 @@ def load_extended_icd10_codes() -> tuple[list[ICD10Code], dict[str, list[str]]]:
     return codes, synonym_index
 
 
+# ============================================================================
+# Compiled Snapshot
+# ============================================================================
+
+SNAPSHOT_KIND = "icd10"
+
+# Stored in place of a missing omop_concept_id
+_NO_CONCEPT_ID = -1
+
+# Index of a loaded ICD-10 code set: codes, synonym-to-code index, the index's
+# synonyms in order, and the trigram index over those synonyms
+ICD10CodeIndex = tuple[list[ICD10Code], dict[str, list[str]], list[str], TrigramIndex]
+
+
+def icd10_snapshot_source_hash() -> str:
+    """Get a checksum of the fixture and this module (core codes, loading rules)."""
+    return hash_files(FIXTURE_FILE, Path(__file__))
+
+
+def write_icd10_snapshot(path: Path | None = None) -> Path:
+    """Build the ICD-10 code index from the fixture and write it as a snapshot.
+
+    Only fixture codes are stored; the core codes are defined in this module.
+
+    Args:
+        path: Destination file. Defaults to the snapshot directory.
+
+    Returns:
+        The written path.
+    """
+    codes, synonym_index = load_extended_icd10_codes()
+    extended = codes[len(ICD10_CODES):]
+    categories = {category: i for i, category in enumerate(CodeCategory)}
+    positions: dict[str, int] = {}
+    for position, code in enumerate(codes):
+        positions.setdefault(code.code, position)
+    synonyms = list(synonym_index)
+
+    writer = SnapshotWriter(SNAPSHOT_KIND, icd10_snapshot_source_hash())
+    writer.add_strings("codes", [c.code for c in extended])
+    writer.add_strings("descriptions", [c.description for c in extended])
+    writer.add_array(
+        "categories", np.array([categories[c.category] for c in extended], dtype=np.int16)
+    )
+    writer.add_array("is_billable", np.array([c.is_billable for c in extended], dtype=np.bool_))
+    writer.add_array(
+        "omop_concept_ids",
+        np.array(
+            [_NO_CONCEPT_ID if c.omop_concept_id is None else c.omop_concept_id for c in extended],
+            dtype=np.int64,
+        ),
+    )
+    writer.add_string_lists("synonyms", [c.synonyms for c in extended])
+    writer.add_strings("index_terms", synonyms)
+    writer.add_lists("index_codes", [[positions[c] for c in synonym_index[s]] for s in synonyms])
+    writer.add_trigram_index("index_trigrams", TrigramIndex(synonyms))
+    return writer.write(path or snapshot_path(SNAPSHOT_KIND))
+
+
+def load_icd10_code_index() -> ICD10CodeIndex:
+    """Load the ICD-10 code index, from the compiled snapshot when it is current.
+
+    Returns:
+        Tuple of (codes, synonym-to-code index, synonyms, synonym trigram index)
+    """
+    snapshot = open_snapshot(SNAPSHOT_KIND, icd10_snapshot_source_hash())
+    if snapshot is None:
+        codes, synonym_index = load_extended_icd10_codes()
+        synonyms = list(synonym_index)
+        return codes, synonym_index, synonyms, TrigramIndex(synonyms)
+
+    categories = list(CodeCategory)
+    codes = list(ICD10_CODES)
+    for code_str, description, category, is_billable, concept_id, synonyms in zip(
+        snapshot.strings("codes"),
+        snapshot.strings("descriptions"),
+        snapshot.array("categories").tolist(),
+        snapshot.array("is_billable").tolist(),
+        snapshot.array("omop_concept_ids").tolist(),
+        snapshot.string_lists("synonyms"),
+        strict=True,
+    ):
+        codes.append(ICD10Code(
+            code=code_str,
+            description=description,
+            category=categories[category],
+            is_billable=is_billable,
+            omop_concept_id=None if concept_id == _NO_CONCEPT_ID else concept_id,
+            synonyms=synonyms,
+        ))
+
+    code_strs = [c.code for c in codes]
+    synonyms = snapshot.strings("index_terms")
+    synonym_index = {
+        synonym: [code_strs[i] for i in positions]
+        for synonym, positions in zip(synonyms, snapshot.lists("index_codes"), strict=True)
+    }
+    logger.info(f"Loaded {len(codes)} ICD-10 codes from snapshot {snapshot.path}")
+    return codes, synonym_index, synonyms, snapshot.trigram_index("index_trigrams", synonyms)
+
+
 # ============================================================================
 # ICD-10 Suggester Service
 # ============================================================================
@@ -818,8 +925,11 @@ class ICD10SuggesterService:
         self._codes: dict[str, ICD10Code] = {}
         self._synonym_index: dict[str, list[str]] = {}
 
-        # Load extended codes from fixture
-        codes, self._synonym_index = load_extended_icd10_codes()
+        # Load extended codes (compiled snapshot or fixture), with a
+        # substring index over synonyms for partial matching
+        codes, self._synonym_index, self._synonyms, self._synonym_trigrams = (
+            load_icd10_code_index()
+        )
 
         # Index codes by code
         for code in codes:
@@ -856,15 +966,15 @@ class ICD10SuggesterService:
                     seen_codes.add(code_str)
 
         # 2. Partial synonym match (medium confidence)
-        for synonym, code_list in self._synonym_index.items():
-            if query_lower in synonym or synonym in query_lower:
-                for code_str in code_list:
-                    if code_str in self._codes and code_str not in seen_codes:
-                        code = self._codes[code_str]
-                        suggestions.append(self._create_suggestion(
-                            code, CodeConfidence.MEDIUM, f"Partial match: '{synonym}'", query
-                        ))
-                        seen_codes.add(code_str)
+        for synonym_id in self._synonym_trigrams.overlapping(query_lower):
+            synonym = self._synonyms[synonym_id]
+            for code_str in self._synonym_index[synonym]:
+                if code_str in self._codes and code_str not in seen_codes:
+                    code = self._codes[code_str]
+                    suggestions.append(self._create_suggestion(
+                        code, CodeConfidence.MEDIUM, f"Partial match: '{synonym}'", query
+                    ))
+                    seen_codes.add(code_str)
 
         # 3. Description search (lower confidence)
         query_words = set(query_lower.split())
@@ -10,6 +10,8 @@ from enum import Enum
 from threading import Lock
 from typing import Any
 
+from app.services.trigram_index import TrigramIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -590,6 +592,17 @@ for ref_range in LAB_REFERENCE_RANGES:
     for alias in ref_range.aliases:
         _ALIAS_INDEX[alias.lower()] = ref_range
 
+# Substring search index: test name, test code and aliases of every range
+_SEARCH_FIELDS: list[str] = []
+_SEARCH_FIELD_RANGES: list[int] = []
+
+for i, ref_range in enumerate(LAB_REFERENCE_RANGES):
+    for value in (ref_range.test_name.lower(), ref_range.test_code.lower(), *ref_range.aliases):
+        _SEARCH_FIELDS.append(value)
+        _SEARCH_FIELD_RANGES.append(i)
+
+_SEARCH_TRIGRAMS = TrigramIndex(_SEARCH_FIELDS)
+
 
 # ============================================================================
 # Interpretation Causes and Recommendations
@@ -662,6 +675,8 @@ class LabReferenceService:
         self._reference_ranges = LAB_REFERENCE_RANGES
         self._test_index = _TEST_INDEX
         self._alias_index = _ALIAS_INDEX
+        self._search_trigrams = _SEARCH_TRIGRAMS
+        self._search_field_ranges = _SEARCH_FIELD_RANGES
 
     def normalize_test_name(self, test: str) -> str:
         """Normalize test name to lookup key.
@@ -879,24 +894,10 @@ class LabReferenceService:
             List of matching reference ranges.
         """
         query_lower = query.lower()
-        results = []
-
-        for ref in self._reference_ranges:
-            # Check test name and code
-            if query_lower in ref.test_name.lower() or query_lower in ref.test_code.lower():
-                results.append(ref)
-                continue
-
-            # Check aliases
-            for alias in ref.aliases:
-                if query_lower in alias:
-                    results.append(ref)
-                    break
-
-            if len(results) >= limit:
-                break
+        field_ids = self._search_trigrams.containing(query_lower)
+        range_ids = sorted({self._search_field_ranges[i] for i in field_ids})
 
-        return results[:limit]
+        return [self._reference_ranges[i] for i in range_ids[:limit]]
 
     def get_stats(self) -> dict[str, Any]:
         """Get statistics about the reference database.
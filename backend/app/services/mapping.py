@@ -4,6 +4,7 @@ Provides the interface for mapping extracted mentions to OMOP concepts.
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
 
@@ -186,6 +187,27 @@ class BaseMappingService(MappingServiceInterface):
         """
         return []
 
+    def map_mentions_batch(
+        self,
+        texts: Sequence[str],
+        domain: Domain | None = None,
+        limit: int = 5,
+    ) -> list[list[ConceptCandidate]]:
+        """Map many mention texts to OMOP concepts.
+
+        The default implementation calls `map_mention` per text; services
+        override it to resolve all texts with a few set-based lookups.
+
+        Args:
+            texts: The mention texts to map.
+            domain: Optional domain filter applied to every text.
+            limit: Maximum candidates per text.
+
+        Returns:
+            One ranked candidate list per text, in input order.
+        """
+        return [self.map_mention(text, domain, limit) for text in texts]
+
     def get_best_match(
         self,
         text: str,
@@ -0,0 +1,271 @@
+"""Two-tier cache for concept mapping results.
+
+The same surface forms ("hypertension", "metformin", "BNP") are mapped
+over and over across documents. MappingCache keeps recent results in a
+bounded in-process LRU (tier 1) backed by Redis (tier 2), which every API
+and worker process shares.
+
+Entries are keyed by the vocabulary version marker, so a vocabulary change
+makes older entries unreachable: the local tier is cleared and Redis
+entries expire on their TTL.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import asdict
+from typing import Generic, TypeVar
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.schemas.base import Domain
+from app.services.mapping import ConceptCandidate, MappingMethod
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+# (normalized text, domain filter, candidate limit)
+MappingCacheKey = tuple[str, Domain | None, int]
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded, thread-safe least-recently-used cache."""
+
+    def __init__(self, max_size: int) -> None:
+        self._entries: OrderedDict[K, V] = OrderedDict()
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get a cached value, marking it most recently used."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def max_size(self) -> int:
+        """Maximum number of entries."""
+        return self._max_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _encode(candidates: list[ConceptCandidate]) -> str:
+    """Serialize candidates for Redis."""
+    return json.dumps([asdict(candidate) for candidate in candidates])
+
+
+def _decode(payload: str) -> list[ConceptCandidate]:
+    """Deserialize candidates stored by _encode."""
+    return [
+        ConceptCandidate(
+            **{
+                **fields,
+                "domain_id": Domain(fields["domain_id"]),
+                "method": MappingMethod(fields["method"]),
+            }
+        )
+        for fields in json.loads(payload)
+    ]
+
+
+class MappingCache:
+    """In-process LRU in front of Redis for concept mapping results.
+
+    Usage:
+        cache = get_mapping_cache()
+        cached = cache.get_many(version, keys)
+        cache.put_many(version, {key: candidates for key, candidates in computed})
+    """
+
+    KEY_PREFIX = "mapping"
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        redis_factory: Callable[[], Redis] | None = get_redis,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Local LRU capacity. Defaults to settings.mapping_cache_size.
+            redis_factory: Returns the Redis client for the shared tier, or
+                None to cache in-process only.
+            ttl_seconds: Redis entry lifetime. Defaults to
+                settings.mapping_cache_ttl_seconds.
+        """
+        self._local: LRUCache[MappingCacheKey, list[ConceptCandidate]] = LRUCache(
+            settings.mapping_cache_size if max_size is None else max_size
+        )
+        self._redis_factory = redis_factory
+        self._ttl_seconds = (
+            settings.mapping_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self._version: int | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "redis_errors": 0,
+            "invalidations": 0,
+        }
+
+    def _redis_key(self, version: int, key: MappingCacheKey) -> str:
+        text, domain, limit = key
+        return f"{self.KEY_PREFIX}:v{version}:{domain.value if domain else '*'}:{limit}:{text}"
+
+    def _sync_version(self, version: int) -> None:
+        """Drop local entries when the vocabulary version changes."""
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._stats["invalidations"] += 1
+                self._local.clear()
+                self._version = version
+
+    def _count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += n
+
+    def get_many(
+        self,
+        version: int,
+        keys: Iterable[MappingCacheKey],
+    ) -> dict[MappingCacheKey, list[ConceptCandidate]]:
+        """Look up cached results, local tier first, then one Redis MGET.
+
+        Redis hits are copied into the local tier. Redis errors are counted
+        and treated as misses.
+
+        Args:
+            version: Current vocabulary version marker.
+            keys: Lookups to resolve.
+
+        Returns:
+            Cached candidates for the keys that were found.
+        """
+        self._sync_version(version)
+        found: dict[MappingCacheKey, list[ConceptCandidate]] = {}
+        remote: list[MappingCacheKey] = []
+        for key in dict.fromkeys(keys):
+            candidates = self._local.get(key)
+            if candidates is None:
+                remote.append(key)
+            else:
+                found[key] = candidates
+        self._count("local_hits", len(found))
+
+        redis_hits = 0
+        if remote and self._redis_factory is not None:
+            try:
+                payloads = self._redis_factory().mget(
+                    [self._redis_key(version, key) for key in remote]
+                )
+            except RedisError as e:
+                logger.debug(f"Mapping cache Redis read failed: {e}")
+                self._count("redis_errors")
+                payloads = [None] * len(remote)
+            for key, payload in zip(remote, payloads, strict=True):
+                if payload is not None:
+                    found[key] = _decode(payload)
+                    self._local.put(key, found[key])
+                    redis_hits += 1
+        self._count("redis_hits", redis_hits)
+        self._count("misses", len(remote) - redis_hits)
+        return found
+
+    def put_many(
+        self,
+        version: int,
+        entries: dict[MappingCacheKey, list[ConceptCandidate]],
+    ) -> None:
+        """Store freshly computed results in both tiers.
+
+        Args:
+            version: Vocabulary version the results were computed against.
+            entries: Candidates per lookup key.
+        """
+        self._sync_version(version)
+        for key, candidates in entries.items():
+            self._local.put(key, candidates)
+
+        if entries and self._redis_factory is not None:
+            try:
+                pipe = self._redis_factory().pipeline(transaction=False)
+                for key, candidates in entries.items():
+                    pipe.set(
+                        self._redis_key(version, key), _encode(candidates), ex=self._ttl_seconds
+                    )
+                pipe.execute()
+            except RedisError as e:
+                logger.debug(f"Mapping cache Redis write failed: {e}")
+                self._count("redis_errors")
+
+    def clear(self) -> None:
+        """Clear the local tier (Redis entries age out on their TTL)."""
+        self._local.clear()
+
+    def get_stats(self) -> dict[str, int | float | None]:
+        """Get cache hit/miss statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+            version = self._version
+        hits = stats["local_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": hits / lookups if lookups > 0 else 0,
+            "size": len(self._local),
+            "max_size": self._local.max_size,
+            "vocabulary_version": version,
+        }
+
+
+# ============================================================================
+# Singleton
+# ============================================================================
+
+_mapping_cache: MappingCache | None = None
+
+
+def get_mapping_cache() -> MappingCache | None:
+    """Get the process-wide mapping cache, or None when caching is disabled."""
+    global _mapping_cache
+    if not settings.mapping_cache_enabled:
+        return None
+    if _mapping_cache is None:
+        _mapping_cache = MappingCache(
+            redis_factory=get_redis if settings.mapping_cache_redis_enabled else None
+        )
+    return _mapping_cache
+
+
+def reset_mapping_cache() -> None:
+    """Reset the mapping cache singleton (for testing)."""
+    global _mapping_cache
+    _mapping_cache = None
@@ -10,6 +10,10 @@ from sqlalchemy.orm import Session, joinedload
 from app.models.vocabulary import Concept
 from app.schemas.base import Domain
 from app.services.mapping import BaseMappingService, ConceptCandidate, MappingMethod
+from app.services.token_index import TokenSetIndex
+
+# Minimum token Jaccard similarity for fuzzy candidates
+FUZZY_MIN_SIMILARITY = 0.3
 
 
 class DatabaseMappingService(BaseMappingService):
@@ -31,6 +35,10 @@ class DatabaseMappingService(BaseMappingService):
         self._concepts: list[Concept] = []
         self._synonym_index: dict[str, list[tuple[Concept, str]]] = {}
         self._concept_id_index: dict[int, Concept] = {}
+        # Synonym keys by position, grouped by normalized form, and their token sets
+        self._synonym_keys: list[str] = []
+        self._keys_by_normalized: dict[str, list[str]] = {}
+        self._token_index = TokenSetIndex([], FUZZY_MIN_SIMILARITY)
         self._loaded = False
 
     def load_from_db(self, session: Session | None = None) -> None:
@@ -63,6 +71,15 @@ class DatabaseMappingService(BaseMappingService):
                     self._synonym_index[syn_key] = []
                 self._synonym_index[syn_key].append((concept, synonym.concept_synonym_name))
 
+        self._synonym_keys = list(self._synonym_index)
+        self._keys_by_normalized = {}
+        token_sets = []
+        for key in self._synonym_keys:
+            normalized_key = self.normalize_text(key)
+            self._keys_by_normalized.setdefault(normalized_key, []).append(key)
+            token_sets.append(normalized_key.split())
+        self._token_index = TokenSetIndex(token_sets, FUZZY_MIN_SIMILARITY)
+
         self._loaded = True
 
     def is_loaded(self) -> bool:
@@ -154,29 +171,24 @@ class DatabaseMappingService(BaseMappingService):
                         return candidates
 
         # Check other normalized forms
-        for synonym_key, entries in self._synonym_index.items():
-            if self.normalize_text(synonym_key) == normalized_text:
-                if synonym_key != normalized_text:
-                    for concept, _variant in entries:
-                        if add_candidate(concept, 0.95, MappingMethod.EXACT):
-                            if len(candidates) >= limit:
-                                return candidates
+        for synonym_key in self._keys_by_normalized.get(normalized_text, []):
+            if synonym_key != normalized_text:
+                for concept, _variant in self._synonym_index[synonym_key]:
+                    if add_candidate(concept, 0.95, MappingMethod.EXACT):
+                        if len(candidates) >= limit:
+                            return candidates
 
         # Fuzzy matching if not enough exact matches found
         if len(candidates) < limit:
             fuzzy_candidates: list[tuple[Concept, float]] = []
-            min_threshold = 0.3
-
-            for synonym_key, entries in self._synonym_index.items():
-                similarity = self.calculate_similarity(text, synonym_key)
-                if similarity >= min_threshold:
-                    for concept, _variant in entries:
-                        if concept.concept_id not in seen_ids:
-                            if (
-                                domain is None
-                                or self._domain_from_string(concept.domain_id) == domain
-                            ):
-                                fuzzy_candidates.append((concept, similarity))
+
+            # Same token Jaccard as calculate_similarity, scored only for
+            # the synonyms the token index cannot rule out
+            for key_id, similarity in self._token_index.similar(normalized_text.split()):
+                for concept, _variant in self._synonym_index[self._synonym_keys[key_id]]:
+                    if concept.concept_id not in seen_ids:
+                        if domain is None or self._domain_from_string(concept.domain_id) == domain:
+                            fuzzy_candidates.append((concept, similarity))
 
             # Sort by score descending and add top candidates
             fuzzy_candidates.sort(key=lambda x: x[1], reverse=True)
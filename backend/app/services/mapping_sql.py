@@ -8,19 +8,114 @@ Key features:
 1. Exact match using indexed synonym lookup
 2. Fuzzy matching using PostgreSQL trigram similarity (pg_trgm)
 3. No memory overhead - all lookups via SQL
+
+The lookups rely on the lower() btree and GIN trigram expression indexes
+from migration 016; check_mapping_indexes() warns when they are missing.
 """
 
 import logging
-
-from sqlalchemy import select, func, text, union_all
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import (
+    Row,
+    Select,
+    String,
+    Subquery,
+    func,
+    literal,
+    select,
+    text,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.vocabulary import Concept, ConceptSynonym
 from app.schemas.base import Domain
 from app.services.mapping import BaseMappingService, ConceptCandidate, MappingMethod
+from app.services.mapping_cache import MappingCache
+from app.services.vocabulary_db import get_vocabulary_version
 
 logger = logging.getLogger(__name__)
 
+# Columns needed to build a ConceptCandidate
+_CANDIDATE_COLUMNS = (
+    Concept.concept_id,
+    Concept.concept_name,
+    Concept.vocabulary_id,
+    Concept.domain_id,
+)
+
+# Lowercased concept name, the expression the name indexes are built on
+_NAME_KEY = func.lower(Concept.concept_name)
+
+# Index each batch lookup step probes; check_mapping_indexes EXPLAINs the steps
+MAPPING_STEP_INDEXES: dict[str, str] = {
+    "exact_name": "ix_concepts_concept_name_lower",
+    "exact_synonym": "ix_concept_synonyms_name_lower",
+    "prefix": "ix_concepts_concept_name_lower",
+    "trigram": "ix_concepts_concept_name_trgm",
+}
+
+# Sorts after any character that can follow a prefix, closing prefix ranges
+_PREFIX_END = "\U0010ffff"
+
+# Terms the index check plans the lookups for (two, as in a real batch)
+_CHECK_TERMS = ["index check", "index probe"]
+
+
+def check_mapping_indexes(session: Session) -> list[str]:
+    """Check that the SQL mapping lookups are index probes, not table scans.
+
+    EXPLAINs the statement each batch lookup step runs (see
+    MAPPING_STEP_INDEXES) for a two-term batch, with sequential scans
+    disabled, so a plan that still scans a table means the step's index
+    is missing or unusable. Logs a warning listing those indexes. Only
+    PostgreSQL is checked.
+
+    Args:
+        session: SQLAlchemy session for the vocabulary database.
+
+    Returns:
+        Names of the indexes whose lookups fall back to a sequential scan.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return []
+
+    service = SQLMappingService(session)
+    missing: list[str] = []
+    try:
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        for step, stmt in service._step_statements(_CHECK_TERMS, None, 5).items():
+            index_name = MAPPING_STEP_INDEXES[step]
+            # Named paramstyle: text() escapes the % operator for the driver itself
+            sql = stmt.compile(
+                dialect=postgresql.dialect(paramstyle="named"),
+                compile_kwargs={"literal_binds": True},
+            )
+            try:
+                with session.begin_nested():
+                    plan = "\n".join(session.execute(text(f"EXPLAIN {sql}")).scalars())
+            except DBAPIError:
+                # The trigram step fails outright without the pg_trgm extension
+                plan = "Seq Scan"
+            if "Seq Scan" in plan and index_name not in missing:
+                missing.append(index_name)
+    finally:
+        session.rollback()
+
+    if missing:
+        logger.warning(
+            "Concept mapping indexes missing (run alembic upgrade): %s. "
+            "Mapping lookups will scan the concept tables.",
+            ", ".join(missing),
+        )
+    return missing
+
 
 class SQLMappingService(BaseMappingService):
     """SQL-based mapping service for OMOP concepts.
@@ -33,14 +128,28 @@ class SQLMappingService(BaseMappingService):
         candidates = service.map_mention("hypertension")
     """
 
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        similarity_threshold: float | None = None,
+        cache: MappingCache | None = None,
+    ) -> None:
         """Initialize the SQL mapping service.
 
         Args:
             session: SQLAlchemy session for database queries.
+            similarity_threshold: Minimum pg_trgm similarity for fuzzy
+                candidates. Defaults to settings.mapping_similarity_threshold.
+            cache: Optional result cache, keyed on the vocabulary version.
         """
         super().__init__()
         self._session = session
+        self._cache = cache
+        self._similarity_threshold = (
+            settings.mapping_similarity_threshold
+            if similarity_threshold is None
+            else similarity_threshold
+        )
 
     def is_loaded(self) -> bool:
         """SQL service doesn't need loading - always ready."""
@@ -66,12 +175,12 @@ class SQLMappingService(BaseMappingService):
 
     def _concept_to_candidate(
         self,
-        concept: Concept,
+        concept: Concept | Row[Any],
         score: float,
         method: MappingMethod,
         rank: int = 1,
     ) -> ConceptCandidate:
-        """Convert a database Concept to ConceptCandidate."""
+        """Convert a database Concept (or a row of its columns) to ConceptCandidate."""
         return ConceptCandidate(
             omop_concept_id=concept.concept_id,
             concept_name=concept.concept_name,
@@ -99,98 +208,269 @@ class SQLMappingService(BaseMappingService):
         Returns:
             List of ConceptCandidate objects ranked by match quality.
         """
-        normalized_text = self.normalize_text(text)
-        candidates: list[ConceptCandidate] = []
-        seen_ids: set[int] = set()
+        return self.map_mentions_batch([text], domain=domain, limit=limit)[0]
 
-        # Step 1: Exact match on concept_name
-        exact_stmt = select(Concept).where(
-            func.lower(Concept.concept_name) == normalized_text
-        )
-        if domain:
-            exact_stmt = exact_stmt.where(Concept.domain_id == domain.name.title())
-        exact_stmt = exact_stmt.limit(limit)
-
-        exact_results = self._session.execute(exact_stmt)
-        for concept in exact_results.scalars():
-            if concept.concept_id not in seen_ids:
-                candidate = self._concept_to_candidate(
-                    concept, 1.0, MappingMethod.EXACT, len(candidates) + 1
+    def map_mentions_batch(
+        self,
+        texts: Sequence[str],
+        domain: Domain | None = None,
+        limit: int = 5,
+    ) -> list[list[ConceptCandidate]]:
+        """Map many mention texts to candidate OMOP concepts in a few queries.
+
+        Runs the same four matching steps as a single lookup (exact name,
+        exact synonym, name prefix, trigram similarity), but each step is one
+        query for all distinct normalized texts that still need candidates.
+        Each text's matches are looked up with their own LIMIT (a LATERAL
+        subquery on PostgreSQL), so a document costs a fixed number of
+        round trips however many mentions it has. With a cache, only texts
+        missing from it are queried.
+
+        Args:
+            texts: The mention texts to map.
+            domain: Optional domain filter applied to every text.
+            limit: Maximum candidates per text.
+
+        Returns:
+            One list of ConceptCandidate objects per text, in input order.
+        """
+        normalized = [self.normalize_text(text) for text in texts]
+        terms = list(dict.fromkeys(term for term in normalized if term))
+
+        # Cached results are only valid for the vocabulary version they came from
+        version = None
+        if self._cache is not None and terms:
+            version = get_vocabulary_version(self._session)
+        if self._cache is None or version is None:
+            found = self._map_terms(terms, domain, limit)
+        else:
+            keys = {term: (term, domain, limit) for term in terms}
+            cached = self._cache.get_many(version, keys.values())
+            found = {term: cached[key] for term, key in keys.items() if key in cached}
+            computed = self._map_terms([t for t in terms if t not in found], domain, limit)
+            self._cache.put_many(version, {keys[t]: c for t, c in computed.items()})
+            found.update(computed)
+
+        return [list(found.get(term, [])) for term in normalized]
+
+    def _map_terms(
+        self,
+        terms: list[str],
+        domain: Domain | None,
+        limit: int,
+    ) -> dict[str, list[ConceptCandidate]]:
+        """Run the matching steps for distinct normalized terms."""
+        found: dict[str, list[ConceptCandidate]] = {term: [] for term in terms}
+        seen: dict[str, set[int]] = {term: set() for term in found}
+
+        def add(term: str, row: Row[Any], score: float, method: MappingMethod) -> None:
+            candidates = found[term]
+            if len(candidates) < limit and row.concept_id not in seen[term]:
+                candidates.append(
+                    self._concept_to_candidate(row, score, method, len(candidates) + 1)
                 )
-                candidates.append(candidate)
-                seen_ids.add(concept.concept_id)
+                seen[term].add(row.concept_id)
+
+        def pending(terms: Iterable[str]) -> list[str]:
+            return [term for term in terms if len(found[term]) < limit]
+
+        # Step 1: Exact match on concept_name
+        if terms:
+            for row in self._session.execute(self._exact_name_matches(terms, domain, limit)):
+                add(row.match_key, row, 1.0, MappingMethod.EXACT)
 
         # Step 2: Exact match on synonyms
-        if len(candidates) < limit:
-            syn_stmt = (
-                select(Concept)
-                .join(ConceptSynonym, Concept.concept_id == ConceptSynonym.concept_id)
-                .where(func.lower(ConceptSynonym.concept_synonym_name) == normalized_text)
-            )
-            if domain:
-                syn_stmt = syn_stmt.where(Concept.domain_id == domain.name.title())
-            syn_stmt = syn_stmt.limit(limit - len(candidates))
-
-            syn_results = self._session.execute(syn_stmt)
-            for concept in syn_results.scalars():
-                if concept.concept_id not in seen_ids:
-                    candidate = self._concept_to_candidate(
-                        concept, 0.95, MappingMethod.EXACT, len(candidates) + 1
-                    )
-                    candidates.append(candidate)
-                    seen_ids.add(concept.concept_id)
-
-        # Step 3: Prefix/contains match for partial matches
-        if len(candidates) < limit and len(normalized_text) >= 3:
-            like_pattern = f"{normalized_text}%"
-            like_stmt = select(Concept).where(
-                func.lower(Concept.concept_name).like(like_pattern)
+        terms = pending(terms)
+        if terms:
+            for row in self._session.execute(self._exact_synonym_matches(terms, domain, limit)):
+                add(row.match_key, row, 0.95, MappingMethod.EXACT)
+
+        # Step 3: Prefix match for partial matches
+        prefix_terms = [term for term in pending(terms) if len(term) >= 3]
+        if prefix_terms:
+            for row in self._session.execute(self._prefix_matches(prefix_terms, domain, limit)):
+                # Score based on how much of the name matched
+                score = min(0.9, len(row.match_key) / len(row.concept_name) + 0.3)
+                add(row.match_key, row, score, MappingMethod.FUZZY)
+
+        # Step 4: Fuzzy matching, ranked by trigram similarity
+        fuzzy_terms = [term for term in pending(found) if len(term) >= 3]
+        if fuzzy_terms:
+            if self._is_postgresql():
+                self._add_trigram_matches(fuzzy_terms, domain, limit, add)
+            else:
+                self._add_word_matches(fuzzy_terms, domain, limit, add)
+
+        return found
+
+    def _step_statements(
+        self,
+        terms: list[str],
+        domain: Domain | None,
+        limit: int,
+    ) -> dict[str, Select[Any]]:
+        """Build the statement of every PostgreSQL lookup step, by step name."""
+        return {
+            "exact_name": self._exact_name_matches(terms, domain, limit),
+            "exact_synonym": self._exact_synonym_matches(terms, domain, limit),
+            "prefix": self._prefix_matches(terms, domain, limit),
+            "trigram": self._trigram_matches(terms, domain, limit),
+        }
+
+    def _exact_name_matches(
+        self, terms: list[str], domain: Domain | None, limit: int
+    ) -> Select[Any]:
+        """Concepts whose lowercased name equals a term."""
+        term_table = self._term_table(terms)
+        stmt = select(*_CANDIDATE_COLUMNS).where(_NAME_KEY == term_table.c.term)
+        return self._ranked_matches(stmt, term_table, domain, limit)
+
+    def _exact_synonym_matches(
+        self, terms: list[str], domain: Domain | None, limit: int
+    ) -> Select[Any]:
+        """Concepts with a synonym that, lowercased, equals a term."""
+        term_table = self._term_table(terms)
+        stmt = (
+            select(*_CANDIDATE_COLUMNS)
+            .join(ConceptSynonym, Concept.concept_id == ConceptSynonym.concept_id)
+            .where(func.lower(ConceptSynonym.concept_synonym_name) == term_table.c.term)
+        )
+        return self._ranked_matches(stmt, term_table, domain, limit)
+
+    def _prefix_matches(self, terms: list[str], domain: Domain | None, limit: int) -> Select[Any]:
+        """Concepts whose lowercased name starts with a term.
+
+        Written as a range on the name rather than LIKE term || '%': a
+        btree index only serves LIKE for a constant pattern, not one taken
+        from the joined term, but serves the range for each term. On
+        PostgreSQL the range uses the text_pattern_ops operators of the
+        migration 016 index.
+        """
+        term_table = self._term_table(terms)
+        term = term_table.c.term
+        upper = term + _PREFIX_END
+        if self._is_postgresql():
+            starts_with = _NAME_KEY.op("~>=~")(term) & _NAME_KEY.op("~<~")(upper)
+        else:
+            starts_with = (_NAME_KEY >= term) & (_NAME_KEY < upper)
+        stmt = select(*_CANDIDATE_COLUMNS).where(starts_with)
+        return self._ranked_matches(stmt, term_table, domain, limit)
+
+    def _trigram_matches(self, terms: list[str], domain: Domain | None, limit: int) -> Select[Any]:
+        """Concepts whose lowercased name is trigram-similar to a term, most similar first."""
+        term_table = self._term_table(terms)
+        similarity = func.similarity(_NAME_KEY, term_table.c.term)
+        stmt = select(*_CANDIDATE_COLUMNS, similarity.label("similarity")).where(
+            _NAME_KEY.op("%")(term_table.c.term)
+        )
+        ranking = (similarity.desc(), Concept.concept_id)
+        return self._ranked_matches(stmt, term_table, domain, limit, ranking)
+
+    def _add_trigram_matches(
+        self,
+        terms: list[str],
+        domain: Domain | None,
+        limit: int,
+        add: Callable[[str, Row[Any], float, MappingMethod], None],
+    ) -> None:
+        """Add names similar to each term, probing the GIN trigram index.
+
+        The `%` operator is what the index serves; its cut-off is set to the
+        configured threshold for the current transaction.
+        """
+        self._session.execute(
+            select(
+                func.set_config(
+                    "pg_trgm.similarity_threshold", str(self._similarity_threshold), True
+                )
             )
-            if domain:
-                like_stmt = like_stmt.where(Concept.domain_id == domain.name.title())
-            like_stmt = like_stmt.limit(limit - len(candidates))
-
-            like_results = self._session.execute(like_stmt)
-            for concept in like_results.scalars():
-                if concept.concept_id not in seen_ids:
-                    # Score based on how much of the name matched
-                    name_len = len(concept.concept_name)
-                    score = min(0.9, len(normalized_text) / name_len + 0.3)
-                    candidate = self._concept_to_candidate(
-                        concept, score, MappingMethod.FUZZY, len(candidates) + 1
-                    )
-                    candidates.append(candidate)
-                    seen_ids.add(concept.concept_id)
-
-        # Step 4: Word-based matching for multi-word terms
-        if len(candidates) < limit and " " in normalized_text:
-            words = normalized_text.split()
+        )
+        for row in self._session.execute(self._trigram_matches(terms, domain, limit)):
+            add(row.match_key, row, min(0.9, row.similarity), MappingMethod.FUZZY)
+
+    def _add_word_matches(
+        self,
+        terms: list[str],
+        domain: Domain | None,
+        limit: int,
+        add: Callable[[str, Row[Any], float, MappingMethod], None],
+    ) -> None:
+        """Add names containing the longest word of each multi-word term.
+
+        Token-overlap fallback for databases without pg_trgm.
+        """
+        # Longest word is likely the most specific
+        terms_by_word: dict[str, list[str]] = {}
+        for term in terms:
+            words = term.split()
             if len(words) >= 2:
-                # Try matching with main keywords
-                main_word = max(words, key=len)  # Longest word is likely most specific
+                main_word = max(words, key=len)
                 if len(main_word) >= 4:
-                    word_stmt = select(Concept).where(
-                        func.lower(Concept.concept_name).contains(main_word)
-                    )
-                    if domain:
-                        word_stmt = word_stmt.where(Concept.domain_id == domain.name.title())
-                    word_stmt = word_stmt.limit(limit - len(candidates))
-
-                    word_results = self._session.execute(word_stmt)
-                    for concept in word_results.scalars():
-                        if concept.concept_id not in seen_ids:
-                            # Calculate similarity score
-                            similarity = self.calculate_similarity(
-                                text, concept.concept_name
-                            )
-                            if similarity >= 0.3:
-                                candidate = self._concept_to_candidate(
-                                    concept, similarity, MappingMethod.FUZZY, len(candidates) + 1
-                                )
-                                candidates.append(candidate)
-                                seen_ids.add(concept.concept_id)
-
-        return candidates
+                    terms_by_word.setdefault(main_word, []).append(term)
+        if not terms_by_word:
+            return
+
+        term_table = self._term_table(list(terms_by_word))
+        stmt = select(*_CANDIDATE_COLUMNS).where(_NAME_KEY.contains(term_table.c.term))
+        for row in self._session.execute(self._ranked_matches(stmt, term_table, domain, limit)):
+            for term in terms_by_word[row.match_key]:
+                similarity = self.calculate_similarity(term, row.concept_name)
+                if similarity >= self._similarity_threshold:
+                    add(term, row, similarity, MappingMethod.FUZZY)
+
+    def _term_table(self, terms: list[str]) -> Subquery:
+        """Build an inline one-column table of terms to join concepts against."""
+        rows = [select(literal(term, String).label("term")) for term in terms]
+        return union_all(*rows).subquery("terms")
+
+    def _ranked_matches(
+        self,
+        stmt: Select[Any],
+        term_table: Subquery,
+        domain: Domain | None,
+        limit: int,
+        ranking: Sequence[Any] = (Concept.concept_id,),
+    ) -> Select[Any]:
+        """Build a batch lookup keeping the first `limit` matches per term.
+
+        `stmt` selects the concepts matching one term of `term_table`. On
+        PostgreSQL it becomes a LATERAL subquery ordered by `ranking`
+        (concept ID by default) and limited per term, so each term stops
+        after its first `limit` matches. Elsewhere (no LATERAL) a window
+        function ranks all matches of a term and the rest are filtered out.
+
+        Rows carry the matched term as `match_key` and come back grouped by
+        it in `ranking` order.
+        """
+        if domain:
+            stmt = stmt.where(Concept.domain_id == domain.name.title())
+        term = term_table.c.term
+        if self._is_postgresql():
+            match_rank = func.row_number().over(order_by=list(ranking))
+            matches = (
+                stmt.add_columns(match_rank.label("match_rank"))
+                .order_by(*ranking)
+                .limit(limit)
+                .lateral("matches")
+            )
+            return (
+                select(term.label("match_key"), matches)
+                .select_from(term_table.join(matches, true()))
+                .order_by(term, matches.c.match_rank)
+            )
+        match_rank = func.row_number().over(partition_by=term, order_by=list(ranking))
+        ranked = stmt.add_columns(
+            term.label("match_key"), match_rank.label("match_rank")
+        ).subquery()
+        return (
+            select(ranked)
+            .where(ranked.c.match_rank <= limit)
+            .order_by(ranked.c.match_key, ranked.c.match_rank)
+        )
+
+    def _is_postgresql(self) -> bool:
+        """Whether the session is bound to PostgreSQL (LATERAL, pg_trgm)."""
+        return self._session.get_bind().dialect.name == "postgresql"
 
     def get_concept_by_id(self, concept_id: int) -> ConceptCandidate | None:
         """Look up a concept by its OMOP concept ID."""
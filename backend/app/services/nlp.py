@@ -4,10 +4,15 @@ Provides the interface for extracting mentions from clinical documents.
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from uuid import UUID
 
 from app.schemas.base import Assertion, Experiencer, Temporality
+from app.services.section_parser import SectionIndex, SectionSpan, get_section_parser
+
+# A document to extract from: (text, document_id, note_type)
+NLPDocument = tuple[str, UUID, str | None]
 
 
 @dataclass
@@ -47,6 +52,47 @@ class ExtractedMention:
         """Check if this mention is about family history."""
         return self.experiencer == Experiencer.FAMILY
 
+    def to_tuple(self) -> tuple:
+        """Pack into a compact tuple of primitives for cross-process transfer.
+
+        Enum members are stored by value, which pickles far smaller than
+        the dataclass instance. Inverse of from_tuple().
+        """
+        return (
+            self.text,
+            self.start_offset,
+            self.end_offset,
+            self.lexical_variant,
+            self.section,
+            self.assertion.value,
+            self.temporality.value,
+            self.experiencer.value,
+            self.confidence,
+            self.domain_hint,
+            self.omop_concept_id,
+        )
+
+    @classmethod
+    def from_tuple(cls, packed: tuple) -> "ExtractedMention":
+        """Rebuild a mention packed by to_tuple()."""
+        (
+            text, start_offset, end_offset, lexical_variant, section,
+            assertion, temporality, experiencer, confidence, domain_hint, omop_concept_id,
+        ) = packed
+        return cls(
+            text=text,
+            start_offset=start_offset,
+            end_offset=end_offset,
+            lexical_variant=lexical_variant,
+            section=section,
+            assertion=Assertion(assertion),
+            temporality=Temporality(temporality),
+            experiencer=Experiencer(experiencer),
+            confidence=confidence,
+            domain_hint=domain_hint,
+            omop_concept_id=omop_concept_id,
+        )
+
 
 class NLPServiceInterface(ABC):
     """Interface for NLP extraction services.
@@ -97,6 +143,27 @@ class BaseNLPService(NLPServiceInterface):
     Provides shared utilities for NLP implementations.
     """
 
+    def extract_mentions_batch(
+        self,
+        documents: Iterable[NLPDocument],
+    ) -> Iterator[list[ExtractedMention]]:
+        """Extract clinical mentions from many documents.
+
+        Results are streamed back one list per document, in input order, so
+        callers can persist each document as soon as it is ready. The default
+        implementation calls `extract_mentions` per document; services
+        override it to share work (automaton passes, context scans, model
+        batches) across documents.
+
+        Args:
+            documents: (text, document_id, note_type) tuples.
+
+        Yields:
+            List of ExtractedMention objects for each document.
+        """
+        for text, document_id, note_type in documents:
+            yield self.extract_mentions(text, document_id, note_type)
+
     def normalize_text(self, text: str) -> str:
         """Normalize clinical text for processing.
 
@@ -116,6 +183,21 @@ class BaseNLPService(NLPServiceInterface):
         normalized = re.sub(r"\s+", " ", text)
         return normalized.strip()
 
+    def get_section_index(self, text: str) -> SectionIndex[SectionSpan]:
+        """Parse the clinical sections of a document for offset lookups.
+
+        Uses the shared SectionParser, so every extractor agrees on section
+        boundaries. Build the index once per document and query it per
+        mention.
+
+        Args:
+            text: The full document text.
+
+        Returns:
+            SectionIndex over the document's section headers.
+        """
+        return get_section_parser().index(text)
+
     def get_section_name(self, text: str, offset: int) -> str | None:
         """Try to identify the clinical section for a given offset.
 
@@ -126,51 +208,11 @@ class BaseNLPService(NLPServiceInterface):
             offset: Character offset to find section for.
 
         Returns:
-            Section name if identified, None otherwise.
+            Section header as written in the note (e.g. "HPI"), or None if
+            the offset precedes every section header.
         """
-        # Common clinical note section headers
-        section_patterns = [
-            "Chief Complaint",
-            "CC",
-            "History of Present Illness",
-            "HPI",
-            "Past Medical History",
-            "PMH",
-            "Social History",
-            "Family History",
-            "Review of Systems",
-            "ROS",
-            "Physical Exam",
-            "PE",
-            "Assessment",
-            "Plan",
-            "Medications",
-            "Allergies",
-            "Vital Signs",
-            "Labs",
-            "Imaging",
-            "Hospital Course",
-            "Discharge Diagnosis",
-            "Admission Diagnosis",
-            "Discharge Medications",
-            "Follow-up",
-        ]
-
-        text_before = text[:offset].lower()
-
-        # Find the most recent section header
-        current_section = None
-        current_pos = -1
-
-        for pattern in section_patterns:
-            # Look for pattern followed by : or newline
-            search_pattern = pattern.lower()
-            pos = text_before.rfind(search_pattern)
-            if pos > current_pos:
-                current_pos = pos
-                current_section = pattern
-
-        return current_section
+        span = self.get_section_index(text).span_at(offset)
+        return span.title if span is not None else None
 
     def extract_mentions(
         self,
@@ -0,0 +1,235 @@
+"""On-disk cache for the rule-based NLP Aho-Corasick automaton.
+
+Building the automaton requires loading the full NLP vocabulary (JSON
+fixtures or ~100K database concepts) and inserting every synonym into a
+trie. Both steps are repeated in every RQ worker and every uvicorn worker
+process. This module persists the finished automaton to disk, keyed by a
+fingerprint of the vocabulary sources, so a process can load the trie
+directly and skip the vocabulary load entirely.
+
+The fingerprint is provided by the vocabulary service itself via a
+``cache_fingerprint()`` method, which must be cheap (file hashes or a
+version-marker lookup) and must change whenever the synonyms would change. Cache
+files are written atomically so concurrently starting workers never see a
+partially written automaton.
+
+Automaton values are stored as JSON rather than pickle, and cache files
+live in a private (0700) per-user directory; files or directories owned by
+another user, or writable by group/others, are never loaded.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    ahocorasick = None  # type: ignore
+    HAS_AHOCORASICK = False
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from ahocorasick import Automaton
+
+logger = logging.getLogger(__name__)
+
+# Bump when the automaton payload layout changes (value tuple shape, etc.)
+CACHE_FORMAT_VERSION = 2
+
+CACHE_FILE_PREFIX = "rule_based_automaton"
+
+# Number of cache files kept per directory after a save (newest first)
+DEFAULT_MAX_ENTRIES = 4
+
+
+def _serialize_value(value: Any) -> bytes:
+    """Serialize an automaton value (synonym, domain_id, concept_id) as JSON."""
+    return json.dumps(value).encode()
+
+
+def _deserialize_value(data: bytes) -> tuple:
+    """Deserialize an automaton value written by _serialize_value."""
+    return tuple(json.loads(data))
+
+
+def _default_cache_dir() -> Path:
+    """Get the default per-user cache directory."""
+    if settings.nlp_cache_dir:
+        return Path(settings.nlp_cache_dir)
+    return Path.home() / ".cache" / "clinical-ontology-normalizer"
+
+
+def _is_private(path: Path) -> bool:
+    """Check that a path is owned by the current user and not group/world-writable."""
+    if not hasattr(os, "getuid"):
+        return True
+    st = path.stat()
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class AutomatonCache:
+    """Persist and restore Aho-Corasick automatons keyed by vocabulary fingerprint.
+
+    Usage:
+        cache = AutomatonCache()
+        automaton = cache.load(fingerprint)
+        if automaton is None:
+            automaton = build()
+            cache.save(fingerprint, automaton)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """Initialize the automaton cache.
+
+        Args:
+            cache_dir: Directory for cache files. Defaults to
+                       settings.nlp_cache_dir, or ~/.cache/clinical-ontology-normalizer
+                       when unset.
+            max_entries: Number of cache files to keep after a save; older
+                        files (stale vocabulary versions) are pruned.
+        """
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else _default_cache_dir()
+        self._max_entries = max(1, max_entries)
+
+    @property
+    def cache_dir(self) -> Path:
+        """Get the cache directory."""
+        return self._cache_dir
+
+    def path_for(self, fingerprint: str) -> Path:
+        """Get the cache file path for a vocabulary fingerprint.
+
+        The format version is folded into the key so incompatible files
+        from older releases are never loaded.
+        """
+        key = hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}:{fingerprint}".encode()
+        ).hexdigest()[:32]
+        return self._cache_dir / f"{CACHE_FILE_PREFIX}-{key}.bin"
+
+    def load(self, fingerprint: str) -> "Automaton | None":
+        """Load a cached automaton.
+
+        Args:
+            fingerprint: Vocabulary fingerprint the automaton was built from.
+
+        Returns:
+            The automaton, or None on a cache miss or unreadable file.
+        """
+        if not HAS_AHOCORASICK:
+            return None
+
+        path = self.path_for(fingerprint)
+        if not path.exists():
+            return None
+
+        try:
+            trusted = _is_private(self._cache_dir) and _is_private(path)
+        except OSError:
+            trusted = False
+        if not trusted:
+            logger.warning(f"Ignoring automaton cache {path}: not private to the current user")
+            return None
+
+        start_time = time.perf_counter()
+        try:
+            automaton = ahocorasick.load(str(path), _deserialize_value)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable automaton cache {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Loaded cached automaton ({len(automaton)} patterns) in {elapsed_ms:.2f}ms")
+        return automaton
+
+    def save(self, fingerprint: str, automaton: Any) -> Path | None:
+        """Write an automaton to the cache atomically.
+
+        Failures are logged and swallowed; caching is an optimization and
+        must never break extraction.
+
+        Args:
+            fingerprint: Vocabulary fingerprint the automaton was built from.
+            automaton: A finalized ahocorasick.Automaton.
+
+        Returns:
+            Path of the written cache file, or None if it could not be written.
+        """
+        path = self.path_for(fingerprint)
+        tmp_path: str | None = None
+        try:
+            self._cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not _is_private(self._cache_dir):
+                logger.warning(
+                    f"Not writing automaton cache: {self._cache_dir} is not private "
+                    "to the current user"
+                )
+                return None
+            fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir, prefix=".tmp-", suffix=".bin")
+            os.close(fd)
+            automaton.save(tmp_path, _serialize_value)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except Exception as e:
+            logger.warning(f"Could not write automaton cache {path}: {e}")
+            return None
+        finally:
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+        logger.info(f"Wrote automaton cache {path}")
+        self._prune(keep=path)
+        return path
+
+    def _prune(self, keep: Path) -> int:
+        """Remove old cache files beyond max_entries, never removing `keep`.
+
+        Args:
+            keep: The file just written.
+
+        Returns:
+            Number of files removed.
+        """
+        try:
+            others = sorted(
+                (p for p in self._cache_dir.glob(f"{CACHE_FILE_PREFIX}-*.bin") if p != keep),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True,
+            )
+        except OSError as e:
+            logger.warning(f"Could not prune automaton cache {self._cache_dir}: {e}")
+            return 0
+
+        removed = 0
+        for path in others[self._max_entries - 1:]:
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Remove all cached automatons.
+
+        Returns:
+            Number of files removed.
+        """
+        if not self._cache_dir.exists():
+            return 0
+        removed = 0
+        for path in self._cache_dir.glob(f"{CACHE_FILE_PREFIX}-*.bin"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
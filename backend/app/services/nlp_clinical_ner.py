@@ -10,12 +10,13 @@ in an ensemble for better coverage and accuracy.
 
 import logging
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID
 
 from app.schemas.base import Assertion, Domain, Experiencer, Temporality
-from app.services.nlp import BaseNLPService, ExtractedMention
+from app.services.nlp import BaseNLPService, ExtractedMention, NLPDocument
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,9 @@ ENTITY_TO_DOMAIN: dict[str, str] = {
     "PRODUCT": Domain.DEVICE.value,  # Products might be medical devices
 }
 
+# Documents whose text is sent to the models together in batch extraction
+DEFAULT_DOCUMENTS_PER_BATCH = 32
+
 # Confidence levels for different sources
 CONFIDENCE_BY_SOURCE = {
     "transformer_ner": 0.85,  # High confidence for transformer models
@@ -305,34 +309,64 @@ class ClinicalNERService(BaseNLPService):
 
     def _extract_with_transformer(self, text: str) -> list[dict]:
         """Extract entities using transformer pipeline."""
+        return self._extract_with_transformer_batch([text])[0]
+
+    def _extract_with_transformer_batch(self, texts: list[str]) -> list[list[dict]]:
+        """Extract entities from several texts with one batched pipeline call.
+
+        Long texts are split into chunks, and the chunks of every text are
+        fed to the pipeline together so the model runs full batches across
+        documents.
+
+        Args:
+            texts: Texts to process.
+
+        Returns:
+            Entities for each text, with offsets relative to that text.
+        """
         if not self._transformer_available or self._transformer_pipeline is None:
-            return []
+            return [[] for _ in texts]
 
-        try:
+        # (text index, chunk offset, chunk) for every chunk of every text
+        chunks: list[tuple[int, int, str]] = []
+        for index, text in enumerate(texts):
             # Handle long texts by chunking
             if len(text) > self.config.max_sequence_length * 4:
-                chunks = self._chunk_text(text)
-                all_entities = []
-                offset = 0
-                for chunk in chunks:
-                    entities = self._transformer_pipeline(chunk)
-                    # Adjust offsets for chunk position
-                    for ent in entities:
-                        ent["start"] += offset
-                        ent["end"] += offset
-                    all_entities.extend(entities)
-                    offset += len(chunk)
-                return all_entities
-            else:
-                return self._transformer_pipeline(text)
+                chunks.extend((index, offset, chunk) for offset, chunk in self._chunk_spans(text))
+            elif text:
+                chunks.append((index, 0, text))
+
+        results: list[list[dict]] = [[] for _ in texts]
+        if not chunks:
+            return results
+
+        try:
+            outputs = self._transformer_pipeline(
+                [chunk for _, _, chunk in chunks],
+                batch_size=self.config.batch_size,
+            )
         except Exception as e:
             logger.warning(f"Transformer extraction failed: {e}")
-            return []
+            return results
+
+        seen: set[tuple[int, int, int]] = set()
+        for (index, offset, _), entities in zip(chunks, outputs, strict=True):
+            for ent in entities:
+                # Adjust offsets for chunk position
+                ent["start"] += offset
+                ent["end"] += offset
+                # Overlapping chunks report the same entity twice
+                key = (index, ent["start"], ent["end"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                results[index].append(ent)
+        return results
 
-    def _chunk_text(self, text: str, overlap: int = 50) -> list[str]:
-        """Split text into overlapping chunks for processing."""
+    def _chunk_spans(self, text: str, overlap: int = 50) -> list[tuple[int, str]]:
+        """Split text into overlapping chunks, with each chunk's offset."""
         chunk_size = self.config.max_sequence_length * 4
-        chunks = []
+        spans = []
         start = 0
         while start < len(text):
             end = min(start + chunk_size, len(text))
@@ -343,31 +377,43 @@ class ClinicalNERService(BaseNLPService):
                     if last_punct > chunk_size // 2:
                         end = start + last_punct + len(punct)
                         break
-            chunks.append(text[start:end])
-            start = end - overlap
-        return chunks
+            spans.append((start, text[start:end]))
+            if end >= len(text):
+                break
+            start = max(end - overlap, start + 1)
+        return spans
+
+    def _chunk_text(self, text: str, overlap: int = 50) -> list[str]:
+        """Split text into overlapping chunks for processing."""
+        return [chunk for _, chunk in self._chunk_spans(text, overlap)]
 
     def _extract_with_spacy(self, text: str) -> list[dict]:
         """Extract entities using spaCy."""
+        return self._extract_with_spacy_batch([text])[0]
+
+    def _extract_with_spacy_batch(self, texts: list[str]) -> list[list[dict]]:
+        """Extract entities from several texts using spaCy's batched pipe."""
         if not self._spacy_available or self._nlp is None:
-            return []
+            return [[] for _ in texts]
 
         try:
-            doc = self._nlp(text)
-            entities = []
-            for ent in doc.ents:
-                entities.append({
-                    "word": ent.text,
-                    "start": ent.start_char,
-                    "end": ent.end_char,
-                    "entity_group": ent.label_,
-                    "score": 0.6,  # Default confidence for spaCy
-                    "source": "spacy",
-                })
-            return entities
+            results = []
+            for doc in self._nlp.pipe(texts, batch_size=self.config.batch_size):
+                entities = []
+                for ent in doc.ents:
+                    entities.append({
+                        "word": ent.text,
+                        "start": ent.start_char,
+                        "end": ent.end_char,
+                        "entity_group": ent.label_,
+                        "score": 0.6,  # Default confidence for spaCy
+                        "source": "spacy",
+                    })
+                results.append(entities)
+            return results
         except Exception as e:
             logger.warning(f"SpaCy extraction failed: {e}")
-            return []
+            return [[] for _ in texts]
 
     def _merge_entities(
         self,
@@ -419,24 +465,78 @@ class ClinicalNERService(BaseNLPService):
         Returns:
             List of ExtractedMention objects with entity types and context.
         """
+        return next(self.extract_mentions_batch([(text, document_id, note_type)]))
+
+    def extract_mentions_batch(
+        self,
+        documents: Iterable[NLPDocument],
+        documents_per_batch: int = DEFAULT_DOCUMENTS_PER_BATCH,
+    ) -> Iterator[list[ExtractedMention]]:
+        """Extract clinical mentions from many documents.
+
+        Documents are grouped `documents_per_batch` at a time; the transformer
+        sees the chunks of a whole group in one batched call and spaCy runs
+        the group through `nlp.pipe`.
+
+        Args:
+            documents: (text, document_id, note_type) tuples.
+            documents_per_batch: Documents sent to the models together.
+
+        Yields:
+            List of ExtractedMention objects for each document, in input order.
+        """
         self._initialize()
 
-        if not self.is_available():
+        available = self.is_available()
+        if not available:
             logger.warning("No NER models available")
-            return []
 
-        mentions: list[ExtractedMention] = []
+        batch: list[NLPDocument] = []
+        for document in documents:
+            if not available:
+                yield []
+                continue
+            batch.append(document)
+            if len(batch) >= documents_per_batch:
+                yield from self._extract_batch(batch)
+                batch = []
+
+        if batch:
+            yield from self._extract_batch(batch)
+
+    def _extract_batch(self, documents: list[NLPDocument]) -> list[list[ExtractedMention]]:
+        """Run both models over a group of documents and build mentions."""
+        texts = [text for text, _, _ in documents]
 
         # Extract with transformer (primary)
-        transformer_ents = self._extract_with_transformer(text)
-        for ent in transformer_ents:
-            ent["source"] = "transformer"
+        transformer_batch = self._extract_with_transformer_batch(texts)
 
         # Extract with spaCy (supplement)
-        spacy_ents = self._extract_with_spacy(text)
+        spacy_batch = self._extract_with_spacy_batch(texts)
+
+        results = []
+        for (text, document_id, _), transformer_ents, spacy_ents in zip(
+            documents, transformer_batch, spacy_batch, strict=True
+        ):
+            for ent in transformer_ents:
+                ent["source"] = "transformer"
+
+            # Merge entities
+            all_entities = self._merge_entities(transformer_ents, spacy_ents)
+            results.append(self._build_mentions(text, document_id, all_entities))
+        return results
+
+    def _build_mentions(
+        self,
+        text: str,
+        document_id: UUID,
+        all_entities: list[dict],
+    ) -> list[ExtractedMention]:
+        """Convert merged model entities to mentions with context attributes."""
+        mentions: list[ExtractedMention] = []
 
-        # Merge entities
-        all_entities = self._merge_entities(transformer_ents, spacy_ents)
+        # Parse sections once for all entities of the document
+        section_index = self.get_section_index(text)
 
         # Convert to ExtractedMention objects
         for ent in all_entities:
@@ -479,7 +579,8 @@ class ClinicalNERService(BaseNLPService):
                 experiencer = self._detect_experiencer(text, start, end)
 
                 # Get section
-                section = self.get_section_name(text, start)
+                section_span = section_index.span_at(start)
+                section = section_span.title if section_span is not None else None
 
                 mention = ExtractedMention(
                     text=entity_text,
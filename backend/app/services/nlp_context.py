@@ -0,0 +1,340 @@
+"""Single-pass context engine for NegEx-style attribute detection.
+
+The rule-based extractor decides assertion, temporality and experiencer for
+each mention by searching a context window around it for trigger phrases.
+Doing that per mention re-runs ~50 regexes over a fresh window string, so a
+long note with hundreds of mentions spends most of its time here.
+
+This module compiles each trigger category once and scans a document once,
+recording where triggers occur. Each mention's attributes are then answered
+from those positions with a bisect, giving the same results as matching the
+trigger patterns against the window substring:
+
+- Triggers starting well inside a window are taken from the document scan.
+  Trigger patterns span at most a few whitespace runs, so these matches can
+  never see past the window end.
+- Word starts near the window end are re-matched with ``endpos`` set to the
+  window end, which reproduces slicing (a word cut by the window edge still
+  ends at a word boundary, optional suffixes are truncated, etc.).
+- A window that starts mid-word is matched at its first character without
+  the leading ``\\b``, as the sliced string would be.
+
+Patterns that do not start with ``\\b`` followed by a word character fall
+back to per-window matching for their category, so custom trigger lists stay
+correct, just slower.
+
+Several documents can be packed into one buffer (separated by non-word
+characters) and scanned together; ``DocumentContext.segment``
+then clips every window to one document's bounds.
+"""
+
+import copy
+import re
+from bisect import bisect_left
+from collections.abc import Sequence
+
+from app.schemas.base import Assertion, Experiencer, Temporality
+
+# Characters before/after a mention searched for triggers
+DEFAULT_WINDOW_SIZE = 50
+
+_WORD_START = re.compile(r"\b\w")
+_WORD_CHAR = re.compile(r"\w")
+_WHITESPACE_RUN = re.compile(r"\s+")
+# Pattern features that can match whitespace (or anything) outside of \s
+_UNBOUNDED_SPAN = re.compile(r"(?<!\\) |(?<!\\)\.|\\[WSD]|\[\^")
+
+
+def resolve_assertion(uncertainty_pos: int, positive_pos: int, negation_pos: int) -> Assertion:
+    """Resolve assertion from the closest trigger of each kind.
+
+    The trigger closest to the mention (largest end position) wins; ties are
+    broken as uncertainty > positive > negation.
+
+    Args:
+        uncertainty_pos: End of the closest uncertainty trigger, or -1.
+        positive_pos: End of the closest positive trigger, or -1.
+        negation_pos: End of the closest negation trigger, or -1.
+
+    Returns:
+        Assertion enum value (PRESENT, ABSENT, or POSSIBLE).
+    """
+    if uncertainty_pos == -1 and positive_pos == -1 and negation_pos == -1:
+        return Assertion.PRESENT
+
+    max_pos = max(uncertainty_pos, positive_pos, negation_pos)
+    if uncertainty_pos == max_pos:
+        return Assertion.POSSIBLE
+    if positive_pos == max_pos:
+        return Assertion.PRESENT
+    return Assertion.ABSENT
+
+
+class TriggerSet:
+    """A compiled category of context trigger patterns."""
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        """Compile a trigger category.
+
+        Args:
+            patterns: Regex trigger patterns (matched case-insensitively).
+        """
+        self.patterns = tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+        joined = "|".join(f"(?:{p})" for p in patterns) or r"(?!)"
+        self.any = re.compile(joined, re.IGNORECASE)
+        self._scan = re.compile(f"(?=(?:{joined}))", re.IGNORECASE)
+
+        # Document-scan mode needs every trigger to start at a word start
+        self.word_anchored = all(
+            p.startswith(r"\b") and _WORD_CHAR.match(p, 2) for p in patterns
+        )
+        self.headless = tuple(
+            re.compile(p[2:] if p.startswith(r"\b") else p, re.IGNORECASE) for p in patterns
+        )
+
+        # Max whitespace runs one match can span; None if not bounded
+        if any(_UNBOUNDED_SPAN.search(p) for p in patterns):
+            self.max_whitespace_runs: int | None = None
+        else:
+            self.max_whitespace_runs = max((p.count(r"\s") for p in patterns), default=0)
+
+    def closest_end(self, context: str) -> int:
+        """Get the end of the trigger match closest to the end of `context`.
+
+        Args:
+            context: Context string (the mention follows it).
+
+        Returns:
+            Largest match end within the string, or -1 if no trigger matches.
+        """
+        best_pos = -1
+        for pattern in self.patterns:
+            for match in pattern.finditer(context):
+                if match.end() > best_pos:
+                    best_pos = match.end()
+        return best_pos
+
+    def search(self, context: str) -> bool:
+        """Check whether any trigger occurs in `context`."""
+        return any(pattern.search(context) for pattern in self.patterns)
+
+    def max_end_at(self, patterns: Sequence[re.Pattern], text: str, pos: int, endpos: int) -> int:
+        """Get the largest end of any pattern matching at `pos`, or -1."""
+        best = -1
+        for pattern in patterns:
+            match = pattern.match(text, pos, endpos)
+            if match is not None and match.end() > best:
+                best = match.end()
+        return best
+
+    def index(self, text: str) -> tuple[list[int], list[int]]:
+        """Scan a document once for trigger occurrences.
+
+        Args:
+            text: Lowercased document text.
+
+        Returns:
+            Parallel lists of trigger start positions and, for each start,
+            the largest end of any trigger matching there.
+        """
+        starts: list[int] = []
+        ends: list[int] = []
+        for match in self._scan.finditer(text):
+            start = match.start()
+            starts.append(start)
+            ends.append(self.max_end_at(self.patterns, text, start, len(text)))
+        return starts, ends
+
+
+class DocumentContext:
+    """Trigger positions of one document, answering per-mention attribute queries."""
+
+    def __init__(self, engine: "ContextEngine", text: str) -> None:
+        """Scan a document.
+
+        Args:
+            engine: The compiled context engine.
+            text: Original document text.
+        """
+        self._engine = engine
+        self._text = text.lower()
+        self._bounds = (0, len(self._text))
+        # Offsets only line up if lowercasing preserved the length
+        self._indexed = len(self._text) == len(text)
+        self._index: dict[str, tuple[list[int], list[int]]] = {}
+        if self._indexed:
+            self._word_starts = [m.start() for m in _WORD_START.finditer(self._text)]
+            self._whitespace_runs = [m.start() for m in _WHITESPACE_RUN.finditer(self._text)]
+            for name, triggers in engine.trigger_sets.items():
+                if triggers.word_anchored:
+                    self._index[name] = triggers.index(self._text)
+
+    def segment(self, start: int, end: int) -> "DocumentContext":
+        """Get a view of one document packed into the scanned buffer.
+
+        The view shares the scan; its windows are clipped to [start, end) so
+        neighbouring documents never contribute triggers. The characters just
+        outside the segment must be non-word characters for results to match
+        scanning the document on its own.
+
+        Args:
+            start: Offset of the document in the buffer.
+            end: End offset of the document in the buffer.
+
+        Returns:
+            DocumentContext answering queries in buffer offsets.
+        """
+        view = copy.copy(self)
+        view._bounds = (start, end)
+        return view
+
+    def _tail_start(self, triggers: TriggerSet, window_end: int) -> int:
+        """Get the first offset whose triggers might reach `window_end`.
+
+        A match starting before the returned offset spans fewer whitespace
+        runs than lie between it and the window end, so it cannot read past
+        the window and the document scan result is exact.
+        """
+        if triggers.max_whitespace_runs is None:
+            return 0
+        needed = triggers.max_whitespace_runs + 1
+        runs_before = bisect_left(self._whitespace_runs, window_end)
+        if runs_before < needed:
+            return 0
+        return self._whitespace_runs[runs_before - needed]
+
+    def _closest_end(self, name: str, window_start: int, window_end: int) -> int:
+        """Get the largest trigger end in the window, or -1 (window-relative)."""
+        triggers = self._engine.trigger_sets[name]
+        if name not in self._index:
+            return triggers.closest_end(self._text[window_start:window_end])
+
+        text = self._text
+        best = -1
+
+        # Triggers well inside the window come straight from the document scan
+        starts, ends = self._index[name]
+        tail_start = max(window_start, self._tail_start(triggers, window_end))
+        for i in range(bisect_left(starts, window_start), bisect_left(starts, tail_start)):
+            if ends[i] > best:
+                best = ends[i]
+
+        # Near the window end, match as if the text stopped there
+        first = bisect_left(self._word_starts, tail_start)
+        last = bisect_left(self._word_starts, window_end)
+        for pos in self._word_starts[first:last]:
+            if triggers.any.match(text, pos, window_end):
+                best = max(best, triggers.max_end_at(triggers.patterns, text, pos, window_end))
+
+        # A window cut mid-word has a word boundary at its first character
+        if (
+            0 < window_start < window_end
+            and _WORD_CHAR.match(text, window_start - 1)
+            and _WORD_CHAR.match(text, window_start)
+        ):
+            best = max(
+                best,
+                triggers.max_end_at(triggers.headless, text, window_start, window_end),
+            )
+
+        return best - window_start if best >= 0 else -1
+
+    def _preceding_window(self, start: int) -> tuple[int, int]:
+        """Get the window before a mention used for assertion."""
+        return max(self._bounds[0], start - self._engine.window_size), start
+
+    def _surrounding_window(self, start: int, end: int) -> tuple[int, int]:
+        """Get the window around a mention used for temporality and experiencer."""
+        size = self._engine.window_size
+        return max(self._bounds[0], start - size), min(self._bounds[1], end + size)
+
+    def assertion(self, start: int) -> Assertion:
+        """Detect assertion for a mention starting at `start`."""
+        if not self._indexed:
+            return self._engine.detect_assertion(self._text[slice(*self._preceding_window(start))])
+        window = self._preceding_window(start)
+        return resolve_assertion(
+            self._closest_end("uncertainty", *window),
+            self._closest_end("positive", *window),
+            self._closest_end("negation", *window),
+        )
+
+    def temporality(self, start: int, end: int) -> Temporality:
+        """Detect temporality for a mention spanning [start, end)."""
+        window = self._surrounding_window(start, end)
+        if not self._indexed:
+            return self._engine.detect_temporality(self._text[slice(*window)])
+        return Temporality.PAST if self._closest_end("past", *window) >= 0 else Temporality.CURRENT
+
+    def experiencer(self, start: int, end: int) -> Experiencer:
+        """Detect experiencer for a mention spanning [start, end)."""
+        window = self._surrounding_window(start, end)
+        if not self._indexed:
+            return self._engine.detect_experiencer(self._text[slice(*window)])
+        return Experiencer.FAMILY if self._closest_end("family", *window) >= 0 else Experiencer.PATIENT
+
+
+class ContextEngine:
+    """Compiled trigger categories for assertion, temporality and experiencer.
+
+    Usage:
+        engine = ContextEngine(positive=[...], negation=[...], uncertainty=[...],
+                               past=[...], family=[...])
+        context = engine.analyze(text)
+        assertion = context.assertion(mention_start)
+    """
+
+    def __init__(
+        self,
+        positive: Sequence[str],
+        negation: Sequence[str],
+        uncertainty: Sequence[str],
+        past: Sequence[str],
+        family: Sequence[str],
+        window_size: int = DEFAULT_WINDOW_SIZE,
+    ) -> None:
+        """Compile the trigger categories.
+
+        Args:
+            positive: Triggers asserting presence.
+            negation: Triggers asserting absence.
+            uncertainty: Triggers asserting possibility.
+            past: Triggers marking past temporality.
+            family: Triggers marking a family-member experiencer.
+            window_size: Characters searched before/after each mention.
+        """
+        self.window_size = window_size
+        self.trigger_sets = {
+            "positive": TriggerSet(positive),
+            "negation": TriggerSet(negation),
+            "uncertainty": TriggerSet(uncertainty),
+            "past": TriggerSet(past),
+            "family": TriggerSet(family),
+        }
+
+    def analyze(self, text: str) -> DocumentContext:
+        """Scan a document for triggers.
+
+        Args:
+            text: Document text.
+
+        Returns:
+            DocumentContext answering per-mention attribute queries.
+        """
+        return DocumentContext(self, text)
+
+    def detect_assertion(self, context: str) -> Assertion:
+        """Detect assertion from the text preceding a mention."""
+        return resolve_assertion(
+            self.trigger_sets["uncertainty"].closest_end(context),
+            self.trigger_sets["positive"].closest_end(context),
+            self.trigger_sets["negation"].closest_end(context),
+        )
+
+    def detect_temporality(self, context: str) -> Temporality:
+        """Detect temporality from the text around a mention."""
+        return Temporality.PAST if self.trigger_sets["past"].search(context) else Temporality.CURRENT
+
+    def detect_experiencer(self, context: str) -> Experiencer:
+        """Detect experiencer from the text around a mention."""
+        return Experiencer.FAMILY if self.trigger_sets["family"].search(context) else Experiencer.PATIENT
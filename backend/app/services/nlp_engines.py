@@ -0,0 +1,338 @@
+"""Process-wide registry of shared NLP extraction engines.
+
+The preview/extract API used to construct extraction services per request,
+which re-ran vocabulary loading and Aho-Corasick construction before any
+text was processed. This registry owns one warm instance of each engine
+(rule-based, value, NER, relation, ensemble), builds them once (optionally
+at application startup), and hands the same instance to every request.
+
+Engines can be hot-swapped: ``reload()`` builds replacement instances and
+swaps them in atomically, so in-flight requests keep using the engine they
+already hold. The registry's ensemble looks its components up here on every
+call, so it picks up swapped engines without being rebuilt itself.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from threading import Lock
+from typing import Any
+
+from app.services.nlp_clinical_ner import get_clinical_ner_service, reset_clinical_ner_service
+from app.services.nlp_ensemble import EnsembleNLPService, reset_ensemble_nlp_service
+from app.services.nlp_rule_based import RuleBasedNLPService
+from app.services.relation_extraction import (
+    get_relation_extraction_service,
+    reset_relation_extraction_service,
+)
+from app.services.value_extraction import (
+    get_value_extraction_service,
+    reset_value_extraction_service,
+)
+from app.services.vocabulary import preload_vocabulary, reset_vocabulary_singleton
+
+logger = logging.getLogger(__name__)
+
+# Singleton instance and lock for thread-safe initialization
+_registry_instance: "NLPEngineRegistry | None" = None
+_registry_lock = Lock()
+
+
+def _build_rule_based(registry: "NLPEngineRegistry") -> RuleBasedNLPService:
+    """Build and warm the rule-based engine.
+
+    During a vocabulary reload the cached automaton is not trusted: the
+    engine is built from the freshly loaded vocabulary and the cache entry
+    is overwritten.
+    """
+    engine = RuleBasedNLPService()
+    if registry.refreshing_vocabulary:
+        engine.warm_up(refresh_cache=True)
+    else:
+        engine.warm_up()
+    return engine
+
+
+def _build_value(registry: "NLPEngineRegistry") -> Any:
+    """Build a fresh value extraction engine."""
+    reset_value_extraction_service()
+    return get_value_extraction_service()
+
+
+def _build_ner(registry: "NLPEngineRegistry") -> Any:
+    """Build a fresh clinical NER engine and load its models."""
+    reset_clinical_ner_service()
+    engine = get_clinical_ner_service()
+    engine.is_available()
+    return engine
+
+
+def _build_relation(registry: "NLPEngineRegistry") -> Any:
+    """Build a fresh relation extraction engine."""
+    reset_relation_extraction_service()
+    return get_relation_extraction_service()
+
+
+def _build_ensemble(registry: "NLPEngineRegistry") -> EnsembleNLPService:
+    """Build the default ensemble on top of the registry's components."""
+    engine = EnsembleNLPService(engine_registry=registry)
+    engine.warm_up()
+    return engine
+
+
+# Engine factory: receives the owning registry, returns a fully warmed engine
+EngineFactory = Callable[["NLPEngineRegistry"], Any]
+
+# Engine name -> factory
+ENGINE_FACTORIES: dict[str, EngineFactory] = {
+    "rule_based": _build_rule_based,
+    "value": _build_value,
+    "ner": _build_ner,
+    "relation": _build_relation,
+    "ensemble": _build_ensemble,
+}
+
+# Engines whose output depends on the loaded vocabulary
+VOCABULARY_ENGINES: tuple[str, ...] = ("rule_based",)
+
+
+@dataclass
+class EngineStats:
+    """Build and usage statistics for one registered engine."""
+
+    name: str
+    built: bool = False
+    generation: int = 0
+    build_time_ms: float = 0.0
+    built_at: datetime | None = None
+    reuse_count: int = 0
+    last_error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert stats to a JSON-serializable dictionary."""
+        return {
+            "name": self.name,
+            "built": self.built,
+            "generation": self.generation,
+            "build_time_ms": round(self.build_time_ms, 2),
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "reuse_count": self.reuse_count,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class _EngineSlot:
+    """Holds the current instance of an engine and its build lock."""
+
+    stats: EngineStats
+    instance: Any = None
+    build_lock: Lock = field(default_factory=Lock)
+
+
+class NLPEngineRegistry:
+    """Registry of shared, pre-warmed NLP extraction engines.
+
+    Usage:
+        registry = get_nlp_engine_registry()
+        registry.prewarm()                       # at startup
+        nlp = registry.get("rule_based")         # per request
+        registry.reload(reload_vocabulary=True)  # after vocabulary changes
+    """
+
+    def __init__(self, factories: dict[str, EngineFactory] | None = None) -> None:
+        """Initialize the registry.
+
+        Args:
+            factories: Optional engine factories keyed by engine name.
+                      Defaults to ENGINE_FACTORIES.
+        """
+        self._factories = dict(factories or ENGINE_FACTORIES)
+        self._slots = {
+            name: _EngineSlot(stats=EngineStats(name=name)) for name in self._factories
+        }
+        self._lock = Lock()
+        self._refreshing_vocabulary = False
+
+    @property
+    def refreshing_vocabulary(self) -> bool:
+        """Whether engines are being rebuilt for a vocabulary reload."""
+        return self._refreshing_vocabulary
+
+    @property
+    def engine_names(self) -> list[str]:
+        """Get the names of all registered engines."""
+        return list(self._factories)
+
+    def _slot(self, name: str) -> _EngineSlot:
+        """Get the slot for an engine, raising KeyError for unknown names."""
+        if name not in self._slots:
+            raise KeyError(f"Unknown NLP engine: {name}")
+        return self._slots[name]
+
+    def _build(self, name: str) -> Any:
+        """Build a new engine instance and install it in its slot."""
+        slot = self._slot(name)
+        start_time = time.perf_counter()
+        try:
+            instance = self._factories[name](self)
+        except Exception as e:
+            slot.stats.last_error = str(e)
+            raise
+        build_time_ms = (time.perf_counter() - start_time) * 1000
+
+        with self._lock:
+            slot.instance = instance
+            slot.stats.built = True
+            slot.stats.generation += 1
+            slot.stats.build_time_ms = build_time_ms
+            slot.stats.built_at = datetime.now(UTC)
+            slot.stats.reuse_count = 0
+            slot.stats.last_error = None
+
+        logger.info(f"NLP engine '{name}' built in {build_time_ms:.2f}ms")
+        return instance
+
+    def get(self, name: str) -> Any:
+        """Get the shared instance of an engine, building it on first use.
+
+        Args:
+            name: Engine name (rule_based, value, ner, relation, ensemble).
+
+        Returns:
+            The shared engine instance.
+
+        Raises:
+            KeyError: If the engine name is not registered.
+        """
+        slot = self._slot(name)
+        with self._lock:
+            if slot.instance is not None:
+                slot.stats.reuse_count += 1
+                return slot.instance
+
+        with slot.build_lock:
+            # Double-check: another thread may have built it while we waited
+            with self._lock:
+                if slot.instance is not None:
+                    slot.stats.reuse_count += 1
+                    return slot.instance
+            return self._build(name)
+
+    def is_built(self, name: str) -> bool:
+        """Check if an engine has been built."""
+        return self._slot(name).instance is not None
+
+    def prewarm(self, names: Iterable[str] | None = None) -> dict[str, Any]:
+        """Build engines ahead of the first request.
+
+        Failures are logged and the engine is left to build lazily, so one
+        missing optional dependency does not block startup.
+
+        Args:
+            names: Engines to build. Defaults to all registered engines.
+
+        Returns:
+            Dictionary mapping engine name to build time in ms, or an error.
+        """
+        results: dict[str, Any] = {}
+        for name in names if names is not None else self.engine_names:
+            slot = self._slot(name)
+            try:
+                with slot.build_lock:
+                    if slot.instance is None:
+                        self._build(name)
+                results[name] = round(slot.stats.build_time_ms, 2)
+            except Exception as e:
+                logger.warning(f"Failed to prewarm NLP engine '{name}': {e}")
+                results[name] = {"error": str(e)}
+        return results
+
+    def reload(
+        self,
+        names: Iterable[str] | None = None,
+        reload_vocabulary: bool = False,
+    ) -> dict[str, Any]:
+        """Rebuild engines and hot-swap them in.
+
+        Requests that already hold an engine keep using it; new requests get
+        the replacement as soon as it is built. The registry's ensemble reads
+        its components from the registry per call and needs no rebuild; the
+        legacy get_ensemble_nlp_service() singleton is reset so it rebuilds
+        on next use.
+
+        Args:
+            names: Engines to rebuild. Defaults to the vocabulary-dependent
+                  engines when reload_vocabulary is set, otherwise all engines.
+            reload_vocabulary: Reset and reload the shared vocabulary first,
+                              bypassing the on-disk automaton cache.
+
+        Returns:
+            Dictionary mapping engine name to build time in ms, or an error.
+        """
+        if reload_vocabulary:
+            reset_vocabulary_singleton()
+            preload_vocabulary()
+            if names is None:
+                names = VOCABULARY_ENGINES
+
+        targets = list(names) if names is not None else self.engine_names
+
+        results: dict[str, Any] = {}
+        self._refreshing_vocabulary = reload_vocabulary
+        try:
+            for name in targets:
+                slot = self._slot(name)
+                try:
+                    with slot.build_lock:
+                        self._build(name)
+                    results[name] = round(slot.stats.build_time_ms, 2)
+                except Exception as e:
+                    # Keep serving the previous instance if the rebuild fails
+                    logger.warning(f"Failed to reload NLP engine '{name}': {e}")
+                    results[name] = {"error": str(e)}
+        finally:
+            self._refreshing_vocabulary = False
+
+        reset_ensemble_nlp_service()
+        return results
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get build and reuse statistics for all engines.
+
+        Returns:
+            Dictionary with per-engine stats.
+        """
+        with self._lock:
+            engines = {name: slot.stats.to_dict() for name, slot in self._slots.items()}
+        return {
+            "engine_count": len(engines),
+            "built_count": sum(1 for e in engines.values() if e["built"]),
+            "engines": engines,
+        }
+
+
+def get_nlp_engine_registry() -> NLPEngineRegistry:
+    """Get the singleton NLPEngineRegistry instance.
+
+    Returns:
+        The process-wide engine registry.
+    """
+    global _registry_instance
+
+    if _registry_instance is None:
+        with _registry_lock:
+            # Double-check locking pattern
+            if _registry_instance is None:
+                _registry_instance = NLPEngineRegistry()
+
+    return _registry_instance
+
+
+def reset_nlp_engine_registry() -> None:
+    """Reset the singleton registry (for testing only)."""
+    global _registry_instance
+    with _registry_lock:
+        _registry_instance = None
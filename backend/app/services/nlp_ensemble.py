@@ -10,14 +10,16 @@ The ensemble uses voting and confidence boosting when multiple methods agree.
 """
 
 import logging
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 from app.schemas.base import Assertion, Domain, Experiencer, Temporality
-from app.services.nlp import BaseNLPService, ExtractedMention, NLPServiceInterface
+from app.services.nlp import BaseNLPService, ExtractedMention, NLPDocument, NLPServiceInterface
 from app.services.nlp_rule_based import RuleBasedNLPService
 from app.services.nlp_clinical_ner import (
+    DEFAULT_DOCUMENTS_PER_BATCH,
     ClinicalNERService,
     TransformerNERConfig,
     get_clinical_ner_service,
@@ -31,9 +33,21 @@ from app.services.relation_extraction import (
     RelationExtractionService,
     get_relation_extraction_service,
 )
+from app.services.span_index import SpanIndex, overlap_ratio
+
+if TYPE_CHECKING:
+    from app.services.nlp_engines import NLPEngineRegistry
 
 logger = logging.getLogger(__name__)
 
+# Registry engine name -> (EnsembleConfig flag, attribute holding a pinned instance)
+COMPONENT_ENGINES: dict[str, tuple[str, str]] = {
+    "rule_based": ("use_rule_based", "_rule_based_service"),
+    "ner": ("use_ml_ner", "_ml_ner_service"),
+    "value": ("use_value_extraction", "_value_service"),
+    "relation": ("use_relation_extraction", "_relation_service"),
+}
+
 
 @dataclass
 class EnsembleConfig:
@@ -125,6 +139,8 @@ class EnsembleNLPService(BaseNLPService):
     """
 
     config: EnsembleConfig = field(default_factory=EnsembleConfig)
+    # Shared engine registry; when set, components are not pinned per instance
+    engine_registry: "NLPEngineRegistry | None" = None
 
     # Component services (lazy initialized)
     _rule_based_service: RuleBasedNLPService | None = field(default=None, init=False)
@@ -134,10 +150,21 @@ class EnsembleNLPService(BaseNLPService):
     _initialized: bool = field(default=False, init=False)
 
     def _initialize(self) -> None:
-        """Lazy initialization of component services."""
+        """Lazy initialization of component services.
+
+        With an engine registry, components are looked up on every call
+        (see _component) so engines hot-swapped by the registry take effect
+        immediately; here they are only built ahead of first use.
+        """
         if self._initialized:
             return
 
+        if self.engine_registry is not None:
+            for engine in COMPONENT_ENGINES:
+                self._component(engine)
+            self._initialized = True
+            return
+
         if self.config.use_rule_based:
             self._rule_based_service = RuleBasedNLPService()
             logger.info("Initialized rule-based NLP service")
@@ -156,6 +183,30 @@ class EnsembleNLPService(BaseNLPService):
 
         self._initialized = True
 
+    def _component(self, engine: str) -> Any:
+        """Get the current instance of an enabled component service.
+
+        Args:
+            engine: Registry engine name (rule_based, ner, value, relation).
+
+        Returns:
+            The component service, or None if disabled in the config.
+        """
+        enabled_flag, attr = COMPONENT_ENGINES[engine]
+        if not getattr(self.config, enabled_flag):
+            return None
+        if self.engine_registry is not None:
+            try:
+                return self.engine_registry.get(engine)
+            except Exception as e:
+                logger.warning(f"Ensemble component '{engine}' unavailable: {e}")
+                return None
+        return getattr(self, attr)
+
+    def warm_up(self) -> None:
+        """Initialize all enabled component services ahead of first use."""
+        self._initialize()
+
     def _spans_overlap(
         self,
         start1: int,
@@ -174,23 +225,7 @@ class EnsembleNLPService(BaseNLPService):
         Returns:
             True if spans overlap by at least threshold ratio
         """
-        overlap_start = max(start1, start2)
-        overlap_end = min(end1, end2)
-        overlap_length = max(0, overlap_end - overlap_start)
-
-        if overlap_length == 0:
-            return False
-
-        # Calculate overlap ratio relative to smaller span
-        span1_length = end1 - start1
-        span2_length = end2 - start2
-        min_length = min(span1_length, span2_length)
-
-        if min_length == 0:
-            return False
-
-        overlap_ratio = overlap_length / min_length
-        return overlap_ratio >= threshold
+        return overlap_ratio(start1, end1, start2, end2) >= threshold
 
     def _merge_mentions(
         self,
@@ -224,23 +259,25 @@ class EnsembleNLPService(BaseNLPService):
             key=lambda x: (x[1].start_offset, -(x[1].end_offset - x[1].start_offset))
         )
 
-        merged: list[ExtractedMention] = []
-        used_spans: list[tuple[int, int]] = []
+        # Accepted mentions keyed by span; handles keep acceptance order so
+        # the first overlapping mention is the one a list scan would find
+        merged: SpanIndex[ExtractedMention] = SpanIndex()
 
         for source, mention in all_mentions:
             # Check if this span overlaps with an already-included span
             overlaps_with = None
-            for i, (used_start, used_end) in enumerate(used_spans):
+            for handle, used_start, used_end, existing in merged.overlapping(
+                mention.start_offset, mention.end_offset
+            ):
                 if self._spans_overlap(
                     mention.start_offset, mention.end_offset,
                     used_start, used_end
-                ):
-                    overlaps_with = i
-                    break
+                ) and (overlaps_with is None or handle < overlaps_with[0]):
+                    overlaps_with = (handle, existing)
 
             if overlaps_with is not None:
                 # Check if we should replace the existing mention
-                existing = merged[overlaps_with]
+                handle, existing = overlaps_with
 
                 should_replace = False
 
@@ -264,8 +301,7 @@ class EnsembleNLPService(BaseNLPService):
 
                 if should_replace:
                     # Replace existing mention
-                    merged[overlaps_with] = mention
-                    used_spans[overlaps_with] = (mention.start_offset, mention.end_offset)
+                    merged.replace(handle, mention.start_offset, mention.end_offset, mention)
                 else:
                     # Boost confidence of existing mention (agreement)
                     existing.confidence = min(
@@ -274,10 +310,9 @@ class EnsembleNLPService(BaseNLPService):
                     )
             else:
                 # No overlap, add new mention
-                merged.append(mention)
-                used_spans.append((mention.start_offset, mention.end_offset))
+                merged.insert(mention.start_offset, mention.end_offset, mention)
 
-        return merged
+        return list(merged.items())
 
     def _extract_rule_based(
         self,
@@ -286,22 +321,45 @@ class EnsembleNLPService(BaseNLPService):
         note_type: str | None,
     ) -> list[ExtractedMention]:
         """Extract mentions using rule-based service."""
-        if not self._rule_based_service:
+        rule_based_service = self._component("rule_based")
+        if not rule_based_service:
             return []
 
         try:
-            mentions = self._rule_based_service.extract_mentions(
+            mentions = rule_based_service.extract_mentions(
                 text, document_id, note_type
             )
-            # Set base confidence
-            for m in mentions:
-                if m.confidence < self.config.rule_based_confidence:
-                    m.confidence = self.config.rule_based_confidence
-            return mentions
+            return self._apply_rule_based_confidence(mentions)
         except Exception as e:
             logger.warning(f"Rule-based extraction failed: {e}")
             return []
 
+    def _extract_rule_based_batch(
+        self,
+        documents: list[NLPDocument],
+    ) -> list[list[ExtractedMention]]:
+        """Extract mentions from a group of documents using rule-based service."""
+        rule_based_service = self._component("rule_based")
+        if not rule_based_service:
+            return [[] for _ in documents]
+
+        try:
+            batch = list(rule_based_service.extract_mentions_batch(documents))
+            return [self._apply_rule_based_confidence(mentions) for mentions in batch]
+        except Exception as e:
+            logger.warning(f"Rule-based extraction failed: {e}")
+            return [[] for _ in documents]
+
+    def _apply_rule_based_confidence(
+        self,
+        mentions: list[ExtractedMention],
+    ) -> list[ExtractedMention]:
+        """Raise rule-based mentions to the configured base confidence."""
+        for m in mentions:
+            if m.confidence < self.config.rule_based_confidence:
+                m.confidence = self.config.rule_based_confidence
+        return mentions
+
     def _extract_ml_ner(
         self,
         text: str,
@@ -309,11 +367,12 @@ class EnsembleNLPService(BaseNLPService):
         note_type: str | None,
     ) -> list[ExtractedMention]:
         """Extract mentions using ML NER service."""
-        if not self._ml_ner_service:
+        ml_ner_service = self._component("ner")
+        if not ml_ner_service:
             return []
 
         try:
-            mentions = self._ml_ner_service.extract_mentions(
+            mentions = ml_ner_service.extract_mentions(
                 text, document_id, note_type
             )
             return mentions
@@ -321,17 +380,33 @@ class EnsembleNLPService(BaseNLPService):
             logger.warning(f"ML NER extraction failed: {e}")
             return []
 
+    def _extract_ml_ner_batch(
+        self,
+        documents: list[NLPDocument],
+    ) -> list[list[ExtractedMention]]:
+        """Extract mentions from a group of documents using ML NER service."""
+        ml_ner_service = self._component("ner")
+        if not ml_ner_service:
+            return [[] for _ in documents]
+
+        try:
+            return list(ml_ner_service.extract_mentions_batch(documents))
+        except Exception as e:
+            logger.warning(f"ML NER extraction failed: {e}")
+            return [[] for _ in documents]
+
     def _extract_values(
         self,
         text: str,
         document_id: UUID,
     ) -> list[ExtractedMention]:
         """Convert extracted values to mentions."""
-        if not self._value_service:
+        value_service = self._component("value")
+        if not value_service:
             return []
 
         try:
-            values = self._value_service.extract_all(text)
+            values = value_service.extract_all(text)
             mentions = []
 
             for value in values:
@@ -371,11 +446,12 @@ class EnsembleNLPService(BaseNLPService):
         mentions: list[ExtractedMention],
     ) -> list[ExtractedRelation]:
         """Extract relations between mentions."""
-        if not self._relation_service:
+        relation_service = self._component("relation")
+        if not relation_service:
             return []
 
         try:
-            return self._relation_service.extract_all(text, mentions)
+            return relation_service.extract_all(text, mentions)
         except Exception as e:
             logger.warning(f"Relation extraction failed: {e}")
             return []
@@ -424,6 +500,68 @@ class EnsembleNLPService(BaseNLPService):
                 mentions_by_source["value"] = value_mentions
                 logger.debug(f"Values: {len(value_mentions)} mentions")
 
+        return self._combine_sources(mentions_by_source)
+
+    def extract_mentions_batch(
+        self,
+        documents: Iterable[NLPDocument],
+        documents_per_batch: int = DEFAULT_DOCUMENTS_PER_BATCH,
+    ) -> Iterator[list[ExtractedMention]]:
+        """Extract mentions from many documents using the ensemble of methods.
+
+        Documents are grouped `documents_per_batch` at a time and each group
+        goes through the batch APIs of the rule-based and ML NER services, so
+        they can share automaton passes and model batches across documents.
+        Results match calling `extract_mentions` per document.
+
+        Args:
+            documents: (text, document_id, note_type) tuples.
+            documents_per_batch: Documents extracted together.
+
+        Yields:
+            Merged list of ExtractedMention objects for each document.
+        """
+        self._initialize()
+
+        batch: list[NLPDocument] = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= documents_per_batch:
+                yield from self._extract_batch(batch)
+                batch = []
+
+        if batch:
+            yield from self._extract_batch(batch)
+
+    def _extract_batch(self, documents: list[NLPDocument]) -> list[list[ExtractedMention]]:
+        """Run every enabled extractor over a group of documents and merge."""
+        no_mentions: list[list[ExtractedMention]] = [[] for _ in documents]
+        rule_batch = (
+            self._extract_rule_based_batch(documents) if self.config.use_rule_based else no_mentions
+        )
+        ml_batch = self._extract_ml_ner_batch(documents) if self.config.use_ml_ner else no_mentions
+
+        results = []
+        for (text, document_id, _), rule_mentions, ml_mentions in zip(
+            documents, rule_batch, ml_batch, strict=True
+        ):
+            mentions_by_source: dict[str, list[ExtractedMention]] = {}
+            if rule_mentions:
+                mentions_by_source["rule_based"] = rule_mentions
+            if ml_mentions:
+                mentions_by_source["ml_ner"] = ml_mentions
+            if self.config.use_value_extraction:
+                value_mentions = self._extract_values(text, document_id)
+                if value_mentions:
+                    mentions_by_source["value"] = value_mentions
+            results.append(self._combine_sources(mentions_by_source))
+        return results
+
+    def _combine_sources(
+        self,
+        mentions_by_source: dict[str, list[ExtractedMention]],
+    ) -> list[ExtractedMention]:
+        """Merge mentions from all extractors and apply the confidence floor."""
         # Merge all mentions
         merged = self._merge_mentions(mentions_by_source)
 
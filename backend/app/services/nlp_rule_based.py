@@ -6,7 +6,8 @@ lookups to extract mentions from clinical documents.
 
 import logging
 import os
-import re
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
 from typing import TYPE_CHECKING, Protocol
 from uuid import UUID
 
@@ -17,8 +18,12 @@ except ImportError:
     ahocorasick = None  # type: ignore
     HAS_AHOCORASICK = False
 
+from app.core.config import settings
 from app.schemas.base import Assertion, Experiencer, Temporality
-from app.services.nlp import BaseNLPService, ExtractedMention
+from app.services.confidence_scoring import ConfidenceScorer
+from app.services.nlp import BaseNLPService, ExtractedMention, NLPDocument
+from app.services.nlp_automaton_cache import AutomatonCache
+from app.services.nlp_context import ContextEngine
 from app.services.section_parser import ClinicalSection, SectionParser, get_section_parser
 from app.services.vocabulary import VocabularyService, get_vocabulary_service
 
@@ -27,6 +32,14 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Joins documents packed into one buffer for batch extraction. Its edges are
+# non-word characters (so boundaries and context windows end there) and the
+# NUL keeps vocabulary terms and section headers from matching across it.
+BATCH_SEPARATOR = "\n\x00\n"
+
+# Soft size limit (characters) of one packed batch buffer
+DEFAULT_BATCH_BUFFER_CHARS = 1_000_000
+
 
 class VocabularyServiceProtocol(Protocol):
     """Protocol for vocabulary services (file-based or database-backed)."""
@@ -192,13 +205,20 @@ class RuleBasedNLPService(BaseNLPService):
         r"\bparent\s+(?:has|had|with|diagnosed)\b",
     ]
 
-    def __init__(self, vocabulary_service: VocabularyServiceProtocol | None = None) -> None:
+    def __init__(
+        self,
+        vocabulary_service: VocabularyServiceProtocol | None = None,
+        automaton_cache: AutomatonCache | None = None,
+    ) -> None:
         """Initialize the rule-based NLP service.
 
         Args:
             vocabulary_service: Optional vocabulary service for term lookup.
                                If not provided, uses the singleton file-based
                                vocabulary (or filtered database if USE_DB_VOCABULARY=true).
+            automaton_cache: Optional on-disk automaton cache. If not provided,
+                            a default cache is used when
+                            settings.nlp_automaton_cache_enabled is true.
         """
         super().__init__()
 
@@ -218,27 +238,60 @@ class RuleBasedNLPService(BaseNLPService):
         self._automaton: "Automaton | None" = None
         self._initialized = False
 
+        # On-disk cache so worker processes can skip vocabulary load + trie build
+        if automaton_cache is None and settings.nlp_automaton_cache_enabled:
+            automaton_cache = AutomatonCache()
+        self._automaton_cache = automaton_cache
+
         # Section parser for section-aware extraction
         self._section_parser: SectionParser = get_section_parser()
 
-    def _initialize_patterns(self) -> None:
+        # Compiled context triggers, scanned once per document
+        self._context_engine = ContextEngine(
+            positive=self.POSITIVE_TRIGGERS,
+            negation=self.NEGATION_TRIGGERS,
+            uncertainty=self.UNCERTAINTY_TRIGGERS,
+            past=self.PAST_TRIGGERS,
+            family=self.FAMILY_TRIGGERS,
+        )
+
+        # Columnar confidence scoring over each document's mentions
+        self._confidence_scorer = ConfidenceScorer(self.CONFIDENCE_WEIGHTS, self._section_parser)
+
+    def _initialize_patterns(self, refresh_cache: bool = False) -> None:
         """Build Aho-Corasick automaton from vocabulary terms.
 
         Uses Aho-Corasick algorithm for O(n) pattern matching regardless
         of the number of patterns. This is significantly faster than
         regex-based matching for large vocabularies.
+
+        When an automaton cache is configured and the vocabulary service can
+        fingerprint its sources, a previously built automaton is loaded from
+        disk instead and the vocabulary itself is never loaded.
+
+        Args:
+            refresh_cache: Skip the cache lookup and overwrite the entry.
         """
         if self._initialized:
             return
 
-        self._vocabulary_service.load()
-
         # Build Aho-Corasick automaton (if available)
         if not HAS_AHOCORASICK:
+            self._vocabulary_service.load()
             logger.warning("ahocorasick not installed, rule-based extraction will be limited")
             self._initialized = True
             return
 
+        fingerprint = self._get_vocabulary_fingerprint()
+        if fingerprint is not None and self._automaton_cache is not None and not refresh_cache:
+            cached = self._automaton_cache.load(fingerprint)
+            if cached is not None:
+                self._automaton = cached
+                self._initialized = True
+                return
+
+        self._vocabulary_service.load()
+
         self._automaton = ahocorasick.Automaton()
 
         # Track which patterns we've added (avoid duplicates)
@@ -265,6 +318,39 @@ class RuleBasedNLPService(BaseNLPService):
         self._initialized = True
         logger.info(f"Aho-Corasick automaton built with {len(added_patterns)} patterns")
 
+        if fingerprint is not None and self._automaton_cache is not None:
+            self._automaton_cache.save(fingerprint, self._automaton)
+
+    def warm_up(self, refresh_cache: bool = False) -> None:
+        """Build (or load) the automaton ahead of the first extraction.
+
+        Args:
+            refresh_cache: Ignore any cached automaton, rebuild from the
+                          vocabulary and overwrite the cache entry.
+        """
+        self._initialize_patterns(refresh_cache=refresh_cache)
+
+    def _get_vocabulary_fingerprint(self) -> str | None:
+        """Get the vocabulary fingerprint used as the automaton cache key.
+
+        Returns:
+            Fingerprint string, or None if caching is disabled, the vocabulary
+            service does not support fingerprinting, or fingerprinting failed.
+        """
+        if self._automaton_cache is None:
+            return None
+
+        fingerprint_fn = getattr(self._vocabulary_service, "cache_fingerprint", None)
+        if fingerprint_fn is None:
+            return None
+
+        try:
+            fingerprint = fingerprint_fn()
+        except Exception as e:
+            logger.warning(f"Could not fingerprint vocabulary, automaton cache disabled: {e}")
+            return None
+        return str(fingerprint) if fingerprint is not None else None
+
     def extract_mentions(
         self,
         text: str,
@@ -291,35 +377,118 @@ class RuleBasedNLPService(BaseNLPService):
         if self._automaton is None:
             return []
 
-        mentions: list[ExtractedMention] = []
+        return self._extract_segments(text, [(0, len(text))])[0]
+
+    def extract_mentions_batch(
+        self,
+        documents: Iterable[NLPDocument],
+        max_buffer_chars: int = DEFAULT_BATCH_BUFFER_CHARS,
+    ) -> Iterator[list[ExtractedMention]]:
+        """Extract clinical mentions from many documents.
+
+        Documents are packed into buffers of up to `max_buffer_chars`
+        characters, joined by a separator no vocabulary term or trigger can
+        match across. The automaton pass, section parse and context scan then
+        run once per buffer instead of once per document. Results are the
+        same as calling `extract_mentions` on each document.
+
+        Args:
+            documents: (text, document_id, note_type) tuples.
+            max_buffer_chars: Soft limit on the size of one packed buffer.
+
+        Yields:
+            List of ExtractedMention objects for each document, in input order.
+        """
+        self._initialize_patterns()
+
+        pending: list[str] = []
+        pending_chars = 0
+        for text, _document_id, _note_type in documents:
+            if self._automaton is None:
+                yield []
+                continue
+
+            # Offsets only survive packing if lowercasing keeps the length
+            if len(text.lower()) != len(text):
+                yield from self._extract_packed(pending)
+                pending, pending_chars = [], 0
+                yield self._extract_segments(text, [(0, len(text))])[0]
+                continue
+
+            pending.append(text)
+            pending_chars += len(text) + len(BATCH_SEPARATOR)
+            if pending_chars >= max_buffer_chars:
+                yield from self._extract_packed(pending)
+                pending, pending_chars = [], 0
+
+        yield from self._extract_packed(pending)
+
+    def _extract_packed(self, texts: list[str]) -> list[list[ExtractedMention]]:
+        """Extract mentions from documents packed into a single buffer."""
+        if not texts:
+            return []
+
+        segments: list[tuple[int, int]] = []
+        offset = 0
+        for text in texts:
+            segments.append((offset, offset + len(text)))
+            offset += len(text) + len(BATCH_SEPARATOR)
+
+        return self._extract_segments(BATCH_SEPARATOR.join(texts), segments)
+
+    def _extract_segments(
+        self,
+        buffer: str,
+        segments: list[tuple[int, int]],
+    ) -> list[list[ExtractedMention]]:
+        """Extract mentions from each document segment of a buffer.
+
+        Args:
+            buffer: One document, or several joined by BATCH_SEPARATOR.
+            segments: (start, end) of each document in the buffer.
+
+        Returns:
+            Mentions for each segment, with offsets relative to the segment.
+        """
+        segment_starts = [start for start, _ in segments]
+        results: list[list[ExtractedMention]] = [[] for _ in segments]
         seen_spans: set[tuple[int, int]] = set()
 
-        # Parse sections once for efficient O(1) lookups
-        section_spans = self._section_parser.parse(text)
+        # Parse sections once for efficient O(log n) lookups
+        section_index = self._section_parser.index(buffer)
 
-        # Build section lookup map for O(1) access
-        # Key is character offset, value is section
-        def get_section_at_offset(offset: int) -> ClinicalSection:
+        def get_section_at_offset(offset: int, segment_start: int) -> ClinicalSection:
             """Get section for offset using pre-parsed sections."""
-            for span in reversed(section_spans):
-                if span.start <= offset:
-                    return span.section
-            return ClinicalSection.UNKNOWN
+            span = section_index.span_at(offset)
+            # Sections of an earlier document do not carry over
+            if span is None or span.start < segment_start:
+                return ClinicalSection.UNKNOWN
+            return span.section
+
+        # Scan context triggers once; per-mention attributes are bisect lookups
+        buffer_context = self._context_engine.analyze(buffer)
+        segment_contexts = [buffer_context.segment(start, end) for start, end in segments]
 
         # Search text with Aho-Corasick automaton (O(n) complexity)
-        text_lower = text.lower()
+        buffer_lower = buffer.lower()
 
-        for end_index, (lexical_variant, domain_id, concept_id) in self._automaton.iter(text_lower):
+        for end_index, (lexical_variant, domain_id, concept_id) in self._automaton.iter(buffer_lower):
             # Calculate start position (end_index is inclusive)
             pattern_len = len(lexical_variant)
             start = end_index - pattern_len + 1
             end = end_index + 1
 
+            # Drop matches in or across the separator between documents
+            segment = bisect_right(segment_starts, start) - 1
+            if segment < 0 or end > segments[segment][1]:
+                continue
+            segment_start = segment_starts[segment]
+
             # Get the original text (preserve case)
-            matched_text = text[start:end]
+            matched_text = buffer[start:end]
 
             # Verify word boundaries (automaton matches substrings)
-            if not self._is_word_boundary(text, start, end):
+            if not self._is_word_boundary(buffer, start, end):
                 continue
 
             # Skip if we've already found a mention at this span
@@ -336,50 +505,42 @@ class RuleBasedNLPService(BaseNLPService):
 
             seen_spans.add((start, end))
 
-            # Get context for attribute detection
-            # Use preceding context for negation (NegEx-style)
-            preceding_context = self._get_preceding_context(text, start)
-            # Use surrounding context for temporality and experiencer
-            surrounding_context = self._get_context_window(text, start, end)
+            # Determine attributes from context: preceding text for negation
+            # (NegEx-style), surrounding text for temporality and experiencer
+            document_context = segment_contexts[segment]
+            assertion = document_context.assertion(start)
+            temporality = document_context.temporality(start, end)
+            experiencer = document_context.experiencer(start, end)
 
-            # Determine attributes from context
-            assertion = self._detect_assertion(preceding_context)
-            temporality = self._detect_temporality(surrounding_context)
-            experiencer = self._detect_experiencer(surrounding_context)
-
-            # Get section using pre-parsed sections (O(1) lookup)
-            clinical_section = get_section_at_offset(start)
+            # Get section using pre-parsed sections
+            clinical_section = get_section_at_offset(start, segment_start)
             section_name = clinical_section.value if clinical_section != ClinicalSection.UNKNOWN else None
 
-            # Calculate comprehensive confidence score
-            confidence = self._calculate_confidence(
-                matched_text=matched_text,
-                lexical_variant=lexical_variant,
-                concept_id=concept_id,
-                domain_id=domain_id,
-                clinical_section=clinical_section,
-                assertion=assertion,
-            )
-
             mention = ExtractedMention(
                 text=matched_text,
-                start_offset=start,
-                end_offset=end,
+                start_offset=start - segment_start,
+                end_offset=end - segment_start,
                 lexical_variant=lexical_variant,
                 section=section_name,
                 assertion=assertion,
                 temporality=temporality,
                 experiencer=experiencer,
-                confidence=confidence,
                 domain_hint=domain_id,  # Pass domain from vocabulary
                 omop_concept_id=concept_id,  # Direct concept_id if available
             )
-            mentions.append(mention)
+            results[segment].append(mention)
+
+        # Score every mention of the buffer in one columnar pass
+        all_mentions = [mention for mentions in results for mention in mentions]
+        scores = self._confidence_scorer.score_mentions(all_mentions).tolist()
+        for mention, confidence in zip(all_mentions, scores, strict=True):
+            mention.confidence = confidence
 
         # Sort mentions by position
-        mentions.sort(key=lambda m: m.start_offset)
+        for mentions in results:
+            mentions.sort(key=lambda m: m.start_offset)
 
-        return mentions
+        return results
 
     def _is_word_boundary(self, text: str, start: int, end: int) -> bool:
         """Check if match is at word boundaries.
@@ -409,50 +570,6 @@ class RuleBasedNLPService(BaseNLPService):
 
         return True
 
-    def _get_context_window(
-        self,
-        text: str,
-        start: int,
-        end: int,
-        window_size: int = 50,
-    ) -> str:
-        """Get text context around a mention for attribute detection.
-
-        Args:
-            text: Full document text.
-            start: Start offset of mention.
-            end: End offset of mention.
-            window_size: Characters to include before/after mention.
-
-        Returns:
-            Context string including the mention.
-        """
-        context_start = max(0, start - window_size)
-        context_end = min(len(text), end + window_size)
-        return text[context_start:context_end].lower()
-
-    def _get_preceding_context(
-        self,
-        text: str,
-        start: int,
-        window_size: int = 50,
-    ) -> str:
-        """Get text BEFORE a mention for negation detection.
-
-        NegEx-style negation typically only looks at preceding text,
-        not following text.
-
-        Args:
-            text: Full document text.
-            start: Start offset of mention.
-            window_size: Characters to include before mention.
-
-        Returns:
-            Preceding context string (lowercase).
-        """
-        context_start = max(0, start - window_size)
-        return text[context_start:start].lower()
-
     def _detect_assertion(self, context: str) -> Assertion:
         """Detect assertion status from context.
 
@@ -468,38 +585,7 @@ class RuleBasedNLPService(BaseNLPService):
         Returns:
             Assertion enum value (PRESENT, ABSENT, or POSSIBLE).
         """
-        # Find positions of all triggers (we want the one closest to the mention)
-        # The mention is at the END of context, so higher position = closer
-
-        def find_closest_match(patterns: list[str]) -> int:
-            """Find the position of the closest match to end of context."""
-            best_pos = -1
-            for pattern in patterns:
-                for match in re.finditer(pattern, context, re.IGNORECASE):
-                    if match.end() > best_pos:
-                        best_pos = match.end()
-            return best_pos
-
-        uncertainty_pos = find_closest_match(self.UNCERTAINTY_TRIGGERS)
-        positive_pos = find_closest_match(self.POSITIVE_TRIGGERS)
-        negation_pos = find_closest_match(self.NEGATION_TRIGGERS)
-
-        # If no triggers found, default to PRESENT
-        if uncertainty_pos == -1 and positive_pos == -1 and negation_pos == -1:
-            return Assertion.PRESENT
-
-        # The closest trigger to the mention wins
-        # Use the END position of match (higher = closer to mention)
-        max_pos = max(uncertainty_pos, positive_pos, negation_pos)
-
-        if uncertainty_pos == max_pos:
-            return Assertion.POSSIBLE
-        elif positive_pos == max_pos:
-            return Assertion.PRESENT
-        elif negation_pos == max_pos:
-            return Assertion.ABSENT
-
-        return Assertion.PRESENT
+        return self._context_engine.detect_assertion(context)
 
     def _detect_temporality(self, context: str) -> Temporality:
         """Detect temporality from context.
@@ -512,11 +598,7 @@ class RuleBasedNLPService(BaseNLPService):
         Returns:
             Temporality enum value (CURRENT, PAST, or FUTURE).
         """
-        for pattern in self.PAST_TRIGGERS:
-            if re.search(pattern, context, re.IGNORECASE):
-                return Temporality.PAST
-
-        return Temporality.CURRENT
+        return self._context_engine.detect_temporality(context)
 
     def _detect_experiencer(self, context: str) -> Experiencer:
         """Detect experiencer from context.
@@ -529,11 +611,7 @@ class RuleBasedNLPService(BaseNLPService):
         Returns:
             Experiencer enum value (PATIENT, FAMILY, or OTHER).
         """
-        for pattern in self.FAMILY_TRIGGERS:
-            if re.search(pattern, context, re.IGNORECASE):
-                return Experiencer.FAMILY
-
-        return Experiencer.PATIENT
+        return self._context_engine.detect_experiencer(context)
 
     def _calculate_confidence(
         self,
@@ -564,49 +642,12 @@ class RuleBasedNLPService(BaseNLPService):
         Returns:
             Confidence score between 0.0 and 1.0.
         """
-        weights = self.CONFIDENCE_WEIGHTS
-        score = 0.0
-
-        # 1. Base confidence (vocabulary match = high quality)
-        score += weights["base"] * 1.0
-
-        # 2. Term length scoring (longer = more specific)
-        # Scale: 2 chars = 0.3, 5 chars = 0.6, 10+ chars = 1.0
-        term_len = len(matched_text)
-        if term_len >= 10:
-            length_score = 1.0
-        elif term_len >= 5:
-            length_score = 0.6 + (term_len - 5) * 0.08  # 0.6 to 1.0
-        else:
-            length_score = 0.3 + (term_len - 2) * 0.1  # 0.3 to 0.6
-        score += weights["term_length"] * length_score
-
-        # 3. Section-domain fit
-        section_modifier = self._section_parser.calculate_confidence_modifier(
-            clinical_section, domain_id or "Observation"
+        scores = self._confidence_scorer.score(
+            [matched_text],
+            [lexical_variant],
+            [concept_id],
+            [domain_id],
+            [clinical_section],
+            [assertion],
         )
-        # Normalize modifier from 0.8-1.1 range to 0.0-1.0
-        section_score = (section_modifier - 0.8) / 0.3
-        section_score = max(0.0, min(1.0, section_score))
-        score += weights["section_fit"] * section_score
-
-        # 4. Specificity (has concept_id = known OMOP entity)
-        specificity_score = 1.0 if concept_id is not None else 0.5
-        score += weights["specificity"] * specificity_score
-
-        # 5. Case match bonus (exact match = higher quality)
-        if matched_text == lexical_variant:
-            case_score = 1.0
-        elif matched_text.lower() == lexical_variant.lower():
-            case_score = 0.8  # Case-insensitive match
-        else:
-            case_score = 0.5  # Partial/fuzzy match
-        score += weights["case_match"] * case_score
-
-        # Apply assertion penalty for uncertain extractions
-        # POSSIBLE assertions get slight reduction (uncertainty = less confident)
-        if assertion == Assertion.POSSIBLE:
-            score *= 0.9
-
-        # Clamp to valid range
-        return max(0.0, min(1.0, score))
+        return float(scores[0])
@@ -17,15 +17,25 @@ which performs SQL queries instead of in-memory matching.
 
 import json
 import logging
+import time
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import Column, Integer, MetaData, Select, Table, and_, func, insert, select
 from sqlalchemy.orm import Session
 
+from app.core.checksums import hash_files
 from app.core.database import get_sync_engine
 from app.models import Concept, ConceptSynonym
 from app.schemas.base import Domain
+from app.services.vocabulary_db import get_vocabulary_version
+from app.services.vocabulary_store import (
+    ConceptRecord,
+    ConceptSequence,
+    VocabularyStore,
+    VocabularyStoreBuilder,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +85,39 @@ NLP_DOMAINS = {
 # Standard concept flags (OMOP CDM standard_concept values)
 STANDARD_CONCEPT_FLAGS = {"S", "C"}  # Standard and Classification concepts
 
+# Rows fetched per round trip while streaming the load queries
+LOAD_BATCH_SIZE = 10_000
+
+# Columns read for each concept (no ORM entities are built)
+_CONCEPT_COLUMNS = (
+    Concept.concept_id,
+    Concept.concept_name,
+    Concept.vocabulary_id,
+    Concept.domain_id,
+)
+
+# Progress callback: (phase name, rows loaded so far)
+LoadProgress = Callable[[str, int], None]
+
+
+def _create_loaded_ids_table(session: Session) -> Table:
+    """Create the session-local temporary table of loaded concept IDs.
+
+    Args:
+        session: Session whose connection owns the table.
+
+    Returns:
+        The table (drop it when the load is done).
+    """
+    table = Table(
+        "nlp_vocabulary_loaded_ids",
+        MetaData(),
+        Column("concept_id", Integer, primary_key=True),
+        prefixes=["TEMPORARY"],
+    )
+    table.create(session.connection(), checkfirst=True)
+    return table
+
 
 @dataclass
 class NLPConcept:
@@ -100,6 +143,17 @@ class NLPConcept:
         return domain_map.get(self.domain_id, Domain.OBSERVATION)
 
 
+def _to_nlp_concept(record: ConceptRecord) -> NLPConcept:
+    """Materialize a stored concept."""
+    return NLPConcept(
+        concept_id=record.concept_id,
+        concept_name=record.concept_name,
+        vocabulary_id=record.vocabulary_id,
+        domain_id=record.domain_id,
+        synonyms=record.synonyms,
+    )
+
+
 class FilteredNLPVocabularyService:
     """Filtered vocabulary service for memory-efficient NLP extraction.
 
@@ -128,21 +182,55 @@ class FilteredNLPVocabularyService:
         self._max_concepts = max_concepts
         self._vocabularies = vocabularies or NLP_VOCABULARIES
         self._domains = domains or NLP_DOMAINS
-        self._concepts: list[NLPConcept] = []
-        self._synonym_index: dict[str, list[NLPConcept]] = {}
+        # Concepts and the synonym index, packed into arrays
+        self._store: VocabularyStore = VocabularyStore.empty()
         self._loaded = False
+        self._load_timings: dict[str, float] = {}
 
     @property
-    def concepts(self) -> list[NLPConcept]:
-        """Get all loaded concepts."""
-        return self._concepts
+    def concepts(self) -> Sequence[NLPConcept]:
+        """Get all loaded concepts (materialized from the store on access)."""
+        return ConceptSequence(self._store, _to_nlp_concept)
 
     @property
     def is_loaded(self) -> bool:
         """Check if vocabulary has been loaded."""
         return self._loaded
 
-    def load(self) -> None:
+    @property
+    def load_timings(self) -> dict[str, float]:
+        """Get the duration of each load phase (and the total) in milliseconds."""
+        return dict(self._load_timings)
+
+    def cache_fingerprint(self) -> str | None:
+        """Get a fingerprint of the vocabulary sources without loading them.
+
+        Combines the clinical abbreviations file hash, the filter settings
+        and the vocabulary version marker (bumped by triggers on every change
+        to the concept tables), so derived artifacts such as the cached NLP
+        automaton are rebuilt when any of them change.
+
+        Returns:
+            Fingerprint string, or None if no version marker exists.
+        """
+        with Session(get_sync_engine()) as session:
+            version = get_vocabulary_version(session)
+        if version is None:
+            return None
+
+        filters = "|".join([
+            str(self._max_concepts),
+            ",".join(sorted(self._vocabularies)),
+            ",".join(sorted(self._domains)),
+            ",".join(f"{v}/{c}" for v, c in PRIORITY_CONCEPT_CLASSES),
+            ",".join(sorted(STANDARD_CONCEPT_FLAGS)),
+        ])
+        return (
+            f"{type(self).__name__}:{hash_files(CLINICAL_ABBREVIATIONS_FILE)}:"
+            f"{filters}:{version}"
+        )
+
+    def load(self, progress: LoadProgress | None = None) -> None:
         """Load filtered vocabulary from database.
 
         Uses a priority-based loading strategy:
@@ -153,6 +241,15 @@ class FilteredNLPVocabularyService:
         This ensures clinical abbreviations (which have correct domains) are
         matched BEFORE database concepts. For example, "creatinine" should be
         Measurement (from our abbreviations), not Drug (from RxNorm).
+
+        Rows are streamed in batches of column-only selects. Loaded concept
+        IDs go to a temporary table, which the fill phase anti-joins and the
+        synonym query joins, so no ID lists are sent to the database.
+        Phase durations are available from load_timings afterwards.
+
+        Args:
+            progress: Optional callback receiving (phase, rows loaded so far)
+                after each batch.
         """
         if self._loaded:
             return
@@ -161,106 +258,113 @@ class FilteredNLPVocabularyService:
             f"Loading filtered NLP vocabulary (max {self._max_concepts} concepts)..."
         )
 
+        load_start = time.perf_counter()
+        self._load_timings = {}
+        builder = VocabularyStoreBuilder()
+
         # Phase 0: Load clinical abbreviations FIRST (highest priority)
         # These are curated terms with correct domains that should take precedence
-        self._load_clinical_abbreviations()
-        curated_synonyms = set(self._synonym_index.keys())
-        logger.info(f"Loaded {len(self._concepts)} clinical abbreviations with {len(curated_synonyms)} synonyms")
+        phase_start = time.perf_counter()
+        self._load_clinical_abbreviations(builder)
+        curated_synonyms = builder.term_keys()
+        self._record_phase("abbreviations", phase_start)
+        logger.info(f"Loaded {len(builder)} clinical abbreviations with {len(curated_synonyms)} synonyms")
 
-        db_concepts = []
-        loaded_ids: set[int] = set()
+        # Concept rows are (concept_id, concept_name, vocabulary_id, domain_id)
+        db_concepts: list[tuple[int, str, str, str]] = []
 
         with Session(get_sync_engine()) as session:
-            # Phase 1: Load priority concept classes first
-            for vocab_id, concept_class in PRIORITY_CONCEPT_CLASSES:
-                if len(db_concepts) >= self._max_concepts:
-                    break
-
-                remaining = self._max_concepts - len(db_concepts)
-                logger.info(f"Loading {vocab_id}/{concept_class} (up to {remaining})...")
-
-                stmt = (
-                    select(Concept)
-                    .where(
-                        and_(
-                            Concept.vocabulary_id == vocab_id,
-                            Concept.concept_class_id == concept_class,
-                            Concept.standard_concept.in_(STANDARD_CONCEPT_FLAGS),
-                            Concept.domain_id.in_(self._domains),
+            loaded = _create_loaded_ids_table(session)
+            try:
+                # Phase 1: Load priority concept classes first
+                phase_start = time.perf_counter()
+                for vocab_id, concept_class in PRIORITY_CONCEPT_CLASSES:
+                    if len(db_concepts) >= self._max_concepts:
+                        break
+
+                    remaining = self._max_concepts - len(db_concepts)
+                    logger.info(f"Loading {vocab_id}/{concept_class} (up to {remaining})...")
+
+                    stmt = (
+                        select(*_CONCEPT_COLUMNS)
+                        .where(
+                            and_(
+                                Concept.vocabulary_id == vocab_id,
+                                Concept.concept_class_id == concept_class,
+                                Concept.standard_concept.in_(STANDARD_CONCEPT_FLAGS),
+                                Concept.domain_id.in_(self._domains),
+                            )
                         )
+                        # Shorter names first (base terms like "furosemide" before "furosemide 40mg tablet")
+                        .order_by(func.length(Concept.concept_name), Concept.concept_name)
+                        .limit(remaining)
                     )
-                    # Shorter names first (base terms like "furosemide" before "furosemide 40mg tablet")
-                    .order_by(func.length(Concept.concept_name), Concept.concept_name)
-                    .limit(remaining)
-                )
+                    self._stream_concepts(session, stmt, loaded, db_concepts, progress, "priority")
 
-                result = session.execute(stmt)
-                for concept in result.scalars():
-                    if concept.concept_id not in loaded_ids:
-                        db_concepts.append(concept)
-                        loaded_ids.add(concept.concept_id)
-
-                logger.info(f"  Loaded {len(db_concepts)} total concepts so far")
-
-            # Phase 2: Fill remaining with other standard concepts
-            if len(db_concepts) < self._max_concepts:
-                remaining = self._max_concepts - len(db_concepts)
-                logger.info(f"Filling remaining {remaining} slots with other concepts...")
-
-                stmt = (
-                    select(Concept)
-                    .where(
-                        and_(
-                            Concept.vocabulary_id.in_(self._vocabularies),
-                            Concept.domain_id.in_(self._domains),
-                            Concept.standard_concept.in_(STANDARD_CONCEPT_FLAGS),
-                            ~Concept.concept_id.in_(loaded_ids) if loaded_ids else True,
-                        )
-                    )
-                    .order_by(func.length(Concept.concept_name), Concept.concept_name)
-                    .limit(remaining)
-                )
+                    logger.info(f"  Loaded {len(db_concepts)} total concepts so far")
+                self._record_phase("priority", phase_start)
 
-                result = session.execute(stmt)
-                for concept in result.scalars():
-                    if concept.concept_id not in loaded_ids:
-                        db_concepts.append(concept)
-                        loaded_ids.add(concept.concept_id)
+                # Phase 2: Fill remaining with other standard concepts
+                phase_start = time.perf_counter()
+                if len(db_concepts) < self._max_concepts:
+                    remaining = self._max_concepts - len(db_concepts)
+                    logger.info(f"Filling remaining {remaining} slots with other concepts...")
 
-            logger.info(f"Loaded {len(db_concepts)} concepts total")
-
-            # Get concept IDs for synonym lookup
-            concept_ids = list(loaded_ids)
+                    # Exclude phase 1 concepts by anti-join on the loaded ids
+                    already_loaded = select(loaded.c.concept_id).where(
+                        loaded.c.concept_id == Concept.concept_id
+                    )
+                    stmt = (
+                        select(*_CONCEPT_COLUMNS)
+                        .where(
+                            and_(
+                                Concept.vocabulary_id.in_(self._vocabularies),
+                                Concept.domain_id.in_(self._domains),
+                                Concept.standard_concept.in_(STANDARD_CONCEPT_FLAGS),
+                                ~already_loaded.exists(),
+                            )
+                        )
+                        .order_by(func.length(Concept.concept_name), Concept.concept_name)
+                        .limit(remaining)
+                    )
+                    self._stream_concepts(session, stmt, loaded, db_concepts, progress, "fill")
+                self._record_phase("fill", phase_start)
 
-            # Load synonyms only for the filtered concepts
-            if concept_ids:
-                synonym_stmt = select(ConceptSynonym).where(
-                    ConceptSynonym.concept_id.in_(concept_ids)
-                )
-                synonym_result = session.execute(synonym_stmt)
-                all_synonyms = synonym_result.scalars().all()
+                logger.info(f"Loaded {len(db_concepts)} concepts total")
 
-                # Build synonym lookup by concept_id
+                # Load synonyms only for the filtered concepts (joined on the loaded ids)
+                phase_start = time.perf_counter()
                 synonyms_by_concept: dict[int, list[str]] = {}
-                for syn in all_synonyms:
-                    if syn.concept_id not in synonyms_by_concept:
-                        synonyms_by_concept[syn.concept_id] = []
-                    synonyms_by_concept[syn.concept_id].append(
-                        syn.concept_synonym_name.lower()
-                    )
-
-                logger.info(f"Found {len(all_synonyms)} synonyms for filtered concepts")
-            else:
-                synonyms_by_concept = {}
+                synonym_stmt = select(
+                    ConceptSynonym.concept_id, ConceptSynonym.concept_synonym_name
+                ).join(loaded, loaded.c.concept_id == ConceptSynonym.concept_id)
+                synonym_count = 0
+                result = session.execute(synonym_stmt, execution_options={"yield_per": LOAD_BATCH_SIZE})
+                for batch in result.partitions():
+                    for concept_id, synonym_name in batch:
+                        synonyms_by_concept.setdefault(concept_id, []).append(synonym_name.lower())
+                    synonym_count += len(batch)
+                    if progress:
+                        progress("synonyms", synonym_count)
+                self._record_phase("synonyms", phase_start)
+
+                logger.info(f"Found {synonym_count} synonyms for filtered concepts")
+            finally:
+                # Nothing was written besides the temporary table; end the
+                # transaction (failed or not) and drop it for good
+                session.rollback()
+                loaded.drop(session.connection(), checkfirst=True)
+                session.commit()
 
             # Build concept objects with synonyms
             # Skip synonyms already covered by clinical abbreviations
-            for db_concept in db_concepts:
+            phase_start = time.perf_counter()
+            for concept_id, concept_name, vocabulary_id, domain_id in db_concepts:
                 # Get synonyms for this concept
-                concept_synonyms = synonyms_by_concept.get(db_concept.concept_id, [])
+                concept_synonyms = synonyms_by_concept.get(concept_id, [])
 
                 # Always include the concept name itself
-                all_names = [db_concept.concept_name.lower()]
+                all_names = [concept_name.lower()]
                 all_names.extend(concept_synonyms)
 
                 # Deduplicate and filter out synonyms already in clinical abbreviations
@@ -275,34 +379,68 @@ class FilteredNLPVocabularyService:
                 if not unique_synonyms:
                     continue
 
-                concept = NLPConcept(
-                    concept_id=db_concept.concept_id,
-                    concept_name=db_concept.concept_name,
-                    vocabulary_id=db_concept.vocabulary_id,
-                    domain_id=db_concept.domain_id,
+                # Indexed under each (already lowercased) synonym
+                builder.add(
+                    concept_id=concept_id,
+                    concept_name=concept_name,
+                    concept_code="",
+                    vocabulary_id=vocabulary_id,
+                    domain_id=domain_id,
                     synonyms=unique_synonyms,
+                    terms=unique_synonyms,
                 )
-                self._concepts.append(concept)
-
-                # Build synonym index for fast lookup
-                for synonym in unique_synonyms:
-                    if synonym not in self._synonym_index:
-                        self._synonym_index[synonym] = []
-                    self._synonym_index[synonym].append(concept)
 
             # Clinical abbreviations already loaded in Phase 0 above
 
+            self._store = builder.build()
+            self._record_phase("build", phase_start)
             self._loaded = True
+            self._load_timings["total"] = round((time.perf_counter() - load_start) * 1000, 2)
             logger.info(
-                f"NLP vocabulary loaded: {len(self._concepts)} concepts, "
-                f"{len(self._synonym_index)} unique terms"
+                f"NLP vocabulary loaded: {len(self._store)} concepts, "
+                f"{self._store.term_count} unique terms in {self._load_timings['total']:.0f}ms "
+                f"(phases: {self._load_timings})"
             )
 
-    def _load_clinical_abbreviations(self) -> None:
+    def _stream_concepts(
+        self,
+        session: Session,
+        stmt: Select,
+        loaded: Table,
+        db_concepts: list[tuple[int, str, str, str]],
+        progress: LoadProgress | None,
+        phase: str,
+    ) -> None:
+        """Stream concept rows in batches, recording their IDs as loaded.
+
+        Args:
+            session: Open database session.
+            stmt: Column select yielding concept rows.
+            loaded: Temporary table of loaded concept IDs.
+            db_concepts: Rows are appended here.
+            progress: Optional progress callback.
+            phase: Phase name reported to the callback.
+        """
+        result = session.execute(stmt, execution_options={"yield_per": LOAD_BATCH_SIZE})
+        for batch in result.partitions():
+            rows = [tuple(row) for row in batch]
+            db_concepts.extend(rows)
+            session.execute(insert(loaded), [{"concept_id": row[0]} for row in rows])
+            if progress:
+                progress(phase, len(db_concepts))
+
+    def _record_phase(self, phase: str, phase_start: float) -> None:
+        """Record the duration of a load phase in milliseconds."""
+        self._load_timings[phase] = round((time.perf_counter() - phase_start) * 1000, 2)
+
+    def _load_clinical_abbreviations(self, builder: VocabularyStoreBuilder) -> None:
         """Load clinical abbreviations for labs, vitals, and common terms.
 
         These are curated short forms that aren't in OMOP vocabularies
         but are essential for clinical NLP extraction.
+
+        Args:
+            builder: Store builder the abbreviation concepts are added to.
         """
         if not CLINICAL_ABBREVIATIONS_FILE.exists():
             logger.warning(f"Clinical abbreviations file not found: {CLINICAL_ABBREVIATIONS_FILE}")
@@ -325,20 +463,15 @@ class FilteredNLPVocabularyService:
                     continue
 
                 # Create NLP concept for this abbreviation
-                concept = NLPConcept(
+                builder.add(
                     concept_id=concept_id,
                     concept_name=name,
+                    concept_code="",
                     vocabulary_id="Clinical Abbreviations",
                     domain_id=domain_str,
                     synonyms=synonyms,
+                    terms=synonyms,
                 )
-                self._concepts.append(concept)
-
-                # Add to synonym index
-                for synonym in synonyms:
-                    if synonym not in self._synonym_index:
-                        self._synonym_index[synonym] = []
-                    self._synonym_index[synonym].append(concept)
 
                 added_count += 1
 
@@ -360,35 +493,22 @@ class FilteredNLPVocabularyService:
         if not self._loaded:
             self.load()
 
-        term_lower = term.lower()
-        matches = self._synonym_index.get(term_lower, [])
+        store = self._store
+        indices = store.lookup(term.lower())
 
         if domain:
-            matches = [c for c in matches if c.domain_id == domain]
+            indices = [i for i in indices if store.domain_id(i) == domain]
 
-        return matches
+        return [_to_nlp_concept(store.record(i)) for i in indices]
 
     def get_statistics(self) -> dict[str, int]:
         """Get vocabulary statistics."""
         if not self._loaded:
             self.load()
 
-        stats: dict[str, int] = {"total_concepts": len(self._concepts)}
-
-        # Count by domain
-        domain_counts: dict[str, int] = {}
-        for concept in self._concepts:
-            domain = concept.domain_id
-            domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-        # Count by vocabulary
-        vocab_counts: dict[str, int] = {}
-        for concept in self._concepts:
-            vocab = concept.vocabulary_id
-            vocab_counts[vocab] = vocab_counts.get(vocab, 0) + 1
-
-        stats["domains"] = domain_counts
-        stats["vocabularies"] = vocab_counts
-        stats["total_synonyms"] = len(self._synonym_index)
+        stats: dict[str, int] = {"total_concepts": len(self._store)}
+        stats["domains"] = self._store.domain_counts()
+        stats["vocabularies"] = self._store.vocabulary_counts()
+        stats["total_synonyms"] = self._store.term_count
 
         return stats
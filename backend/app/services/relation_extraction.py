@@ -12,6 +12,9 @@ Uses pattern matching and dependency parsing for relation detection.
 
 import logging
 import re
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
@@ -22,6 +25,9 @@ from app.services.nlp import ExtractedMention
 
 logger = logging.getLogger(__name__)
 
+# Sentence ends used for the optional sentence window
+_SENTENCE_BOUNDARY = re.compile(r"[.!?](?=\s)|\n\s*\n")
+
 
 class RelationType(str, Enum):
     """Types of clinical relationships."""
@@ -93,81 +99,89 @@ class ExtractedRelation:
 # Pattern format: (regex, source_domain, target_domain, relation_type)
 # Source is captured in group 1, target in group 2
 
+# Longest entity phrase (in words) a pattern captures. Bounding the repetition
+# keeps every pattern linear in the length of the text it scans.
+MAX_PHRASE_WORDS = 6
+
+# An entity phrase of up to MAX_PHRASE_WORDS words, and a one- or two-word term
+_PHRASE = rf"(\b\w+(?:\s+\w+){{0,{MAX_PHRASE_WORDS - 1}}}\b)"
+_TERM = r"(\b\w+(?:\s+\w+)?\b)"
+
 TREATMENT_PATTERNS = [
     # Drug for Condition patterns
-    (r"(\b\w+(?:\s+\w+)?\b)\s+(?:for|to\s+treat|for\s+treatment\s+of)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_TERM + r"\s+(?:for|to\s+treat|for\s+treatment\s+of)\s+" + _PHRASE,
      Domain.DRUG.value, Domain.CONDITION.value, RelationType.TREATS),
 
     # Started on Drug for Condition
-    (r"started\s+(?:on\s+)?(\b\w+(?:\s+\w+)?\b)\s+for\s+(\b\w+(?:\s+\w+)*\b)",
+    (r"started\s+(?:on\s+)?" + _TERM + r"\s+for\s+" + _PHRASE,
      Domain.DRUG.value, Domain.CONDITION.value, RelationType.PRESCRIBED_FOR),
 
     # Continue Drug for Condition
-    (r"continue\s+(\b\w+(?:\s+\w+)?\b)\s+for\s+(\b\w+(?:\s+\w+)*\b)",
+    (r"continue\s+" + _TERM + r"\s+for\s+" + _PHRASE,
      Domain.DRUG.value, Domain.CONDITION.value, RelationType.TREATS),
 
     # Condition - Drug pattern (common in assessment)
-    (r"(\b\w+(?:\s+\w+)*\b)\s*[-–:]\s*(?:start|continue|on)\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r"\s*[-–:]\s*(?:start|continue|on)\s+" + _TERM,
      Domain.CONDITION.value, Domain.DRUG.value, RelationType.TREATS),
 
     # Patient on Drug for Condition
-    (r"(?:patient\s+)?on\s+(\b\w+(?:\s+\w+)?\b)\s+for\s+(?:his|her|their\s+)?(\b\w+(?:\s+\w+)*\b)",
+    (r"(?:patient\s+)?on\s+" + _TERM + r"\s+for\s+(?:his|her|their\s+)?" + _PHRASE,
      Domain.DRUG.value, Domain.CONDITION.value, RelationType.TREATS),
 
     # Condition, treated with Drug (history format)
-    (r"(\b\w+(?:\s+\w+)*\b),?\s+(?:treated|managed)\s+(?:with|on)\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r",?\s+(?:treated|managed)\s+(?:with|on)\s+" + _TERM,
      Domain.CONDITION.value, Domain.DRUG.value, RelationType.TREATS),
 
     # Condition, controlled on Drug (history format)
-    (r"(\b\w+(?:\s+\w+)*\b),?\s+(?:controlled|stable)\s+(?:on|with)\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r",?\s+(?:controlled|stable)\s+(?:on|with)\s+" + _TERM,
      Domain.CONDITION.value, Domain.DRUG.value, RelationType.TREATS),
 
     # Condition, on Drug (simplified history format)
-    (r"(\b\w+(?:\s+\w+)*\b),?\s+on\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r",?\s+on\s+" + _TERM,
      Domain.CONDITION.value, Domain.DRUG.value, RelationType.TREATS),
 ]
 
 ADVERSE_PATTERNS = [
     # Drug causes Side Effect
-    (r"(\b\w+(?:\s+\w+)?\b)\s+(?:caused?|causing|leads?\s+to|resulted?\s+in)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_TERM + r"\s+(?:caused?|causing|leads?\s+to|resulted?\s+in)\s+" + _PHRASE,
      Domain.DRUG.value, Domain.CONDITION.value, RelationType.CAUSES),
 
     # Side effect from Drug
-    (r"(\b\w+(?:\s+\w+)*\b)\s+(?:from|due\s+to|secondary\s+to)\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r"\s+(?:from|due\s+to|secondary\s+to)\s+" + _TERM,
      Domain.CONDITION.value, Domain.DRUG.value, RelationType.CAUSED_BY),
 
     # Allergic to Drug
-    (r"allergic\s+(?:to|reaction\s+to)\s+(\b\w+(?:\s+\w+)?\b)",
+    (r"allergic\s+(?:to|reaction\s+to)\s+" + _TERM,
      None, Domain.DRUG.value, RelationType.CONTRAINDICATED_FOR),
 ]
 
 DIAGNOSTIC_PATTERNS = [
     # Test shows/reveals Condition
-    (r"(\b\w+(?:\s+\w+)?\b)\s+(?:shows?|revealed?|demonstrates?|confirms?)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_TERM + r"\s+(?:shows?|revealed?|demonstrates?|confirms?)\s+" + _PHRASE,
      Domain.MEASUREMENT.value, Domain.CONDITION.value, RelationType.DIAGNOSES),
 
     # Condition diagnosed by Test
-    (r"(\b\w+(?:\s+\w+)*\b)\s+(?:diagnosed\s+(?:by|with|on)|confirmed\s+(?:by|on))\s+(\b\w+(?:\s+\w+)?\b)",
+    (_PHRASE + r"\s+(?:diagnosed\s+(?:by|with|on)|confirmed\s+(?:by|on))\s+" + _TERM,
      Domain.CONDITION.value, Domain.MEASUREMENT.value, RelationType.DIAGNOSES),
 
     # Symptom suggestive of Condition
-    (r"(\b\w+(?:\s+\w+)*\b)\s+(?:suggestive\s+of|consistent\s+with|indicative\s+of|concerning\s+for)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_PHRASE + r"\s+(?:suggestive\s+of|consistent\s+with|indicative\s+of|concerning\s+for)\s+" + _PHRASE,
      Domain.OBSERVATION.value, Domain.CONDITION.value, RelationType.INDICATES),
 ]
 
 PROCEDURE_PATTERNS = [
     # Procedure for Condition
-    (r"(\b\w+(?:\s+\w+)*\b)\s+(?:for|to\s+treat|performed\s+for)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_PHRASE + r"\s+(?:for|to\s+treat|performed\s+for)\s+" + _PHRASE,
      Domain.PROCEDURE.value, Domain.CONDITION.value, RelationType.PERFORMED_FOR),
 
     # Condition - Procedure pattern
-    (r"(\b\w+(?:\s+\w+)*\b)\s*[-–:]\s*(?:schedule|perform|undergo)\s+(\b\w+(?:\s+\w+)*\b)",
+    (_PHRASE + r"\s*[-–:]\s*(?:schedule|perform|undergo)\s+" + _PHRASE,
      Domain.CONDITION.value, Domain.PROCEDURE.value, RelationType.REQUIRES),
 ]
 
 ANATOMICAL_PATTERNS = [
     # Condition in/of Anatomy
-    (r"(\b\w+(?:\s+\w+)*\b)\s+(?:in|of|involving)\s+(?:the\s+)?(\b\w+(?:\s+\w+)*\b)",
+    (_PHRASE + r"\s+(?:in|of|involving)\s+(?:the\s+)?" + _PHRASE,
      Domain.CONDITION.value, Domain.SPEC_ANATOMIC_SITE.value, RelationType.LOCATED_IN),
 
     # Anatomy Condition (e.g., "chest pain", "knee arthritis")
@@ -185,6 +199,50 @@ ALL_PATTERNS = (
     ANATOMICAL_PATTERNS
 )
 
+# A repeated group without an upper bound ("(...)*" / "(...)+"); nested
+# inside another quantifier this backtracks exponentially on long inputs
+_UNBOUNDED_GROUP_REPEAT = re.compile(r"\)[*+]")
+
+
+def _compile_patterns(
+    patterns: list[tuple[str, str | None, str | None, RelationType]],
+) -> list[tuple[re.Pattern, str | None, str | None, RelationType]]:
+    """Compile relation patterns, rejecting unbounded group repetition.
+
+    Raises:
+        ValueError: If a pattern repeats a group without an upper bound.
+    """
+    compiled = []
+    for pattern, source_domain, target_domain, relation_type in patterns:
+        if _UNBOUNDED_GROUP_REPEAT.search(pattern):
+            raise ValueError(f"Relation pattern repeats a group without a bound: {pattern}")
+        compiled.append((re.compile(pattern, re.IGNORECASE), source_domain, target_domain, relation_type))
+    return compiled
+
+
+# Compiled once at import
+COMPILED_PATTERNS = _compile_patterns(ALL_PATTERNS)
+
+
+def sentence_segments(text: str) -> list[tuple[int, int]]:
+    """Split text into sentence-like segments.
+
+    Args:
+        text: Clinical text.
+
+    Returns:
+        (start, end) offsets covering the text, split after sentence
+        punctuation and blank lines.
+    """
+    segments = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        segments.append((start, match.end()))
+        start = match.end()
+    if start < len(text):
+        segments.append((start, len(text)))
+    return segments
+
 
 @dataclass
 class RelationExtractionConfig:
@@ -196,12 +254,19 @@ class RelationExtractionConfig:
     # Maximum distance between entities (in characters)
     max_entity_distance: int = 200
 
+    # Maximum sentences between paired entities for proximity relations
+    # (None = only the character distance applies)
+    max_sentence_distance: int | None = None
+
     # Use dependency parsing if available
     use_dependency_parsing: bool = True
 
     # Use pattern matching
     use_patterns: bool = True
 
+    # Time allowed for pattern matching per document (milliseconds)
+    pattern_time_budget_ms: float = 1000.0
+
     # Domain filters (only extract relations between these domains)
     allowed_source_domains: list[str] | None = None
     allowed_target_domains: list[str] | None = None
@@ -233,6 +298,8 @@ class RelationExtractionService:
     _nlp: Any = field(default=None, init=False, repr=False)
     _spacy_available: bool = field(default=False, init=False)
     _initialized: bool = field(default=False, init=False)
+    # Pattern -> number of documents where it exhausted the time budget
+    budget_overruns: dict[str, int] = field(default_factory=dict, init=False)
 
     def _initialize(self) -> None:
         """Lazy initialization of NLP components."""
@@ -254,12 +321,19 @@ class RelationExtractionService:
         self._initialized = True
 
     def _extract_pattern_relations(self, text: str) -> list[ExtractedRelation]:
-        """Extract relations using pattern matching."""
+        """Extract relations using pattern matching.
+
+        Patterns run sentence by sentence. If matching exceeds the per-document
+        time budget the remaining patterns are skipped and the pattern that
+        was running is recorded in budget_overruns.
+        """
         relations: list[ExtractedRelation] = []
+        segments = sentence_segments(text)
+        deadline = time.perf_counter() + self.config.pattern_time_budget_ms / 1000
 
-        for pattern, source_domain, target_domain, relation_type in ALL_PATTERNS:
-            try:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
+        for pattern, source_domain, target_domain, relation_type in COMPILED_PATTERNS:
+            for segment_start, segment_end in segments:
+                for match in pattern.finditer(text, segment_start, segment_end):
                     # Get matched groups
                     groups = match.groups()
                     if len(groups) >= 2:
@@ -292,9 +366,15 @@ class RelationExtractionService:
                     )
                     relations.append(relation)
 
-            except re.error as e:
-                logger.debug(f"Pattern error: {e}")
-                continue
+                if time.perf_counter() > deadline:
+                    self.budget_overruns[pattern.pattern] = (
+                        self.budget_overruns.get(pattern.pattern, 0) + 1
+                    )
+                    logger.warning(
+                        f"Relation pattern matching exceeded {self.config.pattern_time_budget_ms}ms "
+                        f"on a {len(text)}-character document; stopped at pattern {pattern.pattern!r}"
+                    )
+                    return relations
 
         return relations
 
@@ -320,55 +400,96 @@ class RelationExtractionService:
              ["for", "to treat", "performed"]),
         ]
 
-        # Check all pairs of mentions
-        for i, source_mention in enumerate(mentions):
-            for j, target_mention in enumerate(mentions):
-                if i == j:
-                    continue
-
-                # Check distance
-                distance = abs(source_mention.start_offset - target_mention.start_offset)
-                if distance > self.config.max_entity_distance:
-                    continue
-
-                # Check domain rules
-                for src_domain, tgt_domain, rel_type, keywords in domain_rules:
-                    if (source_mention.domain_hint == src_domain and
-                        target_mention.domain_hint == tgt_domain):
-
-                        # Get text between entities
-                        start = min(source_mention.end_offset, target_mention.end_offset)
-                        end = max(source_mention.start_offset, target_mention.start_offset)
-                        between_text = text[start:end].lower()
-
-                        # Check for keywords
-                        has_keyword = any(kw in between_text for kw in keywords)
-
-                        if has_keyword or distance < 50:  # Close entities or keyword present
-                            confidence = 0.8 if has_keyword else 0.5
-
-                            relation = ExtractedRelation(
-                                source_text=source_mention.text,
-                                source_start=source_mention.start_offset,
-                                source_end=source_mention.end_offset,
-                                source_domain=source_mention.domain_hint,
-                                source_mention_id=None,  # Would be set if mentions have IDs
-                                target_text=target_mention.text,
-                                target_start=target_mention.start_offset,
-                                target_end=target_mention.end_offset,
-                                target_domain=target_mention.domain_hint,
-                                target_mention_id=None,
-                                relation_type=rel_type,
-                                confidence=confidence,
-                                evidence_text=text[min(source_mention.start_offset, target_mention.start_offset):
-                                                  max(source_mention.end_offset, target_mention.end_offset)],
-                                extraction_method="proximity",
-                            )
-                            relations.append(relation)
-                            break  # Only one relation per pair
+        rules_by_domains: dict[tuple[str, str], list[tuple[RelationType, list[str]]]] = (
+            defaultdict(list)
+        )
+        for src_domain, tgt_domain, rel_type, keywords in domain_rules:
+            rules_by_domains[(src_domain, tgt_domain)].append((rel_type, keywords))
+
+        # Only pairs within the distance window can relate
+        for i, j in self._candidate_pairs(text, mentions):
+            source_mention = mentions[i]
+            target_mention = mentions[j]
+            distance = abs(source_mention.start_offset - target_mention.start_offset)
+
+            # Check domain rules
+            rules = rules_by_domains.get((source_mention.domain_hint, target_mention.domain_hint))
+            for rel_type, keywords in rules or ():
+                # Get text between entities
+                start = min(source_mention.end_offset, target_mention.end_offset)
+                end = max(source_mention.start_offset, target_mention.start_offset)
+                between_text = text[start:end].lower()
+
+                # Check for keywords
+                has_keyword = any(kw in between_text for kw in keywords)
+
+                if has_keyword or distance < 50:  # Close entities or keyword present
+                    confidence = 0.8 if has_keyword else 0.5
+
+                    relation = ExtractedRelation(
+                        source_text=source_mention.text,
+                        source_start=source_mention.start_offset,
+                        source_end=source_mention.end_offset,
+                        source_domain=source_mention.domain_hint,
+                        source_mention_id=None,  # Would be set if mentions have IDs
+                        target_text=target_mention.text,
+                        target_start=target_mention.start_offset,
+                        target_end=target_mention.end_offset,
+                        target_domain=target_mention.domain_hint,
+                        target_mention_id=None,
+                        relation_type=rel_type,
+                        confidence=confidence,
+                        evidence_text=text[min(source_mention.start_offset, target_mention.start_offset):
+                                          max(source_mention.end_offset, target_mention.end_offset)],
+                        extraction_method="proximity",
+                    )
+                    relations.append(relation)
+                    break  # Only one relation per pair
 
         return relations
 
+    def _candidate_pairs(
+        self,
+        text: str,
+        mentions: list[ExtractedMention],
+    ) -> list[tuple[int, int]]:
+        """Get ordered mention pairs close enough to relate.
+
+        Sweeps the mentions sorted by start so each one is only paired with
+        neighbours within max_entity_distance (and max_sentence_distance, if
+        set), instead of with every other mention.
+
+        Args:
+            text: Original clinical text.
+            mentions: Extracted mentions, in any order.
+
+        Returns:
+            (source index, target index) pairs in the order a nested loop over
+            `mentions` would visit them.
+        """
+        max_distance = self.config.max_entity_distance
+        order = sorted(range(len(mentions)), key=lambda k: mentions[k].start_offset)
+        starts = [mentions[k].start_offset for k in order]
+
+        sentences: list[int] | None = None
+        if self.config.max_sentence_distance is not None:
+            boundaries = [m.end() for m in _SENTENCE_BOUNDARY.finditer(text)]
+            sentences = [bisect_right(boundaries, start) for start in starts]
+
+        neighbours: list[list[int]] = [[] for _ in mentions]
+        for a, i in enumerate(order):
+            for b in range(a + 1, bisect_right(starts, starts[a] + max_distance)):
+                if (
+                    sentences is not None
+                    and sentences[b] - sentences[a] > self.config.max_sentence_distance
+                ):
+                    break
+                j = order[b]
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+
+        return [(i, j) for i in range(len(mentions)) for j in sorted(neighbours[i])]
+
     def _extract_dependency_relations(
         self,
         text: str,
@@ -383,63 +504,64 @@ class RelationExtractionService:
         try:
             doc = self._nlp(text)
 
-            # Build a map of character positions to tokens
-            char_to_token: dict[int, Any] = {}
-            for token in doc:
-                for i in range(token.idx, token.idx + len(token.text)):
-                    char_to_token[i] = token
+            # Token boundaries, computed once per document
+            tokens = list(doc)
+            token_starts = [token.idx for token in tokens]
+            token_ends = [token.idx + len(token.text) for token in tokens]
 
-            # Find tokens for each mention
+            # Find tokens for each mention, and the mentions holding each token
             mention_tokens: dict[int, list] = {}
+            mentions_by_token: dict[int, list[int]] = defaultdict(list)
             for i, mention in enumerate(mentions):
-                tokens = []
-                for pos in range(mention.start_offset, mention.end_offset):
-                    if pos in char_to_token:
-                        token = char_to_token[pos]
-                        if token not in tokens:
-                            tokens.append(token)
-                mention_tokens[i] = tokens
-
-            # Check dependency paths between mention pairs
-            for i, source_mention in enumerate(mentions):
-                for j, target_mention in enumerate(mentions):
-                    if i == j:
-                        continue
-
-                    source_tokens = mention_tokens.get(i, [])
-                    target_tokens = mention_tokens.get(j, [])
-
-                    if not source_tokens or not target_tokens:
-                        continue
-
-                    # Check if there's a dependency path
-                    for src_token in source_tokens:
-                        for tgt_token in target_tokens:
-                            # Direct dependency
-                            if tgt_token.head == src_token:
-                                relation_type = self._dep_to_relation(
-                                    tgt_token.dep_,
-                                    source_mention.domain_hint,
-                                    target_mention.domain_hint,
+                first = bisect_right(token_ends, mention.start_offset)
+                last = bisect_left(token_starts, mention.end_offset)
+                mention_tokens[i] = tokens[first:last]
+                for position in range(first, last):
+                    mentions_by_token[position].append(i)
+
+            # Only pairs where a target token's head lies in the source can relate
+            candidates: set[tuple[int, int]] = set()
+            for j, target_tokens in mention_tokens.items():
+                for tgt_token in target_tokens:
+                    for i in mentions_by_token.get(tgt_token.head.i, ()):
+                        if i != j:
+                            candidates.add((i, j))
+
+            # Check dependency paths between candidate mention pairs
+            for i, j in sorted(candidates):
+                source_mention = mentions[i]
+                target_mention = mentions[j]
+                source_tokens = mention_tokens[i]
+                target_tokens = mention_tokens[j]
+
+                # Check if there's a dependency path
+                for src_token in source_tokens:
+                    for tgt_token in target_tokens:
+                        # Direct dependency
+                        if tgt_token.head == src_token:
+                            relation_type = self._dep_to_relation(
+                                tgt_token.dep_,
+                                source_mention.domain_hint,
+                                target_mention.domain_hint,
+                            )
+                            if relation_type:
+                                relation = ExtractedRelation(
+                                    source_text=source_mention.text,
+                                    source_start=source_mention.start_offset,
+                                    source_end=source_mention.end_offset,
+                                    source_domain=source_mention.domain_hint,
+                                    target_text=target_mention.text,
+                                    target_start=target_mention.start_offset,
+                                    target_end=target_mention.end_offset,
+                                    target_domain=target_mention.domain_hint,
+                                    relation_type=relation_type,
+                                    confidence=0.75,
+                                    evidence_text=text[min(src_token.idx, tgt_token.idx):
+                                                     max(src_token.idx + len(src_token.text),
+                                                         tgt_token.idx + len(tgt_token.text))],
+                                    extraction_method="dependency",
                                 )
-                                if relation_type:
-                                    relation = ExtractedRelation(
-                                        source_text=source_mention.text,
-                                        source_start=source_mention.start_offset,
-                                        source_end=source_mention.end_offset,
-                                        source_domain=source_mention.domain_hint,
-                                        target_text=target_mention.text,
-                                        target_start=target_mention.start_offset,
-                                        target_end=target_mention.end_offset,
-                                        target_domain=target_mention.domain_hint,
-                                        relation_type=relation_type,
-                                        confidence=0.75,
-                                        evidence_text=text[min(src_token.idx, tgt_token.idx):
-                                                         max(src_token.idx + len(src_token.text),
-                                                             tgt_token.idx + len(tgt_token.text))],
-                                        extraction_method="dependency",
-                                    )
-                                    relations.append(relation)
+                                relations.append(relation)
 
         except Exception as e:
             logger.warning(f"Dependency parsing failed: {e}")
@@ -5,9 +5,11 @@ section-domain affinity mapping for improved extraction accuracy.
 """
 
 import re
+from bisect import bisect_right
+from collections.abc import Hashable, Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import ClassVar
+from typing import ClassVar, Generic, Protocol, TypeVar
 
 
 class ClinicalSection(str, Enum):
@@ -63,18 +65,81 @@ class SectionSpan:
     end: int
     header_text: str  # The actual header text found
 
+    @property
+    def title(self) -> str:
+        """Header as written in the note, without the trailing colon."""
+        return self.header_text.rstrip(":").strip()
+
+
+class SectionSpanLike(Protocol):
+    """Any section span: a section label over [start, end)."""
+
+    start: int
+    end: int
+
+    @property
+    def section(self) -> Hashable: ...
+
+
+SpanT = TypeVar("SpanT", bound=SectionSpanLike)
+
+
+class SectionIndex(Generic[SpanT]):
+    """Offset-to-section lookups over a note's section spans.
+
+    Built once per note and queried per mention with a bisect, so lookups
+    cost O(log n) in the number of sections. Works for any span type with
+    start, end and section attributes (SectionParser and
+    clinical_context.SectionDetector spans alike).
+
+    Usage:
+        index = get_section_parser().index(note_text)
+        section = index.section_at(mention.start_offset)
+    """
+
+    def __init__(self, spans: Sequence[SpanT], unknown: Hashable = ClinicalSection.UNKNOWN) -> None:
+        """Index section spans.
+
+        Args:
+            spans: Section spans sorted by start; each ends where the next starts.
+            unknown: Section returned for offsets outside every span.
+        """
+        self.spans = list(spans)
+        self.unknown = unknown
+        self._starts = [span.start for span in self.spans]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[SpanT]:
+        return iter(self.spans)
+
+    def span_at(self, offset: int) -> SpanT | None:
+        """Get the span containing `offset`, or None before the first header."""
+        index = bisect_right(self._starts, offset) - 1
+        if index < 0:
+            return None
+        span = self.spans[index]
+        return span if offset < span.end else None
+
+    def section_at(self, offset: int) -> Hashable:
+        """Get the section containing `offset`, or the index's unknown section."""
+        span = self.span_at(offset)
+        return span.section if span is not None else self.unknown
+
 
 @dataclass
 class SectionParser:
     """Parser for clinical note sections.
 
-    Identifies section boundaries in clinical notes and provides
-    efficient O(1) section lookup for any character offset.
+    Identifies section boundaries in clinical notes in a single regex pass
+    and provides O(log n) section lookup for any character offset.
 
     Usage:
         parser = SectionParser()
         sections = parser.parse(note_text)
-        section = parser.get_section_at(note_text, offset)
+        index = parser.index(note_text)
+        section = index.section_at(offset)
     """
 
     # Section header patterns mapped to canonical sections
@@ -247,18 +312,24 @@ class SectionParser:
         },
     }
 
-    # Compiled patterns (lazy initialized)
-    _compiled_patterns: list[tuple[re.Pattern, ClinicalSection]] = field(
-        default_factory=list, repr=False
-    )
+    # All header patterns as one alternation, one named group per pattern
+    _compiled_pattern: re.Pattern | None = field(default=None, repr=False)
+    _group_sections: dict[str, ClinicalSection] = field(default_factory=dict, repr=False)
 
     def __post_init__(self) -> None:
         """Compile regex patterns."""
-        if not self._compiled_patterns:
-            self._compiled_patterns = [
-                (re.compile(pattern, re.IGNORECASE | re.MULTILINE), section)
-                for pattern, section in self.SECTION_PATTERNS
-            ]
+        if self._compiled_pattern is None:
+            # Alternatives are tried in list order, so the more specific
+            # patterns listed first win at any position
+            self._group_sections = {
+                f"s{i}": section for i, (_, section) in enumerate(self.SECTION_PATTERNS)
+            }
+            self._compiled_pattern = re.compile(
+                "|".join(
+                    f"(?P<s{i}>{pattern})" for i, (pattern, _) in enumerate(self.SECTION_PATTERNS)
+                ),
+                re.IGNORECASE | re.MULTILINE,
+            )
 
     def parse(self, text: str) -> list[SectionSpan]:
         """Parse a clinical note to identify section boundaries.
@@ -270,26 +341,16 @@ class SectionParser:
             List of SectionSpan objects representing identified sections.
         """
         sections: list[SectionSpan] = []
-        found_positions: set[int] = set()
-
-        # Find all section headers
-        for pattern, section in self._compiled_patterns:
-            for match in pattern.finditer(text):
-                start = match.start()
-                # Avoid duplicate sections at same position
-                if start in found_positions:
-                    continue
-                found_positions.add(start)
-
-                sections.append(SectionSpan(
-                    section=section,
-                    start=start,
-                    end=len(text),  # Will be updated below
-                    header_text=match.group().strip(),
-                ))
-
-        # Sort by position
-        sections.sort(key=lambda s: s.start)
+
+        # One pass finds every header; a header nested in a longer one
+        # (e.g. "Medications:" in "Discharge Medications:") is not split out
+        for match in self._compiled_pattern.finditer(text):
+            sections.append(SectionSpan(
+                section=self._group_sections[match.lastgroup],
+                start=match.start(),
+                end=len(text),  # Will be updated below
+                header_text=match.group().strip(),
+            ))
 
         # Update end positions (each section ends where the next begins)
         for i in range(len(sections) - 1):
@@ -297,9 +358,22 @@ class SectionParser:
 
         return sections
 
+    def index(self, text: str) -> SectionIndex[SectionSpan]:
+        """Parse a clinical note into an offset-to-section index.
+
+        Args:
+            text: The clinical note text.
+
+        Returns:
+            SectionIndex over the note's sections.
+        """
+        return SectionIndex(self.parse(text))
+
     def get_section_at(self, text: str, offset: int) -> ClinicalSection:
         """Get the clinical section for a given character offset.
 
+        Parses the note on every call; use `index` to look up many offsets.
+
         Args:
             text: The clinical note text.
             offset: Character offset to find section for.
@@ -307,13 +381,7 @@ class SectionParser:
         Returns:
             The ClinicalSection at the given offset.
         """
-        sections = self.parse(text)
-
-        for section_span in reversed(sections):
-            if section_span.start <= offset:
-                return section_span.section
-
-        return ClinicalSection.UNKNOWN
+        return self.index(text).section_at(offset)
 
     def get_domain_affinity(
         self, section: ClinicalSection, domain: str
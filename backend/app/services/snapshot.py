@@ -0,0 +1,311 @@
+"""Compiled, memory-mapped snapshots of prebuilt vocabulary indexes.
+
+The vocabulary and code suggester services json.load their fixtures
+(several MB for the CPT code set) and rebuild their synonym and trigram
+indexes in Python at every boot, in every API and worker process. A
+snapshot stores the finished index arrays in one binary file, built ahead
+of time with:
+
+    python -m app.scripts.build_snapshots
+
+Opening a snapshot memory-maps the file and parses only a small JSON
+header; arrays are zero-copy numpy views over the mapping and string
+tables are packed UTF-8 blobs (see StringTable), so nothing is parsed or
+re-indexed and the pages are shared between processes by the OS.
+
+Layout (little-endian)::
+
+    MAGIC | header length (uint64) | JSON header | arrays, each 64-byte aligned
+
+The header records the format version, the snapshot kind, the checksum of
+the source files the snapshot was built from, labels and other small
+metadata, and each array's dtype, shape and offset. A snapshot whose
+version, kind or source checksum does not match is ignored, and callers
+fall back to building from the sources.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.trigram_index import TrigramIndex
+from app.services.vocabulary_store import StringTable, VocabularyStore
+
+logger = logging.getLogger(__name__)
+
+# Bump when the file layout or the array naming of any snapshot kind changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+MAGIC = b"CONSNAP\x00"
+
+_LENGTH = struct.Struct("<Q")
+_ALIGNMENT = 64
+
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent.parent.parent / "snapshots"
+
+
+def snapshot_dir() -> Path:
+    """Get the snapshot directory (settings.vocabulary_snapshot_dir or backend/snapshots)."""
+    if settings.vocabulary_snapshot_dir:
+        return Path(settings.vocabulary_snapshot_dir)
+    return DEFAULT_SNAPSHOT_DIR
+
+
+def snapshot_path(kind: str) -> Path:
+    """Get the file a snapshot kind is stored in."""
+    return snapshot_dir() / f"{kind}.snap"
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class SnapshotWriter:
+    """Collects named arrays and writes them as a snapshot file.
+
+    Usage:
+        writer = SnapshotWriter("cpt", source_hash)
+        writer.add_strings("codes", [c.code for c in codes])
+        writer.add_trigram_index("synonym_trigrams", index)
+        writer.write(snapshot_path("cpt"), meta={"categories": [...]})
+    """
+
+    def __init__(self, kind: str, source_hash: str) -> None:
+        """Start an empty snapshot.
+
+        Args:
+            kind: Snapshot kind, checked again on open.
+            source_hash: Checksum of the sources the arrays are built from.
+        """
+        self._kind = kind
+        self._source_hash = source_hash
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def add_array(self, name: str, array: np.ndarray) -> None:
+        """Add an array (stored in its dtype, little-endian)."""
+        self._arrays[name] = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+
+    def add_string_table(self, name: str, table: StringTable) -> None:
+        """Add a packed string table."""
+        self.add_array(f"{name}.blob", np.frombuffer(bytes(table.blob), dtype=np.uint8))
+        self.add_array(f"{name}.offsets", table.offsets)
+
+    def add_strings(self, name: str, strings: Iterable[str]) -> None:
+        """Add strings as a packed string table."""
+        self.add_string_table(name, StringTable.from_strings(strings))
+
+    def add_lists(self, name: str, lists: Sequence[Sequence[int]]) -> None:
+        """Add lists of ints in CSR layout."""
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(values) for values in lists], out=offsets[1:])
+        self.add_array(f"{name}.values", np.array([v for vs in lists for v in vs], dtype=np.int32))
+        self.add_array(f"{name}.offsets", offsets)
+
+    def add_string_lists(self, name: str, lists: Sequence[Sequence[str]]) -> None:
+        """Add lists of strings: one string table plus list offsets."""
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(values) for values in lists], out=offsets[1:])
+        self.add_strings(name, (value for values in lists for value in values))
+        self.add_array(f"{name}.lists", offsets)
+
+    def add_trigram_index(self, name: str, index: TrigramIndex) -> None:
+        """Add a built trigram index (its terms are stored separately)."""
+        self.add_strings(f"{name}.grams", index.grams)
+        for part, array in index.arrays().items():
+            self.add_array(f"{name}.{part}", array)
+
+    def add_vocabulary_store(self, store: VocabularyStore) -> dict[str, Any]:
+        """Add a store's strings, columns and trigram indexes.
+
+        Returns:
+            Metadata to pass to write() (the store's label tables).
+        """
+        self.add_string_table("strings", store.strings)
+        for name, array in store.columns().items():
+            self.add_array(name, array)
+        self.add_trigram_index("term_trigrams", store.term_trigrams)
+        self.add_trigram_index("name_trigrams", store.name_trigrams)
+        return {
+            "vocabulary_labels": store.vocabulary_labels,
+            "domain_labels": store.domain_labels,
+        }
+
+    def write(self, path: Path, meta: dict[str, Any] | None = None) -> Path:
+        """Write the snapshot atomically.
+
+        Args:
+            path: Destination file.
+            meta: JSON-serializable metadata (labels, counts).
+
+        Returns:
+            The written path.
+        """
+        entries = {}
+        offset = 0
+        for name, array in self._arrays.items():
+            offset = _aligned(offset)
+            entries[name] = {"dtype": array.dtype.str, "shape": array.shape, "offset": offset}
+            offset += array.nbytes
+        header = json.dumps({
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "kind": self._kind,
+            "source_hash": self._source_hash,
+            "meta": meta or {},
+            "arrays": entries,
+        }).encode()
+        data_start = _aligned(len(MAGIC) + _LENGTH.size + len(header))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".snap")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + _LENGTH.pack(len(header)) + header)
+                for name, array in self._arrays.items():
+                    f.seek(data_start + entries[name]["offset"])
+                    f.write(array.tobytes())
+                f.truncate(data_start + offset)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        logger.info(f"Wrote {self._kind} snapshot {path} ({data_start + offset} bytes)")
+        return path
+
+
+class Snapshot:
+    """A snapshot file mapped into memory; arrays are read-only views of it."""
+
+    def __init__(self, path: Path) -> None:
+        """Map a snapshot file and read its header.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not a snapshot of this format version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        prefix = len(MAGIC) + _LENGTH.size
+        if len(self._mmap) < prefix or self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a vocabulary snapshot")
+        (header_length,) = _LENGTH.unpack_from(self._mmap, len(MAGIC))
+        header = json.loads(self._mmap[prefix : prefix + header_length])
+        if header.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has snapshot format {header.get('format_version')}, "
+                f"expected {SNAPSHOT_FORMAT_VERSION}"
+            )
+
+        self.kind: str = header["kind"]
+        self.source_hash: str = header["source_hash"]
+        self.meta: dict[str, Any] = header["meta"]
+        self._entries: dict[str, dict[str, Any]] = header["arrays"]
+        self._data_start = _aligned(prefix + header_length)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the size of the mapped file."""
+        return len(self._mmap)
+
+    def array(self, name: str) -> np.ndarray:
+        """Get a stored array as a read-only view of the mapping."""
+        entry = self._entries[name]
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        return np.frombuffer(
+            self._mmap, dtype=dtype, count=count, offset=self._data_start + entry["offset"]
+        ).reshape(shape)
+
+    def string_table(self, name: str) -> StringTable:
+        """Get a stored string table; its blob is a view of the mapping."""
+        return StringTable(memoryview(self.array(f"{name}.blob")), self.array(f"{name}.offsets"))
+
+    def strings(self, name: str) -> list[str]:
+        """Get stored strings as a list."""
+        return list(self.string_table(name))
+
+    def lists(self, name: str) -> list[list[int]]:
+        """Get lists of ints stored with add_lists."""
+        values = self.array(f"{name}.values").tolist()
+        bounds = self.array(f"{name}.offsets").tolist()
+        return [values[bounds[i] : bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    def string_lists(self, name: str) -> list[list[str]]:
+        """Get lists of strings stored with add_string_lists."""
+        values = self.strings(name)
+        bounds = self.array(f"{name}.lists").tolist()
+        return [values[bounds[i] : bounds[i + 1]] for i in range(len(bounds) - 1)]
+
+    def trigram_index(self, name: str, terms: Sequence[str]) -> TrigramIndex:
+        """Restore a trigram index stored with add_trigram_index.
+
+        Args:
+            name: Name the index was added under.
+            terms: The terms it was built over, in the same order.
+        """
+        arrays = {
+            part: self.array(f"{name}.{part}")
+            for part in ("postings", "offsets", "gram_counts", "short_terms")
+        }
+        return TrigramIndex.from_arrays(terms, self.string_table(f"{name}.grams"), arrays)
+
+    def vocabulary_store(self) -> VocabularyStore:
+        """Restore a store added with add_vocabulary_store, search indexes included."""
+        store = VocabularyStore(
+            self.string_table("strings"),
+            self.meta["vocabulary_labels"],
+            self.meta["domain_labels"],
+            **{name: self.array(name) for name in VocabularyStore.COLUMNS},
+        )
+        store.set_search_indexes(
+            self.trigram_index("term_trigrams", store.term_column),
+            self.trigram_index("name_trigrams", store.name_key_column),
+        )
+        return store
+
+
+def open_snapshot(kind: str, source_hash: str, path: Path | None = None) -> Snapshot | None:
+    """Open a snapshot if it exists and was built from the current sources.
+
+    Unusable snapshots are logged and skipped; snapshots are an
+    optimization and must never break loading.
+
+    Args:
+        kind: Expected snapshot kind.
+        source_hash: Checksum of the current sources.
+        path: Snapshot file. Defaults to snapshot_path(kind).
+
+    Returns:
+        The mapped snapshot, or None if the caller should build from sources.
+    """
+    if not settings.vocabulary_snapshot_enabled:
+        return None
+    path = path if path is not None else snapshot_path(kind)
+    if not path.exists():
+        logger.debug(f"No {kind} snapshot at {path}")
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable {kind} snapshot {path}: {e}")
+        return None
+    if snapshot.kind != kind or snapshot.source_hash != source_hash:
+        logger.warning(
+            f"Ignoring stale {kind} snapshot {path}: sources changed since it was built "
+            "(rebuild with python -m app.scripts.build_snapshots)"
+        )
+        return None
+    return snapshot
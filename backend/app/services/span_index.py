@@ -0,0 +1,204 @@
+"""Sorted interval index for resolving overlapping text spans.
+
+Extractors that combine or clean up mentions need to find, for each new
+span, the already-accepted spans it overlaps. Scanning every accepted span
+makes that quadratic in the number of mentions. SpanIndex keeps spans sorted
+by start and tracks the longest span seen, so an overlap query only visits
+spans that start within one maximum span length before the query: a sweep
+over sorted spans with O(log n + k) lookups for the short spans clinical
+text produces.
+
+Entries keep the order they were accepted in (their handle), which merge
+code uses to break ties the same way a list scan would.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+# Decides whether a new item should replace an overlapping accepted one
+MergePolicy = Callable[[T, T], bool]
+
+
+def overlap_ratio(start1: int, end1: int, start2: int, end2: int) -> float:
+    """Get the overlap of two spans relative to the shorter one.
+
+    Args:
+        start1, end1: First span boundaries
+        start2, end2: Second span boundaries
+
+    Returns:
+        Overlap length divided by the shorter span's length (0 if either
+        span is empty or they do not overlap).
+    """
+    overlap_length = min(end1, end2) - max(start1, start2)
+    if overlap_length <= 0:
+        return 0.0
+
+    min_length = min(end1 - start1, end2 - start2)
+    if min_length <= 0:
+        return 0.0
+
+    return overlap_length / min_length
+
+
+class SpanIndex(Generic[T]):
+    """Spans sorted by start, supporting insert, remove, stabbing and overlap queries.
+
+    Usage:
+        index = SpanIndex()
+        handle = index.insert(0, 8, mention)
+        for handle, start, end, item in index.overlapping(5, 12):
+            ...
+        index.replace(handle, 0, 17, longer_mention)
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        # (start, handle) sorted; handle -> (start, end, item)
+        self._keys: list[tuple[int, int]] = []
+        self._entries: dict[int, tuple[int, int, T]] = {}
+        self._next_handle = 0
+        # Longest span ever inserted; bounds how far back overlaps can start
+        self._max_length = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def insert(self, start: int, end: int, item: T) -> int:
+        """Add a span.
+
+        Args:
+            start: Span start offset.
+            end: Span end offset (exclusive).
+            item: Value stored with the span.
+
+        Returns:
+            Handle of the new entry; handles increase in insertion order.
+        """
+        handle = self._next_handle
+        self._next_handle += 1
+        self._add(handle, start, end, item)
+        return handle
+
+    def remove(self, handle: int) -> None:
+        """Remove an entry.
+
+        Args:
+            handle: Handle returned by insert.
+        """
+        start, _, _ = self._entries.pop(handle)
+        del self._keys[bisect_left(self._keys, (start, handle))]
+
+    def replace(self, handle: int, start: int, end: int, item: T) -> None:
+        """Replace an entry's span and item, keeping its handle (and order).
+
+        Args:
+            handle: Handle returned by insert.
+            start: New span start offset.
+            end: New span end offset (exclusive).
+            item: New value.
+        """
+        self.remove(handle)
+        self._add(handle, start, end, item)
+
+    def _add(self, handle: int, start: int, end: int, item: T) -> None:
+        insort(self._keys, (start, handle))
+        self._entries[handle] = (start, end, item)
+        self._max_length = max(self._max_length, end - start)
+
+    def overlapping(self, start: int, end: int) -> list[tuple[int, int, int, T]]:
+        """Get entries sharing at least one character with [start, end).
+
+        Args:
+            start: Query start offset.
+            end: Query end offset (exclusive).
+
+        Returns:
+            (handle, start, end, item) tuples sorted by start.
+        """
+        # Anything starting at or before start - max_length ends by start
+        lo = bisect_right(self._keys, (start - self._max_length, float("inf")))
+        hi = bisect_left(self._keys, (end, -1))
+        result = []
+        for _, handle in self._keys[lo:hi]:
+            entry_start, entry_end, item = self._entries[handle]
+            if entry_end > start:
+                result.append((handle, entry_start, entry_end, item))
+        return result
+
+    def stabbing(self, offset: int) -> list[tuple[int, int, int, T]]:
+        """Get entries containing an offset.
+
+        Args:
+            offset: Character offset.
+
+        Returns:
+            (handle, start, end, item) tuples sorted by start.
+        """
+        return self.overlapping(offset, offset + 1)
+
+    def items(self) -> Iterator[T]:
+        """Iterate stored items in handle (insertion) order."""
+        for handle in sorted(self._entries):
+            yield self._entries[handle][2]
+
+    def spans(self) -> Iterator[tuple[int, int, T]]:
+        """Iterate (start, end, item) in start order."""
+        for _, handle in self._keys:
+            yield self._entries[handle]
+
+
+def prefer_longer(length: Callable[[T], int]) -> MergePolicy:
+    """Merge policy keeping the longer of two overlapping items."""
+
+    def policy(new: T, existing: T) -> bool:
+        return length(new) > length(existing)
+
+    return policy
+
+
+def prefer_more_confident(confidence: Callable[[T], float]) -> MergePolicy:
+    """Merge policy keeping the more confident of two overlapping items."""
+
+    def policy(new: T, existing: T) -> bool:
+        return confidence(new) > confidence(existing)
+
+    return policy
+
+
+def resolve_overlaps(
+    items: Iterable[T],
+    span: Callable[[T], tuple[int, int]],
+    prefer: MergePolicy,
+) -> list[T]:
+    """Keep one item per group of overlapping spans.
+
+    Items are taken in order. Each is compared with the earliest accepted
+    item it overlaps: if `prefer(new, existing)` it replaces that item,
+    otherwise it is dropped. Items overlapping nothing are accepted.
+
+    Args:
+        items: Items to resolve, in priority order.
+        span: Gets an item's (start, end).
+        prefer: Merge policy deciding replacement.
+
+    Returns:
+        Accepted items sorted by span start.
+    """
+    index: SpanIndex[T] = SpanIndex()
+    for item in items:
+        start, end = span(item)
+        overlaps = index.overlapping(start, end)
+        if not overlaps:
+            index.insert(start, end, item)
+            continue
+
+        handle, _, _, existing = min(overlaps, key=lambda entry: entry[0])
+        if prefer(item, existing):
+            index.remove(handle)
+            index.insert(start, end, item)
+
+    return sorted(index.items(), key=lambda item: span(item)[0])
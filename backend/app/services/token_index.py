@@ -0,0 +1,97 @@
+"""Token-set inverted index for Jaccard similarity search over fixed terms.
+
+Fuzzy mapping scored a query against every vocabulary term with token
+Jaccard similarity, which is linear in the vocabulary per query. A term
+can only reach a threshold t if it shares tokens with the query, and
+prefix filtering narrows this further: with tokens ordered globally from
+rarest to most common, two sets with Jaccard >= t must share a token
+among the first ``|x| - ceil(t * |x|) + 1`` tokens of each set. The index
+therefore posts each term under the rarest tokens of its prefix only,
+and a query reads the postings of its own prefix tokens.
+
+Candidates are also pruned by size (``t * |x| <= |y| <= |x| / t``) and then
+scored exactly, so results are those of the linear scan.
+"""
+
+import math
+from collections import Counter
+from collections.abc import Collection, Sequence
+
+# Slack for float rounding in the threshold bounds; it only widens them
+_EPSILON = 1e-9
+
+
+class TokenSetIndex:
+    """Jaccard search over token sets, identified by their position.
+
+    Usage:
+        index = TokenSetIndex([{"renal", "failure"}, {"renal", "colic"}], 0.3)
+        index.similar({"acute", "renal", "failure"})  # [(0, 0.666...)]
+    """
+
+    def __init__(self, token_sets: Sequence[Collection[str]], min_similarity: float) -> None:
+        """Build the index.
+
+        Args:
+            token_sets: Token sets of the terms to index.
+            min_similarity: Jaccard threshold that queries are answered for
+                (the prefix lengths depend on it).
+        """
+        if not 0 < min_similarity <= 1:
+            raise ValueError(f"min_similarity must be in (0, 1], got {min_similarity}")
+        self._min_similarity = min_similarity
+        self._sets = [frozenset(tokens) for tokens in token_sets]
+
+        # Global token order: rarest first, ties broken by the token itself
+        frequency = Counter(token for tokens in self._sets for token in tokens)
+        self._token_rank = {
+            token: rank
+            for rank, token in enumerate(sorted(frequency, key=lambda t: (frequency[t], t)))
+        }
+
+        self._postings: dict[int, list[int]] = {}
+        for set_id, tokens in enumerate(self._sets):
+            ranks = sorted(self._token_rank[token] for token in tokens)
+            for rank in ranks[: self._prefix_length(len(ranks))]:
+                self._postings.setdefault(rank, []).append(set_id)
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _prefix_length(self, size: int) -> int:
+        """Number of leading (rarest) tokens a set must share a match in."""
+        return size - math.ceil(self._min_similarity * size - _EPSILON) + 1
+
+    def similar(self, tokens: Collection[str]) -> list[tuple[int, float]]:
+        """Find the token sets with Jaccard similarity >= the threshold.
+
+        Args:
+            tokens: Query tokens.
+
+        Returns:
+            (set id, similarity) pairs, ascending by set id.
+        """
+        query = frozenset(tokens)
+        size = len(query)
+        if size == 0:
+            return []
+
+        # Tokens absent from the index rank before all others (they occur in no set)
+        ranks = sorted(self._token_rank.get(token, -1) for token in query)
+        min_size = self._min_similarity * size - _EPSILON
+        max_size = size / self._min_similarity + _EPSILON
+
+        candidates: set[int] = set()
+        for rank in ranks[: self._prefix_length(size)]:
+            for set_id in self._postings.get(rank, ()):
+                if min_size <= len(self._sets[set_id]) <= max_size:
+                    candidates.add(set_id)
+
+        matches = []
+        for set_id in sorted(candidates):
+            other = self._sets[set_id]
+            intersection = len(query & other)
+            similarity = intersection / (size + len(other) - intersection)
+            if similarity >= self._min_similarity:
+                matches.append((set_id, similarity))
+        return matches
@@ -0,0 +1,222 @@
+"""Trigram inverted index for substring search over a fixed set of terms.
+
+Partial-match lookups ("does the query occur in this synonym?") were done
+by testing every term, which is linear in the vocabulary per query. A term
+can only contain the query if it contains every trigram of the query, so
+the index maps each character trigram to the sorted ids of the terms it
+occurs in. A query intersects the posting lists of its trigrams, starting
+from the rarest, and verifies the few surviving candidates with a plain
+``in`` test, so results are exactly those of the linear scan.
+
+The reverse question ("which terms occur in this text?") is answered from
+the same postings: a term occurs in the text only if all of its trigrams
+do, which is checked by counting posting hits per term.
+
+Terms and queries shorter than a trigram cannot be filtered this way and
+are checked directly; the index also treats strings verbatim (callers
+lowercase both sides as they see fit).
+
+A built index is fully described by its trigram list and four arrays
+(``arrays``), which is what vocabulary snapshots store; ``from_arrays``
+restores it without re-scanning the terms.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+
+GRAM_SIZE = 3
+
+
+def trigrams(text: str) -> set[str]:
+    """Get the distinct character trigrams of a string."""
+    return {text[i : i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+# Bits per code point in a packed trigram key (code points are < 2**21)
+_CHAR_BITS = 21
+_CHAR_MASK = (1 << _CHAR_BITS) - 1
+_KEY_SHIFTS = (np.uint64(2 * _CHAR_BITS), np.uint64(_CHAR_BITS))
+
+
+def _unpack_gram(key: int) -> str:
+    """Get the trigram packed into `key` by TrigramIndex."""
+    return (
+        chr(key >> 2 * _CHAR_BITS) + chr((key >> _CHAR_BITS) & _CHAR_MASK) + chr(key & _CHAR_MASK)
+    )
+
+
+def _run_starts(sorted_values: np.ndarray) -> np.ndarray:
+    """Mask of the first element of each run of equal values."""
+    starts = np.ones(len(sorted_values), dtype=bool)
+    starts[1:] = sorted_values[1:] != sorted_values[:-1]
+    return starts
+
+
+class TrigramIndex:
+    """Substring search over terms, identified by their position in `terms`.
+
+    Usage:
+        index = TrigramIndex(["acute renal failure", "renal colic", "asthma"])
+        index.containing("renal")       # [0, 1]
+        index.contained_in("asthma attack")  # [2]
+    """
+
+    def __init__(self, terms: Sequence[str]) -> None:
+        """Build the index.
+
+        All trigrams are extracted in one pass over the terms laid end to
+        end as code points: each window of three code points inside a term
+        is packed into one integer key, so deduplicating and grouping them
+        are array sorts rather than per-trigram Python work.
+
+        Args:
+            terms: Terms to index. The sequence is kept (not copied) to
+                verify candidates, so it must not change afterwards.
+        """
+        self._terms = terms
+
+        lengths = np.fromiter(map(len, terms), dtype=np.int64, count=len(terms))
+        encoded = "".join(terms).encode("utf-32-le", "surrogatepass")
+        chars = np.frombuffer(encoded, dtype=np.uint32).astype(np.uint64)
+        term_of_char = np.repeat(np.arange(len(terms), dtype=np.int64), lengths)
+
+        # A window starting at i lies inside one term if char i + 2 does too
+        starts = np.flatnonzero(term_of_char[: -GRAM_SIZE + 1] == term_of_char[GRAM_SIZE - 1 :])
+        high, middle = _KEY_SHIFTS
+        keys = (chars[starts] << high) | (chars[starts + 1] << middle) | chars[starts + 2]
+
+        # Number the distinct trigrams in key order
+        key_order = np.argsort(keys)
+        sorted_keys = keys[key_order]
+        new_gram = _run_starts(sorted_keys)
+        gram_keys = sorted_keys[new_gram]
+        gram_of_window = np.empty_like(key_order)
+        gram_of_window[key_order] = np.cumsum(new_gram) - 1
+
+        # Distinct (gram, term) pairs, sorted by gram then term: the postings
+        # in CSR layout
+        term_total = max(len(terms), 1)
+        pairs = np.sort(gram_of_window * term_total + term_of_char[starts])
+        pairs = pairs[_run_starts(pairs)]
+        pair_grams = pairs // term_total
+        self._postings = (pairs % term_total).astype(np.int32)
+        self._offsets = np.zeros(len(gram_keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_grams, minlength=len(gram_keys)), out=self._offsets[1:])
+
+        self._gram_ids = {_unpack_gram(key): i for i, key in enumerate(gram_keys.tolist())}
+        self._gram_counts = np.bincount(self._postings, minlength=len(terms)).astype(np.int32)
+        self._short_terms = np.flatnonzero(lengths < GRAM_SIZE).tolist()
+
+    @classmethod
+    def from_arrays(
+        cls,
+        terms: Sequence[str],
+        grams: Iterable[str],
+        arrays: Mapping[str, np.ndarray],
+    ) -> "TrigramIndex":
+        """Restore an index saved with `grams` and `arrays`.
+
+        Args:
+            terms: The terms the index was built over, in the same order.
+            grams: Trigrams in gram id order.
+            arrays: Postings, offsets, gram counts and short terms.
+
+        Returns:
+            The index, equivalent to TrigramIndex(terms).
+        """
+        index = cls.__new__(cls)
+        index._terms = terms
+        index._gram_ids = {gram: gram_id for gram_id, gram in enumerate(grams)}
+        index._postings = arrays["postings"]
+        index._offsets = arrays["offsets"]
+        index._gram_counts = arrays["gram_counts"]
+        index._short_terms = arrays["short_terms"].tolist()
+        return index
+
+    @property
+    def grams(self) -> list[str]:
+        """Get the indexed trigrams in gram id order."""
+        return list(self._gram_ids)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """Get the index arrays (see from_arrays)."""
+        return {
+            "postings": self._postings,
+            "offsets": self._offsets,
+            "gram_counts": self._gram_counts,
+            "short_terms": np.array(self._short_terms, dtype=np.int32),
+        }
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _posting(self, gram: str) -> np.ndarray | None:
+        gram_id = self._gram_ids.get(gram)
+        if gram_id is None:
+            return None
+        return self._postings[self._offsets[gram_id] : self._offsets[gram_id + 1]]
+
+    def containing(self, query: str) -> list[int]:
+        """Find the terms containing `query` as a substring.
+
+        Args:
+            query: Substring to look for.
+
+        Returns:
+            Ids of matching terms, ascending.
+        """
+        terms = self._terms
+        grams = trigrams(query)
+        if not grams:
+            # Too short to filter by trigrams
+            return [i for i in range(len(terms)) if query in terms[i]]
+
+        postings = []
+        for gram in grams:
+            posting = self._posting(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                return []
+
+        return [i for i in candidates.tolist() if query in terms[i]]
+
+    def contained_in(self, text: str) -> list[int]:
+        """Find the terms occurring in `text` as a substring.
+
+        Args:
+            text: Text to look in (typically a short query).
+
+        Returns:
+            Ids of matching terms, ascending.
+        """
+        terms = self._terms
+        matches = [i for i in self._short_terms if terms[i] in text]
+
+        postings = [p for p in map(self._posting, trigrams(text)) if p is not None]
+        if postings:
+            # Only terms on some posting list are touched
+            term_ids, hits = np.unique(np.concatenate(postings), return_counts=True)
+            candidates = term_ids[hits == self._gram_counts[term_ids]]
+            matches.extend(i for i in candidates.tolist() if terms[i] in text)
+            matches.sort()
+
+        return matches
+
+    def overlapping(self, query: str) -> list[int]:
+        """Find the terms containing `query` or contained in it.
+
+        Args:
+            query: Query string.
+
+        Returns:
+            Ids of matching terms, ascending.
+        """
+        return sorted(set(self.containing(query)) | set(self.contained_in(query)))
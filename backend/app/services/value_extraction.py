@@ -16,6 +16,7 @@ from typing import Sequence
 from uuid import UUID
 
 from app.models.clinical_value import ValueType
+from app.services.span_index import prefer_longer, resolve_overlaps
 
 logger = logging.getLogger(__name__)
 
@@ -707,24 +708,11 @@ class ValueExtractionService:
         if not values:
             return values
 
-        filtered = []
-        for value in values:
-            # Check if this overlaps with any already accepted value
-            overlaps = False
-            for accepted in filtered:
-                if (value.start_offset < accepted.end_offset and
-                    value.end_offset > accepted.start_offset):
-                    # Overlap detected - keep the longer one
-                    if len(value.text) > len(accepted.text):
-                        filtered.remove(accepted)
-                        filtered.append(value)
-                    overlaps = True
-                    break
-
-            if not overlaps:
-                filtered.append(value)
-
-        return sorted(filtered, key=lambda x: x.start_offset)
+        return resolve_overlaps(
+            values,
+            span=lambda v: (v.start_offset, v.end_offset),
+            prefer=prefer_longer(lambda v: len(v.text)),
+        )
 
 
 # Singleton instance
@@ -737,3 +725,9 @@ def get_value_extraction_service() -> ValueExtractionService:
     if _value_extraction_service is None:
         _value_extraction_service = ValueExtractionService()
     return _value_extraction_service
+
+
+def reset_value_extraction_service() -> None:
+    """Reset the singleton service (mainly for testing)."""
+    global _value_extraction_service
+    _value_extraction_service = None
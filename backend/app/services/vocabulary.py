@@ -10,12 +10,21 @@ only once and shared across all services.
 import json
 import logging
 import time
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
 from threading import Lock
 from typing import ClassVar
 
+from app.core.checksums import hash_files
 from app.schemas.base import Domain
+from app.services.snapshot import SnapshotWriter, open_snapshot, snapshot_path
+from app.services.vocabulary_store import (
+    ConceptRecord,
+    ConceptSequence,
+    VocabularyStore,
+    VocabularyStoreBuilder,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +58,11 @@ class OMOPConcept:
         return domain_map.get(self.domain_id, Domain.OBSERVATION)
 
 
+def _to_concept(record: ConceptRecord) -> OMOPConcept:
+    """Materialize a stored concept."""
+    return OMOPConcept(*record)
+
+
 class VocabularyService:
     """Service for loading and querying OMOP vocabulary.
 
@@ -64,6 +78,7 @@ class VocabularyService:
     # Default fixture paths relative to project root
     DEFAULT_FIXTURE_PATH: ClassVar[str] = "fixtures/omop_vocabulary.json"
     CLINICAL_ABBREVIATIONS_PATH: ClassVar[str] = "fixtures/clinical_abbreviations.json"
+    SNAPSHOT_KIND: ClassVar[str] = "vocabulary"
 
     def __init__(self, fixture_path: str | Path | None = None) -> None:
         """Initialize the vocabulary service.
@@ -73,9 +88,10 @@ class VocabularyService:
                          Defaults to fixtures/omop_vocabulary.json.
         """
         self._fixture_path = fixture_path
-        self._concepts: list[OMOPConcept] = []
-        self._synonym_index: dict[str, list[OMOPConcept]] = {}
+        # Concepts and the synonym index, packed into arrays
+        self._store: VocabularyStore = VocabularyStore.empty()
         self._loaded = False
+        self._from_snapshot = False
         self._load_time_ms: float = 0.0
 
     def _find_fixtures_dir(self) -> Path:
@@ -101,20 +117,76 @@ class VocabularyService:
         """Get the clinical abbreviations file path."""
         return self._find_fixtures_dir() / "clinical_abbreviations.json"
 
+    def cache_fingerprint(self) -> str:
+        """Get a fingerprint of the vocabulary sources without loading them.
+
+        Used to key derived artifacts such as the cached NLP automaton.
+
+        Returns:
+            Hash of the vocabulary fixture and clinical abbreviations files.
+        """
+        return f"{type(self).__name__}:" + hash_files(
+            self.clinical_abbreviations_path, self.fixture_path
+        )
+
+    def snapshot_source_hash(self) -> str:
+        """Get a checksum of everything a vocabulary snapshot is built from.
+
+        Covers the fixtures and this module, whose loading rules shape the store.
+        """
+        return f"{type(self).__name__}:" + hash_files(
+            self.clinical_abbreviations_path, self.fixture_path, Path(__file__)
+        )
+
     def load(self) -> None:
-        """Load concepts from vocabulary fixture and clinical abbreviations."""
+        """Load concepts from vocabulary fixture and clinical abbreviations.
+
+        A current compiled snapshot (see write_snapshot) is mapped instead of
+        parsing the fixtures when one exists.
+        """
         if self._loaded:
             return
 
         start_time = time.perf_counter()
 
-        self._concepts = []
-        self._synonym_index = {}
+        snapshot = open_snapshot(self.SNAPSHOT_KIND, self.snapshot_source_hash())
+        if snapshot is not None:
+            store = snapshot.vocabulary_store()
+        else:
+            store = self._build_store()
+            store.build_search_indexes()
+        self._store = store
+        self._from_snapshot = snapshot is not None
+        self._loaded = True
+        self._load_time_ms = (time.perf_counter() - start_time) * 1000
+
+        logger.info(
+            f"Vocabulary loaded{' from snapshot' if self._from_snapshot else ''}: "
+            f"{len(self._store)} concepts, "
+            f"{self._store.term_count} unique terms in {self._load_time_ms:.2f}ms"
+        )
+
+    def write_snapshot(self, path: Path | None = None) -> Path:
+        """Build the vocabulary from its sources and write it as a snapshot.
+
+        Args:
+            path: Destination file. Defaults to the snapshot directory.
+
+        Returns:
+            The written path.
+        """
+        writer = SnapshotWriter(self.SNAPSHOT_KIND, self.snapshot_source_hash())
+        meta = writer.add_vocabulary_store(self._build_store())
+        return writer.write(path or snapshot_path(self.SNAPSHOT_KIND), meta)
+
+    def _build_store(self) -> VocabularyStore:
+        """Build the store from the fixture and clinical abbreviations."""
+        builder = VocabularyStoreBuilder()
 
         # Load clinical abbreviations FIRST (highest priority)
         # These are curated terms with correct domains
-        self._load_clinical_abbreviations()
-        curated_synonyms = set(self._synonym_index.keys())
+        self._load_clinical_abbreviations(builder)
+        curated_synonyms = builder.term_keys()
 
         # Then load OMOP vocabulary fixture
         path = self.fixture_path
@@ -133,7 +205,8 @@ class VocabularyService:
                 if not synonyms:
                     continue
 
-                concept = OMOPConcept(
+                # Indexed under each lowercased synonym for fast lookup
+                builder.add(
                     concept_id=concept_data["concept_id"],
                     concept_name=concept_data["concept_name"],
                     concept_code=concept_data["concept_code"],
@@ -141,25 +214,25 @@ class VocabularyService:
                     domain_id=concept_data["domain_id"],
                     synonyms=synonyms,
                 )
-                self._concepts.append(concept)
 
-                # Build synonym index for fast lookup
-                for synonym in concept.synonyms:
-                    key = synonym.lower()
-                    if key not in self._synonym_index:
-                        self._synonym_index[key] = []
-                    self._synonym_index[key].append(concept)
+        return builder.build()
 
-        self._loaded = True
-        self._load_time_ms = (time.perf_counter() - start_time) * 1000
+    def reload(self) -> None:
+        """Reload the vocabulary from its sources.
 
-        logger.info(
-            f"Vocabulary loaded: {len(self._concepts)} concepts, "
-            f"{len(self._synonym_index)} unique terms in {self._load_time_ms:.2f}ms"
-        )
+        The new store, with its ID and domain indexes, replaces the old one
+        in a single assignment, so concurrent lookups see either the old or
+        the new vocabulary, never a mix.
+        """
+        self._loaded = False
+        self.load()
+
+    def _load_clinical_abbreviations(self, builder: VocabularyStoreBuilder) -> None:
+        """Load clinical abbreviations for labs, vitals, conditions, drugs, etc.
 
-    def _load_clinical_abbreviations(self) -> None:
-        """Load clinical abbreviations for labs, vitals, conditions, drugs, etc."""
+        Args:
+            builder: Store builder the abbreviation concepts are added to.
+        """
         abbrev_path = self.clinical_abbreviations_path
         if not abbrev_path.exists():
             logger.warning(f"Clinical abbreviations not found: {abbrev_path}")
@@ -179,7 +252,7 @@ class VocabularyService:
                 if not name or not synonyms:
                     continue
 
-                concept = OMOPConcept(
+                builder.add(
                     concept_id=concept_id,
                     concept_name=name,
                     concept_code=name.upper(),
@@ -187,14 +260,6 @@ class VocabularyService:
                     domain_id=domain_str,
                     synonyms=synonyms,
                 )
-                self._concepts.append(concept)
-
-                # Build synonym index
-                for synonym in synonyms:
-                    key = synonym.lower()
-                    if key not in self._synonym_index:
-                        self._synonym_index[key] = []
-                    self._synonym_index[key].append(concept)
 
             logger.info(f"Loaded {len(terms)} clinical abbreviations")
 
@@ -202,11 +267,11 @@ class VocabularyService:
             logger.error(f"Error loading clinical abbreviations: {e}")
 
     @property
-    def concepts(self) -> list[OMOPConcept]:
-        """Get all loaded concepts."""
+    def concepts(self) -> Sequence[OMOPConcept]:
+        """Get all loaded concepts (materialized from the store on access)."""
         if not self._loaded:
             self.load()
-        return self._concepts
+        return ConceptSequence(self._store, _to_concept)
 
     @property
     def concept_count(self) -> int:
@@ -224,10 +289,27 @@ class VocabularyService:
         """
         if not self._loaded:
             self.load()
-        for concept in self._concepts:
-            if concept.concept_id == concept_id:
-                return concept
-        return None
+        position = self._store.position(concept_id)
+        if position is None:
+            return None
+        return _to_concept(self._store.record(position))
+
+    def get_many(self, concept_ids: Iterable[int]) -> dict[int, OMOPConcept]:
+        """Get many concepts by OMOP concept ID in one call.
+
+        Args:
+            concept_ids: OMOP concept IDs (duplicates allowed).
+
+        Returns:
+            Mapping of concept ID to concept; unknown IDs are omitted.
+        """
+        if not self._loaded:
+            self.load()
+        store = self._store
+        return {
+            concept_id: _to_concept(store.record(position))
+            for concept_id, position in store.positions(concept_ids).items()
+        }
 
     def search(self, term: str, limit: int = 5) -> list[OMOPConcept]:
         """Search for concepts by term.
@@ -245,37 +327,34 @@ class VocabularyService:
         if not self._loaded:
             self.load()
 
+        store = self._store
         term_lower = term.lower()
         results: list[OMOPConcept] = []
         seen_ids: set[int] = set()
 
+        def add(index: int) -> bool:
+            """Add a concept unless already found; True once the limit is hit."""
+            concept_id = int(store.concept_ids[index])
+            if concept_id not in seen_ids:
+                results.append(_to_concept(store.record(index)))
+                seen_ids.add(concept_id)
+            return len(results) >= limit
+
         # Exact synonym match (highest priority)
-        if term_lower in self._synonym_index:
-            for concept in self._synonym_index[term_lower]:
-                if concept.concept_id not in seen_ids:
-                    results.append(concept)
-                    seen_ids.add(concept.concept_id)
-                    if len(results) >= limit:
-                        return results
-
-        # Partial match on synonyms
-        for synonym, concepts in self._synonym_index.items():
-            if term_lower in synonym:
-                for concept in concepts:
-                    if concept.concept_id not in seen_ids:
-                        results.append(concept)
-                        seen_ids.add(concept.concept_id)
-                        if len(results) >= limit:
-                            return results
+        for index in store.lookup(term_lower):
+            if add(index):
+                return results
+
+        # Partial match on synonyms (trigram candidates, in term order)
+        for term_id in store.term_trigrams.containing(term_lower):
+            for index in store.term_concepts_of(term_id):
+                if add(index):
+                    return results
 
         # Partial match on concept names
-        for concept in self._concepts:
-            if term_lower in concept.concept_name.lower():
-                if concept.concept_id not in seen_ids:
-                    results.append(concept)
-                    seen_ids.add(concept.concept_id)
-                    if len(results) >= limit:
-                        return results
+        for index in store.name_trigrams.containing(term_lower):
+            if add(index):
+                return results
 
         return results
 
@@ -314,7 +393,8 @@ class VocabularyService:
             Domain.DEVICE: "Device",
         }
         domain_str = domain_str_map.get(domain, "")
-        return [c for c in self._concepts if c.domain_id == domain_str]
+        store = self._store
+        return [_to_concept(store.record(i)) for i in store.domain_positions(domain_str).tolist()]
 
     @property
     def load_time_ms(self) -> float:
@@ -334,12 +414,16 @@ class VocabularyService:
                 "concept_count": 0,
                 "term_count": 0,
                 "load_time_ms": 0,
+                "memory_bytes": 0,
+                "from_snapshot": False,
             }
         return {
             "loaded": True,
-            "concept_count": len(self._concepts),
-            "term_count": len(self._synonym_index),
+            "concept_count": len(self._store),
+            "term_count": self._store.term_count,
             "load_time_ms": round(self._load_time_ms, 2),
+            "memory_bytes": self._store.nbytes,
+            "from_snapshot": self._from_snapshot,
         }
 
 
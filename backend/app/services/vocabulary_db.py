@@ -4,14 +4,21 @@ Loads concepts from the database for NLP term extraction.
 """
 
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 
-from sqlalchemy import select, text
+from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
 
 from app.core.database import get_sync_engine
-from app.models import Concept, ConceptSynonym
+from app.models import Concept, ConceptSynonym, VocabularyVersion
 from app.schemas.base import Domain
+from app.services.vocabulary_store import (
+    ConceptRecord,
+    ConceptSequence,
+    VocabularyStore,
+    VocabularyStoreBuilder,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +48,27 @@ class OMOPConcept:
         return domain_map.get(self.domain_id, Domain.OBSERVATION)
 
 
+def _to_concept(record: ConceptRecord) -> OMOPConcept:
+    """Materialize a stored concept."""
+    return OMOPConcept(*record)
+
+
+def get_vocabulary_version(session: Session) -> int | None:
+    """Get the current vocabulary version marker.
+
+    The marker is bumped by database triggers whenever concepts or
+    concept_synonyms change, so reading it is a single-row lookup rather
+    than a scan of the concept tables.
+
+    Args:
+        session: Synchronous database session.
+
+    Returns:
+        The version number, or None if the marker row does not exist.
+    """
+    return session.execute(select(func.max(VocabularyVersion.version))).scalar()
+
+
 class DatabaseVocabularyService:
     """Database-backed vocabulary service for NLP extraction.
 
@@ -55,20 +83,33 @@ class DatabaseVocabularyService:
 
     def __init__(self) -> None:
         """Initialize the vocabulary service."""
-        self._concepts: list[OMOPConcept] = []
-        self._synonym_index: dict[str, list[OMOPConcept]] = {}
+        # Concepts and the synonym index, packed into arrays
+        self._store: VocabularyStore = VocabularyStore.empty()
         self._loaded = False
 
     @property
-    def concepts(self) -> list[OMOPConcept]:
-        """Get all loaded concepts."""
-        return self._concepts
+    def concepts(self) -> Sequence[OMOPConcept]:
+        """Get all loaded concepts (materialized from the store on access)."""
+        return ConceptSequence(self._store, _to_concept)
 
     @property
     def is_loaded(self) -> bool:
         """Check if vocabulary has been loaded."""
         return self._loaded
 
+    def cache_fingerprint(self) -> str | None:
+        """Get a fingerprint of the concept tables without loading them.
+
+        Returns:
+            Fingerprint string built from the vocabulary version marker, or
+            None if no marker exists (derived caches are then not used).
+        """
+        with Session(get_sync_engine()) as session:
+            version = get_vocabulary_version(session)
+        if version is None:
+            return None
+        return f"{type(self).__name__}:{version}"
+
     def load(self, domains: list[str] | None = None) -> None:
         """Load vocabulary from database.
 
@@ -106,7 +147,8 @@ class DatabaseVocabularyService:
 
             logger.info(f"Found {len(all_synonyms)} synonyms in database")
 
-            # Build concept objects with synonyms
+            # Pack concepts with synonyms into the store
+            builder = VocabularyStoreBuilder()
             for db_concept in db_concepts:
                 # Get synonyms for this concept
                 concept_synonyms = synonyms_by_concept.get(db_concept.concept_id, [])
@@ -118,26 +160,22 @@ class DatabaseVocabularyService:
                 # Deduplicate
                 unique_synonyms = list(set(all_names))
 
-                concept = OMOPConcept(
+                # Indexed under each synonym as stored
+                builder.add(
                     concept_id=db_concept.concept_id,
                     concept_name=db_concept.concept_name,
                     concept_code=str(db_concept.concept_id),  # Use concept_id as code
                     vocabulary_id=db_concept.vocabulary_id,
                     domain_id=db_concept.domain_id,
                     synonyms=unique_synonyms,
+                    terms=unique_synonyms,
                 )
-                self._concepts.append(concept)
-
-                # Build synonym index
-                for synonym in unique_synonyms:
-                    if synonym not in self._synonym_index:
-                        self._synonym_index[synonym] = []
-                    self._synonym_index[synonym].append(concept)
 
+            self._store = builder.build()
             self._loaded = True
             logger.info(
-                f"Vocabulary loaded: {len(self._concepts)} concepts, "
-                f"{len(self._synonym_index)} unique synonyms"
+                f"Vocabulary loaded: {len(self._store)} concepts, "
+                f"{self._store.term_count} unique synonyms"
             )
 
     def search(self, term: str, domain: str | None = None) -> list[OMOPConcept]:
@@ -153,38 +191,31 @@ class DatabaseVocabularyService:
         if not self._loaded:
             self.load()
 
-        term_lower = term.lower()
-        matches = self._synonym_index.get(term_lower, [])
+        store = self._store
+        indices = store.lookup(term.lower())
 
         if domain:
-            matches = [c for c in matches if c.domain_id == domain]
+            indices = [i for i in indices if store.domain_id(i) == domain]
 
-        return matches
+        return [_to_concept(store.record(i)) for i in indices]
 
     def get_by_concept_id(self, concept_id: int) -> OMOPConcept | None:
         """Get a concept by its OMOP concept_id."""
         if not self._loaded:
             self.load()
 
-        for concept in self._concepts:
-            if concept.concept_id == concept_id:
-                return concept
-        return None
+        position = self._store.position(concept_id)
+        if position is None:
+            return None
+        return _to_concept(self._store.record(position))
 
     def get_statistics(self) -> dict[str, int]:
         """Get vocabulary statistics."""
         if not self._loaded:
             self.load()
 
-        stats: dict[str, int] = {"total_concepts": len(self._concepts)}
-
-        # Count by domain
-        domain_counts: dict[str, int] = {}
-        for concept in self._concepts:
-            domain = concept.domain_id
-            domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-        stats.update(domain_counts)
-        stats["total_synonyms"] = len(self._synonym_index)
+        stats: dict[str, int] = {"total_concepts": len(self._store)}
+        stats.update(self._store.domain_counts())
+        stats["total_synonyms"] = self._store.term_count
 
         return stats
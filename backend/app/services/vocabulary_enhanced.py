@@ -20,6 +20,7 @@ from sentence_transformers import SentenceTransformer
 
 from app.schemas.base import Domain
 from app.services.vocabulary import OMOPConcept, VocabularyService
+from app.services.vocabulary_store import VocabularyStoreBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -210,12 +211,11 @@ class EnhancedVocabularyService(VocabularyService):
 
         start_time = time.perf_counter()
 
-        self._concepts = []
-        self._synonym_index = {}
+        builder = VocabularyStoreBuilder()
 
         # Load clinical abbreviations first
-        self._load_clinical_abbreviations()
-        curated_synonyms = set(self._synonym_index.keys())
+        self._load_clinical_abbreviations(builder)
+        curated_synonyms = builder.term_keys()
 
         # Try to load full vocabulary first, fall back to basic
         vocab_path = self.full_vocabulary_path
@@ -242,7 +242,8 @@ class EnhancedVocabularyService(VocabularyService):
                 if not final_synonyms:
                     continue
 
-                concept = OMOPConcept(
+                # Indexed under each lowercased synonym
+                builder.add(
                     concept_id=concept_data["concept_id"],
                     concept_name=concept_data["concept_name"],
                     concept_code=concept_data.get("concept_code", ""),
@@ -250,14 +251,10 @@ class EnhancedVocabularyService(VocabularyService):
                     domain_id=concept_data.get("domain_id", ""),
                     synonyms=final_synonyms,
                 )
-                self._concepts.append(concept)
 
-                # Build synonym index
-                for synonym in final_synonyms:
-                    key = synonym.lower()
-                    if key not in self._synonym_index:
-                        self._synonym_index[key] = []
-                    self._synonym_index[key].append(concept)
+        store = builder.build()
+        store.build_search_indexes()
+        self._store = store
 
         # Build Aho-Corasick automaton for efficient multi-pattern matching
         if self._use_automaton:
@@ -271,8 +268,8 @@ class EnhancedVocabularyService(VocabularyService):
         self._load_time_ms = (time.perf_counter() - start_time) * 1000
 
         logger.info(
-            f"Enhanced vocabulary loaded: {len(self._concepts)} concepts, "
-            f"{len(self._synonym_index)} terms in {self._load_time_ms:.2f}ms"
+            f"Enhanced vocabulary loaded: {len(self._store)} concepts, "
+            f"{self._store.term_count} terms in {self._load_time_ms:.2f}ms"
         )
 
     def _expand_synonyms(self, synonyms: list[str]) -> list[str]:
@@ -300,10 +297,11 @@ class EnhancedVocabularyService(VocabularyService):
             import ahocorasick
 
             self._automaton = ahocorasick.Automaton()
-            for term, concepts in self._synonym_index.items():
+            for term, indices in self._store.terms():
+                concepts = [OMOPConcept(*self._store.record(i)) for i in indices]
                 self._automaton.add_word(term, (term, concepts))
             self._automaton.make_automaton()
-            logger.info(f"Built Aho-Corasick automaton with {len(self._synonym_index)} patterns")
+            logger.info(f"Built Aho-Corasick automaton with {self._store.term_count} patterns")
 
         except ImportError:
             logger.warning("ahocorasick not installed, multi-pattern matching disabled")
@@ -315,7 +313,7 @@ class EnhancedVocabularyService(VocabularyService):
             self._embedder = SentenceTransformer(self.EMBEDDING_MODEL)
 
             # Embed all concept names
-            concept_texts = [c.concept_name for c in self._concepts]
+            concept_texts = [self._store.concept_name(i) for i in range(len(self._store))]
             if concept_texts:
                 self._concept_embeddings = self._embedder.encode(
                     concept_texts,
@@ -371,7 +369,7 @@ class EnhancedVocabularyService(VocabularyService):
             if len(results) >= limit:
                 break
 
-            concept = self._concepts[idx]
+            concept = self.concepts[int(idx)]
 
             # Apply domain filter
             if domain is not None and concept.domain != domain:
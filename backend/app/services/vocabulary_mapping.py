@@ -23,6 +23,9 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from app.core.config import settings
+from app.services.mapping_cache import LRUCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -210,7 +213,9 @@ class VocabularyMappingService:
     def __init__(self) -> None:
         """Initialize the vocabulary mapping service."""
         # Caches for efficient lookup
-        self._concept_cache: dict[tuple[str, str], tuple[int, str]] = {}
+        self._concept_cache: LRUCache[tuple[str, str], tuple[int, str]] = LRUCache(
+            settings.mapping_cache_size
+        )
         self._mapping_cache: dict[int, list[tuple[int, str, str]]] = {}
         self._local_mappings: dict[tuple[str, str], LocalCodeMapping] = {}
 
@@ -279,16 +284,17 @@ class VocabularyMappingService:
 
         # Check concept cache
         cache_key = (code.upper(), source_vocabulary.value)
-        if cache_key in self._concept_cache:
+        cached = self._concept_cache.get(cache_key)
+        if cached is not None:
             self._stats["cache_hits"] += 1
-            source_concept_id, source_name = self._concept_cache[cache_key]
+            source_concept_id, source_name = cached
         else:
             # Look up in vocabulary service
             source_concept_id, source_name = self._lookup_source_concept(
                 code, source_vocabulary
             )
             if source_concept_id:
-                self._concept_cache[cache_key] = (source_concept_id, source_name)
+                self._concept_cache.put(cache_key, (source_concept_id, source_name))
 
         if not source_concept_id:
             self._stats["unmapped"] += 1
@@ -0,0 +1,550 @@
+"""Compact, array-backed concept store shared by the vocabulary services.
+
+Keeping every concept as a dataclass plus a ``dict[str, list[Concept]]``
+synonym index costs several hundred bytes per term, which caps how much
+vocabulary a worker can hold. VocabularyStore keeps the same data in a few
+flat arrays instead:
+
+- every distinct string (names, codes, synonyms, index terms) is interned
+  once into a UTF-8 blob addressed by an offsets array;
+- concept_id is an int64 column, names/codes are int32 string references,
+  and vocabulary/domain are int16 codes into small label tables;
+- each concept's synonyms and each index term's concepts are packed offset
+  tables (CSR layout): ``offsets[i]:offsets[i + 1]`` slices a flat array.
+
+Index terms are found by binary search over a sorted permutation, so no
+per-term Python objects are kept. Two access indexes are derived from the
+columns whenever a store is created: a concept_id -> position hash index
+and per-domain partitions (positions grouped by domain code, CSR again).
+Because they live on the store, swapping in a freshly built store on
+reload swaps its indexes with it. Trigram indexes over the index terms and
+lowercased concept names (for substring search) are attached the same way,
+built on first use or eagerly via ``build_search_indexes``, or installed
+prebuilt from a snapshot (see app.services.snapshot). Concepts are materialized on demand
+(``record``/``ConceptSequence``), letting services keep exposing their
+usual ``concepts``/``search``/``get_by_id`` interface.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from functools import cached_property
+from typing import NamedTuple, TypeVar, overload
+
+import numpy as np
+
+from app.services.trigram_index import TrigramIndex
+
+T = TypeVar("T")
+
+
+class ConceptRecord(NamedTuple):
+    """Fields of one stored concept."""
+
+    concept_id: int
+    concept_name: str
+    concept_code: str
+    vocabulary_id: str
+    domain_id: str
+    synonyms: list[str]
+
+
+class StringTable:
+    """Immutable strings packed into one UTF-8 blob plus an offsets array."""
+
+    def __init__(self, blob: bytes | memoryview, offsets: np.ndarray) -> None:
+        """Wrap a packed blob.
+
+        Args:
+            blob: Concatenated UTF-8 encoded strings (a memoryview for
+                blobs mapped from a snapshot file).
+            offsets: int64 array of len(strings) + 1 byte offsets.
+        """
+        self.blob = blob
+        self.offsets = offsets
+        # Plain-int offsets make per-string slicing cheap
+        self._bounds = offsets.tolist()
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        """Pack strings into a table."""
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self) -> int:
+        return len(self._bounds) - 1
+
+    def raw(self, index: int) -> bytes:
+        """Get the UTF-8 bytes of a string."""
+        return bytes(self.blob[self._bounds[index]:self._bounds[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        return self.raw(index).decode()
+
+    def __iter__(self) -> Iterator[str]:
+        blob = self.blob
+        bounds = self._bounds
+        for i in range(len(bounds) - 1):
+            yield bytes(blob[bounds[i]:bounds[i + 1]]).decode()
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory held by the table."""
+        return len(self.blob) + self.offsets.nbytes
+
+
+class VocabularyStore:
+    """Columnar concepts with a packed synonym -> concept index.
+
+    Build one with VocabularyStoreBuilder.
+
+    Usage:
+        builder = VocabularyStoreBuilder()
+        builder.add(255848, "Pneumonia", "233604007", "SNOMED", "Condition", ["pneumonia"])
+        store = builder.build()
+        records = [store.record(i) for i in store.lookup("pneumonia")]
+    """
+
+    # Array columns, as passed to the constructor and returned by columns()
+    COLUMNS = (
+        "concept_ids", "names", "codes", "vocabularies", "domains", "synonym_offsets",
+        "synonyms", "term_keys", "term_order", "term_offsets", "term_concepts",
+    )
+
+    def __init__(
+        self,
+        strings: StringTable,
+        vocabulary_labels: list[str],
+        domain_labels: list[str],
+        concept_ids: np.ndarray,
+        names: np.ndarray,
+        codes: np.ndarray,
+        vocabularies: np.ndarray,
+        domains: np.ndarray,
+        synonym_offsets: np.ndarray,
+        synonyms: np.ndarray,
+        term_keys: np.ndarray,
+        term_order: np.ndarray,
+        term_offsets: np.ndarray,
+        term_concepts: np.ndarray,
+    ) -> None:
+        """Wrap prebuilt columns (see VocabularyStoreBuilder.build)."""
+        self.strings = strings
+        self.vocabulary_labels = vocabulary_labels
+        self.domain_labels = domain_labels
+        self.concept_ids = concept_ids
+        self.names = names
+        self.codes = codes
+        self.vocabularies = vocabularies
+        self.domains = domains
+        self.synonym_offsets = synonym_offsets
+        self.synonyms = synonyms
+        self.term_keys = term_keys
+        self.term_order = term_order
+        self.term_offsets = term_offsets
+        self.term_concepts = term_concepts
+
+        # concept_id -> first position holding it (IDs may repeat, e.g. 0
+        # for abbreviations without an OMOP mapping); filled in reverse so
+        # the first occurrence wins
+        positions = range(len(concept_ids) - 1, -1, -1)
+        self._positions: dict[int, int] = dict(
+            zip(concept_ids[::-1].tolist(), positions, strict=True)
+        )
+        self._term_trigrams: TrigramIndex | None = None
+        self._name_trigrams: TrigramIndex | None = None
+
+        # Positions grouped by domain code, load order kept within a domain
+        self.domain_order = np.argsort(domains, kind="stable").astype(np.int32)
+        self.domain_offsets = np.zeros(len(domain_labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(domains, minlength=len(domain_labels)), out=self.domain_offsets[1:])
+
+    @classmethod
+    def empty(cls) -> "VocabularyStore":
+        """Create a store with no concepts."""
+        return VocabularyStoreBuilder().build()
+
+    def __len__(self) -> int:
+        return len(self.concept_ids)
+
+    @property
+    def term_count(self) -> int:
+        """Get the number of distinct index terms."""
+        return len(self.term_keys)
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory held by the store's arrays."""
+        arrays = (
+            self.concept_ids, self.names, self.codes, self.vocabularies, self.domains,
+            self.synonym_offsets, self.synonyms, self.term_keys, self.term_order,
+            self.term_offsets, self.term_concepts, self.domain_order, self.domain_offsets,
+        )
+        return self.strings.nbytes + sum(a.nbytes for a in arrays)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Get the array columns by name (see COLUMNS)."""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def record(self, index: int) -> ConceptRecord:
+        """Materialize one concept.
+
+        Args:
+            index: Position of the concept in load order.
+
+        Returns:
+            The concept's fields.
+        """
+        strings = self.strings
+        start, end = self.synonym_offsets[index], self.synonym_offsets[index + 1]
+        return ConceptRecord(
+            concept_id=int(self.concept_ids[index]),
+            concept_name=strings[int(self.names[index])],
+            concept_code=strings[int(self.codes[index])],
+            vocabulary_id=self.vocabulary_labels[self.vocabularies[index]],
+            domain_id=self.domain_labels[self.domains[index]],
+            synonyms=[strings[i] for i in self.synonyms[start:end].tolist()],
+        )
+
+    def position(self, concept_id: int) -> int | None:
+        """Find a concept by ID in constant time.
+
+        Args:
+            concept_id: OMOP concept ID.
+
+        Returns:
+            Position of the first concept with that ID, or None.
+        """
+        return self._positions.get(concept_id)
+
+    def positions(self, concept_ids: Iterable[int]) -> dict[int, int]:
+        """Find many concepts by ID.
+
+        Args:
+            concept_ids: OMOP concept IDs (duplicates allowed).
+
+        Returns:
+            Mapping of each found ID to its position; unknown IDs are omitted.
+        """
+        lookup = self._positions.get
+        found = {}
+        for concept_id in concept_ids:
+            position = lookup(concept_id)
+            if position is not None:
+                found[concept_id] = position
+        return found
+
+    def domain_positions(self, domain_id: str) -> np.ndarray:
+        """Get the positions of a domain's concepts, in load order.
+
+        Args:
+            domain_id: OMOP domain label (e.g. "Condition").
+
+        Returns:
+            Array of positions (empty if no concept has that domain).
+        """
+        if domain_id not in self.domain_labels:
+            return self.domain_order[:0]
+        code = self.domain_labels.index(domain_id)
+        return self.domain_order[self.domain_offsets[code] : self.domain_offsets[code + 1]]
+
+    def concept_name(self, index: int) -> str:
+        """Get one concept's name without materializing the concept."""
+        return self.strings[int(self.names[index])]
+
+    def domain_id(self, index: int) -> str:
+        """Get one concept's domain without materializing the concept."""
+        return self.domain_labels[self.domains[index]]
+
+    def term(self, term_id: int) -> str:
+        """Get an index term by its id."""
+        return self.strings[int(self.term_keys[term_id])]
+
+    def find_term(self, key: str) -> int | None:
+        """Find an index term by binary search.
+
+        Args:
+            key: Exact index term.
+
+        Returns:
+            The term id, or None if the term is not indexed.
+        """
+        target = key.encode()
+        raw = self.strings.raw
+        keys = self.term_keys
+        order = self.term_order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if raw(int(keys[order[mid]])) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and raw(int(keys[order[lo]])) == target:
+            return int(order[lo])
+        return None
+
+    def term_concepts_of(self, term_id: int) -> list[int]:
+        """Get the concepts (indices, in load order) listed under a term."""
+        start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+        return self.term_concepts[start:end].tolist()
+
+    def lookup(self, key: str) -> list[int]:
+        """Get the concepts listed under an exact index term.
+
+        Args:
+            key: Exact index term.
+
+        Returns:
+            Concept indices in load order (empty if the term is unknown).
+        """
+        term_id = self.find_term(key)
+        return [] if term_id is None else self.term_concepts_of(term_id)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.find_term(key) is not None
+
+    def terms(self) -> Iterator[tuple[str, list[int]]]:
+        """Iterate (term, concept indices) in the order terms were first added."""
+        for term_id in range(self.term_count):
+            yield self.term(term_id), self.term_concepts_of(term_id)
+
+    @cached_property
+    def term_column(self) -> "StringColumn":
+        """Index terms as a sequence, by term id."""
+        return StringColumn(self.term_count, self.term)
+
+    @cached_property
+    def name_key_column(self) -> "StringColumn":
+        """Lowercased concept names as a sequence, by concept position."""
+        return StringColumn(len(self), lambda i: self.concept_name(i).lower())
+
+    @property
+    def term_trigrams(self) -> TrigramIndex:
+        """Trigram index over the index terms (ids are term ids)."""
+        self._ensure_search_indexes()
+        return self._term_trigrams
+
+    @property
+    def name_trigrams(self) -> TrigramIndex:
+        """Trigram index over lowercased concept names (ids are concept positions)."""
+        self._ensure_search_indexes()
+        return self._name_trigrams
+
+    def _ensure_search_indexes(self) -> None:
+        """Build the substring search indexes unless already built or installed."""
+        if self._term_trigrams is None:
+            self._term_trigrams = TrigramIndex(self.term_column)
+        if self._name_trigrams is None:
+            self._name_trigrams = TrigramIndex(self.name_key_column)
+
+    def build_search_indexes(self) -> None:
+        """Build the substring search indexes now rather than on first query."""
+        self._ensure_search_indexes()
+
+    def set_search_indexes(self, term_trigrams: TrigramIndex, name_trigrams: TrigramIndex) -> None:
+        """Install prebuilt search indexes over term_column and name_key_column."""
+        self._term_trigrams = term_trigrams
+        self._name_trigrams = name_trigrams
+
+    def domain_counts(self) -> dict[str, int]:
+        """Count concepts per domain."""
+        counts = np.bincount(self.domains, minlength=len(self.domain_labels))
+        return {label: int(n) for label, n in zip(self.domain_labels, counts, strict=True) if n}
+
+    def vocabulary_counts(self) -> dict[str, int]:
+        """Count concepts per vocabulary."""
+        counts = np.bincount(self.vocabularies, minlength=len(self.vocabulary_labels))
+        return {label: int(n) for label, n in zip(self.vocabulary_labels, counts, strict=True) if n}
+
+
+class VocabularyStoreBuilder:
+    """Accumulates concepts into compact columns, then builds a VocabularyStore."""
+
+    def __init__(self) -> None:
+        """Create an empty builder."""
+        self._string_ids: dict[str, int] = {}
+        self._strings: list[str] = []
+        self._vocabulary_codes: dict[str, int] = {}
+        self._domain_codes: dict[str, int] = {}
+        self._term_ids: dict[str, int] = {}
+        self._term_keys: list[int] = []
+
+        self._concept_ids: list[int] = []
+        self._names: list[int] = []
+        self._codes: list[int] = []
+        self._vocabularies: list[int] = []
+        self._domains: list[int] = []
+        self._synonym_counts: list[int] = []
+        self._synonyms: list[int] = []
+        # (term id, concept index) pairs of the synonym index
+        self._pair_terms: list[int] = []
+        self._pair_concepts: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._concept_ids)
+
+    def _intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def has_term(self, key: str) -> bool:
+        """Check whether an index term has been added."""
+        return key in self._term_ids
+
+    def term_keys(self) -> set[str]:
+        """Get the index terms added so far."""
+        return set(self._term_ids)
+
+    def add(
+        self,
+        concept_id: int,
+        concept_name: str,
+        concept_code: str,
+        vocabulary_id: str,
+        domain_id: str,
+        synonyms: Sequence[str],
+        terms: Sequence[str] | None = None,
+    ) -> int:
+        """Add a concept and index it under its terms.
+
+        Args:
+            concept_id: OMOP concept ID.
+            concept_name: Concept name.
+            concept_code: Source concept code.
+            vocabulary_id: Vocabulary the concept comes from.
+            domain_id: OMOP domain.
+            synonyms: Synonyms stored with the concept.
+            terms: Index terms, one per synonym (default: lowercased synonyms).
+
+        Returns:
+            Index of the new concept.
+        """
+        index = len(self._concept_ids)
+        self._concept_ids.append(concept_id)
+        self._names.append(self._intern(concept_name))
+        self._codes.append(self._intern(concept_code))
+        self._vocabularies.append(
+            self._vocabulary_codes.setdefault(vocabulary_id, len(self._vocabulary_codes))
+        )
+        self._domains.append(self._domain_codes.setdefault(domain_id, len(self._domain_codes)))
+
+        self._synonym_counts.append(len(synonyms))
+        self._synonyms.extend(self._intern(s) for s in synonyms)
+
+        for key in terms if terms is not None else [s.lower() for s in synonyms]:
+            term_id = self._term_ids.get(key)
+            if term_id is None:
+                term_id = self._term_ids[key] = len(self._term_keys)
+                self._term_keys.append(self._intern(key))
+            self._pair_terms.append(term_id)
+            self._pair_concepts.append(index)
+
+        return index
+
+    def build(self) -> VocabularyStore:
+        """Pack the accumulated concepts into a VocabularyStore."""
+        strings = StringTable.from_strings(self._strings)
+
+        synonym_offsets = np.zeros(len(self._synonym_counts) + 1, dtype=np.int64)
+        np.cumsum(self._synonym_counts, out=synonym_offsets[1:])
+
+        # Group index pairs by term; a stable sort keeps concepts in load order
+        pair_terms = np.array(self._pair_terms, dtype=np.int32)
+        grouped = np.argsort(pair_terms, kind="stable")
+        term_concepts = np.array(self._pair_concepts, dtype=np.int32)[grouped]
+        term_offsets = np.zeros(len(self._term_keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_terms, minlength=len(self._term_keys)), out=term_offsets[1:])
+
+        encoded_terms = [self._strings[k].encode() for k in self._term_keys]
+        term_order = np.array(
+            sorted(range(len(encoded_terms)), key=encoded_terms.__getitem__), dtype=np.int32
+        )
+
+        return VocabularyStore(
+            strings=strings,
+            vocabulary_labels=list(self._vocabulary_codes),
+            domain_labels=list(self._domain_codes),
+            concept_ids=np.array(self._concept_ids, dtype=np.int64),
+            names=np.array(self._names, dtype=np.int32),
+            codes=np.array(self._codes, dtype=np.int32),
+            vocabularies=np.array(self._vocabularies, dtype=np.int16),
+            domains=np.array(self._domains, dtype=np.int16),
+            synonym_offsets=synonym_offsets,
+            synonyms=np.array(self._synonyms, dtype=np.int32),
+            term_keys=np.array(self._term_keys, dtype=np.int32),
+            term_order=term_order,
+            term_offsets=term_offsets,
+            term_concepts=term_concepts,
+        )
+
+
+class StringColumn(Sequence[str]):
+    """Read-only sequence of strings computed from the store on access."""
+
+    def __init__(self, length: int, getter: Callable[[int], str]) -> None:
+        """Create the view.
+
+        Args:
+            length: Number of strings.
+            getter: Returns the string at a position.
+        """
+        self._length = length
+        self._getter = getter
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._getter(index)
+
+
+class ConceptSequence(Sequence[T]):
+    """Read-only sequence view materializing concepts from a store on access."""
+
+    def __init__(self, store: VocabularyStore, factory: Callable[[ConceptRecord], T]) -> None:
+        """Create the view.
+
+        Args:
+            store: Backing store.
+            factory: Builds the service's concept object from a record.
+        """
+        self._store = store
+        self._factory = factory
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._factory(self._store.record(index))
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(len(self)):
+            yield self._factory(self._store.record(index))
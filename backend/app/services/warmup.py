@@ -0,0 +1,261 @@
+"""Concurrent, dependency-aware warm-up of singleton services at startup.
+
+Application startup used to build the vocabulary, the NLP engines and a
+dozen clinical/coding singletons one after another before accepting
+requests, so pod readiness took the sum of all their load times. Most of
+those initializers are independent and spend their time in file I/O,
+numpy and C extensions, so WarmupScheduler runs them on a thread pool,
+starting each task as soon as the tasks it depends on have finished.
+
+Threads rather than processes are used on purpose: the point is to fill
+this process's singletons, which a worker process could not hand back.
+
+Each task records its state, timing and stats, and the scheduler reports
+partially-warm state while it runs (for the /ready probe). Tasks can be
+configured as lazy (settings.warmup_lazy_services): they are skipped at
+startup and their singletons are built on first use, as before. A failing
+task is logged and also left to load lazily; tasks depending on it still run.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from enum import StrEnum
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupState(StrEnum):
+    """Lifecycle of one warm-up task."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+    LAZY = "lazy"
+
+
+@dataclass(frozen=True)
+class WarmupTask:
+    """A service initializer and the tasks that must finish before it.
+
+    The initializer builds (or fetches) the service and returns stats to
+    report, or None.
+    """
+
+    name: str
+    initializer: Callable[[], Any]
+    depends_on: tuple[str, ...] = ()
+
+
+@dataclass
+class WarmupStatus:
+    """State and timing of one warm-up task."""
+
+    name: str
+    state: WarmupState = WarmupState.PENDING
+    duration_ms: float = 0.0
+    started_at: datetime | None = None
+    error: str | None = None
+    details: Any = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the status to a JSON-serializable dictionary."""
+        return {
+            "state": self.state.value,
+            "duration_ms": round(self.duration_ms, 2),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "error": self.error,
+            "details": self.details,
+        }
+
+
+def _check_order(tasks: dict[str, WarmupTask]) -> None:
+    """Reject unknown dependencies and dependency cycles.
+
+    Raises:
+        ValueError: If the tasks cannot all be scheduled.
+    """
+    for task in tasks.values():
+        unknown = [d for d in task.depends_on if d not in tasks]
+        if unknown:
+            raise ValueError(f"Warm-up task '{task.name}' depends on unknown tasks {unknown}")
+
+    done: set[str] = set()
+    remaining = dict(tasks)
+    while remaining:
+        runnable = [n for n, t in remaining.items() if done.issuperset(t.depends_on)]
+        if not runnable:
+            raise ValueError(f"Warm-up tasks have a dependency cycle: {sorted(remaining)}")
+        for name in runnable:
+            done.add(name)
+            del remaining[name]
+
+
+class WarmupScheduler:
+    """Runs warm-up tasks concurrently in dependency order.
+
+    Usage:
+        scheduler = WarmupScheduler(tasks, max_workers=4, lazy={"vocabulary_enhanced"})
+        scheduler.start()          # at startup, in the background
+        scheduler.get_stats()      # from the readiness probe
+        scheduler.wait(timeout=60)
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[WarmupTask],
+        max_workers: int = 4,
+        lazy: Iterable[str] = (),
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            tasks: Tasks to run; names must be unique.
+            max_workers: Maximum number of tasks running at once.
+            lazy: Names of tasks to skip (their services load on first use).
+
+        Raises:
+            ValueError: If names repeat, or dependencies are unknown or cyclic.
+        """
+        self._tasks: dict[str, WarmupTask] = {}
+        for task in tasks:
+            if task.name in self._tasks:
+                raise ValueError(f"Duplicate warm-up task '{task.name}'")
+            self._tasks[task.name] = task
+        _check_order(self._tasks)
+
+        lazy = set(lazy)
+        self._max_workers = max_workers
+        self._status = {
+            name: WarmupStatus(name, WarmupState.LAZY if name in lazy else WarmupState.PENDING)
+            for name in self._tasks
+        }
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at: float | None = None
+        self._total_time_ms: float | None = None
+
+    def _run_task(self, task: WarmupTask) -> None:
+        """Run one initializer, recording its outcome."""
+        status = self._status[task.name]
+        with self._lock:
+            status.state = WarmupState.RUNNING
+            status.started_at = datetime.now(UTC)
+        start_time = time.perf_counter()
+        try:
+            details = task.initializer()
+        except Exception as e:
+            logger.warning(f"Failed to prewarm {task.name}: {e}")
+            with self._lock:
+                status.state = WarmupState.FAILED
+                status.error = str(e)
+                status.duration_ms = (time.perf_counter() - start_time) * 1000
+            return
+        with self._lock:
+            status.state = WarmupState.READY
+            status.details = details
+            status.duration_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Prewarmed {task.name} in {status.duration_ms:.2f}ms")
+
+    def run(self) -> dict[str, Any]:
+        """Run all eager tasks and wait for them.
+
+        Returns:
+            The final stats (see get_stats).
+        """
+        self._started_at = time.perf_counter()
+        pending = {
+            name: task
+            for name, task in self._tasks.items()
+            if self._status[name].state == WarmupState.PENDING
+        }
+        # Lazy tasks never run, so nothing waits on them
+        blockers = {name: set(task.depends_on) & set(pending) for name, task in pending.items()}
+
+        try:
+            with ThreadPoolExecutor(self._max_workers, thread_name_prefix="warmup") as pool:
+                running: dict[Future[None], str] = {}
+                while pending or running:
+                    for name in [n for n in pending if not blockers[n]]:
+                        running[pool.submit(self._run_task, pending.pop(name))] = name
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        for waiting_on in blockers.values():
+                            waiting_on.discard(name)
+        finally:
+            self._total_time_ms = (time.perf_counter() - self._started_at) * 1000
+            self._done.set()
+
+        stats = self.get_stats()
+        logger.info(
+            f"Warm-up finished: {stats['ready_count']}/{stats['task_count']} services "
+            f"in {stats['total_time_ms']}ms ({stats['failed_count']} failed, "
+            f"{stats['lazy_count']} lazy)"
+        )
+        return stats
+
+    def start(self) -> None:
+        """Run the tasks in a background thread and return immediately."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the warm-up to finish.
+
+        Returns:
+            True if it finished within the timeout.
+        """
+        return self._done.wait(timeout)
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether every eager task has finished (successfully or not)."""
+        return self._done.is_set()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get overall progress and per-service status.
+
+        Returns:
+            Dictionary with the overall state ("warming", "ready" or
+            "degraded" when a task failed), counts, elapsed time, and
+            per-service state, timing and stats.
+        """
+        with self._lock:
+            services = {name: status.to_dict() for name, status in self._status.items()}
+        counts = dict.fromkeys(WarmupState, 0)
+        for service in services.values():
+            counts[WarmupState(service["state"])] += 1
+
+        if not self.is_ready:
+            state = "warming"
+        elif counts[WarmupState.FAILED]:
+            state = "degraded"
+        else:
+            state = "ready"
+
+        if self._total_time_ms is not None:
+            total_time_ms = self._total_time_ms
+        elif self._started_at is not None:
+            total_time_ms = (time.perf_counter() - self._started_at) * 1000
+        else:
+            total_time_ms = 0.0
+
+        return {
+            "state": state,
+            "task_count": len(services),
+            "ready_count": counts[WarmupState.READY],
+            "failed_count": counts[WarmupState.FAILED],
+            "lazy_count": counts[WarmupState.LAZY],
+            "total_time_ms": round(total_time_ms, 2),
+            "services": services,
+        }
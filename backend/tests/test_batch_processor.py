@@ -0,0 +1,177 @@
+"""Tests for the batch processing service."""
+
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app.schemas.base import Assertion
+from app.services.batch_processor import (
+    BatchDocument,
+    BatchProcessorService,
+    BatchStatus,
+    DocumentStatus,
+    ExecutionMode,
+    MentionExtractionProcessor,
+)
+from app.services.nlp import ExtractedMention
+
+
+def upper_processor(doc: BatchDocument) -> dict:
+    """Module-level (picklable) processor returning the worker pid."""
+    if doc.content == "boom":
+        raise ValueError("bad document")
+    return {"text": doc.content.upper(), "pid": os.getpid()}
+
+
+def slow_processor(doc: BatchDocument) -> dict:
+    """Module-level (picklable) processor that takes a while."""
+    time.sleep(0.1)
+    return upper_processor(doc)
+
+
+def wait_for(service: BatchProcessorService, job_id: str, timeout: float = 30.0) -> None:
+    """Wait for a batch job to leave the processing state."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get_batch_status(job_id)
+        if job.status not in (BatchStatus.PENDING, BatchStatus.PROCESSING):
+            return
+        time.sleep(0.02)
+    raise TimeoutError(job_id)
+
+
+@pytest.fixture(params=[ExecutionMode.THREAD, ExecutionMode.PROCESS])
+def service(request: pytest.FixtureRequest) -> BatchProcessorService:
+    """Create a batch processor in each execution mode."""
+    return BatchProcessorService(max_workers=2, execution_mode=request.param, chunk_size=2)
+
+
+class TestBatchExecution:
+    """Tests for running batches in thread and process mode."""
+
+    def test_all_documents_processed(self, service: BatchProcessorService) -> None:
+        """Test results, counters and summary are filled in either mode."""
+        job = service.create_batch([{"content": f"note {i}"} for i in range(5)])
+        service.start_batch(job.job_id, upper_processor)
+        wait_for(service, job.job_id)
+
+        job = service.get_batch_status(job.job_id)
+        assert job.status == BatchStatus.COMPLETED
+        assert job.successful_documents == 5
+        assert job.progress_percent == 100.0
+        assert [d.result["text"] for d in job.documents] == [f"NOTE {i}" for i in range(5)]
+        assert all(d.completed_at and d.processing_time_ms >= 0 for d in job.documents)
+        assert job.summary["successful"] == 5
+
+    def test_failures_are_isolated(self, service: BatchProcessorService) -> None:
+        """Test a failing document does not fail its chunk."""
+        job = service.create_batch([{"content": "ok"}, {"content": "boom"}, {"content": "ok"}])
+        service.start_batch(job.job_id, upper_processor)
+        wait_for(service, job.job_id)
+
+        job = service.get_batch_status(job.job_id)
+        assert job.status == BatchStatus.PARTIAL
+        assert [d.status for d in job.documents] == [
+            DocumentStatus.COMPLETED,
+            DocumentStatus.FAILED,
+            DocumentStatus.COMPLETED,
+        ]
+        assert job.errors == ["document_1.txt: bad document"]
+
+    def test_cancelled_documents_stay_queued(self) -> None:
+        """Test documents cancelled before they start are neither run nor failed."""
+        service = BatchProcessorService(max_workers=2, execution_mode=ExecutionMode.THREAD)
+        job = service.create_batch([{"content": f"note {i}"} for i in range(12)])
+        service.start_batch(job.job_id, slow_processor)
+        assert service.cancel_batch(job.job_id)
+
+        deadline = time.time() + 30
+        while not service.get_batch_status(job.job_id).summary:
+            assert time.time() < deadline
+            time.sleep(0.02)
+
+        job = service.get_batch_status(job.job_id)
+        statuses = [d.status for d in job.documents]
+        assert job.status == BatchStatus.CANCELLED
+        assert job.failed_documents == 0
+        assert DocumentStatus.QUEUED in statuses
+        assert set(statuses) <= {DocumentStatus.QUEUED, DocumentStatus.COMPLETED}
+        assert all(d.started_at is None for d in job.documents if d.status == DocumentStatus.QUEUED)
+
+    def test_cancelled_chunk_is_not_failed(self) -> None:
+        """Test a chunk future cancelled before it ran leaves its documents queued."""
+        service = BatchProcessorService(execution_mode=ExecutionMode.PROCESS)
+        job = service.create_batch([{"content": "a"}, {"content": "b"}])
+        future = Future()
+        future.cancel()
+        service._chunk_documents[future] = job.documents
+
+        service._apply_chunk(job.job_id, future)
+
+        assert [d.status for d in job.documents] == [DocumentStatus.QUEUED] * 2
+        assert job.processed_documents == 0
+        assert job.errors == []
+
+    def test_process_mode_times_documents_in_workers(self) -> None:
+        """Test start times are recorded when a document runs, not when it is submitted."""
+        service = BatchProcessorService(
+            max_workers=1, execution_mode=ExecutionMode.PROCESS, chunk_size=1
+        )
+        job = service.create_batch([{"content": "a"}, {"content": "b"}])
+        service.start_batch(job.job_id, slow_processor)
+        wait_for(service, job.job_id)
+
+        first, second = service.get_batch_status(job.job_id).documents
+        assert first.started_at <= first.completed_at <= second.started_at <= second.completed_at
+        assert second.processing_time_ms >= 100
+
+    def test_process_mode_runs_in_workers(self) -> None:
+        """Test process mode executes documents outside the parent process."""
+        service = BatchProcessorService(max_workers=2, execution_mode=ExecutionMode.PROCESS)
+        job = service.create_batch([{"content": "a"}, {"content": "b"}])
+        service.start_batch(job.job_id, upper_processor)
+        wait_for(service, job.job_id)
+
+        pids = {d.result["pid"] for d in service.get_batch_status(job.job_id).documents}
+        assert os.getpid() not in pids
+
+
+class TestMentionExtractionProcessor:
+    """Tests for the shared-engine extraction processor."""
+
+    def test_extracts_compact_mentions_in_process_mode(self) -> None:
+        """Test mentions come back packed and rebuild to the parent's result."""
+        text = "Patient denies chest pain. History of diabetes."
+        processor = MentionExtractionProcessor()
+        expected = processor(BatchDocument(document_id="d", filename="d.txt", content=text))
+
+        service = BatchProcessorService(max_workers=2, execution_mode=ExecutionMode.PROCESS)
+        job = service.create_batch([{"content": text}, {"content": text.encode()}])
+        service.start_batch(job.job_id, processor)
+        wait_for(service, job.job_id)
+
+        for doc in service.get_batch_status(job.job_id).documents:
+            assert doc.result == expected
+            mentions = [ExtractedMention.from_tuple(m) for m in doc.result["mentions"]]
+            assert any(m.assertion == Assertion.ABSENT for m in mentions)
+
+
+class TestExtractedMentionPacking:
+    """Tests for the compact mention form."""
+
+    def test_round_trip(self) -> None:
+        """Test to_tuple/from_tuple preserve every field."""
+        mention = ExtractedMention(
+            text="Fever",
+            start_offset=3,
+            end_offset=8,
+            lexical_variant="fever",
+            section="Assessment",
+            assertion=Assertion.POSSIBLE,
+            confidence=0.75,
+            domain_hint="Condition",
+            omop_concept_id=437663,
+        )
+        assert ExtractedMention.from_tuple(mention.to_tuple()) == mention
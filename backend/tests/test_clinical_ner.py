@@ -269,6 +269,89 @@ class TestTextChunking:
         # Account for overlap
         assert combined_length >= len(long_text)
 
+    def test_chunk_spans_terminate_and_align(self):
+        """Test chunking ends at the text end and offsets point at each chunk."""
+        chunk_size = self.service.config.max_sequence_length * 4
+        long_text = "Patient has diabetes. " * (chunk_size // 5)
+        spans = self.service._chunk_spans(long_text)
+
+        assert len(spans) > 1
+        assert spans[-1][0] + len(spans[-1][1]) == len(long_text)
+        for offset, chunk in spans:
+            assert long_text[offset:offset + len(chunk)] == chunk
+
+
+# ============================================================================
+# Batch Extraction Tests
+# ============================================================================
+
+
+class TestBatchExtraction:
+    """Test extract_mentions_batch with a stand-in transformer pipeline."""
+
+    class FakePipeline:
+        """Tags every "diabetes" as a PROBLEM and records each call."""
+
+        def __init__(self):
+            self.calls: list[int] = []
+
+        def __call__(self, chunks, batch_size=1):
+            self.calls.append(len(chunks))
+            results = []
+            for chunk in chunks:
+                entities = []
+                start = chunk.find("diabetes")
+                while start != -1:
+                    entities.append({
+                        "word": "diabetes",
+                        "start": start,
+                        "end": start + 8,
+                        "entity_group": "PROBLEM",
+                        "score": 0.9,
+                    })
+                    start = chunk.find("diabetes", start + 1)
+                results.append(entities)
+            return results
+
+    def setup_method(self):
+        """Create a service wired to the fake pipeline."""
+        self.service = ClinicalNERService()
+        self.pipeline = self.FakePipeline()
+        self.service._initialized = True
+        self.service._spacy_available = False
+        self.service._transformer_pipeline = self.pipeline
+
+    def test_chunks_of_all_documents_share_one_call(self):
+        """Test one pipeline call covers every chunk of every document."""
+        chunk_size = self.service.config.max_sequence_length * 4
+        long_text = "Patient has diabetes. " * (chunk_size // 10)
+        texts = ["No diabetes.", long_text, "History of diabetes."]
+
+        results = list(
+            self.service.extract_mentions_batch((t, uuid4(), None) for t in texts)
+        )
+
+        assert len(self.pipeline.calls) == 1
+        assert self.pipeline.calls[0] > len(texts)
+        assert [m.assertion for m in results[0]] == [Assertion.ABSENT]
+        assert len(results[1]) == long_text.count("diabetes")
+        for mention in results[1]:
+            assert long_text[mention.start_offset:mention.end_offset] == "diabetes"
+        assert results[2][0].temporality == Temporality.PAST
+
+    def test_documents_per_batch(self):
+        """Test documents are sent to the model in groups."""
+        texts = ["diabetes"] * 5
+
+        results = list(
+            self.service.extract_mentions_batch(
+                ((t, uuid4(), None) for t in texts), documents_per_batch=2
+            )
+        )
+
+        assert self.pipeline.calls == [2, 2, 1]
+        assert all(len(mentions) == 1 for mentions in results)
+
 
 # ============================================================================
 # Extraction Tests
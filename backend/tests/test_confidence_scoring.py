@@ -5,6 +5,8 @@ from uuid import uuid4
 import pytest
 
 from app.schemas.base import Assertion
+from app.services.confidence_scoring import ConfidenceScorer
+from app.services.nlp import ExtractedMention
 from app.services.nlp_rule_based import RuleBasedNLPService
 from app.services.section_parser import ClinicalSection
 
@@ -281,3 +283,52 @@ class TestConfidenceWeights:
         weights = RuleBasedNLPService.CONFIDENCE_WEIGHTS
         expected_keys = {"base", "term_length", "section_fit", "specificity", "case_match"}
         assert set(weights.keys()) == expected_keys
+
+
+class TestConfidenceScorer:
+    """Tests for columnar confidence scoring."""
+
+    def test_batch_matches_single_mentions(self) -> None:
+        """Test scoring a batch gives each mention's single-call score."""
+        scorer = ConfidenceScorer(RuleBasedNLPService.CONFIDENCE_WEIGHTS)
+        rows = [
+            ("CAD", "cad", None, "Condition", ClinicalSection.PAST_MEDICAL_HISTORY, Assertion.PRESENT),
+            ("Metformin", "Metformin", 1503297, "Drug", ClinicalSection.MEDICATIONS, Assertion.PRESENT),
+            ("pneumonia", "pneumonia", 5, None, ClinicalSection.UNKNOWN, Assertion.POSSIBLE),
+            ("widget", "gadget", 7, "Device", ClinicalSection.LABS, Assertion.ABSENT),
+        ]
+        batch = scorer.score(*zip(*rows, strict=True))
+        singles = [scorer.score(*([value] for value in row))[0] for row in rows]
+
+        assert batch.tolist() == singles
+
+    def test_score_mentions_reads_section_names(self) -> None:
+        """Test mentions carrying section names score like the enum."""
+        scorer = ConfidenceScorer(RuleBasedNLPService.CONFIDENCE_WEIGHTS)
+        mention = ExtractedMention(
+            text="Metformin",
+            start_offset=0,
+            end_offset=9,
+            lexical_variant="metformin",
+            section=ClinicalSection.MEDICATIONS.value,
+            domain_hint="Drug",
+            omop_concept_id=1503297,
+        )
+        expected = scorer.score(
+            ["Metformin"], ["metformin"], [1503297], ["Drug"],
+            [ClinicalSection.MEDICATIONS], [Assertion.PRESENT],
+        )
+
+        assert scorer.score_mentions([mention]).tolist() == expected.tolist()
+
+    def test_weights_are_configurable(self) -> None:
+        """Test changed weights apply to the next scoring call."""
+        weights = dict(RuleBasedNLPService.CONFIDENCE_WEIGHTS)
+        scorer = ConfidenceScorer(weights)
+        args = (["HTN"], ["HTN"], [None], ["Condition"], [ClinicalSection.PLAN], [Assertion.PRESENT])
+        before = scorer.score(*args)[0]
+
+        weights.update(base=1.0, term_length=0.0, section_fit=0.0, specificity=0.0, case_match=0.0)
+
+        assert scorer.score(*args)[0] == 1.0
+        assert before < 1.0
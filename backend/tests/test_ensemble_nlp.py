@@ -211,6 +211,24 @@ class TestEnsembleExtraction:
             assert mention.confidence >= 0.99
 
 
+    def test_extract_mentions_batch_matches_single(self):
+        """Test batch extraction merges each document like extract_mentions."""
+        texts = [
+            "Patient has diabetes and takes metformin 500mg daily.",
+            "Vital signs: BP 120/80, HR 72. Denies chest pain.",
+            "",
+        ]
+        expected = [self.service.extract_mentions(text, uuid4()) for text in texts]
+
+        results = list(
+            self.service.extract_mentions_batch(
+                ((text, uuid4(), None) for text in texts), documents_per_batch=2
+            )
+        )
+
+        assert results == expected
+
+
 # ============================================================================
 # Merge Tests
 # ============================================================================
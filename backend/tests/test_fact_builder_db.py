@@ -4,6 +4,7 @@ Tests fact construction, evidence linking, deduplication,
 and correct handling of negated findings (tasks 6.2-6.6).
 """
 
+from unittest.mock import MagicMock
 from uuid import uuid4
 
 import pytest
@@ -437,6 +438,140 @@ class TestDeduplication:
         assert result2.is_new is True
 
 
+class TestBulkFactCreation:
+    """Tests for create_facts_bulk."""
+
+    @staticmethod
+    def mention_fact(
+        mention_id, assertion: Assertion = Assertion.PRESENT, confidence: float = 0.5
+    ) -> tuple[FactInput, list[EvidenceInput]]:
+        return (
+            FactInput(
+                patient_id="P001",
+                domain=Domain.CONDITION,
+                omop_concept_id=437663,
+                concept_name="Fever",
+                assertion=assertion,
+                confidence=confidence,
+            ),
+            [EvidenceInput(EvidenceType.MENTION, mention_id, "mentions")],
+        )
+
+    def test_bulk_matches_sequential_dedup(
+        self, fact_service: DatabaseFactBuilderService, db_session: Session
+    ) -> None:
+        """Test repeated keys in a batch merge into one fact with merged confidence."""
+        results = fact_service.create_facts_bulk(
+            [self.mention_fact(uuid4()), self.mention_fact(uuid4()), self.mention_fact(uuid4())]
+        )
+
+        assert [r.is_new for r in results] == [True, False, False]
+        assert len({r.fact_id for r in results}) == 1
+        assert all(len(r.evidence_ids) == 1 for r in results)
+        retrieved = fact_service.get_fact_by_id(results[0].fact_id)
+        # 1 - 0.5^3
+        assert retrieved.confidence == pytest.approx(0.875)
+        assert db_session.query(FactEvidence).count() == 3
+
+    def test_bulk_merges_into_existing_facts(
+        self, fact_service: DatabaseFactBuilderService, db_session: Session
+    ) -> None:
+        """Test facts already in the database are reused and evidence is not duplicated."""
+        mention_id = uuid4()
+        first = fact_service.create_fact(*self.mention_fact(mention_id))
+
+        results = DatabaseFactBuilderService(db_session).create_facts_bulk(
+            [self.mention_fact(mention_id), self.mention_fact(uuid4())]
+        )
+
+        assert [r.fact_id for r in results] == [first.fact_id, first.fact_id]
+        assert [r.is_new for r in results] == [False, False]
+        assert results[0].evidence_ids == []
+        assert len(results[1].evidence_ids) == 1
+        assert fact_service.get_fact_by_id(first.fact_id).confidence == pytest.approx(0.875)
+
+    def test_bulk_preserves_negated_facts(self, fact_service: DatabaseFactBuilderService) -> None:
+        """Test negated findings are kept as separate facts in a batch."""
+        mention_id = uuid4()
+        present, absent = fact_service.create_facts_bulk(
+            [
+                self.mention_fact(mention_id),
+                self.mention_fact(mention_id, assertion=Assertion.ABSENT),
+            ]
+        )
+
+        assert present.fact_id != absent.fact_id
+        assert absent.is_new is True
+        negated = fact_service.get_negated_facts_for_patient("P001")
+        assert len(negated) == 1
+        assert negated[0].confidence == pytest.approx(0.5)
+
+    def test_bulk_upsert_merges_concurrently_inserted_fact(
+        self,
+        fact_service: DatabaseFactBuilderService,
+        db_session: Session,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a fact inserted after the prefetch is merged via ON CONFLICT."""
+        other = fact_service.create_fact(*self.mention_fact(uuid4()))
+        writer = DatabaseFactBuilderService(db_session)
+        # Simulate another worker inserting the fact after this one's prefetch
+        monkeypatch.setattr(writer, "_prefetch_facts", lambda fact_inputs: {})
+
+        (result,) = writer.create_facts_bulk([self.mention_fact(uuid4())])
+
+        assert result.fact_id == other.fact_id
+        assert result.is_new is False
+        assert len(result.evidence_ids) == 1
+        assert db_session.query(ClinicalFact).count() == 1
+        assert fact_service.get_fact_by_id(other.fact_id).confidence == pytest.approx(0.75)
+
+    def test_bulk_links_each_source_once(
+        self, fact_service: DatabaseFactBuilderService, db_session: Session
+    ) -> None:
+        """Test the same source is linked to a fact only once."""
+        fact_input, evidence = self.mention_fact(uuid4())
+
+        (result,) = fact_service.create_facts_bulk([(fact_input, evidence * 2)])
+
+        assert len(result.evidence_ids) == 1
+        assert db_session.query(FactEvidence).count() == 1
+
+    def test_facts_written_outside_builder_are_not_merged(
+        self, fact_service: DatabaseFactBuilderService, db_session: Session
+    ) -> None:
+        """Test facts without a dedup key (e.g. one per FHIR resource) stay separate."""
+        fact_input, _ = self.mention_fact(uuid4())
+        for _ in range(2):
+            db_session.add(
+                ClinicalFact(
+                    patient_id=fact_input.patient_id,
+                    domain=fact_input.domain,
+                    omop_concept_id=fact_input.omop_concept_id,
+                    concept_name=fact_input.concept_name,
+                )
+            )
+        db_session.flush()
+
+        result = fact_service.create_fact(fact_input)
+
+        assert result.is_new is True
+        assert db_session.query(ClinicalFact).count() == 3
+
+    def test_bulk_empty_batch(self, fact_service: DatabaseFactBuilderService) -> None:
+        """Test an empty batch creates nothing."""
+        assert fact_service.create_facts_bulk([]) == []
+
+    def test_bulk_flushes_write_buffer_first(self, db_session: Session) -> None:
+        """Test the caller's pending inserts are written before facts."""
+        write_buffer = MagicMock()
+        service = DatabaseFactBuilderService(db_session, write_buffer=write_buffer)
+
+        service.create_facts_bulk([])
+
+        write_buffer.flush.assert_called_once()
+
+
 class TestDomainFiltering:
     """Tests for domain filtering."""
 
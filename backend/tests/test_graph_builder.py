@@ -11,7 +11,7 @@ from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.clinical_fact import ClinicalFact
-from app.models.knowledge_graph import KGEdge, KGNode
+from app.models.knowledge_graph import KGEdge, KGNode, KGProjection
 from app.schemas.base import Assertion, Domain, Experiencer, Temporality
 from app.schemas.knowledge_graph import EdgeType, NodeType
 from app.services.graph_builder import (
@@ -40,12 +40,14 @@ def graph_session() -> Session:
     KGNode.__table__.create(bind=_graph_test_engine, checkfirst=True)
     KGEdge.__table__.create(bind=_graph_test_engine, checkfirst=True)
     ClinicalFact.__table__.create(bind=_graph_test_engine, checkfirst=True)
+    KGProjection.__table__.create(bind=_graph_test_engine, checkfirst=True)
 
     session = _GraphTestSession()
     try:
         yield session
     finally:
         session.close()
+        KGProjection.__table__.drop(bind=_graph_test_engine, checkfirst=True)
         KGEdge.__table__.drop(bind=_graph_test_engine, checkfirst=True)
         KGNode.__table__.drop(bind=_graph_test_engine, checkfirst=True)
         ClinicalFact.__table__.drop(bind=_graph_test_engine, checkfirst=True)
@@ -4,6 +4,7 @@ Tests graph construction, patient nodes, fact-to-node projection,
 edge creation, and graph structure validation (tasks 7.2-7.4, 7.6).
 """
 
+from datetime import UTC, datetime, timedelta
 from uuid import uuid4
 
 import pytest
@@ -11,7 +12,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.models.clinical_fact import ClinicalFact
-from app.models.knowledge_graph import KGEdge, KGNode
+from app.models.knowledge_graph import KGEdge, KGNode, KGProjection
 from app.schemas.base import Assertion, Domain, Experiencer, Temporality
 from app.schemas.knowledge_graph import EdgeType, NodeType
 from app.services.graph_builder import EdgeInput, NodeInput
@@ -36,12 +37,14 @@ def db_session() -> Session:
     KGNode.__table__.create(bind=_test_engine, checkfirst=True)
     KGEdge.__table__.create(bind=_test_engine, checkfirst=True)
     ClinicalFact.__table__.create(bind=_test_engine, checkfirst=True)
+    KGProjection.__table__.create(bind=_test_engine, checkfirst=True)
 
     session = _TestSession()
     try:
         yield session
     finally:
         session.close()
+        KGProjection.__table__.drop(bind=_test_engine, checkfirst=True)
         ClinicalFact.__table__.drop(bind=_test_engine, checkfirst=True)
         KGEdge.__table__.drop(bind=_test_engine, checkfirst=True)
         KGNode.__table__.drop(bind=_test_engine, checkfirst=True)
@@ -649,6 +652,155 @@ class TestBuildGraphForPatient:
         assert negated[0].properties.get("is_negated") is True
 
 
+class TestIncrementalProjection:
+    """Tests for incremental graph builds of facts not projected yet."""
+
+    T0 = datetime(2026, 1, 1, tzinfo=UTC)
+
+    @staticmethod
+    def add_fact(
+        db_session: Session,
+        concept_id: int,
+        name: str,
+        created_at: datetime,
+        domain: Domain = Domain.CONDITION,
+        assertion: Assertion = Assertion.PRESENT,
+    ) -> ClinicalFact:
+        fact = ClinicalFact(
+            patient_id="P001",
+            domain=domain,
+            omop_concept_id=concept_id,
+            concept_name=name,
+            assertion=assertion,
+            temporality=Temporality.CURRENT,
+            experiencer=Experiencer.PATIENT,
+            created_at=created_at,
+        )
+        db_session.add(fact)
+        db_session.flush()
+        return fact
+
+    def test_second_build_only_projects_new_facts(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test a rebuild creates only the nodes and edges of newer facts."""
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+        first = graph_service.build_graph_for_patient("P001")
+
+        self.add_fact(db_session, 1000000, "Aspirin", self.T0 + timedelta(hours=1), Domain.DRUG)
+        second = graph_service.build_graph_for_patient("P001")
+
+        assert (first.nodes_created, first.edges_created) == (2, 1)
+        assert (second.nodes_created, second.edges_created) == (1, 1)
+        assert (second.node_count, second.edge_count) == (3, 2)
+        assert len(graph_service.get_nodes_for_patient("P001")) == 3
+        facts = db_session.query(ClinicalFact).filter_by(patient_id="P001").all()
+        assert all(fact.projected_at is not None for fact in facts)
+        projection = db_session.query(KGProjection).filter_by(patient_id="P001").one()
+        assert (projection.node_count, projection.edge_count) == (3, 2)
+
+    def test_rebuild_without_new_facts_is_a_no_op(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test a rebuild without new facts creates nothing."""
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+        graph_service.build_graph_for_patient("P001")
+
+        result = DatabaseGraphBuilderService(db_session).build_graph_for_patient("P001")
+
+        assert (result.nodes_created, result.edges_created) == (0, 0)
+        assert (result.node_count, result.edge_count) == (2, 1)
+        assert len(graph_service.get_edges_for_patient("P001")) == 1
+
+    def test_facts_sharing_a_node_create_one_node_and_edge(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test the first fact of a concept sets its node, as when projecting one by one."""
+        first = self.add_fact(db_session, 255848, "Pneumonia", self.T0, assertion=Assertion.ABSENT)
+        self.add_fact(db_session, 255848, "Pneumonia", self.T0 + timedelta(minutes=1))
+
+        result = graph_service.build_graph_for_patient("P001")
+
+        assert (result.nodes_created, result.edges_created) == (2, 1)
+        node = graph_service.get_nodes_for_patient("P001", node_type=NodeType.CONDITION)[0]
+        assert node.properties["fact_id"] == first.id
+        assert node.properties["is_negated"] is True
+
+    def test_fact_committed_late_is_projected(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test a fact created before the last build but written after it is projected."""
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+        graph_service.build_graph_for_patient("P001")
+        # Inserted by a long-running transaction that started before the build
+        late = self.add_fact(
+            db_session, 1000000, "Aspirin", self.T0 - timedelta(hours=1), Domain.DRUG
+        )
+
+        result = graph_service.build_graph_for_patient("P001")
+
+        assert (result.nodes_created, result.edges_created) == (1, 1)
+        assert (result.node_count, result.edge_count) == (3, 2)
+        db_session.refresh(late)
+        assert late.projected_at is not None
+
+    def test_full_build_reprojects_projected_facts(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test a full build reads facts already marked projected."""
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+        graph_service.build_graph_for_patient("P001")
+        # Marked projected without reaching the graph
+        aspirin = self.add_fact(db_session, 1000000, "Aspirin", self.T0, Domain.DRUG)
+        aspirin.projected_at = self.T0
+        db_session.flush()
+
+        incremental = graph_service.build_graph_for_patient("P001")
+        full = graph_service.build_graph_for_patient("P001", full=True)
+
+        assert incremental.nodes_created == 0
+        assert (full.nodes_created, full.edges_created) == (1, 1)
+        assert (full.node_count, full.edge_count) == (3, 2)
+
+    def test_stale_projection_counts_trigger_reprojection(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test a graph changed outside the builder is reprojected from scratch."""
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+        graph_service.build_graph_for_patient("P001")
+        # Cleared without resetting the projection
+        db_session.query(KGEdge).filter_by(patient_id="P001").delete()
+        db_session.query(KGNode).filter_by(patient_id="P001").delete()
+        db_session.flush()
+
+        result = DatabaseGraphBuilderService(db_session).build_graph_for_patient("P001")
+
+        assert (result.nodes_created, result.edges_created) == (2, 1)
+        assert (result.node_count, result.edge_count) == (2, 1)
+
+    def test_nodes_written_outside_builder_are_not_merged(
+        self, graph_service: DatabaseGraphBuilderService, db_session: Session
+    ) -> None:
+        """Test nodes without a dedup key (e.g. FHIR import) never conflict."""
+        for _ in range(2):
+            db_session.add(
+                KGNode(
+                    patient_id="P001",
+                    node_type=NodeType.CONDITION,
+                    omop_concept_id=437663,
+                    label="Fever",
+                    properties={},
+                )
+            )
+        db_session.flush()
+        self.add_fact(db_session, 437663, "Fever", self.T0)
+
+        result = graph_service.build_graph_for_patient("P001")
+
+        assert (result.nodes_created, result.edges_created) == (2, 1)
+        assert result.node_count == 4
+
+
 class TestGetPatientGraph:
     """Tests for complete graph retrieval."""
 
@@ -4,6 +4,18 @@ from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
+from sqlalchemy import Select
+from sqlalchemy.sql.dml import Insert, Update
+
+
+def inserted_rows(mock_session: MagicMock, model: type) -> list[dict]:
+    """Collect the rows bulk-inserted into a model's table through session.execute."""
+    rows: list[dict] = []
+    for call in mock_session.execute.call_args_list:
+        stmt, *params = call.args
+        if params and isinstance(stmt, Insert) and stmt.entity_description["entity"] is model:
+            rows.extend(params[0])
+    return rows
 
 
 class TestProcessDocumentModule:
@@ -22,6 +34,29 @@ class TestProcessDocumentModule:
         assert callable(process_document)
 
 
+class TestExtractDocumentMentions:
+    """Test batch extraction helper used by document jobs."""
+
+    def test_pairs_documents_with_results_in_order(self) -> None:
+        """Test each document is paired with its own mentions."""
+        from app.jobs.document_processing import extract_document_mentions
+
+        documents = []
+        for text in ["Patient has diabetes.", "No fever.", "History of asthma."]:
+            document = MagicMock()
+            document.id = str(uuid4())
+            document.text = text
+            document.note_type = "progress_note"
+            documents.append(document)
+
+        results = list(extract_document_mentions(documents))
+
+        assert [document for document, _ in results] == documents
+        for document, mentions in results:
+            for mention in mentions:
+                assert document.text[mention.start_offset:mention.end_offset] == mention.text
+
+
 class TestProcessDocumentFunction:
     """Test process_document function behavior."""
 
@@ -93,7 +128,7 @@ class TestProcessDocumentFunction:
         # Mock execute to return document on second call
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:  # Second call is the select
@@ -130,7 +165,7 @@ class TestProcessDocumentFunction:
         # Mock execute to return document on second call
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:  # Second call is the select
@@ -145,8 +180,16 @@ class TestProcessDocumentFunction:
         assert result["success"] is True
         # Should extract at least fever, cough, pneumonia
         assert result["mention_count"] >= 3
-        # Verify session.add was called for each mention
-        assert mock_session.add.call_count >= 3
+        # Verify every mention was written in one bulk INSERT
+        from app.models.mention import Mention
+
+        assert len(inserted_rows(mock_session, Mention)) == result["mention_count"]
+        mention_inserts = [
+            call
+            for call in mock_session.execute.call_args_list
+            if isinstance(call.args[0], Insert) and call.args[0].entity_description["entity"] is Mention
+        ]
+        assert len(mention_inserts) == 1
 
     @patch("app.jobs.document_processing.get_sync_engine")
     @patch("app.jobs.document_processing.Session")
@@ -162,7 +205,9 @@ class TestProcessDocumentFunction:
         mock_session_class.return_value.__exit__ = MagicMock(return_value=None)
 
         # Create mock document
+        document_id = str(uuid4())
         mock_document = MagicMock()
+        mock_document.id = document_id
         mock_document.patient_id = "patient-789"
         mock_document.note_type = "progress_note"
         mock_document.text = "Patient has fever."
@@ -170,7 +215,7 @@ class TestProcessDocumentFunction:
         # Mock execute
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:
@@ -179,18 +224,17 @@ class TestProcessDocumentFunction:
 
         mock_session.execute.side_effect = mock_execute
 
-        document_id = str(uuid4())
         process_document(document_id)
 
-        # Check that Mention objects were added to session
-        add_calls = mock_session.add.call_args_list
-        mentions_added = [call[0][0] for call in add_calls if isinstance(call[0][0], Mention)]
+        # Check that Mention rows were bulk inserted
+        mentions_added = inserted_rows(mock_session, Mention)
 
         assert len(mentions_added) >= 1
         # Verify fever mention attributes
-        fever_mention = next((m for m in mentions_added if "fever" in m.text.lower()), None)
+        fever_mention = next((m for m in mentions_added if "fever" in m["text"].lower()), None)
         assert fever_mention is not None
-        assert fever_mention.document_id == document_id
+        assert fever_mention["document_id"] == document_id
+        assert fever_mention["id"]
 
     @patch("app.jobs.document_processing.get_sync_engine")
     @patch("app.jobs.document_processing.Session")
@@ -246,6 +290,18 @@ class TestDocumentAPIJobEnqueue:
 class TestMentionConceptCandidateCreation:
     """Tests for Phase 5: MentionConceptCandidate record creation."""
 
+    @pytest.fixture(autouse=True)
+    def nlp_without_direct_concepts(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Extract mentions without vocabulary concept IDs, so they go to the mapping service."""
+        from app.services.nlp import ExtractedMention
+
+        nlp = MagicMock()
+        nlp.extract_mentions_batch.side_effect = lambda documents: [
+            [ExtractedMention(text="fever", start_offset=12, end_offset=17, lexical_variant="fever")]
+            for _ in documents
+        ]
+        monkeypatch.setattr("app.jobs.document_processing.get_nlp_service", lambda: nlp)
+
     @patch("app.jobs.document_processing.get_sync_engine")
     @patch("app.jobs.document_processing.Session")
     @patch("app.jobs.document_processing.get_mapping_service")
@@ -274,7 +330,7 @@ class TestMentionConceptCandidateCreation:
         # Mock execute
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:
@@ -285,7 +341,7 @@ class TestMentionConceptCandidateCreation:
 
         # Mock mapping service to return candidates
         mock_mapping = MagicMock()
-        mock_mapping.map_mention.return_value = [
+        mapped = [
             ConceptCandidate(
                 omop_concept_id=437663,
                 concept_name="Fever",
@@ -297,6 +353,9 @@ class TestMentionConceptCandidateCreation:
                 rank=1,
             )
         ]
+        mock_mapping.map_mentions_batch.side_effect = lambda texts, **kwargs: [
+            mapped for _ in texts
+        ]
         mock_get_mapping.return_value = mock_mapping
 
         document_id = str(uuid4())
@@ -305,11 +364,8 @@ class TestMentionConceptCandidateCreation:
         assert result["success"] is True
         assert result["candidate_count"] >= 1
 
-        # Check MentionConceptCandidate objects were added
-        add_calls = mock_session.add.call_args_list
-        candidates_added = [
-            call[0][0] for call in add_calls if isinstance(call[0][0], MentionConceptCandidate)
-        ]
+        # Check MentionConceptCandidate rows were bulk inserted
+        candidates_added = inserted_rows(mock_session, MentionConceptCandidate)
         assert len(candidates_added) >= 1
 
     @patch("app.jobs.document_processing.get_sync_engine")
@@ -338,7 +394,7 @@ class TestMentionConceptCandidateCreation:
 
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:
@@ -348,7 +404,7 @@ class TestMentionConceptCandidateCreation:
         mock_session.execute.side_effect = mock_execute
 
         mock_mapping = MagicMock()
-        mock_mapping.map_mention.return_value = [
+        mapped = [
             ConceptCandidate(
                 omop_concept_id=437663,
                 concept_name="Fever",
@@ -360,25 +416,25 @@ class TestMentionConceptCandidateCreation:
                 rank=1,
             )
         ]
+        mock_mapping.map_mentions_batch.side_effect = lambda texts, **kwargs: [
+            mapped for _ in texts
+        ]
         mock_get_mapping.return_value = mock_mapping
 
         document_id = str(uuid4())
         process_document(document_id)
 
-        add_calls = mock_session.add.call_args_list
-        candidates = [
-            call[0][0] for call in add_calls if isinstance(call[0][0], MentionConceptCandidate)
-        ]
+        candidates = inserted_rows(mock_session, MentionConceptCandidate)
 
         assert len(candidates) >= 1
         candidate = candidates[0]
-        assert candidate.omop_concept_id == 437663
-        assert candidate.concept_name == "Fever"
-        assert candidate.vocabulary_id == "SNOMED"
-        assert candidate.domain_id == Domain.CONDITION
-        assert candidate.score == 0.95
-        assert candidate.method == "fuzzy"
-        assert candidate.rank == 1
+        assert candidate["omop_concept_id"] == 437663
+        assert candidate["concept_name"] == "Fever"
+        assert candidate["vocabulary_id"] == "SNOMED"
+        assert candidate["domain_id"] == Domain.CONDITION
+        assert candidate["score"] == 0.95
+        assert candidate["method"] == "fuzzy"
+        assert candidate["rank"] == 1
 
     @patch("app.jobs.document_processing.get_sync_engine")
     @patch("app.jobs.document_processing.Session")
@@ -406,7 +462,7 @@ class TestMentionConceptCandidateCreation:
 
         call_count = [0]
 
-        def mock_execute(stmt):
+        def mock_execute(stmt, params=None):
             call_count[0] += 1
             result = MagicMock()
             if call_count[0] == 2:
@@ -417,7 +473,7 @@ class TestMentionConceptCandidateCreation:
 
         # Return multiple candidates
         mock_mapping = MagicMock()
-        mock_mapping.map_mention.return_value = [
+        mapped = [
             ConceptCandidate(
                 omop_concept_id=437663,
                 concept_name="Fever",
@@ -439,6 +495,9 @@ class TestMentionConceptCandidateCreation:
                 rank=2,
             ),
         ]
+        mock_mapping.map_mentions_batch.side_effect = lambda texts, **kwargs: [
+            mapped for _ in texts
+        ]
         mock_get_mapping.return_value = mock_mapping
 
         document_id = str(uuid4())
@@ -447,8 +506,286 @@ class TestMentionConceptCandidateCreation:
         # Should have multiple candidates per mention
         assert result["candidate_count"] >= 2
 
-        add_calls = mock_session.add.call_args_list
-        candidates = [
-            call[0][0] for call in add_calls if isinstance(call[0][0], MentionConceptCandidate)
-        ]
+        candidates = inserted_rows(mock_session, MentionConceptCandidate)
         assert len(candidates) >= 2
+
+    @patch("app.jobs.document_processing.get_sync_engine")
+    @patch("app.jobs.document_processing.Session")
+    @patch("app.jobs.document_processing.get_mapping_service")
+    @patch("app.jobs.document_processing.DatabaseFactBuilderService")
+    def test_facts_built_from_top_candidate_in_one_call(
+        self,
+        mock_fact_builder_class: MagicMock,
+        mock_get_mapping: MagicMock,
+        mock_session_class: MagicMock,
+        mock_get_sync_engine: MagicMock,
+    ) -> None:
+        """Test the best-ranked candidate is picked in memory and facts are created in bulk."""
+        from app.jobs import process_document
+        from app.models.mention import Mention
+        from app.schemas.base import Domain
+        from app.services.mapping import ConceptCandidate, MappingMethod
+
+        mock_session = MagicMock()
+        mock_session_class.return_value.__enter__ = MagicMock(return_value=mock_session)
+        mock_session_class.return_value.__exit__ = MagicMock(return_value=None)
+
+        mock_document = MagicMock()
+        mock_document.patient_id = "patient-facts"
+        mock_document.note_type = "progress_note"
+        mock_document.text = "Patient has fever."
+
+        def mock_execute(stmt, params=None):
+            result = MagicMock()
+            result.scalar_one_or_none.return_value = mock_document
+            return result
+
+        mock_session.execute.side_effect = mock_execute
+
+        mock_mapping = MagicMock()
+        mapped = [
+            ConceptCandidate(
+                omop_concept_id=437664,
+                concept_name="High temperature",
+                concept_code="437664",
+                vocabulary_id="SNOMED",
+                domain_id=Domain.CONDITION,
+                score=0.8,
+                method=MappingMethod.FUZZY,
+                rank=2,
+            ),
+            ConceptCandidate(
+                omop_concept_id=437663,
+                concept_name="Fever",
+                concept_code="437663",
+                vocabulary_id="SNOMED",
+                domain_id=Domain.CONDITION,
+                score=1.0,
+                method=MappingMethod.EXACT,
+                rank=1,
+            ),
+        ]
+        mock_mapping.map_mentions_batch.side_effect = lambda texts, **kwargs: [
+            mapped for _ in texts
+        ]
+        mock_get_mapping.return_value = mock_mapping
+        fact_builder = mock_fact_builder_class.return_value
+        fact_builder.create_facts_bulk.side_effect = lambda facts: [MagicMock() for _ in facts]
+
+        result = process_document(str(uuid4()))
+
+        assert result["fact_count"] == 1
+        fact_builder.create_facts_bulk.assert_called_once()
+        ((fact_input, evidence),) = fact_builder.create_facts_bulk.call_args.args[0]
+        assert fact_input.omop_concept_id == 437663
+        assert fact_input.concept_name == "Fever"
+        assert fact_input.patient_id == "patient-facts"
+        (mention,) = inserted_rows(mock_session, Mention)
+        assert str(evidence[0].source_id) == mention["id"]
+        assert evidence[0].source_table == "mentions"
+
+
+class TestProcessDocumentsBatch:
+    """Test the multi-document batch job."""
+
+    @staticmethod
+    def status_updates(mock_session: MagicMock) -> list[tuple[str, list[str]]]:
+        """(status, document IDs) of each status UPDATE, in order."""
+        updates = []
+        for call in mock_session.execute.call_args_list:
+            stmt = call.args[0]
+            if isinstance(stmt, Update):
+                params = stmt.compile().params
+                ids = next(value for key, value in params.items() if key.startswith("id"))
+                updates.append((params["status"].value, ids))
+        return updates
+
+    @pytest.fixture
+    def documents(self) -> list[MagicMock]:
+        documents = []
+        for index in range(3):
+            document = MagicMock()
+            document.id = str(uuid4())
+            document.patient_id = f"patient-{index}"
+            documents.append(document)
+        return documents
+
+    @pytest.fixture
+    def mock_session(self, documents: list[MagicMock]):
+        """Patch the job's Session with a mock that returns the documents."""
+        mock_session = MagicMock()
+
+        def mock_execute(stmt, params=None):
+            result = MagicMock()
+            if isinstance(stmt, Select):
+                result.scalars.return_value = iter(documents)
+            return result
+
+        mock_session.execute.side_effect = mock_execute
+        with (
+            patch("app.jobs.document_processing.get_sync_engine"),
+            patch("app.jobs.document_processing.Session") as mock_session_class,
+            patch("app.jobs.document_processing.get_mapping_service"),
+        ):
+            mock_session_class.return_value.__enter__.return_value = mock_session
+            yield mock_session
+
+    @staticmethod
+    def extract(documents):
+        """Stand-in NLP stream: one mention list per document."""
+        for document in documents:
+            yield document, [f"mention-{document.patient_id}"]
+
+    def test_documents_processed_in_one_session(
+        self, mock_session: MagicMock, documents: list[MagicMock]
+    ) -> None:
+        """Test documents are fetched once, extracted in one stream and stored with shared state."""
+        from app.jobs import process_documents_batch
+
+        counts = {"mention_count": 2, "candidate_count": 4, "fact_count": 1}
+        with (
+            patch(
+                "app.jobs.document_processing.extract_document_mentions", side_effect=self.extract
+            ) as mock_extract,
+            patch(
+                "app.jobs.document_processing.store_document_mentions", return_value=counts
+            ) as mock_store,
+        ):
+            result = process_documents_batch([document.id for document in documents])
+
+        assert result["success"] is True
+        assert result["completed_count"] == 3
+        assert [r["document_id"] for r in result["results"]] == [d.id for d in documents]
+        assert result["results"][0] == {
+            "success": True,
+            "document_id": documents[0].id,
+            "patient_id": "patient-0",
+            **counts,
+        }
+        # One NLP stream over the whole batch
+        assert mock_extract.call_count == 1
+        assert list(mock_extract.call_args.args[0]) == documents
+        stored = [call.args[1:3] for call in mock_store.call_args_list]
+        assert stored == [(d, [f"mention-{d.patient_id}"]) for d in documents]
+        assert len({id(call.args[3]) for call in mock_store.call_args_list}) == 1
+        selects = [c for c in mock_session.execute.call_args_list if isinstance(c.args[0], Select)]
+        assert len(selects) == 1
+        assert mock_session.begin_nested.call_count == 3
+        ids = [document.id for document in documents]
+        assert self.status_updates(mock_session) == [("processing", ids), ("completed", ids)]
+
+    def test_failing_document_is_isolated(
+        self, mock_session: MagicMock, documents: list[MagicMock]
+    ) -> None:
+        """Test a failure rolls back its savepoint and only that document fails."""
+        from app.jobs import process_documents_batch
+
+        def store(session, document, mentions, mapping_service):
+            if document is documents[1]:
+                raise RuntimeError("mapping failed")
+            return {"mention_count": 0, "candidate_count": 0, "fact_count": 0}
+
+        missing_id = str(uuid4())
+        with (
+            patch(
+                "app.jobs.document_processing.extract_document_mentions", side_effect=self.extract
+            ),
+            patch("app.jobs.document_processing.store_document_mentions", side_effect=store),
+        ):
+            result = process_documents_batch([d.id for d in documents] + [missing_id])
+
+        assert result["completed_count"] == 2
+        assert result["failed_count"] == 2
+        assert result["results"][1] == {"success": False, "error": "mapping failed"}
+        assert result["results"][3] == {"success": False, "error": "Document not found"}
+        # The failing document's savepoint saw the exception
+        exit_args = mock_session.begin_nested.return_value.__exit__.call_args_list[1].args
+        assert exit_args[0] is RuntimeError
+        assert self.status_updates(mock_session)[1:] == [
+            ("completed", [documents[0].id, documents[2].id]),
+            ("failed", [documents[1].id]),
+        ]
+        mock_session.commit.assert_called()
+
+    def test_nlp_failure_falls_back_per_document(
+        self, mock_session: MagicMock, documents: list[MagicMock]
+    ) -> None:
+        """Test a failing NLP stream only fails the documents that fail on their own."""
+        from app.jobs import process_documents_batch
+
+        def extract(batch):
+            batch = list(batch)
+            for document in batch:
+                if document is documents[1]:
+                    raise RuntimeError("tokenizer crashed")
+                yield document, [f"mention-{document.patient_id}"]
+
+        counts = {"mention_count": 1, "candidate_count": 1, "fact_count": 1}
+        with (
+            patch(
+                "app.jobs.document_processing.extract_document_mentions", side_effect=extract
+            ) as mock_extract,
+            patch(
+                "app.jobs.document_processing.store_document_mentions", return_value=counts
+            ) as mock_store,
+        ):
+            result = process_documents_batch([d.id for d in documents])
+
+        assert result["completed_count"] == 2
+        assert result["results"][1] == {"success": False, "error": "tokenizer crashed"}
+        # The batch stream, then the documents it had not returned, one by one
+        retried = [list(call.args[0]) for call in mock_extract.call_args_list[1:]]
+        assert retried == [[documents[1]], [documents[2]]]
+        assert [call.args[1] for call in mock_store.call_args_list] == [
+            documents[0],
+            documents[2],
+        ]
+        assert self.status_updates(mock_session)[1:] == [
+            ("completed", [documents[0].id, documents[2].id]),
+            ("failed", [documents[1].id]),
+        ]
+
+    def test_ids_are_matched_in_canonical_form(
+        self, mock_session: MagicMock, documents: list[MagicMock]
+    ) -> None:
+        """Test mis-cased IDs are found and invalid IDs fail on their own."""
+        from app.jobs import process_documents_batch
+
+        counts = {"mention_count": 0, "candidate_count": 0, "fact_count": 0}
+        input_ids = [documents[0].id.upper(), documents[1].id, documents[2].id, "not-a-uuid"]
+        with (
+            patch(
+                "app.jobs.document_processing.extract_document_mentions", side_effect=self.extract
+            ),
+            patch("app.jobs.document_processing.store_document_mentions", return_value=counts),
+        ):
+            result = process_documents_batch(input_ids)
+
+        assert result["success"] is True
+        assert result["completed_count"] == 3
+        assert result["failed_count"] == 1
+        assert result["results"][0]["document_id"] == documents[0].id
+        assert result["results"][3] == {"success": False, "error": "Invalid document ID"}
+        ids = [document.id for document in documents]
+        assert self.status_updates(mock_session) == [("processing", ids), ("completed", ids)]
+
+    def test_batch_failure_marks_all_documents_failed(
+        self, mock_session: MagicMock, documents: list[MagicMock]
+    ) -> None:
+        """Test an error outside a document's savepoint fails the whole batch."""
+        from app.jobs import process_documents_batch
+
+        mock_session.commit.side_effect = [None, RuntimeError("connection lost"), None]
+        with (
+            patch(
+                "app.jobs.document_processing.extract_document_mentions", side_effect=self.extract
+            ),
+            patch(
+                "app.jobs.document_processing.store_document_mentions",
+                return_value={"mention_count": 0, "candidate_count": 0, "fact_count": 0},
+            ),
+        ):
+            result = process_documents_batch([document.id for document in documents])
+
+        assert result == {"success": False, "error": "connection lost"}
+        assert self.status_updates(mock_session)[-1] == ("failed", [d.id for d in documents])
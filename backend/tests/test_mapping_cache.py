@@ -0,0 +1,120 @@
+"""Tests for the two-tier concept mapping cache."""
+
+from unittest.mock import MagicMock
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.schemas.base import Domain
+from app.services.mapping import ConceptCandidate, MappingMethod
+from app.services.mapping_cache import LRUCache, MappingCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the cache uses."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def mget(self, keys: list[str]) -> list[str | None]:
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> "FakeRedis":
+        return self
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+
+    def execute(self) -> None:
+        pass
+
+
+def candidate(concept_id: int = 316866, name: str = "Hypertensive disorder") -> ConceptCandidate:
+    return ConceptCandidate(
+        omop_concept_id=concept_id,
+        concept_name=name,
+        concept_code=str(concept_id),
+        vocabulary_id="SNOMED",
+        domain_id=Domain.CONDITION,
+        score=0.95,
+        method=MappingMethod.EXACT,
+        rank=1,
+    )
+
+
+KEY = ("hypertension", None, 5)
+
+
+class TestLRUCache:
+    """Tests for the bounded LRU."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test the oldest untouched entry is evicted at capacity."""
+        cache: LRUCache[str, int] = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+
+class TestMappingCache:
+    """Tests for the local + Redis mapping cache."""
+
+    def test_miss_then_local_hit(self) -> None:
+        """Test stored results are served from the local tier."""
+        cache = MappingCache(max_size=10, redis_factory=None)
+
+        assert cache.get_many(1, [KEY]) == {}
+        cache.put_many(1, {KEY: [candidate()]})
+
+        assert cache.get_many(1, [KEY]) == {KEY: [candidate()]}
+        stats = cache.get_stats()
+        assert (stats["local_hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_redis_tier_shared_between_processes(self) -> None:
+        """Test a result written by one cache is a Redis hit for another."""
+        redis = FakeRedis()
+        writer = MappingCache(max_size=10, redis_factory=lambda: redis, ttl_seconds=60)
+        reader = MappingCache(max_size=10, redis_factory=lambda: redis)
+
+        writer.put_many(3, {KEY: [candidate()]})
+
+        assert reader.get_many(3, [KEY]) == {KEY: [candidate()]}
+        assert reader.get_stats()["redis_hits"] == 1
+        # Promoted to the local tier
+        assert reader.get_many(3, [KEY]) == {KEY: [candidate()]}
+        assert reader.get_stats()["local_hits"] == 1
+        assert redis.ttls == {"mapping:v3:*:5:hypertension": 60}
+
+    def test_version_change_invalidates(self) -> None:
+        """Test entries from an older vocabulary version are not served."""
+        redis = FakeRedis()
+        cache = MappingCache(max_size=10, redis_factory=lambda: redis)
+        cache.put_many(1, {KEY: [candidate()]})
+
+        assert cache.get_many(2, [KEY]) == {}
+        stats = cache.get_stats()
+        assert stats["invalidations"] == 1
+        assert stats["size"] == 0
+        assert stats["vocabulary_version"] == 2
+
+    def test_redis_errors_degrade_to_local(self) -> None:
+        """Test Redis failures count as misses instead of failing mapping."""
+        redis = MagicMock()
+        redis.mget.side_effect = RedisConnectionError("down")
+        redis.pipeline.return_value.execute.side_effect = RedisConnectionError("down")
+        cache = MappingCache(max_size=10, redis_factory=lambda: redis)
+
+        assert cache.get_many(1, [KEY]) == {}
+        cache.put_many(1, {KEY: [candidate()]})
+
+        assert cache.get_many(1, [KEY]) == {KEY: [candidate()]}
+        assert cache.get_stats()["redis_errors"] == 2
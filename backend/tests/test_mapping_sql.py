@@ -0,0 +1,272 @@
+"""Tests for batched SQL concept mapping in SQLMappingService."""
+
+from collections.abc import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.schemas.base import Domain
+from app.services.mapping import MappingMethod
+from app.services.mapping_cache import MappingCache
+from app.services.mapping_sql import (
+    SQLMappingService,
+    check_mapping_indexes,
+)
+
+# Only the columns the mapper reads (the ORM model's ARRAY column does not exist in SQLite)
+SCHEMA = [
+    """CREATE TABLE concepts (
+        concept_id INTEGER PRIMARY KEY,
+        concept_name VARCHAR(500) NOT NULL,
+        domain_id VARCHAR(50) NOT NULL,
+        vocabulary_id VARCHAR(50) NOT NULL
+    )""",
+    """CREATE TABLE concept_synonyms (
+        concept_id INTEGER NOT NULL,
+        concept_synonym_name VARCHAR(1000) NOT NULL
+    )""",
+    "CREATE TABLE vocabulary_versions (version INTEGER NOT NULL)",
+    "INSERT INTO vocabulary_versions VALUES (1)",
+]
+
+CONCEPTS = [
+    (1, "Fever", "Condition", "SNOMED"),
+    (2, "Fever of unknown origin", "Condition", "SNOMED"),
+    (3, "Hypertension", "Condition", "SNOMED"),
+    (4, "Chest pain", "Condition", "SNOMED"),
+    (5, "Pain in chest wall", "Condition", "SNOMED"),
+    (6, "Metformin", "Drug", "RxNorm"),
+    (7, "Fevers", "Observation", "SNOMED"),
+]
+
+SYNONYMS = [
+    (3, "HTN"),
+    (3, "High blood pressure"),
+    (6, "Glucophage"),
+]
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(
+            text("INSERT INTO concepts VALUES (:id, :name, :domain, :vocab)"),
+            [dict(zip(["id", "name", "domain", "vocab"], c, strict=True)) for c in CONCEPTS],
+        )
+        conn.execute(
+            text("INSERT INTO concept_synonyms VALUES (:id, :name)"),
+            [{"id": i, "name": n} for i, n in SYNONYMS],
+        )
+    with Session(engine) as session:
+        yield session
+
+
+class TestMapMentionsBatch:
+    """Tests for map_mentions_batch."""
+
+    def test_results_follow_input_order(self, session: Session) -> None:
+        """Test one candidate list per text, in order, with unmatched texts empty."""
+        service = SQLMappingService(session)
+
+        results = service.map_mentions_batch(["HTN", "glucophage", "zzz", "", "HTN"])
+
+        assert [[c.omop_concept_id for c in r] for r in results] == [[3], [6], [], [], [3]]
+
+    def test_scores_match_single_mapping(self, session: Session) -> None:
+        """Test each step scores and ranks as in a single lookup."""
+        service = SQLMappingService(session)
+
+        [fever, htn, chest] = service.map_mentions_batch(["Fever", "htn", "chest pain"])
+
+        assert [(c.omop_concept_id, c.score, c.method, c.rank) for c in fever] == [
+            (1, 1.0, MappingMethod.EXACT, 1),
+            (2, pytest.approx(min(0.9, 5 / 23 + 0.3)), MappingMethod.FUZZY, 2),
+            (7, pytest.approx(min(0.9, 5 / 6 + 0.3)), MappingMethod.FUZZY, 3),
+        ]
+        assert [(c.omop_concept_id, c.score) for c in htn] == [(3, 0.95)]
+        # Exact name, then the longest word ("chest") contained in other names
+        assert [(c.omop_concept_id, c.rank) for c in chest] == [(4, 1), (5, 2)]
+        assert chest[1].score == pytest.approx(
+            service.calculate_similarity("chest pain", "Pain in chest wall")
+        )
+
+    def test_limit_and_domain_apply_per_text(self, session: Session) -> None:
+        """Test the limit and domain filter are applied to each text separately."""
+        service = SQLMappingService(session)
+
+        [fever, metformin] = service.map_mentions_batch(["fever", "metformin"], limit=2)
+        assert [c.omop_concept_id for c in fever] == [1, 2]
+        assert [c.omop_concept_id for c in metformin] == [6]
+
+        [fever] = service.map_mentions_batch(["fever"], domain=Domain.CONDITION)
+        assert [c.omop_concept_id for c in fever] == [1, 2]
+
+    def test_round_trips_independent_of_mention_count(self, session: Session) -> None:
+        """Test a batch issues at most one query per matching step."""
+        service = SQLMappingService(session)
+        statements: list[str] = []
+        event.listen(
+            session.get_bind(),
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        texts = ["fever", "htn", "chest pain", "unknown term", "fever of unknown"] * 40
+        results = service.map_mentions_batch(texts)
+
+        assert len(results) == len(texts)
+        assert len(statements) <= 4
+
+    def test_map_mention_uses_batch(self, session: Session) -> None:
+        """Test single-text mapping returns the same candidates as a batch of one."""
+        service = SQLMappingService(session)
+
+        assert service.map_mention("fever") == service.map_mentions_batch(["fever"])[0]
+        assert service.get_best_match("glucophage").omop_concept_id == 6
+
+    def test_similarity_threshold_is_configurable(self, session: Session) -> None:
+        """Test fuzzy candidates below the configured threshold are dropped."""
+        strict = SQLMappingService(session, similarity_threshold=0.6)
+
+        [chest] = strict.map_mentions_batch(["chest pain"])
+
+        # "Pain in chest wall" shares 2 of 4 words (0.5)
+        assert [c.omop_concept_id for c in chest] == [4]
+
+
+class TestMappingWithCache:
+    """Tests for SQLMappingService in front of a MappingCache."""
+
+    def test_cached_texts_skip_the_database(self, session: Session) -> None:
+        """Test a repeated batch is answered from the cache."""
+        cache = MappingCache(max_size=100, redis_factory=None)
+        service = SQLMappingService(session, cache=cache)
+        first = service.map_mentions_batch(["fever", "htn", "zzz"])
+
+        statements: list[str] = []
+        event.listen(
+            session.get_bind(),
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        second = SQLMappingService(session, cache=cache).map_mentions_batch(["htn", "fever"])
+
+        assert second == [first[1], first[0]]
+        # Only the vocabulary version marker was read
+        assert len(statements) == 1
+        assert cache.get_stats()["local_hits"] == 2
+
+    def test_vocabulary_change_remaps(self, session: Session) -> None:
+        """Test bumping the version marker invalidates cached results."""
+        cache = MappingCache(max_size=100, redis_factory=None)
+        service = SQLMappingService(session, cache=cache)
+        assert service.map_mention("zzz") == []
+
+        session.execute(text("INSERT INTO concepts VALUES (8, 'Zzz', 'Condition', 'SNOMED')"))
+        session.execute(text("UPDATE vocabulary_versions SET version = 2"))
+
+        assert [c.omop_concept_id for c in service.map_mention("zzz")] == [8]
+
+
+def postgres_session() -> MagicMock:
+    """A session mock reporting the PostgreSQL dialect and recording statements."""
+    session = MagicMock()
+    session.get_bind.return_value.dialect.name = "postgresql"
+    session.execute.return_value = []
+    return session
+
+
+class TestTrigramMatching:
+    """Tests for the pg_trgm fuzzy step on PostgreSQL."""
+
+    def test_fuzzy_step_uses_trigram_operator(self) -> None:
+        """Test the fuzzy query probes with % and ranks by similarity()."""
+        session = postgres_session()
+        service = SQLMappingService(session, similarity_threshold=0.4)
+
+        assert service.map_mentions_batch(["chest pian"]) == [[]]
+
+        statements = [
+            str(call.args[0].compile(dialect=postgresql.dialect()))
+            for call in session.execute.call_args_list
+        ]
+        set_threshold, trigram = statements[-2:]
+        assert "set_config" in set_threshold
+        threshold_params = session.execute.call_args_list[-2].args[0].compile().params
+        assert "0.4" in threshold_params.values()
+        assert "lower(concepts.concept_name) %% terms.term" in trigram
+        assert "similarity(lower(concepts.concept_name), terms.term) DESC" in trigram
+
+    def test_lookups_are_limited_per_term(self) -> None:
+        """Test every step looks up each term in a LATERAL subquery with its own LIMIT."""
+        session = postgres_session()
+        service = SQLMappingService(session)
+        steps = (
+            service._exact_name_matches,
+            service._exact_synonym_matches,
+            service._prefix_matches,
+            service._trigram_matches,
+        )
+
+        for step in steps:
+            stmt = step(["fever", "chest pain"], None, 3)
+            statement = str(
+                stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            )
+            assert "JOIN LATERAL" in statement
+            assert "LIMIT 3) AS matches" in statement
+
+    def test_prefix_step_is_a_range_on_the_term(self) -> None:
+        """Test the prefix step compares the name with the joined term, not a LIKE pattern."""
+        session = postgres_session()
+        service = SQLMappingService(session)
+
+        prefix = str(
+            service._prefix_matches(["fever"], None, 5).compile(dialect=postgresql.dialect())
+        )
+
+        assert "lower(concepts.concept_name) ~>=~ terms.term" in prefix
+        assert "lower(concepts.concept_name) ~<~ terms.term ||" in prefix
+        assert "LIKE" not in prefix
+
+
+class TestCheckMappingIndexes:
+    """Tests for the EXPLAIN-based index self-check."""
+
+    def test_skipped_outside_postgres(self, session: Session) -> None:
+        """Test non-PostgreSQL databases are not checked."""
+        assert check_mapping_indexes(session) == []
+
+    def test_reports_steps_planned_as_seq_scans(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test the lookup statements are EXPLAINed and scanning steps reported."""
+        session = postgres_session()
+        explained: list[str] = []
+
+        def execute(stmt):
+            statement = str(stmt)
+            if not statement.startswith("EXPLAIN"):
+                return MagicMock()
+            explained.append(statement)
+            if "similarity(" in statement:
+                raise DBAPIError(statement, {}, Exception("operator does not exist"))
+            result = MagicMock()
+            plan = "Seq Scan on concepts" if "~>=~" in statement else "Index Scan using ix"
+            result.scalars.return_value = [plan]
+            return result
+
+        session.execute.side_effect = execute
+
+        missing = check_mapping_indexes(session)
+
+        assert missing == ["ix_concepts_concept_name_lower", "ix_concepts_concept_name_trgm"]
+        assert len(explained) == 4
+        assert all("JOIN LATERAL" in statement for statement in explained)
+        assert "ix_concepts_concept_name_trgm" in caplog.text
+        session.rollback.assert_called_once()
@@ -0,0 +1,248 @@
+"""Tests for the on-disk Aho-Corasick automaton cache."""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.checksums import hash_files
+from app.services.nlp_automaton_cache import AutomatonCache
+from app.services.nlp_rule_based import RuleBasedNLPService
+from app.services.nlp_vocabulary import FilteredNLPVocabularyService
+from app.services.vocabulary import VocabularyService
+from app.services.vocabulary_db import DatabaseVocabularyService
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> AutomatonCache:
+    """Create an automaton cache in a temporary directory."""
+    return AutomatonCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def fixture_file(tmp_path: Path) -> Path:
+    """Write a small vocabulary fixture."""
+    path = tmp_path / "vocab.json"
+    path.write_text(json.dumps({
+        "concepts": [
+            {
+                "concept_id": 1001,
+                "concept_name": "Zebrafever",
+                "concept_code": "Z1",
+                "vocabulary_id": "SNOMED",
+                "domain_id": "Condition",
+                "synonyms": ["zebrafever"],
+            }
+        ]
+    }))
+    return path
+
+
+class TestHashFiles:
+    """Tests for source file hashing."""
+
+    def test_hash_changes_with_content(self, fixture_file: Path) -> None:
+        """Test that editing a file changes the hash."""
+        before = hash_files(fixture_file)
+        fixture_file.write_text(fixture_file.read_text() + " ")
+        assert hash_files(fixture_file) != before
+
+    def test_missing_file_is_stable(self, tmp_path: Path) -> None:
+        """Test that a missing file hashes deterministically."""
+        missing = tmp_path / "missing.json"
+        assert hash_files(missing) == hash_files(missing)
+
+
+class TestAutomatonCache:
+    """Tests for AutomatonCache."""
+
+    def test_miss_returns_none(self, cache: AutomatonCache) -> None:
+        """Test that an unknown fingerprint is a cache miss."""
+        assert cache.load("unknown") is None
+
+    def test_corrupt_file_is_discarded(self, cache: AutomatonCache) -> None:
+        """Test that an unreadable cache file is removed and treated as a miss."""
+        path = cache.path_for("fp")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not an automaton")
+
+        assert cache.load("fp") is None
+        assert not path.exists()
+
+    def test_cache_dir_is_private(self, cache: AutomatonCache, fixture_file: Path) -> None:
+        """Test the cache directory is created with owner-only permissions."""
+        nlp = RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache)
+        nlp.extract_mentions("zebrafever", uuid4())
+
+        assert cache.cache_dir.stat().st_mode & 0o777 == 0o700
+
+    def test_shared_directory_is_not_trusted(
+        self, cache: AutomatonCache, fixture_file: Path
+    ) -> None:
+        """Test that files in a group/world-writable directory are never loaded."""
+        vocab = VocabularyService(fixture_file)
+        RuleBasedNLPService(vocab, automaton_cache=cache).extract_mentions("zebrafever", uuid4())
+        cache.cache_dir.chmod(0o777)
+
+        assert cache.load(vocab.cache_fingerprint()) is None
+
+    def test_save_prunes_old_entries(self, tmp_path: Path, fixture_file: Path) -> None:
+        """Test that saving keeps only the newest max_entries files."""
+        cache = AutomatonCache(tmp_path / "cache", max_entries=1)
+        RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache).warm_up()
+        fixture_file.write_text(fixture_file.read_text() + " ")
+        vocab = VocabularyService(fixture_file)
+        RuleBasedNLPService(vocab, automaton_cache=cache).warm_up()
+
+        assert list(cache.cache_dir.glob("*.bin")) == [cache.path_for(vocab.cache_fingerprint())]
+
+    def test_clear(self, cache: AutomatonCache, fixture_file: Path) -> None:
+        """Test clearing the cache removes written files."""
+        nlp = RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache)
+        nlp.extract_mentions("zebrafever", uuid4())
+
+        assert cache.clear() == 1
+        assert cache.clear() == 0
+
+
+class TestRuleBasedNLPCaching:
+    """Tests for automaton caching in RuleBasedNLPService."""
+
+    def test_build_writes_cache(self, cache: AutomatonCache, fixture_file: Path) -> None:
+        """Test that the first build persists the automaton."""
+        vocab = VocabularyService(fixture_file)
+        nlp = RuleBasedNLPService(vocab, automaton_cache=cache)
+        nlp.extract_mentions("Patient has zebrafever.", uuid4())
+
+        assert cache.path_for(vocab.cache_fingerprint()).exists()
+
+    def test_cache_hit_skips_vocabulary_load(
+        self, cache: AutomatonCache, fixture_file: Path
+    ) -> None:
+        """Test that a warm cache produces identical mentions without loading vocabulary."""
+        text = "Patient has zebrafever and fever."
+        cold = RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache)
+        expected = cold.extract_mentions(text, uuid4())
+
+        vocab = VocabularyService(fixture_file)
+        warm = RuleBasedNLPService(vocab, automaton_cache=cache)
+        with patch.object(vocab, "load", wraps=vocab.load) as load:
+            mentions = warm.extract_mentions(text, uuid4())
+            load.assert_not_called()
+
+        assert [(m.text, m.start_offset, m.omop_concept_id) for m in mentions] == [
+            (m.text, m.start_offset, m.omop_concept_id) for m in expected
+        ]
+        assert any(m.omop_concept_id == 1001 for m in mentions)
+
+    def test_refresh_ignores_cached_automaton(
+        self, cache: AutomatonCache, fixture_file: Path
+    ) -> None:
+        """Test that a refresh rebuilds from the vocabulary and rewrites the cache."""
+        RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache).warm_up()
+
+        vocab = VocabularyService(fixture_file)
+        nlp = RuleBasedNLPService(vocab, automaton_cache=cache)
+        with patch.object(cache, "load") as load, patch.object(
+            vocab, "load", wraps=vocab.load
+        ) as vocab_load:
+            nlp.warm_up(refresh_cache=True)
+
+        load.assert_not_called()
+        vocab_load.assert_called_once()
+        assert cache.path_for(vocab.cache_fingerprint()).exists()
+
+    def test_fixture_change_invalidates_cache(
+        self, cache: AutomatonCache, fixture_file: Path
+    ) -> None:
+        """Test that editing the fixture triggers a rebuild."""
+        nlp = RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache)
+        nlp.extract_mentions("zebrafever", uuid4())
+
+        data = json.loads(fixture_file.read_text())
+        data["concepts"][0]["synonyms"].append("quaggapox")
+        fixture_file.write_text(json.dumps(data))
+
+        rebuilt = RuleBasedNLPService(VocabularyService(fixture_file), automaton_cache=cache)
+        mentions = rebuilt.extract_mentions("Patient has quaggapox.", uuid4())
+
+        assert any(m.text == "quaggapox" for m in mentions)
+        assert len(list(cache.cache_dir.glob("*.bin"))) == 2
+
+    def test_unsupported_vocabulary_builds_without_cache(
+        self, cache: AutomatonCache, fixture_file: Path
+    ) -> None:
+        """Test vocabulary services without fingerprint support still work."""
+
+        class PlainVocabulary:
+            concepts = VocabularyService(fixture_file).concepts
+
+            def load(self) -> None:
+                pass
+
+        nlp = RuleBasedNLPService(PlainVocabulary(), automaton_cache=cache)
+        assert len(nlp.extract_mentions("zebrafever", uuid4())) == 1
+        assert not cache.cache_dir.exists()
+
+
+def _mock_session(version: int | None) -> MagicMock:
+    """Create a mock sync Session whose version-marker query returns `version`."""
+    session = MagicMock()
+    session.__enter__.return_value = session
+    session.execute.return_value.scalar.return_value = version
+    return session
+
+
+class TestDatabaseFingerprints:
+    """Tests for the database vocabulary fingerprints."""
+
+    @pytest.mark.parametrize("module", ["vocabulary_db", "nlp_vocabulary"])
+    def test_fingerprint_follows_version_marker(self, module: str) -> None:
+        """Test that bumping the version marker changes the fingerprint."""
+        service = (
+            DatabaseVocabularyService() if module == "vocabulary_db"
+            else FilteredNLPVocabularyService()
+        )
+        fingerprints = []
+        for version in (7, 7, 8):
+            with patch(f"app.services.{module}.get_sync_engine"), patch(
+                f"app.services.{module}.Session", return_value=_mock_session(version)
+            ):
+                fingerprints.append(service.cache_fingerprint())
+
+        assert fingerprints[0] == fingerprints[1]
+        assert fingerprints[1] != fingerprints[2]
+
+    @pytest.mark.parametrize("module", ["vocabulary_db", "nlp_vocabulary"])
+    def test_missing_marker_disables_cache(self, module: str) -> None:
+        """Test that a missing version row yields no fingerprint."""
+        service = (
+            DatabaseVocabularyService() if module == "vocabulary_db"
+            else FilteredNLPVocabularyService()
+        )
+        with patch(f"app.services.{module}.get_sync_engine"), patch(
+            f"app.services.{module}.Session", return_value=_mock_session(None)
+        ):
+            assert service.cache_fingerprint() is None
+
+    def test_filtered_fingerprint_includes_filters(self) -> None:
+        """Test that different filter settings never share a cache key."""
+        with patch("app.services.nlp_vocabulary.get_sync_engine"), patch(
+            "app.services.nlp_vocabulary.Session", side_effect=lambda _: _mock_session(1)
+        ):
+            default = FilteredNLPVocabularyService().cache_fingerprint()
+            smaller = FilteredNLPVocabularyService(max_concepts=10).cache_fingerprint()
+            drugs = FilteredNLPVocabularyService(domains={"Drug"}).cache_fingerprint()
+
+        assert len({default, smaller, drugs}) == 3
+
+    def test_rule_based_skips_cache_without_marker(self, cache: AutomatonCache) -> None:
+        """Test that a None fingerprint builds without touching the cache."""
+        vocab = MagicMock()
+        vocab.cache_fingerprint.return_value = None
+        vocab.concepts = []
+        nlp = RuleBasedNLPService(vocab, automaton_cache=cache)
+
+        assert nlp._get_vocabulary_fingerprint() is None
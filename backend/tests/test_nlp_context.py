@@ -0,0 +1,139 @@
+"""Tests for the single-pass context engine."""
+
+import random
+
+import pytest
+
+from app.schemas.base import Assertion, Experiencer, Temporality
+from app.services.nlp_context import ContextEngine, TriggerSet, resolve_assertion
+from app.services.nlp_rule_based import RuleBasedNLPService
+
+
+@pytest.fixture
+def engine() -> ContextEngine:
+    """Create an engine with the rule-based service's trigger lists."""
+    return ContextEngine(
+        positive=RuleBasedNLPService.POSITIVE_TRIGGERS,
+        negation=RuleBasedNLPService.NEGATION_TRIGGERS,
+        uncertainty=RuleBasedNLPService.UNCERTAINTY_TRIGGERS,
+        past=RuleBasedNLPService.PAST_TRIGGERS,
+        family=RuleBasedNLPService.FAMILY_TRIGGERS,
+    )
+
+
+def window_attributes(engine: ContextEngine, text: str, start: int, end: int) -> tuple:
+    """Compute attributes the per-mention way, by matching window substrings."""
+    lower = text.lower()
+    preceding = lower[max(0, start - 50):start]
+    surrounding = lower[max(0, start - 50):min(len(lower), end + 50)]
+    return (
+        engine.detect_assertion(preceding),
+        engine.detect_temporality(surrounding),
+        engine.detect_experiencer(surrounding),
+    )
+
+
+def indexed_attributes(engine: ContextEngine, text: str, start: int, end: int) -> tuple:
+    """Compute attributes from a single document scan."""
+    context = engine.analyze(text)
+    return (context.assertion(start), context.temporality(start, end), context.experiencer(start, end))
+
+
+class TestResolveAssertion:
+    """Tests for assertion precedence."""
+
+    def test_no_triggers_is_present(self) -> None:
+        """Test the default when no trigger is found."""
+        assert resolve_assertion(-1, -1, -1) == Assertion.PRESENT
+
+    def test_closest_trigger_wins(self) -> None:
+        """Test the trigger nearest the mention decides."""
+        assert resolve_assertion(-1, 5, 10) == Assertion.ABSENT
+        assert resolve_assertion(-1, 10, 5) == Assertion.PRESENT
+
+    def test_tie_precedence(self) -> None:
+        """Test ties resolve as uncertainty > positive > negation."""
+        assert resolve_assertion(10, 10, 10) == Assertion.POSSIBLE
+        assert resolve_assertion(-1, 10, 10) == Assertion.PRESENT
+
+
+class TestDocumentContext:
+    """Tests for per-mention lookups from a document scan."""
+
+    @pytest.mark.parametrize(
+        ("text", "term", "expected"),
+        [
+            ("Patient denies chest pain.", "chest pain", Assertion.ABSENT),
+            ("No chest pain. Taking metformin daily.", "metformin", Assertion.PRESENT),
+            ("Cannot rule out pneumonia.", "pneumonia", Assertion.POSSIBLE),
+            ("No evidence of pneumonia.", "pneumonia", Assertion.ABSENT),
+        ],
+    )
+    def test_assertion(
+        self, engine: ContextEngine, text: str, term: str, expected: Assertion
+    ) -> None:
+        """Test assertion detection from the document scan."""
+        start = text.index(term)
+        assert engine.analyze(text).assertion(start) == expected
+
+    def test_temporality_and_experiencer(self, engine: ContextEngine) -> None:
+        """Test past and family triggers in the surrounding window."""
+        text = "Family history of breast cancer in mother."
+        start = text.index("breast cancer")
+        context = engine.analyze(text)
+
+        assert context.temporality(start, start + 13) == Temporality.PAST
+        assert context.experiencer(start, start + 13) == Experiencer.FAMILY
+
+    def test_window_cut_mid_word_matches_substring(self, engine: ContextEngine) -> None:
+        """Test a window starting inside a word behaves like the sliced window."""
+        text = "piano " + "y" * 46 + " fever"
+        start = text.index("fever")
+        assert text[start - 50:].startswith("no ")
+
+        # The window starts at "no", which the sliced string sees as a trigger
+        assert indexed_attributes(engine, text, start, start + 5) == window_attributes(
+            engine, text, start, start + 5
+        )
+        assert engine.analyze(text).assertion(start) == Assertion.ABSENT
+
+    def test_window_end_truncates_trigger(self, engine: ContextEngine) -> None:
+        """Test a window ending inside a word behaves like the sliced window."""
+        text = "fever " + "x" * 45 + " historyless"
+        assert indexed_attributes(engine, text, 0, 5) == window_attributes(engine, text, 0, 5)
+
+    def test_length_changing_lowercase_falls_back(self, engine: ContextEngine) -> None:
+        """Test text whose lowercase changes length is matched per window."""
+        text = "İ no fever"
+        start = text.index("fever")
+        assert engine.analyze(text).assertion(start) == Assertion.ABSENT
+
+    def test_unanchored_patterns_fall_back(self) -> None:
+        """Test categories with patterns that are not word-anchored still work."""
+        triggers = [r"neg(?:ative)?", r"\bno\b"]
+        assert not TriggerSet(triggers).word_anchored
+
+        engine = ContextEngine(positive=[], negation=triggers, uncertainty=[], past=[], family=[])
+        text = "Cultures negative: fever"
+        assert engine.analyze(text).assertion(text.index("fever")) == Assertion.ABSENT
+
+    def test_matches_window_matching_on_random_text(self, engine: ContextEngine) -> None:
+        """Test the document scan agrees with window matching everywhere."""
+        words = (
+            "no not none note piano cannot can't rule out ruled suspect suspected "
+            "report reports presents with history of past family hx mother has had "
+            "prior priority was diagnosed started on taking denies possible likely "
+            "unlikely evidence appears to be concern for fever cough . , ;"
+        ).split()
+        rng = random.Random(42)
+        for _ in range(300):
+            text = "".join(
+                rng.choice(words) + rng.choice([" ", "  ", "\n", "", ", "])
+                for _ in range(rng.randint(1, 40))
+            )
+            for _ in range(10):
+                start = rng.randint(0, len(text))
+                end = min(len(text), start + rng.randint(0, 12))
+                assert indexed_attributes(engine, text, start, end) == window_attributes(
+                    engine, text, start, end
+                ), (text, start, end)
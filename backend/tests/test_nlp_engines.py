@@ -0,0 +1,227 @@
+"""Tests for the shared NLP engine registry."""
+
+from threading import Thread
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.services import nlp_ensemble
+from app.services.nlp_engines import NLPEngineRegistry, reset_nlp_engine_registry
+from app.services.nlp_ensemble import EnsembleConfig, EnsembleNLPService, get_ensemble_nlp_service
+from app.services.nlp_rule_based import RuleBasedNLPService
+
+
+class Engine:
+    """Minimal stand-in engine that records its build order."""
+
+    builds: list[str] = []
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        Engine.builds.append(name)
+
+
+@pytest.fixture
+def registry() -> NLPEngineRegistry:
+    """Create a registry with cheap engine factories."""
+    Engine.builds = []
+    return NLPEngineRegistry({
+        "rule_based": lambda _: Engine("rule_based"),
+        "value": lambda _: Engine("value"),
+        "ensemble": lambda _: Engine("ensemble"),
+    })
+
+
+class TestNLPEngineRegistry:
+    """Tests for NLPEngineRegistry."""
+
+    def test_get_builds_once_and_counts_reuse(self, registry: NLPEngineRegistry) -> None:
+        """Test that engines are built once and reused."""
+        first = registry.get("rule_based")
+        second = registry.get("rule_based")
+
+        assert first is second
+        assert Engine.builds == ["rule_based"]
+        stats = registry.get_stats()["engines"]["rule_based"]
+        assert stats["built"] is True
+        assert stats["generation"] == 1
+        assert stats["reuse_count"] == 1
+
+    def test_concurrent_get_builds_once(self, registry: NLPEngineRegistry) -> None:
+        """Test that concurrent first requests share a single build."""
+        results: list[Engine] = []
+        threads = [Thread(target=lambda: results.append(registry.get("value"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert Engine.builds == ["value"]
+        assert all(r is results[0] for r in results)
+
+    def test_unknown_engine_raises(self, registry: NLPEngineRegistry) -> None:
+        """Test that unknown engine names are rejected."""
+        with pytest.raises(KeyError):
+            registry.get("nope")
+
+    def test_prewarm_builds_all(self, registry: NLPEngineRegistry) -> None:
+        """Test prewarming builds every engine."""
+        results = registry.prewarm()
+
+        assert set(results) == {"rule_based", "value", "ensemble"}
+        assert registry.get_stats()["built_count"] == 3
+
+    def test_prewarm_failure_is_isolated(self) -> None:
+        """Test that one failing engine does not block the others."""
+
+        def fail(_: NLPEngineRegistry) -> Engine:
+            raise RuntimeError("model missing")
+
+        registry = NLPEngineRegistry({"ok": lambda _: Engine("ok"), "bad": fail})
+        results = registry.prewarm()
+
+        assert "error" in results["bad"]
+        assert registry.is_built("ok")
+        assert not registry.is_built("bad")
+        assert registry.get_stats()["engines"]["bad"]["last_error"] == "model missing"
+
+    def test_reload_hot_swaps_only_targets(self, registry: NLPEngineRegistry) -> None:
+        """Test reload swaps in a new instance and leaves other engines alone."""
+        old_rule = registry.get("rule_based")
+        old_ensemble = registry.get("ensemble")
+        old_value = registry.get("value")
+
+        results = registry.reload(["rule_based"])
+
+        assert list(results) == ["rule_based"]
+        assert registry.get("rule_based") is not old_rule
+        assert registry.get("ensemble") is old_ensemble
+        assert registry.get("value") is old_value
+        assert registry.get_stats()["engines"]["rule_based"]["generation"] == 2
+
+    def test_vocabulary_reload_refreshes_engines(self) -> None:
+        """Test vocabulary reloads tell factories to bypass cached artifacts."""
+        seen: list[bool] = []
+
+        def build(registry: NLPEngineRegistry) -> Engine:
+            seen.append(registry.refreshing_vocabulary)
+            return Engine("rule_based")
+
+        registry = NLPEngineRegistry({"rule_based": build})
+        registry.get("rule_based")
+        with patch("app.services.nlp_engines.reset_vocabulary_singleton"), patch(
+            "app.services.nlp_engines.preload_vocabulary"
+        ):
+            registry.reload(reload_vocabulary=True)
+        registry.reload()
+
+        assert seen == [False, True, False]
+        assert not registry.refreshing_vocabulary
+
+    def test_reload_resets_ensemble_singleton(self, registry: NLPEngineRegistry) -> None:
+        """Test reload drops the legacy ensemble singleton so it is rebuilt."""
+        nlp_ensemble._ensemble_service = EnsembleNLPService()
+        previous = get_ensemble_nlp_service()
+
+        registry.reload(["value"])
+
+        assert nlp_ensemble._ensemble_service is None
+        assert get_ensemble_nlp_service() is not previous
+        nlp_ensemble.reset_ensemble_nlp_service()
+
+    def test_failed_reload_keeps_previous_instance(self) -> None:
+        """Test a failing rebuild keeps serving the existing engine."""
+        calls = {"n": 0}
+
+        def flaky(_: NLPEngineRegistry) -> Engine:
+            calls["n"] += 1
+            if calls["n"] > 1:
+                raise RuntimeError("boom")
+            return Engine("flaky")
+
+        registry = NLPEngineRegistry({"flaky": flaky})
+        original = registry.get("flaky")
+        results = registry.reload()
+
+        assert "error" in results["flaky"]
+        assert registry.get("flaky") is original
+
+
+class TestDefaultRegistry:
+    """Tests for the default engine factories."""
+
+    def test_ensemble_uses_swapped_components(self) -> None:
+        """Test the registry ensemble picks up hot-swapped components per call."""
+        rule_based = MagicMock()
+        rule_based.extract_mentions.return_value = []
+        registry = NLPEngineRegistry({"rule_based": lambda _: rule_based})
+        config = EnsembleConfig(
+            use_ml_ner=False, use_value_extraction=False, use_relation_extraction=False
+        )
+        ensemble = EnsembleNLPService(config=config, engine_registry=registry)
+        ensemble.extract_mentions("fever", uuid4())
+
+        replacement = MagicMock()
+        replacement.extract_mentions.return_value = []
+        registry._factories["rule_based"] = lambda _: replacement
+        registry.reload(["rule_based"])
+        ensemble.extract_mentions("fever", uuid4())
+
+        assert rule_based.extract_mentions.call_count == 1
+        assert replacement.extract_mentions.call_count == 1
+
+    def test_rule_based_engine_is_warm(self) -> None:
+        """Test the rule-based engine is built with its automaton ready."""
+        registry = NLPEngineRegistry()
+        engine = registry.get("rule_based")
+
+        assert isinstance(engine, RuleBasedNLPService)
+        assert engine._initialized
+
+
+class TestEngineEndpoints:
+    """Tests for the engine stats and reload endpoints."""
+
+    @pytest.fixture(autouse=True)
+    def reset_registry(self) -> None:
+        """Ensure each test starts with a fresh registry."""
+        reset_nlp_engine_registry()
+        yield
+        reset_nlp_engine_registry()
+
+    async def test_preview_reuses_engine(self, client_with_mock_db: AsyncClient) -> None:
+        """Test repeated previews reuse the shared rule-based engine."""
+        for _ in range(2):
+            response = await client_with_mock_db.post(
+                "/documents/preview/extract", json={"text": "Patient has fever."}
+            )
+            assert response.status_code == 200
+
+        response = await client_with_mock_db.get("/documents/preview/engines")
+        assert response.status_code == 200
+        rule_based = response.json()["engines"]["rule_based"]
+        assert rule_based["generation"] == 1
+        assert rule_based["reuse_count"] == 1
+
+    async def test_reload_unknown_engine_returns_400(
+        self, client_with_mock_db: AsyncClient
+    ) -> None:
+        """Test reloading an unknown engine is rejected."""
+        response = await client_with_mock_db.post(
+            "/documents/preview/engines/reload", json={"engines": ["bogus"]}
+        )
+        assert response.status_code == 400
+
+    async def test_reload_rule_based(self, client_with_mock_db: AsyncClient) -> None:
+        """Test reloading the rule-based engine bumps its generation."""
+        await client_with_mock_db.post("/documents/preview/extract", json={"text": "fever"})
+        response = await client_with_mock_db.post(
+            "/documents/preview/engines/reload", json={"engines": ["rule_based"]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data["reloaded"]) == ["rule_based"]
+        assert data["engines"]["rule_based"]["generation"] == 2
@@ -338,6 +338,62 @@ class TestExperiencerDetection:
         assert htn_mention.experiencer == Experiencer.PATIENT
 
 
+class TestBatchExtraction:
+    """Tests for extract_mentions_batch."""
+
+    DOCUMENTS = [
+        "Assessment: Patient has diabetes and hypertension.",
+        "No chest pain. Family history of diabetes in mother.",
+        "",
+        "fever",
+        "İ no fever. History of asthma.",
+        "Medications: metformin daily. Denies headache.",
+    ]
+
+    @pytest.fixture
+    def nlp_service(self) -> RuleBasedNLPService:
+        """Create NLP service for tests."""
+        return RuleBasedNLPService(VocabularyService())
+
+    @pytest.mark.parametrize("max_buffer_chars", [1, 80, 1_000_000])
+    def test_matches_single_document_extraction(
+        self, nlp_service: RuleBasedNLPService, max_buffer_chars: int
+    ) -> None:
+        """Test packed buffers give the same mentions as one-by-one extraction."""
+        expected = [nlp_service.extract_mentions(text, uuid4()) for text in self.DOCUMENTS]
+        documents = ((text, uuid4(), None) for text in self.DOCUMENTS)
+
+        results = list(nlp_service.extract_mentions_batch(documents, max_buffer_chars))
+
+        assert results == expected
+        assert any(m.assertion == Assertion.ABSENT for m in results[1])
+
+    def test_context_and_sections_do_not_leak(self, nlp_service: RuleBasedNLPService) -> None:
+        """Test triggers and sections of one document do not reach the next."""
+        documents = [("Assessment: denies pain, no", uuid4(), None), ("diabetes", uuid4(), None)]
+
+        _, second = nlp_service.extract_mentions_batch(documents)
+
+        assert second
+        assert second[0].start_offset == 0
+        assert second[0].assertion == Assertion.PRESENT
+        assert second[0].section is None
+
+    def test_streams_results(self, nlp_service: RuleBasedNLPService) -> None:
+        """Test full buffers are yielded before later documents are read."""
+        consumed: list[str] = []
+
+        def documents():
+            for text in ["diabetes", "hypertension", "asthma"]:
+                consumed.append(text)
+                yield text, uuid4(), None
+
+        results = nlp_service.extract_mentions_batch(documents(), max_buffer_chars=1)
+        next(results)
+
+        assert consumed == ["diabetes"]
+
+
 class TestRuleBasedNLPExports:
     """Tests for module exports."""
 
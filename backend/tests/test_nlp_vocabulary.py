@@ -0,0 +1,125 @@
+"""Tests for the streaming FilteredNLPVocabularyService loader."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine
+
+from app.services import nlp_vocabulary
+from app.services.nlp_vocabulary import FilteredNLPVocabularyService
+
+# Only the columns the loader reads (the ORM model's ARRAY column does not exist in SQLite)
+SCHEMA = [
+    """CREATE TABLE concepts (
+        concept_id INTEGER PRIMARY KEY,
+        concept_name VARCHAR(500) NOT NULL,
+        domain_id VARCHAR(50) NOT NULL,
+        vocabulary_id VARCHAR(50) NOT NULL,
+        concept_class_id VARCHAR(50) NOT NULL,
+        standard_concept VARCHAR(1)
+    )""",
+    """CREATE TABLE concept_synonyms (
+        concept_id INTEGER NOT NULL,
+        concept_synonym_name VARCHAR(1000) NOT NULL
+    )""",
+]
+
+CONCEPTS = [
+    # RxNorm ingredients (priority class); shorter names load first
+    (1, "Metformin", "Drug", "RxNorm", "Ingredient", "S"),
+    (2, "Furosemide", "Drug", "RxNorm", "Ingredient", "S"),
+    (3, "Acetaminophen", "Drug", "RxNorm", "Ingredient", "S"),
+    # SNOMED findings (priority class)
+    (10, "Zzqpathy", "Condition", "SNOMED", "Clinical Finding", "S"),
+    # Fill-phase candidates (non-priority class)
+    (20, "Qqcough", "Observation", "SNOMED", "Context-dependent", "S"),
+    (21, "Longer fill concept", "Condition", "SNOMED", "Context-dependent", "S"),
+    # Filtered out: non-standard, and a non-NLP vocabulary
+    (30, "Nonstandard", "Condition", "SNOMED", "Clinical Finding", None),
+    (31, "Icd code", "Condition", "ICD10CM", "Category", "S"),
+]
+
+SYNONYMS = [
+    (1, "Glucophage"),
+    (1, "metformin hcl"),
+    (10, "ZZQ"),
+    (20, "qq cough"),
+    (30, "never loaded"),
+]
+
+
+@pytest.fixture
+def vocab_engine(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / 'vocab.db'}")
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(
+            text("INSERT INTO concepts VALUES (:id, :name, :domain, :vocab, :cls, :std)"),
+            [dict(zip(["id", "name", "domain", "vocab", "cls", "std"], c, strict=True)) for c in CONCEPTS],
+        )
+        conn.execute(
+            text("INSERT INTO concept_synonyms VALUES (:id, :name)"),
+            [{"id": i, "name": n} for i, n in SYNONYMS],
+        )
+    return engine
+
+
+def load_service(engine: Engine, max_concepts: int, **kwargs) -> FilteredNLPVocabularyService:
+    service = FilteredNLPVocabularyService(max_concepts=max_concepts)
+    with patch.object(nlp_vocabulary, "get_sync_engine", return_value=engine), patch.object(
+        nlp_vocabulary, "CLINICAL_ABBREVIATIONS_FILE", Path("/nonexistent.json")
+    ):
+        service.load(**kwargs)
+    return service
+
+
+class TestStreamingLoader:
+    """Tests for the batched, temp-table based load."""
+
+    def test_loads_priority_then_fill_in_name_order(self, vocab_engine: Engine) -> None:
+        """Test phase order, name-length order and filtering are preserved."""
+        service = load_service(vocab_engine, max_concepts=100)
+
+        assert [c.concept_id for c in service.concepts] == [1, 2, 3, 10, 20, 21]
+
+    def test_fill_excludes_priority_concepts(self, vocab_engine: Engine) -> None:
+        """Test the fill phase never reloads priority concepts and respects the quota."""
+        with patch.object(nlp_vocabulary, "LOAD_BATCH_SIZE", 2):
+            service = load_service(vocab_engine, max_concepts=5)
+
+        ids = [c.concept_id for c in service.concepts]
+        assert ids == [1, 2, 3, 10, 20]
+        assert len(set(ids)) == len(ids)
+
+    def test_synonyms_joined_for_loaded_concepts(self, vocab_engine: Engine) -> None:
+        """Test synonyms come from the join on loaded IDs, lowercased with the name."""
+        service = load_service(vocab_engine, max_concepts=100)
+
+        [metformin] = service.search("glucophage")
+        assert metformin.concept_id == 1
+        assert sorted(metformin.synonyms) == ["glucophage", "metformin", "metformin hcl"]
+        assert service.search("never loaded") == []
+
+    def test_progress_and_timings(self, vocab_engine: Engine) -> None:
+        """Test progress is reported per batch and every phase is timed."""
+        calls: list[tuple[str, int]] = []
+        with patch.object(nlp_vocabulary, "LOAD_BATCH_SIZE", 2):
+            service = load_service(
+                vocab_engine, max_concepts=100, progress=lambda phase, n: calls.append((phase, n))
+            )
+
+        assert ("priority", 2) in calls
+        assert calls[-1] == ("synonyms", 4)
+        assert {"abbreviations", "priority", "fill", "synonyms", "build", "total"} <= set(
+            service.load_timings
+        )
+
+    def test_temporary_table_dropped(self, vocab_engine: Engine) -> None:
+        """Test the loaded-ids table does not outlive the load."""
+        load_service(vocab_engine, max_concepts=100)
+
+        with vocab_engine.connect() as conn:
+            assert "nlp_vocabulary_loaded_ids" not in inspect(conn).get_temp_table_names()
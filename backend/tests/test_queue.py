@@ -1,6 +1,7 @@
 """Tests for Redis queue configuration."""
 
 from unittest.mock import MagicMock, patch
+from uuid import uuid4
 
 import pytest
 
@@ -230,6 +231,69 @@ class TestEnqueueJob:
         assert call_kwargs["job_id"] == str(custom_id)
 
 
+class TestEnqueueBatches:
+    """Test enqueue_batches function."""
+
+    @staticmethod
+    def queued_chunks(mock_queue: MagicMock) -> list[list[str]]:
+        return [call.kwargs["args"][0] for call in mock_queue.prepare_data.call_args_list]
+
+    @patch("app.core.queue.get_queue")
+    def test_packs_ids_into_chunks(self, mock_get_queue: MagicMock) -> None:
+        """Test each job gets up to batch_size IDs, all enqueued in one call."""
+        from app.core.queue import enqueue_batches
+
+        mock_queue = MagicMock()
+        mock_get_queue.return_value = mock_queue
+        ids = [uuid4() for _ in range(5)]
+
+        enqueue_batches(len, ids, batch_size=2, queue_name="docs", job_timeout=900)
+
+        assert self.queued_chunks(mock_queue) == [
+            [str(ids[0]), str(ids[1])],
+            [str(ids[2]), str(ids[3])],
+            [str(ids[4])],
+        ]
+        assert mock_queue.prepare_data.call_args.kwargs["timeout"] == 900
+        mock_queue.enqueue_many.assert_called_once()
+        assert len(mock_queue.enqueue_many.call_args.args[0]) == 3
+        mock_get_queue.assert_called_with("docs")
+
+    @patch("app.core.queue.get_queue")
+    def test_default_batch_size_from_settings(
+        self, mock_get_queue: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test the batch size defaults to settings.queue_batch_size."""
+        from app.core.config import settings
+        from app.core.queue import enqueue_batches
+
+        monkeypatch.setattr(settings, "queue_batch_size", 3)
+        mock_queue = MagicMock()
+        mock_get_queue.return_value = mock_queue
+
+        enqueue_batches(len, (str(i) for i in range(7)))
+
+        assert [len(chunk) for chunk in self.queued_chunks(mock_queue)] == [3, 3, 1]
+
+    @patch("app.core.queue.get_queue")
+    def test_no_ids_enqueues_nothing(self, mock_get_queue: MagicMock) -> None:
+        """Test an empty ID list enqueues no jobs."""
+        from app.core.queue import enqueue_batches
+
+        mock_queue = MagicMock()
+        mock_get_queue.return_value = mock_queue
+
+        assert enqueue_batches(len, []) == []
+        mock_queue.enqueue_many.assert_not_called()
+
+    def test_rejects_empty_batches(self) -> None:
+        """Test batch_size must be positive."""
+        from app.core.queue import enqueue_batches
+
+        with pytest.raises(ValueError):
+            enqueue_batches(len, ["a"], batch_size=0)
+
+
 class TestGetJob:
     """Test get_job function."""
 
@@ -219,6 +219,59 @@ class TestPatternExtraction:
         assert len(relations) < 5
 
 
+class TestPatternSafety:
+    """Test the compiled pattern set and its time budget."""
+
+    def test_patterns_compiled_and_bounded(self):
+        """Test every pattern is precompiled without unbounded group repeats."""
+        from app.services.relation_extraction import ALL_PATTERNS, COMPILED_PATTERNS
+
+        assert len(COMPILED_PATTERNS) == len(ALL_PATTERNS)
+        assert all(")*" not in p and ")+" not in p for p, *_ in ALL_PATTERNS)
+
+    def test_unbounded_pattern_rejected(self):
+        """Test a nested unbounded repeat is refused at compile time."""
+        from app.services.relation_extraction import _compile_patterns
+
+        with pytest.raises(ValueError):
+            _compile_patterns([(r"(\w+(?:\s+\w+)*) for (\w+)", None, None, RelationType.TREATS)])
+
+    def test_pathological_input_is_fast(self):
+        """Test long runs of words without punctuation match in linear time."""
+        import time
+
+        service = RelationExtractionService()
+        text = "word " * 20000 + "x"
+        started = time.perf_counter()
+        service._extract_pattern_relations(text)
+        assert time.perf_counter() - started < 5
+
+    def test_matches_stay_within_sentences(self):
+        """Test a relation never spans a sentence boundary."""
+        from app.services.relation_extraction import sentence_segments
+
+        text = "Patient seen today.\n\nMetformin for diabetes. Knee pain noted."
+        relations = RelationExtractionService()._extract_pattern_relations(text)
+        segments = sentence_segments(text)
+
+        assert relations
+        for relation in relations:
+            start = min(relation.source_start, relation.target_start)
+            end = max(relation.source_end, relation.target_end)
+            assert any(s <= start and end <= e for s, e in segments)
+
+    def test_budget_overrun_is_recorded(self):
+        """Test exhausting the budget stops matching and names the pattern."""
+        from app.services.relation_extraction import COMPILED_PATTERNS
+
+        service = RelationExtractionService(
+            config=RelationExtractionConfig(pattern_time_budget_ms=0)
+        )
+        service._extract_pattern_relations("Metformin for diabetes.")
+
+        assert service.budget_overruns == {COMPILED_PATTERNS[0][0].pattern: 1}
+
+
 # ============================================================================
 # Proximity Extraction Tests
 # ============================================================================
@@ -527,6 +580,148 @@ ALLERGIES/ADVERSE REACTIONS:
         assert len(adverse_relations) >= 1
 
 
+# ============================================================================
+# Candidate Window Tests
+# ============================================================================
+
+
+class FakeToken:
+    """Minimal stand-in for a spaCy token."""
+
+    def __init__(self, i: int, idx: int, text: str, dep: str) -> None:
+        self.i = i
+        self.idx = idx
+        self.text = text
+        self.dep_ = dep
+        self.head = self
+
+
+def relation_key(relation: ExtractedRelation) -> tuple:
+    """Comparable identity of a relation (ids differ per run)."""
+    return (
+        relation.source_start, relation.target_start, relation.relation_type,
+        relation.confidence, relation.evidence_text, relation.extraction_method,
+    )
+
+
+class TestCandidateWindow:
+    """Test windowed candidate pairing."""
+
+    DOMAINS = [
+        Domain.DRUG.value, Domain.CONDITION.value, Domain.OBSERVATION.value,
+        Domain.MEASUREMENT.value, Domain.PROCEDURE.value,
+    ]
+
+    def _random_document(self, seed: int) -> tuple[str, list[ExtractedMention]]:
+        """Build a long note with mentions scattered through it."""
+        import random
+
+        rng = random.Random(seed)
+        words = "for on taking shows performed treat the patient with and .".split()
+        text = " ".join(rng.choice(words) for _ in range(600))
+        mentions = []
+        for _ in range(120):
+            start = rng.randrange(len(text) - 10)
+            end = start + rng.randint(1, 10)
+            mentions.append(ExtractedMention(
+                text=text[start:end],
+                start_offset=start,
+                end_offset=end,
+                lexical_variant=text[start:end],
+                domain_hint=rng.choice(self.DOMAINS),
+            ))
+        return text, mentions
+
+    def test_window_matches_all_pairs(self):
+        """Test windowed pairs give the all-pairs result within the distance."""
+        for seed in range(3):
+            text, mentions = self._random_document(seed)
+            windowed = RelationExtractionService(
+                config=RelationExtractionConfig(max_entity_distance=80)
+            )._extract_proximity_relations(text, mentions)
+            everything = RelationExtractionService(
+                config=RelationExtractionConfig(max_entity_distance=10**9)
+            )._extract_proximity_relations(text, mentions)
+
+            within = [r for r in everything if abs(r.source_start - r.target_start) <= 80]
+            assert [relation_key(r) for r in windowed] == [relation_key(r) for r in within]
+
+    def test_candidate_pairs_follow_mention_order(self):
+        """Test pairs come back in nested-loop order regardless of offsets."""
+        service = RelationExtractionService()
+        mentions = [
+            ExtractedMention(text="b", start_offset=50, end_offset=51, lexical_variant="b"),
+            ExtractedMention(text="a", start_offset=0, end_offset=1, lexical_variant="a"),
+            ExtractedMention(text="c", start_offset=500, end_offset=501, lexical_variant="c"),
+        ]
+        assert service._candidate_pairs("x" * 600, mentions) == [(0, 1), (1, 0)]
+
+    def test_sentence_window(self):
+        """Test the optional sentence distance limits pairs."""
+        text = "Metformin for diabetes. Lisinopril daily."
+        mentions = [
+            ExtractedMention(text="Metformin", start_offset=0, end_offset=9,
+                             lexical_variant="metformin", domain_hint=Domain.DRUG.value),
+            ExtractedMention(text="diabetes", start_offset=14, end_offset=22,
+                             lexical_variant="diabetes", domain_hint=Domain.CONDITION.value),
+            ExtractedMention(text="Lisinopril", start_offset=24, end_offset=34,
+                             lexical_variant="lisinopril", domain_hint=Domain.DRUG.value),
+        ]
+        service = RelationExtractionService(
+            config=RelationExtractionConfig(max_sentence_distance=0)
+        )
+        assert service._candidate_pairs(text, mentions) == [(0, 1), (1, 0)]
+
+    def test_dependency_candidates_match_all_pairs(self):
+        """Test head-based candidates find the same relations as all pairs."""
+        text = "Metformin for diabetes and aspirin for pain"
+        tokens = []
+        position = 0
+        for i, word in enumerate(text.split()):
+            position = text.index(word, position)
+            tokens.append(FakeToken(i, position, word, "pobj"))
+        # metformin <- diabetes, aspirin <- pain, diabetes <- metformin
+        tokens[2].head = tokens[0]
+        tokens[6].head = tokens[4]
+        tokens[0].head = tokens[2]
+
+        def mention(word: str, domain: str) -> ExtractedMention:
+            start = text.index(word)
+            return ExtractedMention(text=word, start_offset=start, end_offset=start + len(word),
+                                    lexical_variant=word.lower(), domain_hint=domain)
+
+        mentions = [
+            mention("pain", Domain.CONDITION.value),
+            mention("Metformin", Domain.DRUG.value),
+            mention("diabetes", Domain.CONDITION.value),
+            mention("aspirin", Domain.DRUG.value),
+        ]
+        service = RelationExtractionService()
+        service._nlp = lambda _: tokens
+        service._spacy_available = True
+        relations = service._extract_dependency_relations(text, mentions)
+
+        expected = []
+        for i, source in enumerate(mentions):
+            for j, target in enumerate(mentions):
+                if i == j:
+                    continue
+                for src in tokens:
+                    for tgt in tokens:
+                        if (
+                            src.idx < source.end_offset and src.idx + len(src.text) > source.start_offset
+                            and tgt.idx < target.end_offset and tgt.idx + len(tgt.text) > target.start_offset
+                            and tgt.head is src
+                            and service._dep_to_relation(tgt.dep_, source.domain_hint, target.domain_hint)
+                        ):
+                            expected.append((source.start_offset, target.start_offset))
+
+        assert [(r.source_start, r.target_start) for r in relations] == expected
+        assert {(r.source_text, r.target_text) for r in relations} == {
+            ("Metformin", "diabetes"), ("aspirin", "pain"), ("diabetes", "Metformin"),
+        }
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
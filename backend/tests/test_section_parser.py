@@ -4,8 +4,10 @@ from uuid import uuid4
 
 import pytest
 
+from app.services import clinical_context
 from app.services.section_parser import (
     ClinicalSection,
+    SectionIndex,
     SectionParser,
     SectionSpan,
     get_section_parser,
@@ -206,6 +208,79 @@ class TestSectionAtOffset:
         assert section == ClinicalSection.UNKNOWN
 
 
+class TestSingleRegexParse:
+    """Tests for the single-alternation parse."""
+
+    @pytest.fixture
+    def parser(self) -> SectionParser:
+        return SectionParser()
+
+    def test_nested_header_not_split(self, parser: SectionParser) -> None:
+        """Test a header containing a shorter header is one section."""
+        text = "Discharge Medications: aspirin\nAssessment and Plan: rest"
+        sections = parser.parse(text)
+
+        assert [s.section for s in sections] == [
+            ClinicalSection.DISCHARGE_MEDICATIONS,
+            ClinicalSection.ASSESSMENT_PLAN,
+        ]
+        assert [s.title for s in sections] == ["Discharge Medications", "Assessment and Plan"]
+
+    @pytest.mark.parametrize(
+        ("header", "section"),
+        [
+            ("HPI:", ClinicalSection.HPI),
+            ("Vitals:", ClinicalSection.VITAL_SIGNS),
+            ("Discharge Dx:", ClinicalSection.DISCHARGE_DIAGNOSIS),
+            ("Admitting Diagnosis:", ClinicalSection.DIAGNOSIS),
+            ("F/U:", ClinicalSection.FOLLOW_UP),
+        ],
+    )
+    def test_group_maps_to_section(
+        self, parser: SectionParser, header: str, section: ClinicalSection
+    ) -> None:
+        """Test the matched named group maps back to its pattern's section."""
+        assert parser.get_section_at(header + " text", len(header) + 1) == section
+
+
+class TestSectionIndex:
+    """Tests for SectionIndex lookups."""
+
+    def test_lookup_matches_linear_scan(self) -> None:
+        """Test bisect lookups agree with scanning spans in reverse."""
+        text = "Intro. CC: pain.\nHPI: worse.\nPMH: DM.\nMedications: metformin.\nPlan: f/u."
+        spans = SectionParser().parse(text)
+        index = SectionIndex(spans)
+
+        for offset in range(len(text)):
+            expected = next(
+                (s.section for s in reversed(spans) if s.start <= offset), ClinicalSection.UNKNOWN
+            )
+            assert index.section_at(offset) == expected
+
+    def test_empty_index(self) -> None:
+        """Test an index without sections returns the unknown section."""
+        index = get_section_parser().index("no headers here")
+
+        assert len(index) == 0
+        assert index.span_at(3) is None
+        assert index.section_at(3) == ClinicalSection.UNKNOWN
+
+    def test_clinical_context_detector_uses_index(self) -> None:
+        """Test SectionDetector lookups through its index."""
+        detector = clinical_context.SectionDetector()
+        text = "Family history: mother with diabetes.\nMedications: lisinopril"
+        index = detector.index(text)
+
+        assert index.section_at(20) == clinical_context.ClinicalSection.FAMILY_HISTORY
+        assert detector.get_section_at_position(index.spans, len(text) - 1) == (
+            clinical_context.ClinicalSection.MEDICATIONS
+        )
+        assert detector.get_section_at_position(index, len(text)) == (
+            clinical_context.ClinicalSection.UNKNOWN
+        )
+
+
 class TestDomainAffinity:
     """Tests for section-domain affinity scoring."""
 
@@ -0,0 +1,157 @@
+"""Tests for compiled vocabulary snapshots."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import cpt_suggester, icd10_suggester
+from app.services.snapshot import Snapshot, SnapshotWriter, open_snapshot
+from app.services.trigram_index import TrigramIndex
+from app.services.vocabulary import VocabularyService
+
+TERMS = ["acute renal failure", "renal colic", "asthma", "ra", "", "café au lait"]
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "vocabulary_snapshot_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "vocabulary_snapshot_enabled", True)
+    return tmp_path
+
+
+def write_sample(path: Path, source_hash: str = "abc") -> Path:
+    writer = SnapshotWriter("sample", source_hash)
+    writer.add_array("ids", np.array([3, 1, 2], dtype=np.int64))
+    writer.add_array("empty", np.array([], dtype=np.int32))
+    writer.add_strings("terms", TERMS)
+    writer.add_lists("groups", [[0, 2], [], [1]])
+    writer.add_string_lists("synonyms", [["a", "b"], [], ["ü"]])
+    writer.add_trigram_index("trigrams", TrigramIndex(TERMS))
+    return writer.write(path, meta={"labels": ["x", "y"]})
+
+
+class TestSnapshotFormat:
+    """Tests for writing and mapping snapshot files."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test every stored structure reads back unchanged."""
+        snapshot = Snapshot(write_sample(tmp_path / "sample.snap"))
+
+        assert (snapshot.kind, snapshot.source_hash) == ("sample", "abc")
+        assert snapshot.meta == {"labels": ["x", "y"]}
+        assert snapshot.array("ids").tolist() == [3, 1, 2]
+        assert snapshot.array("empty").tolist() == []
+        assert snapshot.strings("terms") == TERMS
+        assert snapshot.string_table("terms")[5] == "café au lait"
+        assert snapshot.lists("groups") == [[0, 2], [], [1]]
+        assert snapshot.string_lists("synonyms") == [["a", "b"], [], ["ü"]]
+
+    def test_arrays_are_read_only_views(self, tmp_path: Path) -> None:
+        """Test arrays map the file rather than copying it."""
+        snapshot = Snapshot(write_sample(tmp_path / "sample.snap"))
+        ids = snapshot.array("ids")
+
+        assert not ids.flags.writeable
+        assert not ids.flags.owndata
+
+    def test_trigram_index_matches_fresh_build(self, tmp_path: Path) -> None:
+        """Test a restored trigram index answers queries like a fresh one."""
+        snapshot = Snapshot(write_sample(tmp_path / "sample.snap"))
+        restored = snapshot.trigram_index("trigrams", TERMS)
+        fresh = TrigramIndex(TERMS)
+
+        for query in ["renal", "ra", "asthma attack", "acute renal failure today", "café", ""]:
+            assert restored.containing(query) == fresh.containing(query)
+            assert restored.contained_in(query) == fresh.contained_in(query)
+
+    def test_open_rejects_stale_and_foreign_snapshots(self, snapshot_dir: Path) -> None:
+        """Test snapshots of other sources, kinds or formats are ignored."""
+        path = write_sample(snapshot_dir / "sample.snap")
+
+        assert open_snapshot("sample", "abc") is not None
+        assert open_snapshot("sample", "changed") is None
+        assert open_snapshot("other", "abc", path=path) is None
+        assert open_snapshot("missing", "abc") is None
+
+        path.write_bytes(b"not a snapshot")
+        assert open_snapshot("sample", "abc") is None
+
+    def test_open_respects_disabled_setting(
+        self, snapshot_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test snapshots are not used when disabled."""
+        write_sample(snapshot_dir / "sample.snap")
+        monkeypatch.setattr(settings, "vocabulary_snapshot_enabled", False)
+
+        assert open_snapshot("sample", "abc") is None
+
+
+class TestServiceSnapshots:
+    """Tests for services loading from snapshots."""
+
+    def test_vocabulary_service(self, snapshot_dir: Path) -> None:
+        """Test a vocabulary loaded from its snapshot matches the fixture build."""
+        built = VocabularyService()
+        built.load()
+        VocabularyService().write_snapshot()
+
+        mapped = VocabularyService()
+        mapped.load()
+
+        assert mapped.get_stats()["from_snapshot"] is True
+        assert not built.get_stats()["from_snapshot"]
+        assert list(mapped.concepts) == list(built.concepts)
+        for query in ["hypertension", "diab", "chf", "blood pressure", "x"]:
+            assert mapped.search(query) == built.search(query)
+
+    def test_vocabulary_snapshot_invalidated_by_source_change(
+        self, snapshot_dir: Path, tmp_path: Path
+    ) -> None:
+        """Test a snapshot of an edited fixture is not used."""
+        fixture = tmp_path / "omop_vocabulary.json"
+        fixture.write_text(VocabularyService().fixture_path.read_text())
+        VocabularyService(fixture).write_snapshot()
+        fixture.write_text('{"concepts": []}')
+
+        service = VocabularyService(fixture)
+        service.load()
+
+        assert service.get_stats()["from_snapshot"] is False
+
+    @pytest.mark.parametrize(
+        ("module", "write", "load", "load_source"),
+        [
+            (
+                cpt_suggester,
+                cpt_suggester.write_cpt_snapshot,
+                cpt_suggester.load_cpt_code_index,
+                cpt_suggester.load_extended_cpt_codes,
+            ),
+            (
+                icd10_suggester,
+                icd10_suggester.write_icd10_snapshot,
+                icd10_suggester.load_icd10_code_index,
+                icd10_suggester.load_extended_icd10_codes,
+            ),
+        ],
+        ids=["cpt", "icd10"],
+    )
+    def test_code_index(
+        self, snapshot_dir: Path, monkeypatch: pytest.MonkeyPatch, module, write, load, load_source
+    ) -> None:
+        """Test a code index loaded from its snapshot matches the fixture build."""
+        codes, synonym_index = load_source()
+        write()
+
+        # The fixture must not be read again
+        monkeypatch.setattr(module, load_source.__name__, None)
+        mapped_codes, mapped_index, synonyms, trigrams = load()
+
+        assert mapped_codes == codes
+        assert mapped_index == synonym_index
+        assert synonyms == list(synonym_index)
+        fresh = TrigramIndex(synonyms)
+        for query in ["knee", "mri", "ec", "chest pain", "office visit"]:
+            assert trigrams.overlapping(query) == fresh.overlapping(query)
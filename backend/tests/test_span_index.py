@@ -0,0 +1,188 @@
+"""Tests for the shared span interval index."""
+
+import random
+
+import pytest
+
+from app.models.clinical_value import ValueType
+from app.services.nlp import ExtractedMention
+from app.services.nlp_ensemble import EnsembleNLPService
+from app.services.span_index import (
+    SpanIndex,
+    overlap_ratio,
+    prefer_longer,
+    prefer_more_confident,
+    resolve_overlaps,
+)
+from app.services.value_extraction import ExtractedValue, ValueExtractionService
+
+
+def random_spans(rng: random.Random, count: int, text_length: int = 400) -> list[tuple[int, int]]:
+    """Generate short spans, some long, scattered over a document."""
+    spans = []
+    for _ in range(count):
+        start = rng.randint(0, text_length)
+        length = rng.choice([0, 1, 3, 5, 8, 12, 20, 60])
+        spans.append((start, start + length))
+    return spans
+
+
+def scan_remove_overlapping(values: list[ExtractedValue]) -> list[ExtractedValue]:
+    """Quadratic reference: first accepted overlap decides, longer text wins."""
+    filtered: list[ExtractedValue] = []
+    for value in values:
+        for i, accepted in enumerate(filtered):
+            if value.start_offset < accepted.end_offset and value.end_offset > accepted.start_offset:
+                if len(value.text) > len(accepted.text):
+                    del filtered[i]
+                    filtered.append(value)
+                break
+        else:
+            filtered.append(value)
+    return sorted(filtered, key=lambda x: x.start_offset)
+
+
+def scan_merge(
+    service: EnsembleNLPService, mentions_by_source: dict[str, list[ExtractedMention]]
+) -> list[ExtractedMention]:
+    """Quadratic reference for the ensemble merge over a list of used spans."""
+    config = service.config
+    all_mentions = [(source, m) for source, ms in mentions_by_source.items() for m in ms]
+    all_mentions.sort(key=lambda x: (x[1].start_offset, -(x[1].end_offset - x[1].start_offset)))
+
+    merged: list[ExtractedMention] = []
+    for source, mention in all_mentions:
+        for i, existing in enumerate(merged):
+            if not service._spans_overlap(
+                mention.start_offset, mention.end_offset, existing.start_offset, existing.end_offset
+            ):
+                continue
+            length = mention.end_offset - mention.start_offset
+            if (
+                config.domain_preferences.get(mention.domain_hint or "") == source
+                or length > existing.end_offset - existing.start_offset
+                or mention.confidence > existing.confidence
+            ):
+                merged[i] = mention
+            else:
+                existing.confidence = min(
+                    existing.confidence + config.agreement_boost, config.max_confidence
+                )
+            break
+        else:
+            merged.append(mention)
+    return merged
+
+
+class TestSpanIndex:
+    """Tests for SpanIndex queries."""
+
+    def test_overlapping_matches_brute_force(self) -> None:
+        """Test overlap and stabbing queries agree with a full scan."""
+        rng = random.Random(7)
+        index: SpanIndex[int] = SpanIndex()
+        spans = random_spans(rng, 300)
+        handles = [index.insert(start, end, i) for i, (start, end) in enumerate(spans)]
+
+        # Remove some entries and move others
+        live = dict(enumerate(spans))
+        for i in rng.sample(range(len(spans)), 60):
+            index.remove(handles[i])
+            del live[i]
+        for i in rng.sample(sorted(live), 40):
+            start = rng.randint(0, 400)
+            live[i] = (start, start + rng.randint(0, 30))
+            index.replace(handles[i], *live[i], i)
+
+        assert len(index) == len(live)
+        for start, end in random_spans(rng, 200):
+            expected = {i for i, (s, e) in live.items() if s < end and e > start}
+            assert {item for _, _, _, item in index.overlapping(start, end)} == expected
+            offset = start
+            expected = {i for i, (s, e) in live.items() if s <= offset < e}
+            assert {item for _, _, _, item in index.stabbing(offset)} == expected
+
+    def test_items_keep_insertion_order_across_replace(self) -> None:
+        """Test replace keeps an entry's position in handle order."""
+        index: SpanIndex[str] = SpanIndex()
+        first = index.insert(10, 20, "a")
+        index.insert(0, 5, "b")
+        index.replace(first, 30, 40, "c")
+
+        assert list(index.items()) == ["c", "b"]
+        assert [item for _, _, item in index.spans()] == ["b", "c"]
+
+    def test_overlap_ratio(self) -> None:
+        """Test overlap is measured against the shorter span."""
+        assert overlap_ratio(0, 10, 5, 7) == 1.0
+        assert overlap_ratio(0, 10, 5, 15) == 0.5
+        assert overlap_ratio(0, 10, 10, 20) == 0.0
+        assert overlap_ratio(5, 5, 0, 10) == 0.0
+
+
+class TestResolveOverlaps:
+    """Tests for merge policies."""
+
+    def test_prefer_longer(self) -> None:
+        """Test the longer of overlapping spans is kept."""
+        spans = [(0, 5), (3, 12), (20, 25), (22, 24)]
+        result = resolve_overlaps(spans, span=lambda s: s, prefer=prefer_longer(lambda s: s[1] - s[0]))
+        assert result == [(3, 12), (20, 25)]
+
+    def test_prefer_more_confident(self) -> None:
+        """Test the more confident of overlapping spans is kept."""
+        items = [(0, 5, 0.9), (3, 12, 0.5), (10, 14, 0.7)]
+        result = resolve_overlaps(
+            items, span=lambda i: (i[0], i[1]), prefer=prefer_more_confident(lambda i: i[2])
+        )
+        assert result == [(0, 5, 0.9), (10, 14, 0.7)]
+
+
+class TestValueOverlapRemoval:
+    """Tests for ValueExtractionService._remove_overlapping."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_list_scan(self, seed: int) -> None:
+        """Test the indexed removal keeps the same values as a list scan."""
+        rng = random.Random(seed)
+        values = [
+            ExtractedValue(
+                text="x" * (end - start),
+                start_offset=start,
+                end_offset=end,
+                name=f"v{i}",
+                value_type=ValueType.LAB_RESULT,
+            )
+            for i, (start, end) in enumerate(random_spans(rng, 150))
+        ]
+        values.sort(key=lambda x: (x.start_offset, -x.end_offset))
+
+        service = ValueExtractionService()
+        assert service._remove_overlapping(values) == scan_remove_overlapping(values)
+
+
+class TestEnsembleMergeIndex:
+    """Tests for the indexed ensemble merge."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_merge_matches_list_scan(self, seed: int) -> None:
+        """Test the indexed merge gives the same mentions as a list scan."""
+
+        def build() -> dict[str, list[ExtractedMention]]:
+            rng = random.Random(seed)
+            by_source: dict[str, list[ExtractedMention]] = {"rule_based": [], "ml_ner": []}
+            for start, end in random_spans(rng, 200):
+                by_source[rng.choice(list(by_source))].append(
+                    ExtractedMention(
+                        text="x" * (end - start),
+                        start_offset=start,
+                        end_offset=end,
+                        lexical_variant="x",
+                        confidence=round(rng.random(), 2),
+                        domain_hint=rng.choice([None, "Condition", "Drug"]),
+                    )
+                )
+            return by_source
+
+        service = EnsembleNLPService()
+        assert service._merge_mentions(build()) == scan_merge(service, build())
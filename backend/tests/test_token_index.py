@@ -0,0 +1,115 @@
+"""Tests for the token-set Jaccard index."""
+
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.mapping import MappingMethod
+from app.services.mapping_db import DatabaseMappingService
+from app.services.token_index import TokenSetIndex
+
+
+def random_token_sets(rng: random.Random, count: int) -> list[set[str]]:
+    """Generate token sets over a small, skewed vocabulary so overlaps are common."""
+    vocabulary = [f"t{i}" for i in range(30)]
+    weights = [1 / (i + 1) for i in range(30)]
+    return [set(rng.choices(vocabulary, weights, k=rng.randint(0, 8))) for _ in range(count)]
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TestTokenSetIndex:
+    """Tests for TokenSetIndex queries against linear scans."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8, 1.0])
+    def test_similar_matches_scan(self, seed: int, threshold: float) -> None:
+        """Test similar() finds exactly the sets a scan would, in order."""
+        rng = random.Random(seed)
+        sets = random_token_sets(rng, 400)
+        index = TokenSetIndex(sets, threshold)
+
+        for query in random_token_sets(rng, 100) + [set(), {"unknown"}, {"unknown", "t0"}]:
+            expected = [
+                (i, jaccard(query, s)) for i, s in enumerate(sets) if jaccard(query, s) >= threshold
+            ]
+            assert index.similar(query) == expected
+
+    def test_rejects_invalid_threshold(self) -> None:
+        """Test a zero threshold (which admits every set) is refused."""
+        with pytest.raises(ValueError):
+            TokenSetIndex([{"a"}], 0)
+
+
+def concept(concept_id: int, name: str, domain: str, synonyms: list[str]) -> SimpleNamespace:
+    return SimpleNamespace(
+        concept_id=concept_id,
+        concept_name=name,
+        vocabulary_id="SNOMED",
+        domain_id=domain,
+        synonyms=[SimpleNamespace(concept_synonym_name=s) for s in synonyms],
+    )
+
+
+CONCEPTS = [
+    concept(1, "Essential hypertension", "Condition", ["High blood pressure", "HTN"]),
+    concept(2, "Pain in chest", "Condition", ["Chest pain", "Thoracic pain"]),
+    concept(3, "Chest wall pain", "Condition", []),
+    concept(4, "Blood pressure", "Measurement", ["BP"]),
+    concept(5, "Heart failure", "Condition", ["Congestive heart failure", "CHF"]),
+    concept(6, "Arterial pressure", "Measurement", ["Blood pressure."]),
+]
+
+
+def scan_fuzzy(service: DatabaseMappingService, text: str) -> list[tuple[int, float]]:
+    """The former linear fuzzy scan: Jaccard against every synonym key."""
+    matches = []
+    for key, entries in service._synonym_index.items():
+        similarity = service.calculate_similarity(text, key)
+        if similarity >= 0.3:
+            matches.extend((c.concept_id, similarity) for c, _ in entries)
+    matches.sort(key=lambda m: m[1], reverse=True)
+    return matches
+
+
+class TestDatabaseMappingFuzzy:
+    """Tests for DatabaseMappingService fuzzy matching through the token index."""
+
+    @pytest.fixture
+    def service(self) -> DatabaseMappingService:
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value.unique.return_value.all.return_value = (
+            CONCEPTS
+        )
+        service = DatabaseMappingService()
+        service.load_from_db(session)
+        return service
+
+    @pytest.mark.parametrize(
+        "text", ["chest pain left side", "blood pressure high", "heart", "acute heart failure"]
+    )
+    def test_fuzzy_matches_linear_scan(self, service: DatabaseMappingService, text: str) -> None:
+        """Test fuzzy candidates and scores equal those of the linear scan."""
+        candidates = service.map_mention(text, limit=50)
+
+        fuzzy = [
+            (c.omop_concept_id, c.score) for c in candidates if c.method == MappingMethod.FUZZY
+        ]
+        expected, seen = [], {c.omop_concept_id for c in candidates if c.is_exact_match}
+        for concept_id, score in scan_fuzzy(service, text):
+            if concept_id not in seen:
+                expected.append((concept_id, score))
+                seen.add(concept_id)
+        assert fuzzy == expected
+
+    def test_other_normalized_forms_are_exact(self, service: DatabaseMappingService) -> None:
+        """Test keys differing only by edge punctuation still match at 0.95."""
+        candidates = service.map_mention("blood pressure")
+
+        assert [(c.omop_concept_id, c.score) for c in candidates[:2]] == [(4, 1.0), (6, 0.95)]
@@ -0,0 +1,87 @@
+"""Tests for the trigram substring index."""
+
+import random
+
+import pytest
+
+from app.services.drug_safety import DrugSafetyService
+from app.services.lab_reference import LAB_REFERENCE_RANGES, LabReferenceService
+from app.services.trigram_index import TrigramIndex, trigrams
+
+
+def random_terms(rng: random.Random, count: int) -> list[str]:
+    """Generate short and long terms over a small alphabet, so substrings repeat."""
+    alphabet = "abcde "
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+
+class TestTrigramIndex:
+    """Tests for TrigramIndex queries against linear scans."""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_containing_matches_scan(self, seed: int) -> None:
+        """Test containing() finds exactly the terms a scan would, in order."""
+        rng = random.Random(seed)
+        terms = random_terms(rng, 400)
+        index = TrigramIndex(terms)
+
+        for query in random_terms(rng, 100) + ["", "a", "ab", "zzz"]:
+            assert index.containing(query) == [i for i, t in enumerate(terms) if query in t]
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_contained_in_matches_scan(self, seed: int) -> None:
+        """Test contained_in() finds exactly the terms occurring in the text."""
+        rng = random.Random(seed)
+        terms = random_terms(rng, 400)
+        index = TrigramIndex(terms)
+
+        for text in random_terms(rng, 100) + [""]:
+            assert index.contained_in(text) == [i for i, t in enumerate(terms) if t in text]
+
+    def test_overlapping(self) -> None:
+        """Test overlapping() combines both directions."""
+        terms = ["renal failure", "acute renal failure", "failure", "asthma", "re"]
+        index = TrigramIndex(terms)
+
+        assert index.overlapping("renal failure") == [0, 1, 2, 4]
+        assert index.overlapping("asthma attack") == [3]
+
+    def test_non_ascii_and_short_terms(self) -> None:
+        """Test terms outside ASCII and shorter than a trigram are indexed exactly."""
+        terms = ["", "é", "ménière", "sjögren", "😀😀😀", "ère", "aaaa"]
+        index = TrigramIndex(terms)
+
+        assert index.containing("ère") == [2, 5]
+        assert index.containing("😀😀") == [4]
+        assert index.contained_in("sjögren and ménière") == [0, 1, 2, 3, 5]
+        assert index.grams == sorted(set().union(*map(trigrams, terms)))
+
+    def test_trigrams(self) -> None:
+        """Test trigram extraction."""
+        assert trigrams("abcd") == {"abc", "bcd"}
+        assert trigrams("ab") == set()
+
+
+class TestServiceSearch:
+    """Tests for services searching through trigram indexes."""
+
+    @pytest.mark.parametrize("query", ["glu", "a", "sodium", "HbA1c", "chol", "zzz"])
+    def test_lab_search_matches_scan(self, query: str) -> None:
+        """Test lab search returns the ranges a field scan would."""
+        q = query.lower()
+        expected = [
+            ref for ref in LAB_REFERENCE_RANGES
+            if q in ref.test_name.lower() or q in ref.test_code.lower() or any(q in a for a in ref.aliases)
+        ]
+        assert LabReferenceService().search(query, limit=100) == expected[:100]
+
+    @pytest.mark.parametrize("query", ["pril", "statin", "Metformin", "beta", "x"])
+    def test_drug_search_matches_scan(self, query: str) -> None:
+        """Test drug profile search returns the profiles a field scan would."""
+        service = DrugSafetyService()
+        q = query.lower()
+        expected = [
+            p for p in service._profiles.values()
+            if q in p.drug_name.lower() or q in p.generic_name.lower() or q in p.drug_class.lower()
+        ]
+        assert service.search_profiles(query, limit=5) == expected[:5]
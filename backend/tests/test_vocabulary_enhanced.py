@@ -169,16 +169,16 @@ class TestVocabularyLoading:
         """Test vocabulary loads successfully."""
         self.service.load()
         assert self.service._loaded
-        assert len(self.service._concepts) > 0
-        assert len(self.service._synonym_index) > 0
+        assert len(self.service.concepts) > 0
+        assert self.service._store.term_count > 0
 
     def test_load_idempotent(self):
         """Test multiple load calls are idempotent."""
         self.service.load()
-        count1 = len(self.service._concepts)
+        count1 = len(self.service.concepts)
 
         self.service.load()
-        count2 = len(self.service._concepts)
+        count2 = len(self.service.concepts)
 
         assert count1 == count2
 
@@ -187,9 +187,9 @@ class TestVocabularyLoading:
         self.service.load()
 
         # Check that abbreviations are expanded
-        assert "hypertension" in self.service._synonym_index
-        assert "high blood pressure" in self.service._synonym_index
-        assert "diabetes" in self.service._synonym_index
+        assert "hypertension" in self.service._store
+        assert "high blood pressure" in self.service._store
+        assert "diabetes" in self.service._store
 
 
 # ============================================================================
@@ -516,7 +516,7 @@ class TestIntegration:
         service.load()
 
         # Should have concepts loaded
-        assert len(service._concepts) > 0
+        assert len(service.concepts) > 0
 
         # Search for a concept
         results = service.search("diabetes", limit=1)
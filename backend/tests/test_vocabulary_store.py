@@ -0,0 +1,265 @@
+"""Tests for the array-backed vocabulary store."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.schemas.base import Domain
+from app.services.vocabulary import OMOPConcept, VocabularyService
+from app.services.vocabulary_store import (
+    ConceptRecord,
+    ConceptSequence,
+    StringTable,
+    VocabularyStore,
+    VocabularyStoreBuilder,
+)
+
+
+def random_concepts(rng: random.Random, count: int) -> list[ConceptRecord]:
+    """Generate concepts with overlapping synonyms across a few domains."""
+    words = ["acute", "chronic", "renal", "cardiac", "failure", "pain", "insulin", "level", "Ü-test"]
+    concepts = []
+    for i in range(count):
+        synonyms = [
+            " ".join(rng.sample(words, rng.randint(1, 3))).title() if rng.random() < 0.3
+            else " ".join(rng.sample(words, rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        concepts.append(
+            ConceptRecord(
+                concept_id=1000 + i,
+                concept_name=synonyms[0].title(),
+                concept_code=f"C{i}",
+                vocabulary_id=rng.choice(["SNOMED", "RxNorm", "LOINC"]),
+                domain_id=rng.choice(["Condition", "Drug", "Measurement"]),
+                synonyms=synonyms,
+            )
+        )
+    return concepts
+
+
+def build_store(concepts: list[ConceptRecord]) -> VocabularyStore:
+    builder = VocabularyStoreBuilder()
+    for concept in concepts:
+        builder.add(*concept)
+    return builder.build()
+
+
+def reference_index(concepts: list[ConceptRecord]) -> dict[str, list[int]]:
+    """Dict-of-lists index the store replaces."""
+    index: dict[str, list[int]] = {}
+    for i, concept in enumerate(concepts):
+        for synonym in concept.synonyms:
+            index.setdefault(synonym.lower(), []).append(i)
+    return index
+
+
+class TestStringTable:
+    """Tests for StringTable."""
+
+    def test_round_trip(self) -> None:
+        """Test strings (including empty and non-ASCII) come back unchanged."""
+        strings = ["", "pneumonia", "Ödem", "a b c"]
+        table = StringTable.from_strings(strings)
+        assert [table[i] for i in range(len(table))] == strings
+        assert table.raw(2) == "Ödem".encode()
+
+
+class TestVocabularyStore:
+    """Tests for VocabularyStore built from VocabularyStoreBuilder."""
+
+    def test_records_round_trip(self) -> None:
+        """Test every concept is materialized with its original fields."""
+        concepts = random_concepts(random.Random(1), 200)
+        store = build_store(concepts)
+
+        assert len(store) == len(concepts)
+        assert [store.record(i) for i in range(len(store))] == concepts
+
+    def test_lookup_matches_dict_index(self) -> None:
+        """Test term lookup returns the same concepts, in load order, as a dict index."""
+        concepts = random_concepts(random.Random(2), 300)
+        store = build_store(concepts)
+        expected = reference_index(concepts)
+
+        assert store.term_count == len(expected)
+        for term, indices in expected.items():
+            assert store.lookup(term) == indices
+            assert term in store
+        assert store.lookup("not a term") == []
+        assert "not a term" not in store
+
+    def test_terms_in_insertion_order(self) -> None:
+        """Test terms() iterates terms in the order they were first added."""
+        concepts = random_concepts(random.Random(3), 50)
+        store = build_store(concepts)
+        assert list(store.terms()) == list(reference_index(concepts).items())
+
+    def test_explicit_terms(self) -> None:
+        """Test explicit index terms are used verbatim instead of lowercased synonyms."""
+        builder = VocabularyStoreBuilder()
+        builder.add(1, "Heart Rate", "HR", "Clinical Abbreviations", "Measurement", ["HR"], terms=["HR"])
+        store = builder.build()
+
+        assert store.lookup("HR") == [0]
+        assert store.lookup("hr") == []
+
+    def test_counts(self) -> None:
+        """Test domain and vocabulary counts."""
+        concepts = random_concepts(random.Random(4), 100)
+        store = build_store(concepts)
+
+        domains: dict[str, int] = {}
+        vocabularies: dict[str, int] = {}
+        for concept in concepts:
+            domains[concept.domain_id] = domains.get(concept.domain_id, 0) + 1
+            vocabularies[concept.vocabulary_id] = vocabularies.get(concept.vocabulary_id, 0) + 1
+        assert store.domain_counts() == domains
+        assert store.vocabulary_counts() == vocabularies
+
+    def test_empty(self) -> None:
+        """Test an empty store answers queries."""
+        store = VocabularyStore.empty()
+        assert len(store) == 0
+        assert store.term_count == 0
+        assert store.lookup("anything") == []
+        assert store.domain_counts() == {}
+
+
+class TestConceptIndexes:
+    """Tests for the ID hash index and domain partitions."""
+
+    def test_position_returns_first_occurrence(self) -> None:
+        """Test ID lookup matches a linear scan, including repeated IDs."""
+        concepts = random_concepts(random.Random(6), 100)
+        concepts[10] = concepts[10]._replace(concept_id=0)
+        concepts[40] = concepts[40]._replace(concept_id=0)
+        store = build_store(concepts)
+
+        assert store.position(0) == 10
+        for i, concept in enumerate(concepts):
+            if concept.concept_id:
+                assert store.position(concept.concept_id) == i
+        assert store.position(-1) is None
+
+    def test_positions_bulk(self) -> None:
+        """Test bulk lookup resolves known IDs and omits unknown ones."""
+        concepts = random_concepts(random.Random(7), 50)
+        store = build_store(concepts)
+
+        ids = [c.concept_id for c in concepts[::3]] + [-5, concepts[0].concept_id]
+        found = store.positions(ids)
+        assert found == {c.concept_id: i for i, c in enumerate(concepts) if i % 3 == 0}
+
+    def test_domain_positions(self) -> None:
+        """Test domain partitions hold each domain's concepts in load order."""
+        concepts = random_concepts(random.Random(8), 120)
+        store = build_store(concepts)
+
+        for domain in ["Condition", "Drug", "Measurement"]:
+            expected = [i for i, c in enumerate(concepts) if c.domain_id == domain]
+            assert store.domain_positions(domain).tolist() == expected
+        assert store.domain_positions("Device").tolist() == []
+
+
+class TestConceptSequence:
+    """Tests for the lazy concept view."""
+
+    def test_sequence_protocol(self) -> None:
+        """Test indexing, slicing and iteration materialize concepts."""
+        concepts = random_concepts(random.Random(5), 20)
+        view = ConceptSequence(build_store(concepts), lambda r: OMOPConcept(*r))
+
+        assert len(view) == 20
+        assert view[0] == OMOPConcept(*concepts[0])
+        assert view[-1] == OMOPConcept(*concepts[-1])
+        assert view[2:5] == [OMOPConcept(*c) for c in concepts[2:5]]
+        assert list(view) == [OMOPConcept(*c) for c in concepts]
+        with pytest.raises(IndexError):
+            view[20]
+
+
+@pytest.fixture(scope="module")
+def service() -> VocabularyService:
+    service = VocabularyService()
+    service.load()
+    return service
+
+
+class TestVocabularyServiceStore:
+    """Tests for VocabularyService on the store."""
+
+    def test_search_uses_store(self, service: VocabularyService) -> None:
+        """Test exact synonym lookups resolve through the store."""
+        store = service._store
+        term, indices = next(store.terms())
+        assert service.search(term, limit=len(indices))[: len(indices)] == [
+            service.concepts[i] for i in indices
+        ]
+
+    def test_get_by_id(self, service: VocabularyService) -> None:
+        """Test concept ID lookup returns the first concept with that ID."""
+        concept = service.concepts[len(service.concepts) // 2]
+        found = service.get_by_id(concept.concept_id)
+        assert found is not None
+        assert found.concept_id == concept.concept_id
+
+    def test_get_many(self, service: VocabularyService) -> None:
+        """Test bulk ID lookup agrees with get_by_id."""
+        ids = [c.concept_id for c in service.concepts[::7]] + [-1]
+        found = service.get_many(ids)
+
+        assert -1 not in found
+        for concept_id in ids[:-1]:
+            assert found[concept_id] == service.get_by_id(concept_id)
+
+    def test_get_concepts_by_domain(self, service: VocabularyService) -> None:
+        """Test domain partitions return the same concepts as a filter."""
+        expected = [c for c in service.concepts if c.domain == Domain.DRUG]
+        assert service.get_concepts_by_domain(Domain.DRUG) == expected
+        assert expected
+
+    def test_reload_rebuilds_indexes(self, tmp_path: Path) -> None:
+        """Test reloading swaps the store and its indexes together."""
+        fixture = tmp_path / "vocab.json"
+        concept = {
+            "concept_id": 900001,
+            "concept_name": "Test Condition",
+            "concept_code": "T1",
+            "vocabulary_id": "SNOMED",
+            "domain_id": "Condition",
+            "synonyms": ["zzq test condition"],
+        }
+        fixture.write_text(json.dumps({"concepts": [concept]}))
+        service = VocabularyService(fixture_path=fixture)
+        service.load()
+        assert service.get_by_id(900001) is not None
+
+        concept.update(concept_id=900002, domain_id="Drug")
+        fixture.write_text(json.dumps({"concepts": [concept]}))
+        service.reload()
+
+        assert service.get_by_id(900001) is None
+        assert service.get_by_id(900002).domain_id == "Drug"
+        assert 900002 in [c.concept_id for c in service.get_concepts_by_domain(Domain.DRUG)]
+
+    def test_store_smaller_than_objects(self, service: VocabularyService) -> None:
+        """Test the packed store uses less memory than concept objects plus a dict index."""
+        concepts = list(service.concepts)
+        index: dict[str, list[OMOPConcept]] = {}
+        for concept in concepts:
+            for synonym in concept.synonyms:
+                index.setdefault(synonym.lower(), []).append(concept)
+
+        object_bytes = sys.getsizeof(concepts) + sys.getsizeof(index)
+        for concept in concepts:
+            object_bytes += sys.getsizeof(concept) + sys.getsizeof(concept.__dict__)
+            object_bytes += sys.getsizeof(concept.synonyms)
+            object_bytes += sum(sys.getsizeof(s) for s in concept.synonyms)
+        object_bytes += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in index.items())
+
+        assert service.get_stats()["memory_bytes"] == service._store.nbytes
+        assert service._store.nbytes < object_bytes / 2
@@ -0,0 +1,157 @@
+"""Tests for the startup warm-up scheduler."""
+
+import threading
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import WARMUP_TASKS, app
+from app.services.warmup import WarmupScheduler, WarmupTask
+
+
+def recorder(log: list[str], name: str, result: object = None):
+    def initialize() -> object:
+        log.append(name)
+        return result
+
+    return initialize
+
+
+class TestWarmupScheduler:
+    """Tests for WarmupScheduler."""
+
+    def test_independent_tasks_run_concurrently(self) -> None:
+        """Test independent tasks overlap (each waits for the other to start)."""
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = WarmupScheduler(
+            [WarmupTask("a", barrier.wait), WarmupTask("b", barrier.wait)], max_workers=2
+        )
+
+        stats = scheduler.run()
+
+        assert stats["state"] == "ready"
+        assert stats["ready_count"] == 2
+
+    def test_dependencies_finish_first(self) -> None:
+        """Test a task starts only after the tasks it depends on."""
+        log: list[str] = []
+        scheduler = WarmupScheduler(
+            [
+                WarmupTask("engines", recorder(log, "engines"), depends_on=("vocabulary",)),
+                WarmupTask("vocabulary", recorder(log, "vocabulary")),
+            ],
+            max_workers=4,
+        )
+
+        scheduler.run()
+
+        assert log == ["vocabulary", "engines"]
+
+    def test_failure_is_isolated(self) -> None:
+        """Test a failing task is reported and does not block its dependents."""
+
+        def fail() -> None:
+            raise RuntimeError("fixture missing")
+
+        log: list[str] = []
+        scheduler = WarmupScheduler(
+            [
+                WarmupTask("bad", fail),
+                WarmupTask("after", recorder(log, "after", {"n": 1}), depends_on=("bad",)),
+            ]
+        )
+
+        stats = scheduler.run()
+
+        assert stats["state"] == "degraded"
+        assert stats["services"]["bad"]["state"] == "failed"
+        assert stats["services"]["bad"]["error"] == "fixture missing"
+        assert stats["services"]["after"]["details"] == {"n": 1}
+        assert log == ["after"]
+
+    def test_lazy_tasks_are_skipped(self) -> None:
+        """Test lazy tasks do not run and do not hold up their dependents."""
+        log: list[str] = []
+        scheduler = WarmupScheduler(
+            [
+                WarmupTask("big", recorder(log, "big")),
+                WarmupTask("small", recorder(log, "small"), depends_on=("big",)),
+            ],
+            lazy={"big"},
+        )
+
+        stats = scheduler.run()
+
+        assert log == ["small"]
+        assert stats["services"]["big"]["state"] == "lazy"
+        assert (stats["ready_count"], stats["lazy_count"]) == (1, 1)
+
+    def test_reports_partial_progress(self) -> None:
+        """Test stats show per-service state while warming."""
+        release = threading.Event()
+        scheduler = WarmupScheduler(
+            [WarmupTask("slow", lambda: release.wait(5)), WarmupTask("fast", lambda: None)]
+        )
+        scheduler.start()
+        try:
+            while scheduler.get_stats()["services"]["fast"]["state"] != "ready":
+                threading.Event().wait(0.01)
+            stats = scheduler.get_stats()
+            assert stats["state"] == "warming"
+            assert stats["services"]["slow"]["state"] == "running"
+            assert not scheduler.is_ready
+        finally:
+            release.set()
+
+        assert scheduler.wait(timeout=5)
+        assert scheduler.get_stats()["state"] == "ready"
+
+    @pytest.mark.parametrize(
+        "tasks",
+        [
+            [WarmupTask("a", lambda: None), WarmupTask("a", lambda: None)],
+            [WarmupTask("a", lambda: None, depends_on=("missing",))],
+            [
+                WarmupTask("a", lambda: None, depends_on=("b",)),
+                WarmupTask("b", lambda: None, depends_on=("a",)),
+            ],
+        ],
+        ids=["duplicate", "unknown", "cycle"],
+    )
+    def test_rejects_unschedulable_tasks(self, tasks: list[WarmupTask]) -> None:
+        """Test duplicate names, unknown dependencies and cycles are refused."""
+        with pytest.raises(ValueError):
+            WarmupScheduler(tasks)
+
+    def test_startup_tasks_are_schedulable(self) -> None:
+        """Test the application's task graph is valid."""
+        WarmupScheduler(WARMUP_TASKS)
+
+
+class TestReadinessProbe:
+    """Tests for /ready during warm-up."""
+
+    @pytest.mark.asyncio
+    async def test_ready_reports_503_while_warming(self) -> None:
+        """Test the probe fails with per-service progress until warm."""
+        release = threading.Event()
+        scheduler = WarmupScheduler([WarmupTask("slow", lambda: release.wait(5))])
+        scheduler.start()
+        app.state.warmup = scheduler
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get("/ready")
+                assert response.status_code == 503
+                assert response.json()["status"] == "warming"
+                assert response.json()["warmup"]["services"]["slow"]["state"] == "running"
+
+                release.set()
+                assert scheduler.wait(timeout=5)
+                response = await client.get("/ready")
+                assert response.status_code == 200
+                assert response.json()["warmup"]["state"] == "ready"
+        finally:
+            release.set()
+            del app.state.warmup
@@ -0,0 +1,163 @@
+"""Tests for the unit-of-work write buffer."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import ForeignKey, String, create_engine, func, select
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from app.core.database import Base
+from app.core.write_buffer import AsyncWriteBuffer, WriteBuffer
+
+
+class BufferParent(Base):
+    """Parent table for write buffer tests."""
+
+    __tablename__ = "write_buffer_parents"
+
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+class BufferChild(Base):
+    """Child table referencing BufferParent."""
+
+    __tablename__ = "write_buffer_children"
+
+    parent_id: Mapped[str] = mapped_column(ForeignKey("write_buffer_parents.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+@pytest.fixture
+def session() -> Session:
+    """Create an in-memory database with the test tables."""
+    engine = create_engine("sqlite:///:memory:")
+    tables = [BufferParent.__table__, BufferChild.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    with Session(engine) as session:
+        yield session
+
+
+def count(session: Session, model: type[Base]) -> int:
+    return session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def inserted_tables(mock_session: MagicMock) -> list[str]:
+    """Tables of the INSERTs executed on a mock session, in order."""
+    return [call.args[0].table.name for call in mock_session.execute.call_args_list]
+
+
+class TestWriteBuffer:
+    """Tests for the sync write buffer."""
+
+    def test_rows_get_client_side_ids(self, session: Session) -> None:
+        """Test IDs are assigned on add, before anything is written."""
+        buffer = WriteBuffer(session)
+        parent_id = buffer.add(BufferParent, {"name": "a"})
+        child_id = buffer.add(BufferChild, {"parent_id": parent_id, "name": "b"})
+        given_id = buffer.add(BufferParent, {"id": "kept", "name": "c"})
+
+        assert count(session, BufferParent) == 0
+        assert buffer.pending_count == 3
+        assert given_id == "kept"
+
+        buffer.flush()
+
+        child = session.get(BufferChild, child_id)
+        assert child.parent_id == parent_id
+        assert count(session, BufferParent) == 2
+        assert buffer.pending_count == 0
+
+    def test_flushes_at_max_rows(self, session: Session) -> None:
+        """Test reaching max_rows writes the pending rows."""
+        buffer = WriteBuffer(session, max_rows=3, max_age_seconds=60)
+        buffer.add_all(BufferParent, [{"name": "a"}, {"name": "b"}])
+        assert count(session, BufferParent) == 0
+
+        buffer.add(BufferParent, {"name": "c"})
+
+        assert count(session, BufferParent) == 3
+        assert buffer.get_stats()["flush_count"] == 1
+
+    def test_flushes_when_oldest_row_expires(self, session: Session) -> None:
+        """Test rows older than max_age_seconds are written on the next add."""
+        buffer = WriteBuffer(session, max_rows=100, max_age_seconds=0)
+        buffer.add(BufferParent, {"name": "a"})
+
+        assert count(session, BufferParent) == 1
+
+    def test_parents_flushed_before_children(self) -> None:
+        """Test models are written in foreign key order, whatever the add order."""
+        mock_session = MagicMock()
+        buffer = WriteBuffer(mock_session)
+        buffer.add(BufferChild, {"parent_id": "p", "name": "child"})
+        buffer.add(BufferParent, {"id": "p", "name": "parent"})
+
+        buffer.flush()
+
+        assert inserted_tables(mock_session) == ["write_buffer_parents", "write_buffer_children"]
+
+    def test_one_insert_per_model_per_flush(self) -> None:
+        """Test each model's rows go out in a single executemany."""
+        mock_session = MagicMock()
+        buffer = WriteBuffer(mock_session)
+        buffer.add_all(BufferParent, [{"name": str(i)} for i in range(50)])
+
+        buffer.flush()
+        buffer.flush()
+
+        assert mock_session.execute.call_count == 1
+        assert len(mock_session.execute.call_args.args[1]) == 50
+
+    def test_context_manager_flushes_only_on_success(self, session: Session) -> None:
+        """Test leaving the block writes pending rows unless it raised."""
+        with WriteBuffer(session) as buffer:
+            buffer.add(BufferParent, {"name": "a"})
+        assert count(session, BufferParent) == 1
+
+        with pytest.raises(RuntimeError), WriteBuffer(session) as buffer:
+            buffer.add(BufferParent, {"name": "b"})
+            raise RuntimeError("boom")
+        assert count(session, BufferParent) == 1
+
+    def test_stats_report_rows_per_flush(self, session: Session) -> None:
+        """Test flush metrics."""
+        buffer = WriteBuffer(session, max_rows=4, max_age_seconds=60)
+        parent_id = buffer.add(BufferParent, {"name": "a"})
+        buffer.add_all(BufferChild, [{"parent_id": parent_id, "name": str(i)} for i in range(3)])
+        buffer.add(BufferParent, {"name": "b"})
+        buffer.flush()
+
+        stats = buffer.get_stats()
+        assert stats["flush_count"] == 2
+        assert stats["row_count"] == 5
+        assert stats["rows_per_flush"] == 2.5
+        assert stats["max_rows_per_flush"] == 4
+        assert stats["rows_by_table"] == {"write_buffer_parents": 2, "write_buffer_children": 3}
+        assert stats["pending_count"] == 0
+
+
+class TestAsyncWriteBuffer:
+    """Tests for the async write buffer."""
+
+    @pytest.mark.asyncio
+    async def test_add_and_flush(self) -> None:
+        """Test rows are queued with IDs and written with awaited executes."""
+        mock_session = AsyncMock()
+        async with AsyncWriteBuffer(mock_session, max_rows=10) as buffer:
+            parent_id = await buffer.add(BufferParent, {"name": "a"})
+            await buffer.add(BufferChild, {"parent_id": parent_id, "name": "b"})
+            mock_session.execute.assert_not_awaited()
+
+        assert inserted_tables(mock_session) == ["write_buffer_parents", "write_buffer_children"]
+        assert buffer.get_stats()["row_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_flushes_at_max_rows(self) -> None:
+        """Test reaching max_rows writes the pending rows."""
+        mock_session = AsyncMock()
+        buffer = AsyncWriteBuffer(mock_session, max_rows=2, max_age_seconds=60)
+
+        await buffer.add_all(BufferParent, [{"name": "a"}, {"name": "b"}])
+
+        assert mock_session.execute.await_count == 1
+        assert buffer.pending_count == 0